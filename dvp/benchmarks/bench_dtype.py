@@ -0,0 +1,49 @@
+"""Benchmark float32 versus float64 signal pipelines.
+
+Report the memory footprint of the main arrays built by the sleep
+preprocessing / detection pipeline and the maximum deviation of the float32
+results from the float64 ones.
+
+Usage : python bench_dtype.py [n_hours] [sf]
+"""
+import sys
+
+import numpy as np
+
+from visbrain.utils import (filt, morlet_power, smoothing, generate_eeg,
+                            code_timer)
+
+n_hours = float(sys.argv[1]) if len(sys.argv) > 1 else 1.
+sf = float(sys.argv[2]) if len(sys.argv) > 2 else 100.
+n_pts = int(n_hours * 3600 * sf)
+data = np.squeeze(generate_eeg(sf=sf, n_pts=n_pts, random_state=0)[0])
+freqs = [.5, 4., 8., 12., 16., 30.]
+
+
+def pipeline(x):
+    """Run the preprocessing / envelope steps of the sleep detections."""
+    out = {'data': x}
+    out['filt'] = filt(sf, [.1, 45.], x)
+    out['npow'] = morlet_power(out['filt'], freqs, sf, norm=True)
+    out['smooth'] = smoothing(out['npow'][0, :], 20 * sf)
+    return out
+
+
+results, t_start = {}, code_timer(verbose=False)
+for dtype in [np.float64, np.float32]:
+    results[dtype] = pipeline(data.astype(dtype))
+    t_start = code_timer(t_start, prefix=np.dtype(dtype).name + ' pipeline')
+
+header = ('array', 'float64 (MB)', 'float32 (MB)', 'saving', 'max rel err')
+print("\n%-10s %14s %14s %10s %12s" % header)
+tot_64 = tot_32 = 0
+for key in results[np.float64].keys():
+    x_64, x_32 = results[np.float64][key], results[np.float32][key]
+    mb_64, mb_32 = x_64.nbytes / 1e6, x_32.nbytes / 1e6
+    tot_64, tot_32 = tot_64 + mb_64, tot_32 + mb_32
+    err = np.abs(x_64 - x_32).max() / np.abs(x_64).max()
+    print("%-10s %14.2f %14.2f %9.0f%% %12.2e" % (key, mb_64, mb_32,
+                                                  100. * (1. - mb_32 / mb_64),
+                                                  err))
+saving = 100. * (1. - tot_32 / tot_64)
+print("%-10s %14.2f %14.2f %9.0f%%" % ('total', tot_64, tot_32, saving))
@@ -82,4 +82,5 @@ setup(
         visbrain_sleep=visbrain.cli:cli_sleep
         visbrain_fig_hyp=visbrain.cli:cli_fig_hyp
         visbrain_sleep_stats=visbrain.cli:cli_sleep_stats
+        visbrain_sleep_stats_batch=visbrain.cli:cli_sleep_stats_batch
     ''')
@@ -6,7 +6,7 @@ import numpy as np
 
 from visbrain import Sleep
 from visbrain.io import (write_fig_hyp, read_hypno, oversample_hypno,
-                         write_csv)
+                         write_csv, batch_sleepstats)
 from visbrain.utils import sleepstats
 
 ###############################################################################
@@ -159,3 +159,59 @@ def cli_sleep_stats(hypno, outfile):
     if outfile is not None:
         write_csv(outfile, zip(keys, val))
         print('===========\nCSV file saved to:', outfile)
+
+
+# -------------------- BATCH SLEEP STATS --------------------
+
+@click.command()
+@click.option('-d', '--directory', default=None,
+              help='Directory containing hypnogram files (*.hyp, *.txt, \
+              *.csv).', type=click.Path(exists=True, file_okay=False),
+              required=True)
+@click.option('-p', '--pattern', default='*.txt',
+              help='Pattern of hypnogram file names inside the directory. \
+              Files that are not hypnograms are skipped. Default is *.txt.',
+              type=str)
+@click.option('-o', '--outfile', default=None,
+              help='Output filename (with extension - *.csv). If None, sleep \
+              statistics will only be displayed and not saved into a file',
+              type=click.Path(exists=False))
+@click.option('-j', '--n_jobs', default=1,
+              help='Number of processes (-1 to use every CPU). Default is 1.',
+              type=int)
+def cli_sleep_stats_batch(directory, pattern, outfile, n_jobs):
+    """Compute sleep statistics of hypnogram files in a directory.
+
+    The table contains one row per file with the statistics of
+    visbrain_sleep_stats, plus :
+
+    * Trans_X_Y : number of transitions from stage X to stage Y.
+    * Bouts_X, BoutMean_X, BoutMedian_X, BoutMax_X : number of bouts of
+      stage X and distribution of their duration (minutes).
+    * Shifts, SSI : number of stage shifts (per hour of TST).
+    * Awakenings, AI : number of awakenings (per hour of TST).
+    * SFI : sleep fragmentation index.
+    """
+    directory = click.format_filename(directory)
+    if outfile is not None:
+        outfile = click.format_filename(outfile)
+        # Check extension
+        ext = os.path.splitext(outfile)[1][1:].strip().lower()
+        if ext == '':
+            outfile = outfile + '.csv'
+
+    # Get sleep stats
+    stats = batch_sleepstats(os.path.join(directory, pattern), n_jobs=n_jobs)
+    if not stats:
+        print('No hypnogram file found in:', directory)
+        return None
+    keys = list(stats[0].keys())
+    table = [keys] + [[str(k[i]) for i in keys] for k in stats]
+    print('\nSLEEP STATS\n===========')
+    print('%i hypnogram files processed' % len(stats))
+    for k in stats:
+        print(k['File'], '\t', 'TST', str(k['TST']), '\t', 'SE',
+              str(k['SE']))
+    if outfile is not None:
+        write_csv(outfile, table)
+        print('===========\nCSV file saved to:', outfile)
@@ -3,6 +3,7 @@ import sys
 import getopt
 import logging
 
+import numpy as np
 from PyQt5 import QtWidgets
 from vispy import app as visapp
 
@@ -39,6 +40,20 @@ def use_app(backend_name):
     CONFIG['VISPY_APP'] = visapp.application.Application(backend_name)
 
 
+"""Floating point precision of signals (readers, preprocessing and detections).
+Single precision halves the memory footprint of large recordings.
+"""
+CONFIG['FLOAT_DTYPE'] = np.float32
+
+
+def use_dtype(dtype):
+    """Set the floating point type used for signals ('float32', 'float64')."""
+    dtype = np.dtype(dtype)
+    if dtype not in [np.float32, np.float64]:
+        raise ValueError("dtype should either be float32 or float64")
+    CONFIG['FLOAT_DTYPE'] = dtype.type
+
+
 """Input command line arguments
 """
 VISBRAIN_HELP = """
@@ -53,6 +68,9 @@ Visbrain command line arguments:
   --visbrain-show=(True|False)
     Control if GUI have to be displayed.
 
+  --visbrain-dtype=(float32|float64)
+    Floating point precision of signals. The default is 'float32'.
+
   --visbrain-help
     Display help Visbrain command line help.
 
@@ -64,7 +82,7 @@ def init_config(argv):
     global CONFIG
 
     argnames = ['visbrain-log=', 'visbrain-show=', 'visbrain-help',
-                'visbrain-search=']
+                'visbrain-search=', 'visbrain-dtype=']
     try:
         opts, args = getopt.getopt(sys.argv[1:], '', argnames)
     except getopt.GetoptError:
@@ -81,5 +99,8 @@ def init_config(argv):
                 logger.debug("Show PyQt app : %r" % CONFIG['SHOW_PYQT_APP'])
             if o == '--visbrain-search':
                 set_log_level(match=a)
+            if o == '--visbrain-dtype':
+                use_dtype(a)
+                logger.debug("Signals dtype : %s" % a)
 
 init_config(sys.argv[1:])  # noqa
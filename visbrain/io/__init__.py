@@ -8,8 +8,10 @@ from .read_annotations import *  # noqa
 from .read_data import *  # noqa
 from .read_sleep import *  # noqa
 from .rw_config import *  # noqa
+from .rw_events import *  # noqa
 from .rw_hypno import *  # noqa
 from .rw_utils import *  # noqa
+from .stream import *  # noqa
 from .write_data import *  # noqa
 from .write_image import *  # noqa
 from .write_table import *  # noqa
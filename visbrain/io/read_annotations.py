@@ -1,8 +1,56 @@
 """Read annotations."""
+import csv
+
 import numpy as np
-from .dependencies import is_mne_installed
+from .dependencies import is_mne_installed, is_pandas_installed
+
+__all__ = ['annotations_to_array', 'merge_annotations', 'read_annotations',
+           'AnnotationStore']
+
+
+def read_annotations(path, default_txt='enter annotations'):
+    """Read a CSV or TXT annotation file.
+
+    Each line of the file should contain the (start, end, text) of an
+    annotation, separated by commas. The file is parsed in a single call
+    (using pandas if installed, the csv module otherwise).
+
+    Parameters
+    ----------
+    path : string
+        Path to the annotation file.
+    default_txt : string | 'enter annotations'
+        Default text to use if the file only contains start (and end).
 
-__all__ = ['annotations_to_array', 'merge_annotations']
+    Returns
+    -------
+    start : array_like
+        First array of float.
+    end : array_like
+        Second array of float.
+    text : array_like
+        Array of text.
+    """
+    if is_pandas_installed():
+        import pandas as pd
+        try:
+            table = pd.read_csv(path, header=None, dtype=str,
+                                keep_default_na=False).values
+        except pd.errors.EmptyDataError:
+            table = np.zeros((0, 3), dtype=str)
+    else:
+        with open(path, newline='') as f:
+            rows = [k for k in csv.reader(f) if k]
+        table = np.array(rows, dtype=str) if rows else np.zeros((0, 3),
+                                                                dtype=str)
+    n_cols = table.shape[1]
+    if not 1 <= n_cols <= 3:
+        raise ValueError("Annotation files should contain (start, end, text) "
+                         "columns.")
+    start = table[:, 0]
+    end = table[:, 1] if n_cols > 1 else start
+    text = table[:, 2] if n_cols > 2 else np.full(len(start), default_txt)
+    return start.astype(float), end.astype(float), text
 
 
 def annotations_to_array(annotations, default_txt='enter annotations'):
@@ -30,8 +78,9 @@ def annotations_to_array(annotations, default_txt='enter annotations'):
         start = end = text = np.array([])
     elif isinstance(annotations, str):  # 'file.txt'
         # Get starting/ending/annotation :
-        start, end, text = np.genfromtxt(annotations, delimiter=',',
-                                         dtype=str).T
+        start, end, text = read_annotations(annotations, default_txt)
+    elif isinstance(annotations, AnnotationStore):
+        start, end, text = annotations.to_array()
     elif isinstance(annotations, (np.ndarray, list)):  # array of annotations
         annotations = np.asarray(annotations)
         if (annotations.ndim == 1):
@@ -69,12 +118,155 @@ def merge_annotations(*args):
     text : array_like
         Array of text.
     """
-    start = end = text = np.array([])
-    for k in args:
-        # Convert annotations :
-        start_t, end_t, text_t = annotations_to_array(k)
-        # Extend start, end and text :
-        start = np.append(start, start_t)
-        end = np.append(end, end_t)
-        text = np.append(text, text_t)
-    return start, end, text
+    # Convert annotations :
+    annot = [annotations_to_array(k) for k in args]
+    if not annot:
+        return np.array([]), np.array([]), np.array([])
+    # Concatenate start, end and text :
+    start, end, text = [np.concatenate([np.asarray(a[k]) for a in annot])
+                        for k in range(3)]
+    return start.astype(float), end.astype(float), text
+
+
+class AnnotationStore(object):
+    """Annotations sorted by starting time.
+
+    Annotations overlapping a time window are found using a binary search
+    over the sorted starting times and over the cumulated maximum of ending
+    times.
+
+    Parameters
+    ----------
+    start : array_like | None
+        Starting time of each annotation.
+    end : array_like | None
+        Ending time of each annotation.
+    text : array_like | None
+        Text of each annotation.
+    """
+
+    def __init__(self, start=None, end=None, text=None):
+        """Init."""
+        start = np.array([]) if start is None else np.asarray(start, float)
+        end = start.copy() if end is None else np.asarray(end, float)
+        if text is None:
+            text = np.full(len(start), 'enter annotations')
+        assert len(start) == len(end) == len(text)
+        order = np.argsort(start, kind='mergesort')
+        self.onset = start[order]
+        self.duration = end[order] - self.onset
+        self.text = np.asarray(text).astype(object)[order]
+        self._update()
+
+    def __len__(self):
+        """Return the number of annotations."""
+        return len(self.onset)
+
+    @classmethod
+    def from_annotations(cls, *args):
+        """Create a store from annotation files, arrays or MNE instances.
+
+        Parameters
+        ----------
+        args : string, array_like, mne.io.annotations.Annotations
+            Annotation file / array / MNE instance.
+
+        Returns
+        -------
+        store : AnnotationStore
+            The annotation store.
+        """
+        return cls(*merge_annotations(*args))
+
+    @property
+    def end(self):
+        """Get the ending time of each annotation."""
+        return self.onset + self.duration
+
+    def _update(self):
+        """Update the cumulated maximum of ending times and the markers."""
+        end = self.end
+        self._max_end = np.maximum.accumulate(end) if len(self) else end
+        self._markers = (self.onset + end) / 2.
+
+    def to_array(self):
+        """Get the (start, end, text) arrays (sorted by starting time)."""
+        return self.onset.copy(), self.end, self.text.copy()
+
+    def add(self, start, end, text='enter annotations'):
+        """Add an annotation.
+
+        Parameters
+        ----------
+        start : float
+            Starting time.
+        end : float
+            Ending time.
+        text : string | 'enter annotations'
+            Annotation text.
+
+        Returns
+        -------
+        idx : int
+            Index of the new annotation.
+        """
+        idx = int(np.searchsorted(self.onset, start, side='right'))
+        self.onset = np.insert(self.onset, idx, start)
+        self.duration = np.insert(self.duration, idx, end - start)
+        self.text = np.insert(self.text, idx, text)
+        self._update()
+        return idx
+
+    def remove(self, idx):
+        """Remove annotations.
+
+        Parameters
+        ----------
+        idx : int | array_like
+            Index of annotations to remove.
+        """
+        self.onset = np.delete(self.onset, idx)
+        self.duration = np.delete(self.duration, idx)
+        self.text = np.delete(self.text, idx)
+        self._update()
+
+    def query(self, t_start, t_end):
+        """Get annotations overlapping a time window.
+
+        Parameters
+        ----------
+        t_start : float
+            Starting time of the window.
+        t_end : float
+            Ending time of the window.
+
+        Returns
+        -------
+        idx : array_like
+            Sorted index of annotations overlapping [t_start, t_end].
+        """
+        first = np.searchsorted(self._max_end, t_start, side='left')
+        last = np.searchsorted(self.onset, t_end, side='right')
+        idx = np.arange(first, max(first, last))
+        return idx[self.end[idx] >= t_start]
+
+    def markers(self, t_start=None, t_end=None):
+        """Get the middle time of annotations (inside a window).
+
+        Parameters
+        ----------
+        t_start : float | None
+            Starting time of the window. If None, markers of every annotation
+            are returned.
+        t_end : float | None
+            Ending time of the window.
+
+        Returns
+        -------
+        markers : array_like
+            Middle time of annotations.
+        """
+        if t_start is None:
+            return self._markers
+        markers = self._markers[self.query(t_start, t_end)]
+        return markers[(markers >= t_start) & (markers <= t_end)]
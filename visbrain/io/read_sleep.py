@@ -15,13 +15,14 @@ from warnings import warn
 import logging
 
 from .rw_utils import get_file_ext
-from .rw_hypno import (read_hypno, oversample_hypno)
+from .rw_hypno import read_hypno
 from .dialog import dialog_load
 from .mneio import mne_switch
 from .dependencies import is_mne_installed
-from ..utils import get_dsf, vispy_array
-from ..io import merge_annotations
-from ..config import PROFILER
+from ..utils import get_dsf, vispy_array, StageRuns
+from .read_annotations import AnnotationStore
+from ..utils.sleep.loader import ChunkLoader
+from ..config import PROFILER, CONFIG
 
 logger = logging.getLogger('visbrain')
 
@@ -32,8 +33,9 @@ class ReadSleepData(object):
     """Main class for reading sleep data."""
 
     def __init__(self, data, channels, sf, hypno, href, preload, use_mne,
-                 downsample, kwargs_mne, annotations):
+                 downsample, kwargs_mne, annotations, background=False):
         """Init."""
+        loader = None
         # ========================== LOAD DATA ==========================
         # Dialog window if data is None :
         if data is None:
@@ -66,9 +68,18 @@ class ReadSleepData(object):
                 args = mne_switch(file, ext, downsample, **kwargs_mne)
             else:  # Load using Sleep functions
                 logger.debug("Load file using Sleep")
-                args = sleep_switch(file, ext, downsample)
+                args = sleep_switch(file, ext, downsample, background)
             # Get output arguments :
             (sf, downsample, dsf, data, channels, n, offset, annot) = args
+            if callable(data):  # Header only, read data in the background
+                shape = (len(channels), len(range(0, n, dsf)))
+                data, read_chunk = np.zeros(shape, CONFIG['FLOAT_DTYPE']), data
+                loader = ChunkLoader(read_chunk, data, n, dsf,
+                                     n_chunk=300 * sf)
+                # The first chunk is read right away :
+                loader.read(0)
+                logger.info("Remaining data are loaded in the background (%i "
+                            "chunks)" % (len(loader) - 1))
             info = ("File successfully loaded (%s):"
                     "\n- Sampling-frequency : %.2fHz"
                     "\n- Number of time points (before down-sampling): %i"
@@ -98,7 +109,8 @@ class ReadSleepData(object):
 
         # Keep variables :
         self._file = file
-        self._annot_file = np.c_[merge_annotations(annotations, annot)]
+        self._annot_file = AnnotationStore.from_annotations(annotations,
+                                                            annot)
         self._N = n
         self._dsf = dsf
         self._sfori = float(sf)
@@ -121,10 +133,11 @@ class ReadSleepData(object):
                 raise ValueError("Then length of the hypnogram must be the "
                                  "same as raw data")
         if isinstance(hypno, str):  # (*.hyp / *.txt / *.csv)
-            hypno, _ = read_hypno(hypno)
-            # Oversample then downsample :
-            hypno = oversample_hypno(hypno, self._N)[::dsf]
+            hypno, _ = read_hypno(hypno, as_runs=True)
             PROFILER("Hypnogram file loaded", level=1)
+        if isinstance(hypno, StageRuns):
+            # Oversample then downsample (without expanding the raw length) :
+            hypno = hypno.oversample(self._N).decimate(dsf).to_array()
 
         # ========================== CHECKING ==========================
         # ---------- DATA ----------
@@ -191,14 +204,19 @@ class ReadSleepData(object):
                 hypno = np.zeros((npts,), dtype=np.float32)
 
         # ---------- SCALING ----------
-        # Check amplitude of the data and if necessary apply re-scaling
-        if np.abs(np.ptp(data, 0).mean()) < 0.1:
+        # Check amplitude of the data and if necessary apply re-scaling (for
+        # background loading, only the first chunk is checked) :
+        n_loaded = npts if loader is None else loader.n_loaded
+        if np.abs(np.ptp(data[:, :n_loaded], 0).mean()) < 0.1:
             warn("Wrong data amplitude for Sleep software.")
-            data *= 1e6
+            data[:, :n_loaded] *= 1e6
+            if loader is not None:
+                loader.scale = 1e6
 
         # ---------- CONVERSION ----------=
-        # Convert data and hypno to be contiguous and float 32 (for vispy):
-        self._data = vispy_array(data)
+        # Convert data to be contiguous using the signal floating point type
+        # and hypno to be float 32 (for vispy):
+        self._data = vispy_array(data, CONFIG['FLOAT_DTYPE'])
         self._hypno = vispy_array(hypno)
         self._time = vispy_array(time)
         self._channels = chanc
@@ -206,8 +224,15 @@ class ReadSleepData(object):
         self._hconv = conv
         PROFILER("Check data", level=1)
 
+        # ---------- BACKGROUND LOADING ----------
+        # Remaining chunks are copied inside self._data by a background
+        # thread :
+        self._loader, self._n_loaded = loader, n_loaded
+        if loader is not None:
+            loader.start()
 
-def sleep_switch(file, ext, downsample):
+
+def sleep_switch(file, ext, downsample, chunked=False):
     """Switch between sleep data files.
 
     Parameters
@@ -218,6 +243,10 @@ def sleep_switch(file, ext, downsample):
         Extension name (e.g. '.eeg')
     downsample : int
         Down-sampling frequency.
+    chunked : bool | False
+        If True, only the header is read and the data are replaced by a
+        function read_chunk(start, stop) returning the down-sampled data
+        between two time points (before down-sampling).
 
     Returns
     -------
@@ -227,8 +256,9 @@ def sleep_switch(file, ext, downsample):
         The down-sampling frequency used.
     dsf : int
         The down-sampling factor.
-    data : array_like
-        The raw data of shape (n_channels, n_points)
+    data : array_like | callable
+        The raw data of shape (n_channels, n_points) (or the read_chunk
+        function if chunked is True).
     channels : list
         List of channel names.
     n : int
@@ -242,16 +272,16 @@ def sleep_switch(file, ext, downsample):
     path = file + ext
 
     if ext == '.vhdr':  # BrainVision
-        return read_eeg(path, downsample)
+        return read_eeg(path, downsample, chunked=chunked)
 
     if ext == '.eeg':  # Elan
-        return read_elan(path, downsample)
+        return read_elan(path, downsample, chunked)
 
     elif ext in ['.edf', '.rec']:  # European Data Format
-        return read_edf(path, downsample)
+        return read_edf(path, downsample, chunked)
 
     elif ext == '.trc':  # Micromed
-        return read_trc(path, downsample)
+        return read_trc(path, downsample, chunked)
 
     else:  # None
         raise ValueError("*" + ext + " files are currently not supported.")
@@ -263,7 +293,7 @@ def sleep_switch(file, ext, downsample):
 ###############################################################################
 ###############################################################################
 
-def read_edf(path, downsample):
+def read_edf(path, downsample, chunked=False):
     """Read data from a European Data Format (edf) file.
 
     Use phypno class for reading EDF files:
@@ -275,6 +305,9 @@ def read_edf(path, downsample):
         Filename(with full path) to EDF file
     downsample : int
         Down-sampling frequency.
+    chunked : bool | False
+        If True, data are not loaded and a function read_chunk(start, stop)
+        is returned instead.
 
     Returns
     -------
@@ -309,22 +342,24 @@ def read_edf(path, downsample):
         bad_chans = np.where(edf.hdr['n_samples_per_record'] < sf)
         chan = np.delete(chan, bad_chans)
 
-    # Load all samples of selected channels
-    np.seterr(divide='ignore', invalid='ignore')
-    data = edf.return_dat(chan, 0, n_samples)
-
-    # Get original signal length :
-    n = data.shape[1]
-
     # Get down-sample factor :
     sf = float(sf)
     chan = list(chan)
     dsf, downsample = get_dsf(downsample, sf)
 
-    return sf, downsample, dsf, data[:, ::dsf], chan, n, start_time, None
+    np.seterr(divide='ignore', invalid='ignore')
+
+    def read_chunk(start, stop):
+        # Load samples of selected channels
+        data = edf.return_dat(chan, start, stop, dtype=CONFIG['FLOAT_DTYPE'])
+        return data[:, ::dsf]
+
+    data = read_chunk if chunked else read_chunk(0, n_samples)
+
+    return sf, downsample, dsf, data, chan, n_samples, start_time, None
 
 
-def read_trc(path, downsample):
+def read_trc(path, downsample, chunked=False):
     """Read data from a Micromed (trc) file (version 4).
 
     Poor man's version of micromedio.py from Neo package
@@ -336,6 +371,9 @@ def read_trc(path, downsample):
         Filename(with full path) to .trc file
     downsample : int
         Down-sampling frequency.
+    chunked : bool | False
+        If True, data are not loaded and a function read_chunk(start, stop)
+        is returned instead.
 
     Returns
     -------
@@ -372,16 +410,16 @@ def read_trc(path, downsample):
         day, month, year, hour, minute, sec = read_f(f, 'bbbbbb')
         start_time = datetime.time(hour, minute, sec)
 
-        # Raw data
-        f.seek(data_start_offset, 0)
-        m_raw = np.fromstring(f.read(), dtype='u' + str(nbytes))
-        m_raw = m_raw.reshape((int(m_raw.size / n_chan), n_chan)).transpose()
+        # Raw data (only mapped, samples are read when needed)
+        n_bytes = os.path.getsize(path) - data_start_offset
+        m_raw = np.memmap(path, dtype='u' + str(nbytes), mode='r',
+                          offset=data_start_offset,
+                          shape=(int(n_bytes / (nbytes * n_chan)), n_chan)).T
 
         # Read label / gain
         gain = []
         chan = []
         logical_ground = []
-        data = np.empty(shape=m_raw.shape, dtype=np.float32)
 
         f.seek(176, 0)
         zone_names = ['ORDER', 'LABCOD']
@@ -407,22 +445,27 @@ def read_trc(path, downsample):
             gain = np.append(gain, float(physical_max - physical_min) /
                              float(logical_max - logical_min + 1))
 
-    # Multiply by gain
-    m_raw = m_raw - logical_ground[:, np.newaxis]
-    data = m_raw * gain[:, np.newaxis].astype(np.float32)
-
     # Get original signal length :
-    n = data.shape[1]
+    n = m_raw.shape[1]
 
     # Get down-sample factor :
     sf = float(sf)
     chan = list(chan)
     dsf, downsample = get_dsf(downsample, sf)
 
-    return sf, downsample, dsf, data[:, ::dsf], chan, n, start_time, None
+    def read_chunk(start, stop):
+        # Multiply by gain
+        data = m_raw[:, start:stop:dsf].astype(CONFIG['FLOAT_DTYPE'])
+        data -= logical_ground[:, np.newaxis]
+        data *= gain[:, np.newaxis]
+        return data
+
+    data = read_chunk if chunked else read_chunk(0, n)
+
+    return sf, downsample, dsf, data, chan, n, start_time, None
 
 
-def read_eeg(path, downsample, read_markers=False):
+def read_eeg(path, downsample, read_markers=False, chunked=False):
     """Read data from a BrainVision (*.vhdr) file.
 
     Poor man's version of https: // gist.github.com / breuderink / 6266871
@@ -441,6 +484,9 @@ def read_eeg(path, downsample, read_markers=False):
         Down-sampling frequency.
     read_markers : bool | False
         Import markers from the .vmrk files as annotations
+    chunked : bool | False
+        If True, data are not loaded and a function read_chunk(start, stop)
+        is returned instead.
 
     Returns
     -------
@@ -536,27 +582,30 @@ def read_eeg(path, downsample, read_markers=False):
         else:
             anot = None
 
-    with io.open(data_path, 'rb') as f:
-        raw = f.read()
-        size = int(len(raw) / 2)
-
-        ints = np.ndarray((n_chan, int(size / n_chan)),
-                          dtype='<i2', order='F', buffer=raw)
-
-        data = np.float32(np.diag(resolution)).dot(ints)
+    # Raw data (only mapped, samples are read when needed)
+    size = int(os.path.getsize(data_path) / 2)
+    ints = np.memmap(data_path, dtype='<i2', mode='r', order='F',
+                     shape=(n_chan, int(size / n_chan)))
 
     # Get original signal length :
-    n = data.shape[1]
+    n = ints.shape[1]
 
     # Get down-sample factor :
     sf = float(sf)
     chan = list(chan)
     dsf, downsample = get_dsf(downsample, sf)
 
-    return sf, downsample, dsf, data[:, ::dsf], chan, n, start_time, anot
+    def read_chunk(start, stop):
+        data = ints[:, start:stop:dsf].astype(CONFIG['FLOAT_DTYPE'])
+        data *= resolution[:, np.newaxis]
+        return data
+
+    data = read_chunk if chunked else read_chunk(0, n)
 
+    return sf, downsample, dsf, data, chan, n, start_time, anot
 
-def read_elan(path, downsample):
+
+def read_elan(path, downsample, chunked=False):
     """Read data from a ELAN (eeg) file.
 
     Elan format specs: http: // elan.lyon.inserm.fr/
@@ -567,6 +616,9 @@ def read_elan(path, downsample):
         Filename(with full path) to Elan .eeg file
     downsample : int
         Down-sampling frequency.
+    chunked : bool | False
+        If True, data are not loaded and a function read_chunk(start, stop)
+        is returned instead.
 
     Returns
     -------
@@ -639,8 +691,7 @@ def read_elan(path, downsample):
         max_num = float(ent[offset4 + i])
 
         gain[i - 1] = (max_an - min_an) / (max_num - min_num)
-    if gain.dtype != np.float32:
-        gain = gain.astype(np.float32, copy=False)
+    gain = gain.astype(CONFIG['FLOAT_DTYPE'], copy=False)
 
     # Load memmap
     nb_bytes = os.path.getsize(path)
@@ -657,8 +708,12 @@ def read_elan(path, downsample):
     chan = list(chan)
     dsf, downsample = get_dsf(downsample, sf)
 
-    # Multiply by gain :
-    data = m_raw[chan_list, ::dsf] * \
-        gain[chan_list][..., np.newaxis]
+    def read_chunk(start, stop):
+        # Multiply by gain :
+        data = m_raw[chan_list, start:stop:dsf].astype(gain.dtype)
+        data *= gain[chan_list][..., np.newaxis]
+        return data
+
+    data = read_chunk if chunked else read_chunk(0, n)
 
     return sf, downsample, dsf, data, chan, n, start_time, None
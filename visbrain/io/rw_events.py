@@ -0,0 +1,287 @@
+"""Columnar storage of detected events.
+
+Events of every (channel, type) detection of a recording are stored in a
+single uncompressed NumPy archive (*.npz) with one array per column (channel,
+type, start, stop and optional features). Rows are sorted by channel, type
+and starting index and the offset of each (channel, type) group is stored so
+that a group is a contiguous slice of each column. Columns are memory-mapped
+when the archive is loaded. Hence, querying a channel or a time window only
+reads the pages of the file covering the requested rows.
+"""
+import logging
+import struct
+import zipfile
+
+import numpy as np
+
+logger = logging.getLogger('visbrain')
+
+__all__ = ('EventStore',)
+
+
+def _npz_memmap(path):
+    """Memory-map arrays of an uncompressed NumPy archive.
+
+    Arrays that can't be memory-mapped (compressed, empty or containing
+    Python objects) are loaded instead.
+
+    Parameters
+    ----------
+    path : string
+        Path to the *.npz file.
+
+    Returns
+    -------
+    arrays : dict
+        Dictionary of arrays.
+    """
+    fmt = np.lib.format
+    read_header = {(1, 0): fmt.read_array_header_1_0,
+                   (2, 0): fmt.read_array_header_2_0}
+    arrays, to_load = {}, []
+    with zipfile.ZipFile(path) as zf, open(path, 'rb') as f:
+        for info in zf.infolist():
+            name = info.filename[:-4]
+            if info.compress_type != zipfile.ZIP_STORED:
+                to_load.append(name)
+                continue
+            # Skip the local header of the file (30 bytes + name + extra) :
+            f.seek(info.header_offset + 26)
+            n_name, n_extra = struct.unpack('<HH', f.read(4))
+            f.seek(info.header_offset + 30 + n_name + n_extra)
+            version = fmt.read_magic(f)
+            if version not in read_header:
+                to_load.append(name)
+                continue
+            shape, fortran, dtype = read_header[version](f)
+            if dtype.hasobject or not np.prod(shape):
+                to_load.append(name)
+                continue
+            arrays[name] = np.memmap(path, dtype=dtype, mode='r',
+                                     offset=f.tell(), shape=shape,
+                                     order='F' if fortran else 'C')
+    if to_load:
+        with np.load(path) as arch:
+            arrays.update({k: arch[k] for k in to_load})
+    return arrays
+
+
+class EventStore(object):
+    """Columnar store of detected events.
+
+    Events are sorted by channel, type and starting index. Events of a
+    (channel, type) detection overlapping a window are found using a binary
+    search over the sorted starting indices and over the cumulated maximum of
+    stopping indices (see the query method).
+
+    Parameters
+    ----------
+    channels : list
+        Name of each channel.
+    types : list
+        Name of each detection type (e.g 'Spindles').
+    columns : dict | None
+        Dictionary of sorted columns with at least the 'channel', 'type'
+        (codes referring to channels and types), 'start' and 'stop' keys.
+        Other columns are per-event features. Use the from_dict method to
+        build a store from unsorted detections.
+    """
+
+    _base = ('channel', 'type', 'start', 'stop')
+
+    def __init__(self, channels, types, columns=None):
+        """Init."""
+        self.channels, self.types = list(channels), list(types)
+        if columns is None:
+            columns = {k: np.zeros((0,), dtype=int) for k in self._base}
+        assert all([k in columns for k in self._base])
+        self._columns = columns
+        # Offset of each (channel, type) group and cumulated maximum of
+        # stopping indices inside each group (both saved with the store) :
+        self._offsets = columns.pop('_offsets', None)
+        if (self._offsets is None) or ('_max_stop' not in columns):
+            group = self._group(columns['channel'], columns['type'])
+            self._offsets = np.searchsorted(group, np.arange(
+                len(self.channels) * len(self.types) + 1), side='left')
+            stop = np.asarray(columns['stop'], dtype=np.int64)
+            shift = group * (int(stop.max()) + 1 if len(stop) else 0)
+            columns['_max_stop'] = np.maximum.accumulate(stop + shift) - shift
+
+    def __len__(self):
+        """Return the number of events."""
+        return len(self._columns['start'])
+
+    def __contains__(self, key):
+        """Return if a (channel, type) detection contains events."""
+        sl = self._slice(*key)
+        return sl.stop > sl.start
+
+    def _group(self, channel, kind):
+        """Get the group number of (channel, type) codes."""
+        return np.asarray(channel, dtype=np.int64) * len(self.types) + kind
+
+    def _slice(self, channel, kind):
+        """Get the rows of a (channel, type) detection."""
+        if (channel not in self.channels) or (kind not in self.types):
+            return slice(0, 0)
+        g = int(self._group(self.channels.index(channel),
+                            self.types.index(kind)))
+        return slice(int(self._offsets[g]), int(self._offsets[g + 1]))
+
+    @property
+    def features(self):
+        """Get the name of per-event features."""
+        return [k for k in self._columns.keys() if k not in self._base and
+                not k.startswith('_')]
+
+    @property
+    def keys(self):
+        """Get the (channel, type) of non-empty detections."""
+        return [(c, t) for c in self.channels for t in self.types if
+                (c, t) in self]
+
+    @classmethod
+    def from_dict(cls, events, features=None):
+        """Create a store from detections.
+
+        Parameters
+        ----------
+        events : dict
+            Dictionary of detections as {(channel, type): index} where index
+            is an array of shape (n_events, 2) containing the (start, stop)
+            index of each event.
+        features : dict | None
+            Per-event features as {name: {(channel, type): values}} where
+            values is an array of shape (n_events,). Missing values are
+            filled with NaN.
+
+        Returns
+        -------
+        store : EventStore
+            The event store.
+        """
+        features = {} if features is None else features
+        keys = [k for k in events.keys() if np.asarray(events[k]).size]
+        channels = sorted(set([k[0] for k in keys]), key=str)
+        types = sorted(set([k[1] for k in keys]), key=str)
+        index = [np.asarray(events[k], dtype=np.int64).reshape(-1, 2) for k
+                 in keys]
+        n_events = [len(k) for k in index]
+        index = np.concatenate(index + [np.zeros((0, 2), dtype=np.int64)])
+        columns = {'channel': np.repeat([channels.index(k[0]) for k in keys],
+                                        n_events).astype(np.int16),
+                   'type': np.repeat([types.index(k[1]) for k in keys],
+                                     n_events).astype(np.int8),
+                   'start': index[:, 0], 'stop': index[:, 1]}
+        for name, values in features.items():
+            columns[name] = np.concatenate([np.asarray(values.get(
+                k, np.full((n,), np.nan)), dtype=float).ravel() for k, n in
+                zip(keys, n_events)] + [np.zeros((0,))])
+        # Sort by channel, type and starting index :
+        order = np.lexsort((columns['start'], columns['type'],
+                            columns['channel']))
+        return cls(channels, types, {k: v[order] for k, v in
+                                     columns.items()})
+
+    def to_dict(self):
+        """Get detections as {(channel, type): index}."""
+        return {k: self.query(*k)['index'] for k in self.keys}
+
+    def query(self, channel=None, kind=None, start=None, stop=None,
+              columns=None):
+        """Get events of a channel and / or overlapping a window.
+
+        Parameters
+        ----------
+        channel : string | None
+            Name of the channel. If None, every channel is used.
+        kind : string | None
+            Detection type. If None, every type is used.
+        start, stop : int | None
+            Window of samples [start, stop[. If None, the entire recording is
+            used.
+        columns : list | None
+            Features to return. If None, every feature is returned.
+
+        Returns
+        -------
+        events : dict
+            Dictionary with the 'channel' and 'type' names, the (start, stop)
+            'index' of shape (n_events, 2) and features of each event. Rows
+            are sorted by channel, type and starting index.
+        """
+        channels = self.channels if channel is None else [channel]
+        types = self.types if kind is None else [kind]
+        columns = self.features if columns is None else list(columns)
+        start = -np.inf if start is None else start
+        stop = np.inf if stop is None else stop
+        col, rows = self._columns, []
+        for c in channels:
+            for t in types:
+                sl = self._slice(c, t)
+                # Events starting before the end of the window and after the
+                # first event that could overlap the window :
+                first = sl.start + np.searchsorted(col['_max_stop'][sl],
+                                                   start, side='left')
+                last = sl.start + np.searchsorted(col['start'][sl], stop,
+                                                  side='left')
+                if last <= first:
+                    continue
+                is_over = np.asarray(col['stop'][first:last]) >= start
+                if is_over.all():
+                    rows.append(slice(first, last))
+                else:
+                    rows.append(first + np.nonzero(is_over)[0])
+
+        def _take(x):
+            # A single slice of a memory-mapped column is not copied :
+            if len(rows) == 1:
+                return x[rows[0]]
+            return np.concatenate([x[k] for k in rows] + [x[0:0]])
+
+        events = {'index': np.c_[_take(col['start']), _take(col['stop'])]}
+        events['channel'] = np.array(self.channels, dtype=object)[
+            _take(col['channel'])]
+        events['type'] = np.array(self.types, dtype=object)[
+            _take(col['type'])]
+        for k in columns:
+            events[k] = _take(col[k])
+        return events
+
+    def save(self, path):
+        """Save the store as an uncompressed NumPy archive.
+
+        Parameters
+        ----------
+        path : string
+            Path to the *.npz file.
+        """
+        np.savez(path, _channels=np.array(self.channels, dtype=str),
+                 _types=np.array(self.types, dtype=str),
+                 _offsets=self._offsets, **self._columns)
+        logger.info("%i events saved (%s)" % (len(self), path))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Load a store saved using the save method.
+
+        Parameters
+        ----------
+        path : string
+            Path to the *.npz file.
+        mmap : bool | True
+            Memory-map columns (columns are only read when queried).
+
+        Returns
+        -------
+        store : EventStore
+            The event store.
+        """
+        if mmap:
+            columns = _npz_memmap(path)
+        else:
+            with np.load(path) as arch:
+                columns = {k: arch[k] for k in arch.files}
+        channels = [str(k) for k in columns.pop('_channels')]
+        types = [str(k) for k in columns.pop('_types')]
+        return cls(channels, types, columns)
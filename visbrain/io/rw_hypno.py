@@ -5,14 +5,21 @@
 - read_hypno : read either *.hyp or *.txt hypnogram data
 - read_hypno_hyp : load *.hyp hypnogram data
 - read_hypno_txt : load *.txt hypnogram data
+- batch_sleepstats : sleep statistics of several hypnogram files
 """
+import logging
 import numpy as np
 import os
+from concurrent import futures
+from glob import glob
 
-from ..utils import vispy_array
+from ..utils import vispy_array, StageRuns
+
+logger = logging.getLogger('visbrain')
 
 __all__ = ('oversample_hypno', 'write_hypno_txt', 'write_hypno_hyp',
-           'read_hypno', 'read_hypno_hyp', 'read_hypno_txt')
+           'read_hypno', 'read_hypno_hyp', 'read_hypno_txt',
+           'batch_sleepstats')
 
 
 def oversample_hypno(hypno, n):
@@ -20,16 +27,19 @@ def oversample_hypno(hypno, n):
 
     Parameters
     ----------
-    hypno : array_like
+    hypno : array_like | StageRuns
         Hypnogram data of shape (N,) with N < n.
     n : int
         The destination length.
 
     Returns
     -------
-    hypno : array_like
-        The hypnogram of shape (n,)
+    hypno : array_like | StageRuns
+        The hypnogram of shape (n,). If hypno is a StageRuns instance, the
+        oversampled runs are returned instead.
     """
+    if isinstance(hypno, StageRuns):
+        return hypno.oversample(n)
     # Get the repetition number :
     rep_nb = float(np.floor(n / len(hypno)))
 
@@ -47,6 +57,16 @@ def oversample_hypno(hypno, n):
     return hypno.astype(int)
 
 
+def _hypno_per_second(hypno, sfori, n):
+    """Get one hypnogram value per second of the raw data."""
+    n_sec = np.round(n / sfori)
+    if isinstance(hypno, StageRuns):
+        step = int(hypno.n / n_sec)
+        return hypno.stage_at(np.arange(0, hypno.n, step))
+    step = int(hypno.shape / n_sec)
+    return hypno[::step].astype(int)
+
+
 def write_hypno_txt(filename, hypno, sf, sfori, n, window=1.):
     """Save hypnogram in txt file format (txt).
 
@@ -56,7 +76,7 @@ def write_hypno_txt(filename, hypno, sf, sfori, n, window=1.):
     ----------
     filename : str
         Filename (with full path) of the file to save
-    hypno : array_like
+    hypno : array_like | StageRuns
         Hypnogram array, same length as data
     sf : float
         Sampling frequency of the data (after downsampling)
@@ -75,8 +95,7 @@ def write_hypno_txt(filename, hypno, sf, sfori, n, window=1.):
         base)[0] + '_description.txt')
 
     # Save hypno
-    step = int(hypno.shape / np.round(n / sfori))
-    np.savetxt(filename, hypno[::step].astype(int), fmt='%s')
+    np.savetxt(filename, _hypno_per_second(hypno, sfori, n), fmt='%s')
 
     # Save header file
     hdr = np.array([['time ' + str(window)], ['W 0'], ['N1 1'], ['N2 2'],
@@ -91,7 +110,7 @@ def write_hypno_hyp(filename, hypno, sf, sfori, n):
     ----------
     filename : str
         Filename (with full path) of the file to save
-    hypno : array_like
+    hypno : array_like | StageRuns
         Hypnogram array, same length as data
     sf : int
         Sampling frequency of the data (after downsampling)
@@ -102,9 +121,8 @@ def write_hypno_hyp(filename, hypno, sf, sfori, n):
     """
     # Check data format
     sf = int(sf)
-    hypno = hypno.astype(int)
+    hypno = _hypno_per_second(hypno, sfori, n)
     hypno[hypno == 4] = 5
-    step = int(hypno.shape / np.round(n / sfori))
 
     hdr = np.array([['time_base 1.000000'],
                     ['sampling_period ' + str(np.round(1 / sfori, 8))],
@@ -112,11 +130,11 @@ def write_hypno_hyp(filename, hypno, sf, sfori, n):
                     ['epoch_list']]).flatten()
 
     # Save
-    export = np.append(hdr, hypno[::step].astype(str))
+    export = np.append(hdr, hypno.astype(str))
     np.savetxt(filename, export, fmt='%s')
 
 
-def read_hypno(path):
+def read_hypno(path, as_runs=False):
     """Load hypnogram file.
 
     Sleep stages in the hypnogram should be scored as follow
@@ -133,10 +151,13 @@ def read_hypno(path):
     ----------
     path : string
         Filename (with full path) to hypnogram file.
+    as_runs : bool | False
+        Return the hypnogram as a compact StageRuns object instead of a
+        vector.
 
     Returns
     -------
-    hypno : array_like
+    hypno : array_like | StageRuns
         The hypnogram vector in its original length.
 
     sf_hyp: float
@@ -154,9 +175,60 @@ def read_hypno(path):
     elif ext in ['.txt', '.csv']:  # TXT / CSV
         hypno, sf_hyp = read_hypno_txt(path)
 
+    if as_runs:
+        return StageRuns(hypno, sf_hyp), sf_hyp
     return vispy_array(hypno), sf_hyp
 
 
+def _read_sleepstats(path):
+    """Read a hypnogram file and compute extended sleep statistics.
+
+    Files that can't be read as an hypnogram return None.
+    """
+    try:
+        runs, _ = read_hypno(path, as_runs=True)
+    except Exception as e:
+        logger.warning("%s skipped (%s)" % (path, repr(e)))
+        return None
+    stats = {'File': path}
+    stats.update(runs.sleepstats(extended=True))
+    return stats
+
+
+def batch_sleepstats(paths, n_jobs=1):
+    """Compute sleep statistics of several hypnogram files.
+
+    Each file is described by runs of consecutive stages so that every
+    statistic (including transitions, bouts and fragmentation indices, see
+    visbrain.utils.sleepstats) is computed from a single pass over the
+    runs.
+
+    Parameters
+    ----------
+    paths : string | list
+        Either a glob pattern (e.g 'hypnograms/*.txt') or a list of
+        hypnogram files (*.hyp, *.txt, *.csv). Files that can't be read as
+        an hypnogram are skipped.
+    n_jobs : int | 1
+        Number of processes used to read files. Use -1 to use every CPU.
+
+    Returns
+    -------
+    stats : list
+        List of sleep statistics (one dictionary per file). Every dictionary
+        share the same keys so that it can be used as a table with one row
+        per file.
+    """
+    files = sorted(glob(paths)) if isinstance(paths, str) else list(paths)
+    n_jobs = os.cpu_count() if n_jobs == -1 else int(n_jobs)
+    if (n_jobs > 1) and (len(files) > 1):
+        with futures.ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            stats = list(executor.map(_read_sleepstats, files))
+    else:
+        stats = [_read_sleepstats(k) for k in files]
+    return [k for k in stats if k is not None]
+
+
 def read_hypno_hyp(path):
     """Read Elan hypnogram (hyp).
 
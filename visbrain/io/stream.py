@@ -0,0 +1,463 @@
+"""Acquire data from a streaming source.
+
+A source (a growing binary file or a local TCP socket) is read in a
+background thread. Samples are expected to be interleaved, i.e. each frame
+contains one sample of every channel, using a fixed binary type (float32 by
+default). Received chunks are queued and, each time the display is refreshed,
+they are filtered (causal filter with a persistent state), decimated and
+pushed inside a fixed-size ring buffer containing the latest samples. The
+queue is bounded so that a display that can't keep up drops the oldest chunks
+instead of accumulating latency. Online detectors (e.g OnlineSpindles) can be
+run on processed chunks.
+"""
+import logging
+import socket
+import threading
+import time as tm
+from collections import deque
+
+import numpy as np
+from scipy.signal import butter, sosfilt, sosfilt_zi
+
+logger = logging.getLogger('visbrain')
+
+__all__ = ('StreamSource', 'FileSource', 'TCPSource', 'RingBuffer',
+           'StreamReader')
+
+
+###############################################################################
+###############################################################################
+#                                  SOURCES
+###############################################################################
+###############################################################################
+
+
+class StreamSource(object):
+    """Base class of streaming sources.
+
+    Sub-classes only have to implement the _recv method that returns the
+    bytes received since the previous call. Bytes are converted into chunks
+    of complete frames (incomplete frames are kept for the next call).
+
+    Parameters
+    ----------
+    n_channels : int
+        Number of channels.
+    sf : float
+        The sampling frequency.
+    dtype : string | 'float32'
+        Binary type of samples.
+    """
+
+    def __init__(self, n_channels, sf, dtype='float32'):
+        """Init."""
+        assert n_channels > 0 and sf > 0.
+        self.n_channels, self.sf = int(n_channels), float(sf)
+        self.dtype = np.dtype(dtype)
+        self.closed = False
+        self._frame = self.n_channels * self.dtype.itemsize
+        self._rest = b''
+
+    def _recv(self):
+        """Get received bytes (empty if nothing new was received)."""
+        raise NotImplementedError
+
+    def open(self):
+        """Open the source."""
+        pass
+
+    def close(self):
+        """Close the source."""
+        self.closed = True
+
+    def read(self):
+        """Read received samples.
+
+        Returns
+        -------
+        chunk : array_like | None
+            Array of shape (n_channels, n_samples) or None if no complete
+            frame has been received.
+        """
+        raw = self._rest + self._recv()
+        n_frames = len(raw) // self._frame
+        self._rest = raw[n_frames * self._frame:]
+        if not n_frames:
+            return None
+        chunk = np.frombuffer(raw, self.dtype, n_frames * self.n_channels)
+        return chunk.reshape(n_frames, self.n_channels).T
+
+
+class FileSource(StreamSource):
+    """Read a binary file that is growing (e.g written by an amplifier).
+
+    Parameters
+    ----------
+    path : string
+        Path to the binary file.
+    n_channels : int
+        Number of channels.
+    sf : float
+        The sampling frequency.
+    dtype : string | 'float32'
+        Binary type of samples.
+    offset : int | 0
+        Number of bytes to skip (e.g a header).
+    """
+
+    def __init__(self, path, n_channels, sf, dtype='float32', offset=0):
+        """Init."""
+        StreamSource.__init__(self, n_channels, sf, dtype)
+        self.path, self.offset = path, int(offset)
+        self._file = None
+
+    def open(self):
+        """Open the file."""
+        if self._file is None:
+            self._file = open(self.path, 'rb')
+            self._file.seek(self.offset)
+
+    def close(self):
+        """Close the file."""
+        StreamSource.close(self)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _recv(self):
+        """Get bytes written since the previous call."""
+        self.open()
+        return self._file.read()
+
+
+class TCPSource(StreamSource):
+    """Read samples sent through a local TCP socket.
+
+    The source connects to a server that sends interleaved samples. The
+    source is closed when the server closes the connection.
+
+    Parameters
+    ----------
+    port : int
+        Port of the server.
+    n_channels : int
+        Number of channels.
+    sf : float
+        The sampling frequency.
+    host : string | '127.0.0.1'
+        Address of the server.
+    dtype : string | 'float32'
+        Binary type of samples.
+    timeout : float | .05
+        Maximum time (in seconds) to wait for new bytes.
+    """
+
+    def __init__(self, port, n_channels, sf, host='127.0.0.1',
+                 dtype='float32', timeout=.05):
+        """Init."""
+        StreamSource.__init__(self, n_channels, sf, dtype)
+        self.host, self.port, self.timeout = host, int(port), timeout
+        self._sock = None
+
+    def open(self):
+        """Connect to the server."""
+        if self._sock is None:
+            self._sock = socket.create_connection((self.host, self.port))
+            self._sock.settimeout(self.timeout)
+
+    def close(self):
+        """Close the connection."""
+        StreamSource.close(self)
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def _recv(self):
+        """Get bytes received since the previous call."""
+        self.open()
+        try:
+            raw = self._sock.recv(1 << 20)
+        except socket.timeout:
+            return b''
+        if not raw:  # connection closed by the server
+            self.closed = True
+        return raw
+
+
+###############################################################################
+###############################################################################
+#                              RING BUFFER
+###############################################################################
+###############################################################################
+
+
+class RingBuffer(object):
+    """Fixed-size buffer containing the latest samples of each channel.
+
+    Parameters
+    ----------
+    n_channels : int
+        Number of channels.
+    size : int
+        Maximum number of samples per channel.
+    dtype : type | np.float32
+        Data type of the buffer.
+    """
+
+    def __init__(self, n_channels, size, dtype=np.float32):
+        """Init."""
+        assert size > 0
+        self._data = np.zeros((int(n_channels), int(size)), dtype=dtype)
+        self.n_total = 0
+
+    def __len__(self):
+        """Return the number of samples inside the buffer."""
+        return min(self.n_total, self.size)
+
+    @property
+    def size(self):
+        """Get the maximum number of samples."""
+        return self._data.shape[1]
+
+    def push(self, x):
+        """Push samples.
+
+        Parameters
+        ----------
+        x : array_like
+            Array of shape (n_channels, n_samples).
+        """
+        n = x.shape[1]
+        # Only the latest samples are kept if the chunk is too large :
+        start = self.n_total + max(n - self.size, 0)
+        x = x[:, start - self.n_total:]
+        start, n_x = start % self.size, x.shape[1]
+        n_end = min(n_x, self.size - start)
+        self._data[:, start:start + n_end] = x[:, :n_end]
+        self._data[:, :n_x - n_end] = x[:, n_end:]
+        self.n_total += n
+
+    def get(self, n=None):
+        """Get the latest samples (in chronological order).
+
+        Parameters
+        ----------
+        n : int | None
+            Number of samples. If None, every sample of the buffer is
+            returned.
+
+        Returns
+        -------
+        data : array_like
+            Array of shape (n_channels, n).
+        """
+        n = len(self) if n is None else min(int(n), len(self))
+        stop = self.n_total % self.size
+        index = np.arange(stop - n, stop) % self.size
+        return self._data[:, index]
+
+
+###############################################################################
+###############################################################################
+#                                  READER
+###############################################################################
+###############################################################################
+
+
+class StreamReader(object):
+    """Read a streaming source in a background thread.
+
+    Chunks are queued by the background thread and processed by the update
+    method (usually called by a display timer). Processing is incremental :
+    the filter state and the decimation phase are kept between chunks.
+
+    Parameters
+    ----------
+    source : StreamSource
+        The streaming source.
+    duration : float | 30.
+        Duration (in seconds) of the ring buffer.
+    dsf : int | 1
+        Down-sampling factor.
+    filt : tuple | None
+        Causal Butterworth filter as (f_low, f_high). Use None for one of the
+        frequencies to use a highpass or lowpass filter.
+    order : int | 3
+        Order of the filter.
+    max_chunks : int | 64
+        Maximum number of queued chunks. If the queue is full, the oldest
+        chunk is dropped (see n_dropped).
+    interval : float | .01
+        Time (in seconds) between two reads of the source when no sample is
+        received.
+    """
+
+    def __init__(self, source, duration=30., dsf=1, filt=None, order=3,
+                 max_chunks=64, interval=.01):
+        """Init."""
+        assert isinstance(source, StreamSource) and dsf >= 1
+        self.source, self.dsf = source, int(dsf)
+        self.sf = source.sf / self.dsf
+        self.buffer = RingBuffer(source.n_channels, int(duration * self.sf))
+        self.interval = interval
+        # Causal filter (second-order sections and state of each channel) :
+        self._sos = self._zi = None
+        if filt is not None:
+            nyq = source.sf / 2.
+            f_low, f_high = filt
+            if f_low is None:
+                wn, btype = f_high / nyq, 'lowpass'
+            elif f_high is None:
+                wn, btype = f_low / nyq, 'highpass'
+            else:
+                wn, btype = [f_low / nyq, f_high / nyq], 'bandpass'
+            self._sos = butter(order, wn, btype, output='sos')
+        self._phase = 0
+        # Queue of (arrival time, chunk) and counters :
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self.max_chunks = max_chunks
+        self.n_chunks = self.n_dropped = 0
+        self._last_arrival = None
+        self.latency = np.nan
+        self._stop = False
+        self._thread = None
+        # Online detectors and detected events :
+        self._detectors, self.events = {}, {}
+
+    @property
+    def n_channels(self):
+        """Get the number of channels."""
+        return self.source.n_channels
+
+    @property
+    def is_running(self):
+        """Get if the source is still read."""
+        return (self._thread is not None) and self._thread.is_alive()
+
+    def add_detector(self, name, channel, detector):
+        """Run an online detector on processed chunks of a channel.
+
+        Parameters
+        ----------
+        name : string
+            Name of the detection (e.g 'Spindles').
+        channel : int
+            Index of the channel.
+        detector : OnlineSpindles | OnlineSlowWaves
+            The online detector (see visbrain.utils). The detector must be
+            created using the sampling frequency of the reader (i.e after
+            the down-sampling).
+        """
+        assert abs(detector.sf - self.sf) < 1e-6, ("The sampling frequency "
+                                                   "of the detector must be "
+                                                   "%.2fHz" % self.sf)
+        key = (channel, name)
+        self._detectors[key] = (detector, self.buffer.n_total)
+        self.events[key] = np.zeros((0, 2), dtype=int)
+
+    def start(self):
+        """Start reading the source in a background thread."""
+        if self.is_running:
+            return None
+        self._stop = False
+        self.source.open()
+        self._thread = threading.Thread(target=self._run, name='StreamReader',
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop reading the source."""
+        self._stop = True
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.source.close()
+
+    def _run(self):
+        """Background thread reading the source."""
+        while not (self._stop or self.source.closed):
+            try:
+                chunk = self.source.read()
+            except Exception as e:
+                logger.error("Streaming source failed (%s)" % str(e))
+                break
+            if chunk is None:
+                tm.sleep(self.interval)
+                continue
+            self.put(chunk)
+
+    def put(self, chunk):
+        """Queue a chunk of shape (n_channels, n_samples)."""
+        with self._lock:
+            if len(self._queue) >= self.max_chunks:
+                self._queue.popleft()
+                self.n_dropped += 1
+            self._queue.append((tm.perf_counter(), chunk))
+            self.n_chunks += 1
+
+    def _preprocess(self, x):
+        """Filter and decimate a chunk (state is kept between chunks)."""
+        if self._sos is not None:
+            if self._zi is None:
+                zi = sosfilt_zi(self._sos)[:, np.newaxis, :]
+                self._zi = zi * x[:, 0][np.newaxis, :, np.newaxis]
+            x, self._zi = sosfilt(self._sos, x, axis=-1, zi=self._zi)
+        if self.dsf > 1:
+            phase = self._phase
+            self._phase = (phase - x.shape[1]) % self.dsf
+            x = x[:, phase::self.dsf]
+        return x
+
+    def update(self):
+        """Process queued chunks and push them inside the ring buffer.
+
+        Returns
+        -------
+        n : int
+            Number of new samples inside the buffer.
+        """
+        with self._lock:
+            queue, self._queue = self._queue, deque()
+        n_total = self.buffer.n_total
+        for arrival, chunk in queue:
+            x = self._preprocess(chunk)
+            self.buffer.push(x)
+            self._last_arrival = arrival
+            # Events are indexed from the beginning of the stream :
+            for key, (detector, offset) in self._detectors.items():
+                events = detector.update(x[key[0], :])
+                if events.size:
+                    self.events[key] = np.r_[self.events[key],
+                                             events + offset]
+        return self.buffer.n_total - n_total
+
+    def get_window(self, n=None):
+        """Get the latest samples and the corresponding time vector.
+
+        Parameters
+        ----------
+        n : int | None
+            Number of samples. If None, every sample of the buffer is
+            returned.
+
+        Returns
+        -------
+        data : array_like
+            Array of shape (n_channels, n).
+        time : array_like
+            Time vector (in seconds since the beginning of the stream).
+        """
+        data = self.buffer.get(n)
+        stop = self.buffer.n_total
+        time = np.arange(stop - data.shape[1], stop) / self.sf
+        return data, time
+
+    def mark_displayed(self):
+        """Update the latency once the latest samples have been displayed.
+
+        The latency is the time between the reception of the latest
+        displayed chunk and the call to this method.
+        """
+        if self._last_arrival is not None:
+            self.latency = tm.perf_counter() - self._last_arrival
@@ -1,8 +1,11 @@
 """Test functions in read_annotations.py."""
+from importlib import import_module
+
 import numpy as np
 
 from visbrain.io.read_annotations import (annotations_to_array,
-                                          merge_annotations)
+                                          merge_annotations, read_annotations,
+                                          AnnotationStore)
 from visbrain.io.write_data import (write_csv, write_txt)
 from visbrain.tests._tests_visbrain import _TestVisbrain
 
@@ -44,3 +47,54 @@ class TestReadAnnotations(_TestVisbrain):
     def test_merge_annotations(self):
         """Test function merge_annotations."""
         merge_annotations(*(None, *self._get_annotation_type()))
+
+    def test_read_annotations(self):
+        """Test function read_annotations."""
+        start, end, text = self._get_annotations(str, as_list=True)
+        write_csv(self.to_tmp_dir('read_annot.csv'), zip(start, end, text))
+        write_txt(self.to_tmp_dir('read_annot.txt'), zip(start, end, text))
+        for k in ['read_annot.csv', 'read_annot.txt']:
+            s_r, e_r, t_r = read_annotations(self.to_tmp_dir(k))
+            np.testing.assert_array_equal(s_r, np.array(start, dtype=float))
+            np.testing.assert_array_equal(e_r, np.array(end, dtype=float))
+        assert list(t_r) == [' ' + k for k in text]
+
+    def test_read_annotations_no_pandas(self, monkeypatch):
+        """Test function read_annotations without pandas."""
+        # The module is shadowed by the function in visbrain.io :
+        module = import_module('visbrain.io.read_annotations')
+        path = self.to_tmp_dir('read_annot_quoted.csv')
+        with open(path, 'w') as f:
+            f.write('1.5,2.,"Spindle, C3"\n3.,4.,REM\n')
+        monkeypatch.setattr(module, 'is_pandas_installed', lambda: False)
+        start, end, text = read_annotations(path)
+        np.testing.assert_array_equal(start, [1.5, 3.])
+        np.testing.assert_array_equal(end, [2., 4.])
+        assert list(text) == ['Spindle, C3', 'REM']
+
+    def test_annotation_store(self):
+        """Test class AnnotationStore."""
+        start = np.array([10., 0., 50., 20.])
+        end = np.array([40., 5., 60., 25.])
+        store = AnnotationStore(start, end, list('abcd'))
+        np.testing.assert_array_equal(store.onset, [0., 10., 20., 50.])
+        np.testing.assert_array_equal(store.query(26., 45.), [1])
+        np.testing.assert_array_equal(store.query(0., 100.), np.arange(4))
+        assert not store.query(100., 200.).size
+        np.testing.assert_array_equal(store.markers(20., 30.), [25., 22.5])
+        # Add / remove :
+        assert store.add(15., 16., 'e') == 2
+        np.testing.assert_array_equal(store.query(15.5, 15.6), [1, 2])
+        store.remove(2)
+        assert list(store.text) == list('badc')
+        # Brute force comparison :
+        start = np.random.uniform(0., 1000., 500)
+        end = start + np.random.uniform(0., 50., 500)
+        store = AnnotationStore(start, end)
+        for t_start in np.random.uniform(0., 1000., 20):
+            t_end = t_start + 30.
+            is_over = (store.end >= t_start) & (store.onset <= t_end)
+            np.testing.assert_array_equal(store.query(t_start, t_end),
+                                          np.where(is_over)[0])
+        merged = AnnotationStore.from_annotations(None, start, store)
+        assert len(merged) == 1000
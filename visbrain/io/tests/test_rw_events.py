@@ -0,0 +1,60 @@
+"""Test functions in rw_events.py."""
+import numpy as np
+
+from visbrain.io.rw_events import EventStore, _npz_memmap
+from visbrain.tests._tests_visbrain import _TestVisbrain
+
+
+class TestRwEvents(_TestVisbrain):
+    """Test functions in rw_events.py."""
+
+    @staticmethod
+    def _get_events():
+        events = {('Cz', 'Spindles'): np.array([[500, 600], [100, 200],
+                                                [150, 900]]),
+                  ('Cz', 'REM'): np.array([[50, 60]]),
+                  ('Fz', 'Spindles'): np.array([[300, 400], [1000, 1100]]),
+                  ('Fz', 'REM'): np.array([])}
+        amp = {('Cz', 'Spindles'): np.array([3., 1., 2.])}
+        return events, {'amplitude': amp}
+
+    def test_event_store(self):
+        """Test class EventStore."""
+        store = EventStore.from_dict(*self._get_events())
+        assert len(store) == 6 and store.features == ['amplitude']
+        assert store.keys == [('Cz', 'REM'), ('Cz', 'Spindles'),
+                              ('Fz', 'Spindles')]
+        assert ('Fz', 'REM') not in store
+        # Sorted by starting index :
+        events = store.query('Cz', 'Spindles')
+        np.testing.assert_array_equal(events['index'], [[100, 200],
+                                                        [150, 900],
+                                                        [500, 600]])
+        np.testing.assert_array_equal(events['amplitude'], [1., 2., 3.])
+        # Window queries (with events overlapping the window) :
+        events = store.query(kind='Spindles', start=250, stop=1000)
+        np.testing.assert_array_equal(events['index'], [[150, 900],
+                                                        [500, 600],
+                                                        [300, 400]])
+        np.testing.assert_array_equal(events['channel'], ['Cz', 'Cz', 'Fz'])
+        np.testing.assert_array_equal(events['amplitude'][2], np.nan)
+        assert not len(store.query('Fz', start=0, stop=300)['index'])
+        assert not len(store.query('Pz')['type'])
+
+    def test_event_store_save_load(self):
+        """Test saving and memory-mapping an event store."""
+        path = self.to_tmp_dir('events.npz')
+        store = EventStore.from_dict(*self._get_events())
+        store.save(path)
+        assert isinstance(_npz_memmap(path)['start'], np.memmap)
+        for mmap in [True, False]:
+            store_load = EventStore.load(path, mmap=mmap)
+            assert store_load.keys == store.keys
+            for k in store.keys:
+                np.testing.assert_array_equal(store_load.query(*k)['index'],
+                                              store.query(*k)['index'])
+            events = store_load.query('Fz', start=1050)
+            np.testing.assert_array_equal(events['index'], [[1000, 1100]])
+        # Empty store :
+        EventStore.from_dict({('Cz', 'REM'): np.array([])}).save(path)
+        assert not len(EventStore.load(path))
@@ -1,10 +1,12 @@
 """Test functions in rw_hypno.py."""
+import os
+
 import numpy as np
 
 from visbrain.tests._tests_visbrain import _TestVisbrain
 from visbrain.io.rw_hypno import (oversample_hypno, write_hypno_txt,
                                   write_hypno_hyp, read_hypno, read_hypno_hyp,
-                                  read_hypno_txt)
+                                  read_hypno_txt, batch_sleepstats)
 
 
 class TestRwHypno(_TestVisbrain):
@@ -39,6 +41,16 @@ class TestRwHypno(_TestVisbrain):
         hyp_hyp, sf_hyp = read_hypno(self.to_tmp_dir('hyp.hyp'))
         assert np.array_equal(hyp_txt, hyp_hyp)
         assert sf_txt == sf_hyp
+        # Compact version :
+        runs, _ = read_hypno(self.to_tmp_dir('hyp.txt'), as_runs=True)
+        assert np.array_equal(runs.to_array(), hyp_txt)
+        runs_over = oversample_hypno(runs, 5000)
+        assert np.array_equal(runs_over.to_array(),
+                              oversample_hypno(hyp_txt, 5000))
+        write_hypno_txt(self.to_tmp_dir('hyp_runs.txt'), runs_over, 1000.,
+                        1000., 5000)
+        assert np.array_equal(read_hypno(self.to_tmp_dir('hyp_runs.txt'))[0],
+                              hyp_txt)
 
     def test_read_hypno_hyp(self):
         """Test function read_hypno_hyp."""
@@ -47,3 +59,26 @@ class TestRwHypno(_TestVisbrain):
     def test_read_hypno_txt(self):
         """Test function read_hypno_txt."""
         read_hypno_txt(self.to_tmp_dir('hyp.txt'))
+
+    def test_batch_sleepstats(self):
+        """Test function batch_sleepstats."""
+        path = self.to_tmp_dir('batch')
+        os.makedirs(path, exist_ok=True)
+        for k in range(3):
+            hyp = np.random.randint(-1, 5, (100,))
+            write_hypno_txt(os.path.join(path, 'hyp_%i.txt' % k), hyp, 1.,
+                            1., 100)
+        # Files that are not hypnograms are skipped :
+        with open(os.path.join(path, 'annotations.txt'), 'w') as f:
+            f.write('Onset, Duration, Annotation\n10, 5, Spindle\n')
+        with open(os.path.join(path, 'export.csv'), 'w') as f:
+            f.write('a,b\n1,2\n')
+        stats = batch_sleepstats(os.path.join(path, '*'))
+        assert len(stats) == 3
+        assert stats[0]['Trans_W_N1'] >= 0 and 'SFI' in stats[0]
+        files = [os.path.join(path, 'hyp_%i.txt' % k) for k in range(2)]
+        assert len(batch_sleepstats(files)) == 2
+        stats_par = batch_sleepstats(os.path.join(path, 'hyp_?.txt'),
+                                     n_jobs=2)
+        assert [k['File'] for k in stats] == [k['File'] for k in stats_par]
+        assert [k['TST'] for k in stats] == [k['TST'] for k in stats_par]
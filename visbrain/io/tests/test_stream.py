@@ -0,0 +1,121 @@
+"""Test functions in stream.py."""
+import socket
+import threading
+import time as tm
+
+import numpy as np
+from scipy.signal import butter, sosfilt, sosfilt_zi
+
+from visbrain.io.stream import (FileSource, TCPSource, RingBuffer,
+                                StreamReader)
+from visbrain.tests._tests_visbrain import _TestVisbrain
+
+
+class TestStream(_TestVisbrain):
+    """Test functions in stream.py."""
+
+    def test_ring_buffer(self):
+        """Test class RingBuffer."""
+        ring = RingBuffer(2, 10)
+        data = np.arange(50).reshape(2, 25).astype(np.float32)
+        assert not len(ring) and ring.get().shape == (2, 0)
+        ring.push(data[:, 0:4])
+        np.testing.assert_array_equal(ring.get(), data[:, 0:4])
+        # Wrap around :
+        ring.push(data[:, 4:13])
+        np.testing.assert_array_equal(ring.get(), data[:, 3:13])
+        np.testing.assert_array_equal(ring.get(3), data[:, 10:13])
+        # Chunk larger than the buffer :
+        ring.push(data[:, 13:25])
+        np.testing.assert_array_equal(ring.get(), data[:, 15:25])
+        assert len(ring) == 10 and ring.n_total == 25
+
+    def test_file_source(self):
+        """Test class FileSource (with incomplete frames)."""
+        path = self.to_tmp_dir('stream.bin')
+        data = np.random.rand(3, 100).astype(np.float32)
+        raw = data.T.tobytes()
+        source = FileSource(path, 3, 100.)
+        with open(path, 'wb') as f:
+            f.write(raw[:50])
+            f.flush()
+            chunk = source.read()
+            np.testing.assert_array_equal(chunk, data[:, 0:4])
+            f.write(raw[50:])
+            f.flush()
+            np.testing.assert_array_equal(source.read(), data[:, 4:])
+            assert source.read() is None
+        source.close()
+
+    def test_tcp_source(self):
+        """Test class TCPSource."""
+        data = np.random.rand(2, 1000).astype(np.float32)
+        server = socket.socket()
+        server.bind(('127.0.0.1', 0))
+        server.listen(1)
+
+        def _send():
+            conn, _ = server.accept()
+            for k in range(0, 1000, 100):
+                conn.sendall(data[:, k:k + 100].T.tobytes())
+            conn.close()
+        thread = threading.Thread(target=_send)
+        thread.start()
+        source = TCPSource(server.getsockname()[1], 2, 100.)
+        reader = StreamReader(source, duration=20.)
+        reader.start()
+        thread.join()
+        while reader.is_running:
+            tm.sleep(.01)
+        reader.update()
+        reader.mark_displayed()
+        np.testing.assert_array_equal(reader.get_window()[0], data)
+        assert reader.n_dropped == 0 and reader.latency >= 0.
+        reader.stop()
+        server.close()
+
+    def test_stream_reader(self):
+        """Test incremental filtering / decimation of class StreamReader."""
+        sf, dsf = 256., 3
+        data = np.random.randn(2, 1000).astype(np.float32)
+        source = FileSource(self.to_tmp_dir('stream.bin'), 2, sf)
+        reader = StreamReader(source, duration=100., dsf=dsf,
+                              filt=(1., 30.), max_chunks=1000)
+        for k in range(0, 1000, 77):
+            reader.put(data[:, k:k + 77])
+        assert reader.update() == len(range(0, 1000, dsf))
+        # Compare with the filtering of the entire signal :
+        sos = butter(3, [1. / 128., 30. / 128.], 'bandpass', output='sos')
+        zi = sosfilt_zi(sos)[:, np.newaxis, :] * data[np.newaxis, :, 0,
+                                                      np.newaxis]
+        filt = sosfilt(sos, data, axis=-1, zi=zi)[0][:, ::dsf]
+        window, time = reader.get_window()
+        np.testing.assert_allclose(window, filt, rtol=1e-4, atol=1e-5)
+        np.testing.assert_allclose(time, np.arange(334) * dsf / sf)
+        # Dropped chunks :
+        reader = StreamReader(source, max_chunks=4)
+        for k in range(10):
+            reader.put(data[:, k * 10:(k + 1) * 10])
+        assert reader.n_chunks == 10 and reader.n_dropped == 6
+        reader.update()
+        np.testing.assert_array_equal(reader.get_window()[0],
+                                      data[:, 60:100])
+
+    def test_stream_detection(self):
+        """Test online detections of class StreamReader."""
+        from visbrain.utils import OnlineSpindles
+        sf, rng = 100., np.random.RandomState(0)
+        data = 10. * rng.randn(2, 10000).astype(np.float32)
+        for k in [4000, 6000, 8000]:
+            data[1, k:k + 100] += 40. * np.sin(
+                2 * np.pi * 13. * np.arange(100) / sf) * np.hanning(100)
+        reader = StreamReader(FileSource(self.to_tmp_dir('stream.bin'), 2,
+                                         sf), max_chunks=1000)
+        reader.add_detector('Spindles', 1, OnlineSpindles(sf, 3.))
+        for k in range(0, 10000, 50):
+            reader.put(data[:, k:k + 50])
+        reader.update()
+        index = reader.events[(1, 'Spindles')]
+        np.testing.assert_array_equal(
+            index, OnlineSpindles(sf, 3.).run(data[1, :])[0:len(index)])
+        assert len(index) >= 2
@@ -1,7 +1,6 @@
 """Hypnogram object."""
 import os
 
-import numpy as np
 from vispy import scene
 
 from .visbrain_obj import VisbrainObject
@@ -16,8 +15,8 @@ class HypnogramObj(VisbrainObject):
     ----------
     name : string
         Name of the hypnogram object or path to a *.txt or *.csv file.
-    data : array_like
-        Array of data of shape (n_pts,).
+    data : array_like | StageRuns
+        Array of data of shape (n_pts,) or compact run-length hypnogram.
     time : array_like | None
         Array of time points of shape (n_pts,)
     art, wake, rem, n1, n2, n3 :
@@ -62,8 +61,8 @@ class HypnogramObj(VisbrainObject):
         # Load *.txt, *.csv and *.hyp files :
         file, ext = os.path.splitext(name)
         if ext in ['.csv', '.txt', '.hyp']:
-            data, sf = read_hypno(name)
-            name, time = file, np.arange(len(data)) / sf
+            data, _ = read_hypno(name, as_runs=True)
+            name = file
         # Initialize VisbrainObject and Hypnogram visuam creation :
         VisbrainObject.__init__(self, name, parent, transform, verbose, **kw)
         self.line = Hypnogram(data, time, art, wake, n1, n2, n3, rem,
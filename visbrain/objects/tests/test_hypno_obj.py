@@ -4,6 +4,7 @@ import numpy as np
 from visbrain.objects.hypno_obj import HypnogramObj
 from visbrain.objects.tests._testing_objects import _TestObjects
 from visbrain.io import path_to_visbrain_data
+from visbrain.utils import StageRuns
 
 
 data = np.repeat(np.arange(6), 100) - 1.
@@ -19,12 +20,17 @@ class TestHypnogramObj(_TestObjects):
     def test_definition(self):
         """Test function definition."""
         HypnogramObj('hypno', data)
+        HypnogramObj('hypno', StageRuns(data))
         HypnogramObj(hypno_file)
 
     def test_set_stage(self):
         """Test set stage."""
         h_obj.set_stage(-1, 45, 89)
         h_obj.set_stage('wake', 145, 189)
+        # Compact hypnogram :
+        h_runs = HypnogramObj('hypno', StageRuns(data, 10.))
+        h_runs.set_stage('rem', 145, 189)
+        assert len(h_runs.line) == 4 * len(h_runs.line._runs)
 
     def test_properties(self):
         """Test hypnogram object properties."""
@@ -4,7 +4,7 @@ import numpy as np
 from scipy.signal import spectrogram
 
 from .image_obj import ImageObj
-from ..utils import (morlet, averaging, normalization)
+from ..utils import (FilterBank, averaging, normalization)
 from ..io.dependencies import is_lspopt_installed
 
 logger = logging.getLogger('visbrain')
@@ -147,12 +147,10 @@ class TimeFrequencyObj(ImageObj):
             n_pts = len(data)
             freqs = np.arange(f_min, f_max, f_step)
             time = np.arange(n_pts) / sf
-            tf = np.zeros((len(freqs), n_pts), dtype=data.dtype)
             # Compute TF and inplace normalization :
             logger.info("Compute the time-frequency map ("
                         "normalization=%r)" % norm)
-            for i, k in enumerate(freqs):
-                tf[i, :] = np.square(np.abs(morlet(data, sf, k)))
+            tf = FilterBank(sf, freqs).apply(data, get='power')
             normalization(tf, norm=norm, baseline=baseline, axis=1)
 
             # Averaging :
@@ -3,11 +3,12 @@ import os
 import numpy as np
 
 import vispy.scene.cameras as viscam
+from PyQt5 import QtCore
 
 from .ui_elements import UiElements, UiInit
 from .visuals import Visuals
 from ..utils import (safely_set_cbox, color2tuple, color2vb, mpl_cmap,
-                     toggle_enable_tab)
+                     toggle_enable_tab, textline2color)
 from ..io import write_fig_canvas
 from ..pyqt_module import PyQtModule
 # get_screen_size
@@ -416,3 +417,52 @@ class Signal(PyQtModule, UiInit, UiElements, Visuals):
         idx = ['line', 'marker', 'histogram', 'tf', 'psd',
                'butterfly'].index(form)
         self._sig_form.setCurrentIndex(idx)
+
+    def stream(self, reader, fps=25., duration=None):
+        """Display a streamed signal in scrolling mode.
+
+        The channel to display is selected using the signal index.
+
+        Parameters
+        ----------
+        reader : StreamReader
+            The stream reader (see visbrain.io.StreamReader). The reader is
+            started if needed.
+        fps : float | 25.
+            Target frame rate of the display.
+        duration : float | None
+            Duration (in seconds) of the displayed window. If None, the
+            entire ring buffer of the reader is displayed.
+        """
+        self._stream = reader
+        self._stream_duration = duration
+        if not hasattr(self, '_streamTimer'):
+            self._streamTimer = QtCore.QTimer()
+            self._streamTimer.timeout.connect(self._fcn_stream_update)
+        self._streamTimer.setInterval(int(1000. / fps))
+        reader.start()
+        self._streamTimer.start()
+
+    def stop_stream(self):
+        """Stop displaying the streamed signal."""
+        if hasattr(self, '_streamTimer'):
+            self._streamTimer.stop()
+            self._stream.stop()
+
+    def _fcn_stream_update(self):
+        """Display the latest samples of the stream."""
+        reader = self._stream
+        if not reader.update():
+            return None
+        n = None
+        if self._stream_duration is not None:
+            n = int(round(self._stream_duration * reader.sf))
+        data, time = reader.get_window(n)
+        if data.shape[1] < 2:
+            return None
+        chan = int(self._sig_index.value()) % reader.n_channels
+        color = textline2color(str(self._sig_color.text()))[0]
+        self._signal.set_stream(data[chan, :], time, color=color,
+                                lw=float(self._sig_lw.value()))
+        self.update_cameras(update='signal')
+        reader.mark_displayed()
@@ -1,4 +1,5 @@
 """Test Signal module and related methods."""
+import numpy as np
 from vispy.app.canvas import MouseEvent, KeyEvent
 
 from visbrain import Signal
@@ -276,3 +277,18 @@ class TestSignal(_TestVisbrain):
         """Test function mouse_double_click for grid."""
         ev = MouseEvent('mouse_double_click', pos=(200, 300))
         sig._grid_canvas.canvas.events.mouse_double_click(ev)
+
+    ###########################################################################
+    #                                STREAMING
+    ###########################################################################
+    def test_stream(self):
+        """Test function stream."""
+        from visbrain.io import FileSource, StreamReader
+        path = self.to_tmp_dir('signal_stream.bin')
+        open(path, 'wb').close()
+        reader = StreamReader(FileSource(path, 3, sf), duration=2.)
+        reader.put(np.random.rand(3, 1000).astype(np.float32))
+        sig.stream(reader, fps=50.)
+        sig._fcn_stream_update()
+        assert sig._signal.rect[2] > 0. and reader.latency >= 0.
+        sig.stop_stream()
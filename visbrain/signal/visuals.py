@@ -316,6 +316,30 @@ class SignalVisual(SignalAnnotations):
         # Update annotations :
         self.update_annotations(str(self))
 
+    def set_stream(self, data, time, color='black', lw=2.):
+        """Set the latest window of a streamed signal.
+
+        Parameters
+        ----------
+        data : array_like
+            Data vector of shape (N,) (already preprocessed by the reader).
+        time : array_like
+            Time vector of shape (N,).
+        color : array_like/string/tuple | 'black'
+            Color of the line.
+        lw : float | 2.
+            Line width.
+        """
+        pos = np.c_[time, data].astype(np.float32)
+        self._line.set_data(pos, width=lw, color=color2vb(color))
+        self._line.update()
+        # Scroll the camera with the newest samples :
+        t_min, t_max = time[0], max(time[-1], time[0] + 1. / self._sf)
+        d_min, d_max = data.min(), data.max()
+        off = .05 * (d_max - d_min) if d_max > d_min else 1.
+        self.rect = (t_min, d_min - off, t_max - t_min,
+                     d_max - d_min + 2 * off)
+
     def update_annotations(self, name):
         """Update annotations."""
         is_annotated = self.is_event_annotated(name)
@@ -1042,21 +1042,13 @@ class Ui_MainWindow(object):
         self.q_Score.setObjectName("q_Score")
         self.verticalLayout_29 = QtWidgets.QVBoxLayout(self.q_Score)
         self.verticalLayout_29.setObjectName("verticalLayout_29")
-        self._scoreTable = QtWidgets.QTableWidget(self.q_Score)
+        self._scoreTable = QtWidgets.QTableView(self.q_Score)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
         sizePolicy.setHorizontalStretch(0)
         sizePolicy.setVerticalStretch(0)
         sizePolicy.setHeightForWidth(self._scoreTable.sizePolicy().hasHeightForWidth())
         self._scoreTable.setSizePolicy(sizePolicy)
         self._scoreTable.setObjectName("_scoreTable")
-        self._scoreTable.setColumnCount(3)
-        self._scoreTable.setRowCount(0)
-        item = QtWidgets.QTableWidgetItem()
-        self._scoreTable.setHorizontalHeaderItem(0, item)
-        item = QtWidgets.QTableWidgetItem()
-        self._scoreTable.setHorizontalHeaderItem(1, item)
-        item = QtWidgets.QTableWidgetItem()
-        self._scoreTable.setHorizontalHeaderItem(2, item)
         self._scoreTable.horizontalHeader().setStretchLastSection(True)
         self.verticalLayout_29.addWidget(self._scoreTable)
         self.horizontalLayout_13 = QtWidgets.QHBoxLayout()
@@ -1594,20 +1586,10 @@ class Ui_MainWindow(object):
         self._DetectChanSw.setObjectName("_DetectChanSw")
         self.gridLayout_23.addWidget(self._DetectChanSw, 1, 2, 1, 2)
         self.verticalLayout_39.addLayout(self.gridLayout_23)
-        self._DetectLocations = QtWidgets.QTableWidget(self.q_DetectLoc)
+        self._DetectLocations = QtWidgets.QTableView(self.q_DetectLoc)
         self._DetectLocations.setDragDropMode(QtWidgets.QAbstractItemView.InternalMove)
         self._DetectLocations.setAlternatingRowColors(True)
         self._DetectLocations.setObjectName("_DetectLocations")
-        self._DetectLocations.setColumnCount(4)
-        self._DetectLocations.setRowCount(0)
-        item = QtWidgets.QTableWidgetItem()
-        self._DetectLocations.setHorizontalHeaderItem(0, item)
-        item = QtWidgets.QTableWidgetItem()
-        self._DetectLocations.setHorizontalHeaderItem(1, item)
-        item = QtWidgets.QTableWidgetItem()
-        self._DetectLocations.setHorizontalHeaderItem(2, item)
-        item = QtWidgets.QTableWidgetItem()
-        self._DetectLocations.setHorizontalHeaderItem(3, item)
         self._DetectLocations.horizontalHeader().setStretchLastSection(True)
         self.verticalLayout_39.addWidget(self._DetectLocations)
         self.horizontalLayout_20 = QtWidgets.QHBoxLayout()
@@ -1628,18 +1610,10 @@ class Ui_MainWindow(object):
         self.tab.setObjectName("tab")
         self.verticalLayout_11 = QtWidgets.QVBoxLayout(self.tab)
         self.verticalLayout_11.setObjectName("verticalLayout_11")
-        self._AnnotateTable = QtWidgets.QTableWidget(self.tab)
+        self._AnnotateTable = QtWidgets.QTableView(self.tab)
         self._AnnotateTable.setDragEnabled(True)
         self._AnnotateTable.setAlternatingRowColors(True)
         self._AnnotateTable.setObjectName("_AnnotateTable")
-        self._AnnotateTable.setColumnCount(3)
-        self._AnnotateTable.setRowCount(0)
-        item = QtWidgets.QTableWidgetItem()
-        self._AnnotateTable.setHorizontalHeaderItem(0, item)
-        item = QtWidgets.QTableWidgetItem()
-        self._AnnotateTable.setHorizontalHeaderItem(1, item)
-        item = QtWidgets.QTableWidgetItem()
-        self._AnnotateTable.setHorizontalHeaderItem(2, item)
         self._AnnotateTable.horizontalHeader().setStretchLastSection(True)
         self.verticalLayout_11.addWidget(self._AnnotateTable)
         self.horizontalLayout_21 = QtWidgets.QHBoxLayout()
@@ -2153,12 +2127,6 @@ class Ui_MainWindow(object):
         item.setText(_translate("MainWindow", "Values"))
         self.QuickSettings.setTabText(self.QuickSettings.indexOf(self.q_Info), _translate("MainWindow", "Infos"))
         self._scoreTable.setSortingEnabled(True)
-        item = self._scoreTable.horizontalHeaderItem(0)
-        item.setText(_translate("MainWindow", "From (minutes)"))
-        item = self._scoreTable.horizontalHeaderItem(1)
-        item.setText(_translate("MainWindow", "To (minutes)"))
-        item = self._scoreTable.horizontalHeaderItem(2)
-        item.setText(_translate("MainWindow", "Stage"))
         self._scoreAdd.setText(_translate("MainWindow", "Add line"))
         self._scoreRm.setText(_translate("MainWindow", "Remove line"))
         self.QuickSettings.setTabText(self.QuickSettings.indexOf(self.q_Score), _translate("MainWindow", "Scoring"))
@@ -2238,24 +2206,10 @@ class Ui_MainWindow(object):
         self._DetectViz.setText(_translate("MainWindow", "Visible"))
         self._DetectRm.setText(_translate("MainWindow", "Remove"))
         self._DetectLocations.setSortingEnabled(True)
-        item = self._DetectLocations.horizontalHeaderItem(0)
-        item.setText(_translate("MainWindow", "Start (sec)"))
-        item = self._DetectLocations.horizontalHeaderItem(1)
-        item.setText(_translate("MainWindow", "End (sec)"))
-        item = self._DetectLocations.horizontalHeaderItem(2)
-        item.setText(_translate("MainWindow", "Duration (ms)"))
-        item = self._DetectLocations.horizontalHeaderItem(3)
-        item.setText(_translate("MainWindow", "Stage"))
         self._DetecRmEvent.setText(_translate("MainWindow", "Remove selected event"))
         self._DetectionTab.setTabText(self._DetectionTab.indexOf(self.q_DetectLoc), _translate("MainWindow", "Locations"))
         self.QuickSettings.setTabText(self.QuickSettings.indexOf(self.q_Detection), _translate("MainWindow", "Detection"))
         self._AnnotateTable.setSortingEnabled(True)
-        item = self._AnnotateTable.horizontalHeaderItem(0)
-        item.setText(_translate("MainWindow", "Start (seconds)"))
-        item = self._AnnotateTable.horizontalHeaderItem(1)
-        item.setText(_translate("MainWindow", "End (seconds)"))
-        item = self._AnnotateTable.horizontalHeaderItem(2)
-        item.setText(_translate("MainWindow", "Text"))
         self._AnnotateAdd.setText(_translate("MainWindow", "Annotate"))
         self._AnnotateRm.setText(_translate("MainWindow", "Remove selected line"))
         self.QuickSettings.setTabText(self.QuickSettings.indexOf(self.tab), _translate("MainWindow", "Annotations"))
@@ -1,8 +1,11 @@
 """Enable to annotate a Sleep file."""
 
-from PyQt5 import QtWidgets
+from PyQt5 import QtCore
 import numpy as np
 
+from ....utils import ArrayTableModel
+from ....io import AnnotationStore
+
 
 class UiAnnotate(object):
     """Interactions with annotations."""
@@ -12,45 +15,66 @@ class UiAnnotate(object):
         # Add/remove line :
         self._AnnotateAdd.clicked.connect(self._fcn_annotate_add)
         self._AnnotateRm.clicked.connect(self._fcn_annotate_rm)
-        self._AnnotateTable.itemSelectionChanged.connect(
+        # Table model (start, end, text) :
+        self._annotModel = ArrayTableModel(
+            ['Start (seconds)', 'End (seconds)', 'Text'],
+            parent=self._AnnotateTable)
+        self._annotModel.set_data(np.zeros((0,)), np.zeros((0,)),
+                                  np.array([], dtype=object))
+        self._AnnotateTable.setModel(self._annotModel)
+        self._AnnotateTable.horizontalHeader().setSortIndicator(
+            -1, QtCore.Qt.AscendingOrder)
+        self._AnnotateTable.selectionModel().selectionChanged.connect(
             self._fcn_annotate_goto)
+        self._annotModel.cellChanged.connect(self._fcn_annotate_edit)
+        # Annotations sorted by starting time (same order as the table) :
+        self._annot = AnnotationStore()
 
     def _fcn_annotate_add(self, _, xlim=None, txt="Enter your annotation"):
         """Add a ligne to the annotation table."""
-        # Add a ligne :
-        self._AnnotateTable.setRowCount(self._AnnotateTable.rowCount() + 1)
-        rw = self._AnnotateTable.rowCount() - 1
         if xlim is None:
             # Get the current window :
             val = self._SlVal.value()
             step = self._SigSlStep.value()
             win = self._SigWin.value()
             xlim = (val * step, val * step + win)
-        # Automatically set the window :
-        self._AnnotateTable.setItem(rw, 0, QtWidgets.QTableWidgetItem(
-            str(xlim[0])))
-        self._AnnotateTable.setItem(rw, 1, QtWidgets.QTableWidgetItem(
-            str(xlim[1])))
+        # Add a ligne and automatically set the window :
+        rw = self._annot.add(xlim[0], xlim[1], txt)
+        self._annotModel.insert_rows(rw, [xlim[0]], [xlim[1]], [txt])
         # Select the text item :
-        self._AnnotateTable.setCurrentCell(rw, 2)
-        item = QtWidgets.QTableWidgetItem()
-        item.setText(txt)
-        self._AnnotateTable.setItem(rw, 2, item)
-        self._AnnotateTable.editItem(self._AnnotateTable.item(rw, 2))
+        index = self._annotModel.index(self._annotModel.view_row(rw), 2)
+        self._AnnotateTable.setCurrentIndex(index)
+        self._AnnotateTable.edit(index)
         # Send marker annotation to the time-axis :
-        self._annot_mark = np.append(self._annot_mark, np.array(xlim).mean())
         self._fcn_slider_move()
 
     def _fcn_annotate_rm(self):
         """Remove a line to the annotation table."""
-        row = self._AnnotateTable.currentRow()
-        self._AnnotateTable.removeRow(row)
-        self._annot_mark = np.delete(self._annot_mark, row, 0)
+        row = self._annotModel.source_row(
+            self._AnnotateTable.currentIndex().row())
+        if row >= 0:
+            self._annotModel.remove_rows(row)
+            self._annot.remove(row)
+            self._fcn_slider_move()
+
+    def _fcn_annotate_edit(self, row, col):
+        """Executed function when an annotation is edited."""
+        start, end, text = [self._annotModel.get_column(k)[row] for k in
+                            range(3)]
+        if col == 2:  # Only the text has changed
+            self._annot.text[row] = text
+            return None
+        # Move the annotation to keep annotations sorted :
+        self._annot.remove(row)
+        self._annotModel.remove_rows(row)
+        rw = self._annot.add(start, end, text)
+        self._annotModel.insert_rows(rw, [start], [end], [text])
         self._fcn_slider_move()
 
-    def _fcn_annotate_goto(self):
+    def _fcn_annotate_goto(self, *args):
         """Go to the annotation location."""
-        row = self._AnnotateTable.currentRow()
+        row = self._annotModel.source_row(
+            self._AnnotateTable.currentIndex().row())
         if row >= 0:
-            sta = float(str(self._AnnotateTable.item(row, 0).text()))
+            sta = float(self._annotModel.get_column(0)[row])
             self._SlGoto.setValue(sta)
@@ -1,11 +1,14 @@
 """Main class for sleep tools managment."""
 import numpy as np
+import threading
+from concurrent import futures
 from warnings import warn
 from PyQt5 import QtWidgets, QtCore
 import logging
 
 from ....utils import (remdetect, spindlesdetect, slowwavedetect, kcdetect,
-                       peakdetect, mtdetect)
+                       peakdetect, mtdetect, ArrayTableModel, epoch_features,
+                       epoch_artifacts)
 from ....utils.sleep.event import _events_to_index
 
 logger = logging.getLogger('visbrain')
@@ -23,13 +26,41 @@ class UiDetection(object):
         self._ToolDetectChan.addItems(self._channels)
         self._ToolDetectType.currentIndexChanged.connect(
             self._fcn_switch_detection)
-        self._ToolDetectApply.clicked.connect(self._fcn_apply_detection)
+        self._ToolDetectApply.clicked.connect(self._fcn_detection_clicked)
         # Apply method (Selected / Visible / All) :
         self._ToolRdSelected.clicked.connect(self._fcn_apply_method)
         self._ToolRdViz.clicked.connect(self._fcn_apply_method)
         self._ToolRdAll.clicked.connect(self._fcn_apply_method)
         self._ToolDetectProgress.hide()
         self._fcn_switch_detection()
+        # Channels are detected in a worker thread :
+        self._detectPool = futures.ThreadPoolExecutor(max_workers=1)
+        self._detectJobs, self._detectTotal = [], 0
+        # Stop flag checked by the channel being detected :
+        self._detectStop = threading.Event()
+        self._detectMethod, self._detectReport = None, None
+        self._detectTimer = QtCore.QTimer()
+        self._detectTimer.setInterval(100)
+        self._detectTimer.timeout.connect(self._fcn_detection_progress)
+        # Per-epoch features of the data (shared by the pre-screening of
+        # channels and the artifact screening, see _fcn_get_features) :
+        self._features = None
+        # Artifact screening (flagged epochs of each channel) :
+        self._artifacts = None
+        self._ToolDetectArt = QtWidgets.QPushButton(self.q_DetectSettings)
+        self._ToolDetectArt.setText("Mark artifacts")
+        self._ToolDetectArt.setToolTip("Flag flat, clipped, noisy or high "
+                                       "frequency epochs and score epochs "
+                                       "flagged on at least half of the "
+                                       "channels as Art")
+        self.horizontalLayout_8.insertWidget(1, self._ToolDetectArt)
+        self._ToolDetectArt.clicked.connect(self._fcn_mark_artifacts)
+        self._ToolDetectIgnArt = QtWidgets.QCheckBox(self.q_DetectSettings)
+        self._ToolDetectIgnArt.setText("Ignore artifacts")
+        self._ToolDetectIgnArt.setToolTip("Remove events starting inside "
+                                          "epochs flagged as artifacts")
+        self._ToolDetectIgnArt.setChecked(True)
+        self.horizontalLayout_8.insertWidget(3, self._ToolDetectIgnArt)
 
         # -------------------------------------------------
         # Location table :
@@ -38,9 +69,18 @@ class UiDetection(object):
         self._DetectRm.clicked.connect(self._fcn_rm_location)
         self._DetectViz.clicked.connect(self._fcn_viz_location)
         self._DetecRmEvent.clicked.connect(self._fcn_rm_selected_event)
-        self._DetectLocations.itemSelectionChanged.connect(
+        self._locModel = ArrayTableModel(['Start (sec)', 'End (sec)',
+                                          'Duration (ms)', 'Stage'],
+                                         editable=[0, 1, 2],
+                                         parent=self._DetectLocations)
+        self._locModel.set_data(np.zeros((0,)), np.zeros((0,)),
+                                np.zeros((0,)), np.array([], dtype=object))
+        self._DetectLocations.setModel(self._locModel)
+        self._DetectLocations.horizontalHeader().setSortIndicator(
+            -1, QtCore.Qt.AscendingOrder)
+        self._DetectLocations.selectionModel().selectionChanged.connect(
             self._fcn_goto_location)
-        self._DetectLocations.cellChanged.connect(self._fcn_edit_detection)
+        self._locModel.cellChanged.connect(self._fcn_edit_detection)
         self._DetectionTab.setTabEnabled(1, False)
 
     # =====================================================================
@@ -62,6 +102,49 @@ class UiDetection(object):
     # =====================================================================
     # RUN DETECTION
     # =====================================================================
+    def _fcn_get_features(self):
+        """Get per-epoch features of the data (30 seconds epochs).
+
+        Features are computed once by the detection worker and reused until
+        the data change (montage, loading).
+
+        Returns
+        -------
+        features : concurrent.futures.Future
+            Future of the EpochFeatures table.
+        """
+        if self._features is None:
+            n_epoch = int(round(30. * self._sf))
+            self._features = self._detectPool.submit(
+                epoch_features, self._data, self._sf, n_epoch)
+        return self._features
+
+    def _fcn_mark_artifacts(self):
+        """Flag artifacted epochs (30 seconds) and score them as Art.
+
+        Flags of each channel are kept so that detections can ignore them
+        (see _fcn_get_detection). An epoch is scored as Art (-1) in the
+        hypnogram if it is flagged on at least half of the channels.
+        """
+        n_epoch = int(round(30. * self._sf))
+        features = self._fcn_get_features().result()
+        self._artifacts = epoch_artifacts(self._data, self._sf, n_epoch,
+                                          features=features)[0]
+        is_art = self._artifacts.mean(0) >= .5
+        # Score consecutive artifacted epochs :
+        edges = np.diff(np.r_[0, is_art.astype(int), 0])
+        starts = np.where(edges == 1)[0] * n_epoch
+        stops = np.minimum(np.where(edges == -1)[0] * n_epoch,
+                           len(self._time))
+        for start, stop in zip(starts, stops):
+            self._set_hypno_stage(start, stop, -1.)
+        self._hyp.edit.update()
+        self._fcn_info_update()
+        self._fcn_score_update_rows(0, len(self._scoreModel),
+                                    len(self._hypruns))
+        logger.info("%i epochs scored as artifacts (%i flagged epochs over "
+                    "all channels)" % (is_art.sum(), self._artifacts.sum()))
+
     # -------------- Get channels to apply detection --------------
     def _fcn_get_chan_detection(self):
         """Get on which channel to apply the detection."""
@@ -71,8 +154,7 @@ class UiDetection(object):
 
         # Visible channels :
         elif self._ToolRdViz.isChecked():
-            idx = [
-                k for k in range(len(self)) if self._chanWidget[k].isVisible()]
+            idx = [k for k in range(len(self)) if self._canvas_is_visible(k)]
 
         # All channels :
         elif self._ToolRdAll.isChecked():
@@ -80,115 +162,223 @@ class UiDetection(object):
 
         return idx
 
+    # -------------- Get the detection function --------------
+    def _fcn_get_detection(self, method):
+        """Get the detection function (settings are read from the GUI).
+
+        The returned function is called as fcn(x, bad=None) where x is the
+        data of a single channel and bad the artifacted 30 seconds epochs of
+        this channel (events starting inside these epochs are removed). It
+        returns the (start, end) index of each event, the number of events
+        and the density.
+        """
+        sf, time, hypno = self._sf, self._time, self._hypno.copy()
+        n_epoch = int(round(30. * sf))
+        # ====================== REM ======================
+        if method == 'REM':
+            # Get variables :
+            thr = self._ToolRemTh.value()
+            rem_only = self._ToolRemOnly.isChecked()
+
+            def detect(x):
+                # Get REM indices :
+                return remdetect(x, sf, hypno, rem_only, thr)[0:3]
+
+        # ====================== SPINDLES ======================
+        elif method == 'Spindles':
+            # Get variables :
+            thr = self._ToolSpinTh.value()
+            f_min = self._ToolSpinFmin.value()
+            f_max = self._ToolSpinFmax.value()
+            t_min = self._ToolSpinTmin.value()
+            t_max = self._ToolSpinTmax.value()
+            nrem_only = self._ToolSpinRemOnly.isChecked()
+
+            def detect(x):
+                # Get Spindles indices :
+                return spindlesdetect(x, sf, thr, hypno, nrem_only, f_min,
+                                      f_max, t_min, t_max)[0:3]
+
+        # ====================== SLOW WAVES ======================
+        elif method == 'Slow waves':
+            # Get variables :
+            thr = self._ToolWaveTh.value()
+
+            def detect(x):
+                # Get Slow Waves indices :
+                return slowwavedetect(x, sf, thr)[0:3]
+
+        # ====================== K-COMPLEXES ======================
+        elif method == 'K-complexes':
+            # Get variables :
+            proba_thr = self._ToolKCProbTh.value()
+            amp_thr = self._ToolKCAmpTh.value()
+            tmin = self._ToolKCMinDur.value()
+            tmax = self._ToolKCMaxDur.value()
+            min_amp = self._ToolKCMinAmp.value()
+            max_amp = self._ToolKCMaxAmp.value()
+            nrem_only = self._ToolKCNremOnly.isChecked()
+
+            def detect(x):
+                # Get K-complexes indices :
+                return kcdetect(x, sf, proba_thr, amp_thr, hypno, nrem_only,
+                                tmin, tmax, min_amp, max_amp)[0:3]
+
+        # ====================== PEAKS ======================
+        elif method == 'Peaks':
+            # Get variables :
+            look = int(self._ToolPeakLook.value() * sf)
+            disp = self._ToolPeakMinMax.currentIndex()
+            disp_types = ['max', 'min', 'minmax']
+
+            def detect(x):
+                index, nb, dty = peakdetect(sf, x, time, lookahead=look,
+                                            delta=1., threshold='auto',
+                                            get=disp_types[disp])
+                return np.c_[index, index], nb, dty
+
+        # ====================== MUSCLE TWITCHES ======================
+        elif method == 'Muscle twitches':
+            # Get variables :
+            th = self._ToolMTTh.value()
+            rem_only = self._ToolMTOnly.isChecked()
+
+            def detect(x):
+                return mtdetect(x, sf, th, hypno, rem_only)[0:3]
+
+        def run(x, bad=None):
+            index, nb, dty = detect(x)
+            if index.size and (method != 'Peaks'):
+                index = _events_to_index(index)
+            # Remove events starting inside artifacted epochs :
+            if index.size and (bad is not None):
+                keep = ~bad[index[:, 0] // n_epoch]
+                index = index[keep, :]
+                dty, nb = dty * keep.mean(), keep.sum()
+            return index, nb, dty
+
+        return run
+
     # -------------- Run detection (only on selected channels) --------------
+    def _fcn_detection_clicked(self):
+        """Either run or cancel the detection."""
+        if self._detectJobs:
+            self._fcn_cancel_detection()
+        else:
+            self._fcn_apply_detection()
+
     def _fcn_apply_detection(self):
-        """Apply detection (either REM/Spindles/Peaks/SlowWave/KC/MT)."""
+        """Apply detection (either REM/Spindles/Peaks/SlowWave/KC/MT).
+
+        Channels are sent to a worker thread. Results are merged as they are
+        completed (see _fcn_detection_progress).
+        """
+        # Finish the previous detection :
+        if self._detectJobs:
+            self._fcn_wait_detection()
         # Get channels to apply detection and the detection method :
         idx = self._fcn_get_chan_detection()
         method = str(self._ToolDetectType.currentText())
+        detect = self._fcn_get_detection(method)
 
         ############################################################
         # RUN DETECTION
         ############################################################
-        for i, k in enumerate(idx):
-            # Display progress bar (only if needed):
-            if len(idx) > 1:
-                self._ToolDetectProgress.show()
-
-            # Switch between detection types :
-            # ====================== REM ======================
-            if method == 'REM':
-                # Get variables :
-                thr = self._ToolRemTh.value()
-                rem_only = self._ToolRemOnly.isChecked()
-                # Get REM indices :
-                index, nb, dty, dur = remdetect(self._data[k, :], self._sf,
-                                                self._hypno, rem_only, thr)
-
-            # ====================== SPINDLES ======================
-            elif method == 'Spindles':
-                # Get variables :
-                thr = self._ToolSpinTh.value()
-                f_min = self._ToolSpinFmin.value()
-                f_max = self._ToolSpinFmax.value()
-                t_min = self._ToolSpinTmin.value()
-                t_max = self._ToolSpinTmax.value()
-                nrem_only = self._ToolSpinRemOnly.isChecked()
-                # Get Spindles indices :
-                index, nb, dty, dur, pwr = spindlesdetect(
-                    self._data[k, :], self._sf, thr, self._hypno, nrem_only,
-                    f_min, f_max, t_min, t_max)
-
-            # ====================== SLOW WAVES ======================
-            elif method == 'Slow waves':
-                # Get variables :
-                thr = self._ToolWaveTh.value()
-                # Get Slow Waves indices :
-                index, nb, dty, dur = slowwavedetect(self._data[k, :],
-                                                     self._sf, thr)
-
-            # ====================== K-COMPLEXES ======================
-            elif method == 'K-complexes':
-                # Get variables :
-                proba_thr = self._ToolKCProbTh.value()
-                amp_thr = self._ToolKCAmpTh.value()
-                tmin = self._ToolKCMinDur.value()
-                tmax = self._ToolKCMaxDur.value()
-                min_amp = self._ToolKCMinAmp.value()
-                max_amp = self._ToolKCMaxAmp.value()
-                nrem_only = self._ToolKCNremOnly.isChecked()
-                # Get Slow Waves indices :
-                index, nb, dty, dur = kcdetect(self._data[k, :], self._sf,
-                                               proba_thr, amp_thr, self._hypno,
-                                               nrem_only, tmin, tmax, min_amp,
-                                               max_amp)
-
-            # ====================== PEAKS ======================
-            elif method == 'Peaks':
-                # Get variables :
-                look = int(self._ToolPeakLook.value() * self._sf)
-                disp = self._ToolPeakMinMax.currentIndex()
-                disp_types = ['max', 'min', 'minmax']
-                index, nb, dty = peakdetect(self._sf, self._data[k, :],
-                                            self._time, lookahead=look,
-                                            delta=1., threshold='auto',
-                                            get=disp_types[disp])
-
-            # ====================== MUSCLE TWITCHES ======================
-            elif method == 'Muscle twitches':
-                # Get variables :
-                th = self._ToolMTTh.value()
-                rem_only = self._ToolMTOnly.isChecked()
-                index, nb, dty, dur = mtdetect(self._data[k, :], self._sf, th,
-                                               self._hypno, rem_only)
-
+        self._detectMethod, self._detectReport = method, None
+        bad = self._artifacts
+        if (bad is None) or not self._ToolDetectIgnArt.isChecked():
+            bad = [None] * len(self)
+        data, features = self._data, self._fcn_get_features()
+        # Each detection gets its own flag (a cancelled channel that is still
+        # running cannot stop the next detection) :
+        stop = self._detectStop = threading.Event()
+
+        def _detect_channel(k):
+            # Features are computed first by the same worker. Flat channels
+            # (null variance in every epoch) are skipped :
+            if stop.is_set() or not np.any(features.result()['var'][k, :] > 0):
+                return None
+            # The channel is read (and montaged) by the worker :
+            x = data[k, :]
+            return None if stop.is_set() else detect(x, bad[k])
+        self._detectJobs = [(self._channels[k], self._detectPool.submit(
+            _detect_channel, k)) for k in idx]
+        self._detectTotal = len(self._detectJobs)
+        # Display progress bar (only if needed):
+        self._ToolDetectProgress.setValue(0)
+        self._ToolDetectProgress.setVisible(len(idx) > 1)
+        self._ToolDetectApply.setText('Cancel')
+        self._detectTimer.start()
+
+    def _fcn_cancel_detection(self):
+        """Cancel the detection (already completed channels are kept)."""
+        for chan, job in self._detectJobs:
+            job.cancel()
+        # The result of the running channel is dropped and it stops as soon
+        # as it checks the flag :
+        self._detectJobs = [(c, j) for c, j in self._detectJobs if j.done()]
+        self._detectStop.set()
+        logger.info("%s detection cancelled" % self._detectMethod)
+        self._fcn_detection_progress()
+
+    def _fcn_wait_detection(self):
+        """Wait until the detection is finished."""
+        futures.wait([j for _, j in self._detectJobs])
+        self._fcn_detection_progress()
+
+    def _fcn_detection_progress(self):
+        """Merge completed channels and update the progress bar."""
+        method = self._detectMethod
+        # Merge completed channels (in order) :
+        while self._detectJobs and self._detectJobs[0][1].done():
+            chan, job = self._detectJobs.pop(0)
+            if job.cancelled() or (chan not in self._channels):
+                continue
+            try:
+                result = job.result()
+            except Exception as e:
+                logger.error("%s detection failed on channel %s (%s)" % (
+                    method, chan, str(e)))
+                continue
+            if result is None:
+                logger.warning("%s detection skipped on flat channel %s" % (
+                    method, chan))
+                continue
+            index, nb, dty = result
             logger.info(("Perform %s detection on channel %s. %i events "
-                         "detected.") % (method, self._channels[k], nb))
-
+                         "detected.") % (method, chan, nb))
+            self._detectReport = (chan, index, nb, dty)
             if index.size:
-                # Enable detection tab :
-                self._DetectionTab.setTabEnabled(1, True)
+                k = self._channels.index(chan)
                 # Update index for this channel and detection :
-                if method == 'Peaks':
-                    index = np.c_[index, index]
-                else:
-                    index = _events_to_index(index)
-                self._detect.dict[(self._channels[k], method)]['index'] = index
+                self._detect.set_index((chan, method), index)
                 # Be sure panel is displayed :
                 if not self._canvas_is_visible(k):
                     self._canvas_set_visible(k, True)
                     self._chan.visible[k] = True
                 self._chan.loc[k].visible = True
-                # Update plot :
-                self._fcn_slider_move()
-
-            # Update progress bar :
-            self._ToolDetectProgress.setValue(100. * (i + 1) / len(self))
+        # Update progress bar :
+        n_done = self._detectTotal - len(self._detectJobs)
+        self._ToolDetectProgress.setValue(int(100. * n_done / max(
+            self._detectTotal, 1)))
+        if not self._detectJobs:
+            self._fcn_finish_detection()
+
+    def _fcn_finish_detection(self):
+        """Refresh the display once the detection is finished."""
+        self._detectTimer.stop()
+        self._ToolDetectApply.setText('Apply')
+        self._ToolDetectProgress.hide()
+        if self._detectReport is None:
+            return None
+        chan, index, nb, dty = self._detectReport
 
         ############################################################
         # NUMBER // DENSITY
         ############################################################
         if index.size:
+            # Enable detection tab :
+            self._DetectionTab.setTabEnabled(1, True)
             # Report results on table :
             self._ToolDetectTable.setRowCount(1)
             self._ToolDetectTable.setItem(0, 0, QtWidgets.QTableWidgetItem(
@@ -196,20 +386,19 @@ class UiDetection(object):
             self._ToolDetectTable.setItem(0, 1, QtWidgets.QTableWidgetItem(
                 str(round(dty, 2))))
         else:
-            warn("\nNo " + method + " detected on channel " + self._channels[
-                 k] + ". Try to decrease the threshold")
+            warn("\nNo " + self._detectMethod + " detected on channel " +
+                 chan + ". Try to decrease the threshold")
 
         ############################################################
         # LINE REPORT :
         ############################################################
+        # Update plot (only once for all channels) :
+        self._fcn_slider_move()
         self._loc_line_report()
 
         # Activate the save detections menu and activate detection tab :
         self._check_detect_menu()
 
-        # Finally, hide progress bar :
-        self._ToolDetectProgress.hide()
-
     def _loc_line_report(self, *args, refresh=True):
         """Update line report."""
         self._detect.build_line(self._data)
@@ -267,7 +456,7 @@ class UiDetection(object):
             pos = np.full((1, 3), -10., dtype=np.float32)
             self._chan.loc[self._channels.index(chan)].set_data(pos=pos)
             # Clean table :
-            self._DetectLocations.setRowCount(0)
+            self._locModel.clear()
             # Update GUI :
             self._loc_line_report()
         else:
@@ -303,87 +492,85 @@ class UiDetection(object):
 
     def _fcn_fill_locations(self, channel, kind, index, duration):
         """Fill the location table."""
-        # Disconnect location table :
-        self._DetectLocations.disconnect()
-        ref = ['Wake', 'N1', 'N2', 'N3', 'REM', 'ART']
-        # Clean table :
-        self._DetectLocations.setRowCount(0)
+        ref = np.array(['Wake', 'N1', 'N2', 'N3', 'REM', 'ART'], dtype=object)
         # Get starting index:
         staInd, endInd = index[:, 0], index[:, 1]
-        # Define the length of the table:
-        self._DetectLocations.setRowCount(min(len(staInd), len(duration)))
-        # Fill the table :
-        for num, (k, j, i) in enumerate(zip(staInd, endInd, duration)):
-            # Starting :
-            self._DetectLocations.setItem(num, 0, QtWidgets.QTableWidgetItem(
-                str(self._time[k])))
-            # Ending :
-            self._DetectLocations.setItem(num, 1, QtWidgets.QTableWidgetItem(
-                str(self._time[j])))
-            # Duration :
-            self._DetectLocations.setItem(num, 2, QtWidgets.QTableWidgetItem(
-                str(i)))
-            # Type :
-            item = QtWidgets.QTableWidgetItem(ref[int(self._hypno[k])])
-            item.setFlags(QtCore.Qt.ItemIsEnabled)
-            self._DetectLocations.setItem(num, 3, item)
+        # Fill the table (cells are only converted when displayed) :
+        self._locModel.set_data(self._time[staInd], self._time[endInd],
+                                duration, ref[self._hypno[staInd].astype(int)])
         # Go to the first detected event :
         self._DetectLocations.selectRow(0)
-        self._fcn_goto_location()
-        # Reconnect :
-        self._DetectLocations.itemSelectionChanged.connect(
-            self._fcn_goto_location)
-        self._DetectLocations.cellChanged.connect(self._fcn_edit_detection)
+
+    def _get_location_row(self):
+        """Get the row of the selected event (-1 if no event is selected)."""
+        row = self._DetectLocations.currentIndex().row()
+        return self._locModel.source_row(row)
 
     # =====================================================================
     # GO TO THE LOCATION
     # =====================================================================
-    def _fcn_goto_location(self):
+    def _fcn_goto_location(self, *args):
         """Go to the selected row REM / spindles / peak."""
         # Get the currently selected channel and type :
         chan, types = self._get_current_chan_type()
         # Get selected row and channel :
-        row = self._DetectLocations.currentRow()
+        row = self._get_location_row()
         ix = self._channels.index(chan)
         if row >= 0:
             # Get starting and ending point :
-            sta = float(str(self._DetectLocations.item(row, 0).text()))
-            end = float(str(self._DetectLocations.item(row, 1).text()))
+            sta = float(self._locModel.get_column(0)[row])
+            end = float(self._locModel.get_column(1)[row])
             # Go to :
             self._SlGoto.setValue(sta)
             # Set vertical lines to the location :
             self._chan.set_location(self._sf, self._data[ix, :], ix, sta, end)
 
-    def _fcn_edit_detection(self):
-        """Executed function when the item is edited."""
+    def _fcn_edit_detection(self, row, col):
+        """Executed function when the item is edited.
+
+        Parameters
+        ----------
+        row : int
+            Edited row (i.e event number).
+        col : int
+            Edited column (start, end or duration).
+        """
         # Get the currently selected channel and type :
         chan, types = self._get_current_chan_type()
-        # Get selected row and col :
-        row = self._DetectLocations.currentRow()
-        col = self._DetectLocations.currentColumn()
-        val = self._DetectLocations.item(row, col).text()
+        val = self._locModel.get_column(col)[row]
+        index = self._detect[(chan, types)]['index']
         if col in [0, 1]:  # Edit starting/ending point
             val = int(np.round(float(val) * self._sf))
-            self._detect[(chan, types)]['index'][row, col] = val
+            index[row, col] = val
         elif col == 2:  # Edit duration
             val = int(np.round(float(val) * self._sf / 1000.))
-            start = self._detect[(chan, types)]['index'][row, 0]
-            self._detect[(chan, types)]['index'][row, 1] = start + val
-        elif col == 3:  # Avoid stage editing
-            self._DetectLocations
-            self._DetectLocations.setItem(row, 3,
-                                          QtWidgets.QTableWidgetItem(val))
-        # Update :
-        self._loc_line_report(refresh=False)
-        self._DetectLocations.selectRow(row)
+            index[row, 1] = index[row, 0] + val
+        # Only update the edited row and the edited detection :
+        self._fcn_fill_location_row(row, index[row, 0], index[row, 1])
+        self._fcn_update_detection(chan, types)
+        self._DetectLocations.selectRow(self._locModel.view_row(row))
+
+    def _fcn_fill_location_row(self, row, start, end):
+        """Update a single row of the location table."""
+        dur = (end - start) * (1000. / self._sf)
+        ref = ['Wake', 'N1', 'N2', 'N3', 'REM', 'ART']
+        self._locModel.set_row(row, self._time[start], self._time[end], dur,
+                               ref[int(self._hypno[start])])
+
+    def _fcn_update_detection(self, chan, types):
+        """Update the visuals of a single (channel, type) detection."""
+        self._detect.set_dirty((chan, types))
+        self._detect.build_line(self._data)
+        self._detect.build_hyp(chan, types)
 
     def _fcn_rm_selected_event(self):
         """Remove the selected event in the table and update detections."""
         # Get selected row :
-        row = self._DetectLocations.currentRow()  # return -1 when no more row
+        view_row = self._DetectLocations.currentIndex().row()
+        row = self._locModel.source_row(view_row)  # -1 when no more row
         if row + 1:
             # Remove row :
-            self._DetectLocations.removeRow(row)
+            self._locModel.remove_rows(row)
             # Get the currently selected channel and type :
             chan, types = self._get_current_chan_type()
             # Delete the selected event :
@@ -394,5 +581,5 @@ class UiDetection(object):
                 self._loc_line_report(refresh=True)
             else:
                 self._detect[(chan, types)]['index'] = np.delete(index, row, 0)
-                self._loc_line_report(refresh=False)
-                self._DetectLocations.selectRow(row)
+                self._fcn_update_detection(chan, types)
+                self._DetectLocations.selectRow(view_row)
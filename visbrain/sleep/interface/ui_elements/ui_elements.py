@@ -9,16 +9,18 @@ from .ui_detection import UiDetection
 from .ui_menu import UiMenu
 from .ui_annotate import UiAnnotate
 from .ui_screenshot import UiScreenshot
+from .ui_loading import UiLoading
 from ....config import PROFILER
 
 
 class UiElements(UiSettings, UiPanels, UiInfo, UiTools, UiScoring,
-                 UiDetection, UiAnnotate, UiMenu, UiScreenshot):
+                 UiDetection, UiAnnotate, UiMenu, UiScreenshot, UiLoading):
     """Inherit from the diffrent Ui files and initialize them."""
 
     def __init__(self):
         """Init."""
         for k in ['UiSettings', 'UiPanels', 'UiInfo', 'UiTools', 'UiScoring',
-                  'UiDetection', 'UiAnnotate', 'UiMenu', 'UiScreenshot']:
+                  'UiDetection', 'UiAnnotate', 'UiMenu', 'UiScreenshot',
+                  'UiLoading']:
             eval(k + '.__init__(self)')
             PROFILER("%s" % k, level=1)
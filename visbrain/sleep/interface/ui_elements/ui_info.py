@@ -2,7 +2,6 @@
 
 from PyQt5 import QtWidgets
 
-from ....utils import sleepstats
 from os import path
 
 
@@ -16,8 +15,8 @@ class UiInfo(object):
     def _fcn_info_update(self):
         """Complete the table sleep info."""
         table = self._infoTable
-        # Get sleep stats :
-        stats = sleepstats(self._hyp.gui_to_hyp(), self._sf)
+        # Get sleep stats (from the runs of the hypnogram) :
+        stats = self._hypruns.sleepstats()
 
         # Add global informations to stats dict
         is_file = isinstance(self._file, str)
@@ -25,12 +24,18 @@ class UiInfo(object):
         stats['Sampling frequency'] = str(self._sfori) + " Hz"
         stats['Down-sampling'] = str(self._sf) + " Hz"
 
-        self._keysInfo = [''] * len(stats)
-        self._valInfo = [''] * len(stats)
+        # Only update modified rows :
+        is_new = table.rowCount() != len(stats)
+        if is_new:
+            self._keysInfo = [''] * len(stats)
+            self._valInfo = [''] * len(stats)
         # Check line number:
         table.setRowCount(len(stats))
         # Fill table :
         for num, (k, v) in enumerate(stats.items()):
+            if not is_new and (self._keysInfo[num], self._valInfo[num]) == (
+                    k, str(v)):
+                continue
             # Add keys :
             table.setItem(int(num), 0, QtWidgets.QTableWidgetItem(k))
             # Add values :
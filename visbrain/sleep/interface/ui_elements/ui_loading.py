@@ -0,0 +1,89 @@
+"""Main class for background loading managment."""
+import logging
+
+from PyQt5 import QtCore
+
+logger = logging.getLogger('visbrain')
+
+
+class UiLoading(object):
+    """Extend the GUI as the data are loaded in the background."""
+
+    def __init__(self):
+        """Init."""
+        # Check for loaded chunks :
+        self._loadTimer = QtCore.QTimer()
+        self._loadTimer.setInterval(200)
+        self._loadTimer.timeout.connect(self._fcn_load_refresh)
+        # Elements requiring the entire recording are disabled until the
+        # data are loaded :
+        self._loadWidgets = [self._ToolDetectApply, self._ToolDetectArt,
+                             self._ToolsRefApply, self._PanSpecPrecompute,
+                             self.menuDispTopo, self.menuDispZoom]
+        for k in self._loadWidgets:
+            k.setEnabled(not self._is_loading())
+
+    def _is_loading(self):
+        """Get if the data are still loaded in the background."""
+        return self._n_loaded < len(self._time)
+
+    def _fcn_load_cancel(self):
+        """Stop loading the data in the background (e.g GUI closed)."""
+        self._loadTimer.stop()
+        if self._loader is not None:
+            self._loader.cancel()
+
+    def _fcn_load_refresh(self):
+        """Extend the slider and the hypnogram to the loaded data."""
+        if not self._is_loading():
+            return None
+        n_loaded = self._loader.n_loaded
+        if n_loaded != self._n_loaded:
+            # Check if the current window was partially loaded :
+            win_end = self._SlVal.value() * self._SigSlStep.value() + \
+                self._SigWin.value()
+            is_partial = win_end * self._sf > self._n_loaded
+            self._n_loaded = n_loaded
+            # Prepared windows may contain samples that were not loaded :
+            self._chan.prefetch.invalidate()
+            self._fcn_slider_range()
+            if is_partial:
+                self._fcn_slider_move()
+        if self._loader.complete:
+            self._fcn_load_finish()
+        elif self._loader.error is not None:
+            self._loadTimer.stop()
+            self._specLabel.setText(self._addspace + 'Loading failed')
+        else:
+            # Extend the hypnogram and the time axis :
+            t_min, t_max = self._time.min(), self._time[n_loaded - 1]
+            self._hypcam.rect = (t_min, -5., t_max - t_min, 7.)
+            self._timecam.rect = (t_min, 0., t_max - t_min, 1.)
+            self._specLabel.setText(self._addspace + 'Loading data (%i%%)' % (
+                int(100. * self._loader.progress)))
+            if not self._loadTimer.isActive():
+                self._loadTimer.start()
+
+    def _fcn_load_finish(self):
+        """Update the GUI once the entire recording is loaded."""
+        self._loadTimer.stop()
+        self._n_loaded = len(self._time)
+        self._chan.prefetch.invalidate()
+        self._topo.invalidate()
+        self._features = self._artifacts = None
+        # Amplitude ranges of the entire recording :
+        self._fcn_update_amp_info()
+        for k in range(len(self)):
+            self._yminSpin[k].setRange(self['min'][k], self['max'][k])
+            self._ymaxSpin[k].setMaximum(self['max'][k])
+        self._fcn_chan_sym_amp()
+        # Cameras on the entire recording :
+        t_min, t_max = self._time.min(), self._time.max()
+        self._hypcam.rect = (t_min, -5., t_max - t_min, 7.)
+        self._timecam.rect = (t_min, 0., t_max - t_min, 1.)
+        for k in self._loadWidgets:
+            k.setEnabled(True)
+        self._fcn_slider_range()
+        # Finally, compute the spectrogram :
+        self._fcn_spec_set_data()
+        logger.info("Data loaded")
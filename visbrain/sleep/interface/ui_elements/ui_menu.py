@@ -5,10 +5,10 @@ import numpy as np
 import os
 from PyQt5 import QtWidgets
 
-from ....utils import HelpMenu
+from ....utils import HelpMenu, event_coincidence
 from ....io import (dialog_save, dialog_load, write_fig_hyp, write_csv,
                     write_txt, write_hypno_txt, write_hypno_hyp, read_hypno,
-                    annotations_to_array, oversample_hypno)
+                    AnnotationStore, EventStore)
 
 
 class UiMenu(HelpMenu):
@@ -36,6 +36,11 @@ class UiMenu(HelpMenu):
         # Detections :
         self.menuSaveDetectAll.triggered.connect(self._save_all_detect)
         self.menuSaveDetectSelected.triggered.connect(self._save_select_detect)
+        self.menuSaveDetectCoinc = QtWidgets.QAction("Coincidences", self)
+        self.menuSaveDetectCoinc.setToolTip("Events of the selected type that "
+                                            "co-occur across channels")
+        self.menuSaveDetections.addAction(self.menuSaveDetectCoinc)
+        self.menuSaveDetectCoinc.triggered.connect(self._save_coinc_detect)
         # Sleep GUI config :
         self.menuSaveConfig.triggered.connect(self._save_config)
         # Annotations :
@@ -99,10 +104,10 @@ class UiMenu(HelpMenu):
 
             # Switch between differents types :
             if ext == '.hyp':
-                write_hypno_hyp(filename, self._hypno, self._sf, self._sfori,
+                write_hypno_hyp(filename, self._hypruns, self._sf, self._sfori,
                                 self._N)
             elif ext == '.txt':
-                write_hypno_txt(filename, self._hypno, self._sf, self._sfori,
+                write_hypno_txt(filename, self._hypruns, self._sf, self._sfori,
                                 self._N, 1)
             else:
                 raise ValueError("Not a valid extension")
@@ -138,12 +143,8 @@ class UiMenu(HelpMenu):
     def _save_scoring_table(self, *args, filename=None):
         """Export score info."""
         # Read Table
-        row_count = self._scoreTable.rowCount()
-        sta_ind, end_ind, stage = [], [], []
-        for row in np.arange(row_count):
-            sta_ind.append(str(self._scoreTable.item(row, 0).text()))
-            end_ind.append(str(self._scoreTable.item(row, 1).text()))
-            stage.append(str(self._scoreTable.item(row, 2).text()))
+        sta_ind, end_ind, stage = [self._scoreModel.get_text(k) for k in
+                                   range(3)]
         # Get file name :
         if filename is None:
             filename = dialog_save(self, 'Save file', 'scoring_info',
@@ -166,25 +167,32 @@ class UiMenu(HelpMenu):
         # Get file name :
         if filename is None:
             filename = dialog_save(self, 'Save all detections', 'detections',
-                                   "NumPy (*.npy);;All files (*.*)")
+                                   "Event store (*.npz);;NumPy (*.npy);;"
+                                   "All files (*.*)")
         if filename:
-            file = os.path.splitext(str(filename))[0]
-            np.save(file + '.npy', self._detect.dict)
+            file, ext = os.path.splitext(str(filename))
+            if ext.find('npz') + 1:
+                # Columnar event store (with the stage of each event) :
+                index = {k: self._detect[k]['index'] for k in self._detect}
+                stage = {k: self._hypno[i[:, 0]] for k, i in index.items()
+                         if i.size}
+                store = EventStore.from_dict(index, {'stage': stage})
+                store.save(file + '.npz')
+            else:
+                np.save(file + '.npy', self._detect.dict)
 
     def _save_select_detect(self, *args, filename=None):
         """Export selected detection."""
         channel, method = self._get_current_chan_type()
         # Read Table
-        row_count = self._DetectLocations.rowCount()
         sta_ind = [channel, '', 'Time index (s)']
         end_ind = [method, '', 'Time index (s)']
         duration = ['', '', 'Duration (s)']
         stage = ['', '', 'Sleep stage']
-        for row in np.arange(row_count):
-            sta_ind.append(str(self._DetectLocations.item(row, 0).text()))
-            end_ind.append(str(self._DetectLocations.item(row, 1).text()))
-            duration.append(str(self._DetectLocations.item(row, 2).text()))
-            stage.append(str(self._DetectLocations.item(row, 3).text()))
+        sta_ind += self._locModel.get_text(0)
+        end_ind += self._locModel.get_text(1)
+        duration += self._locModel.get_text(2)
+        stage += self._locModel.get_text(3)
         # Get file name :
         saveas = "locinfo" + '_' + channel + '-' + method
         if filename is None:
@@ -200,6 +208,31 @@ class UiMenu(HelpMenu):
             elif ext.find('txt') + 1:
                 write_txt(file + '.txt', zp)
 
+    def _save_coinc_detect(self, *args, filename=None):
+        """Export clusters of co-occurring events of the selected type."""
+        method = self._get_current_chan_type()[1]
+        index = {k: self._detect[(k, method)]['index'] for k, i in
+                 self._detect.nonzero().items() if method in i}
+        coinc = event_coincidence(index, sf=self._sf)
+        # Get file name :
+        saveas = "coincidences" + '_' + method
+        if filename is None:
+            filename = dialog_save(self, 'Save ' + method + ' coincidences',
+                                   saveas, "CSV file (*.csv);;Text file"
+                                   " (*.txt);;All files (*.*)")
+        if filename:
+            file, ext = os.path.splitext(filename)
+            header = [['Cluster', 'Channel', 'Start (s)', 'End (s)',
+                       'Lag (ms)', 'Channels']]
+            rows = [[str(c), str(ch), '%.3f' % sta, '%.3f' % end,
+                     '%.1f' % lag, str(n)] for c, ch, sta, end, lag, n in zip(
+                coinc['cluster'], coinc['channel'], coinc['start'],
+                coinc['end'], 1000. * coinc['lag'], coinc['n_channels'])]
+            if ext.find('csv') + 1:
+                write_csv(file + '.csv', header + rows)
+            elif ext.find('txt') + 1:
+                write_txt(file + '.txt', header + rows)
+
     # ______________________ SLEEP GUI CONFIG ______________________
     def _save_config(self, *args, filename=None):
         """Save a config file (*.txt) containing several display parameters."""
@@ -258,12 +291,8 @@ class UiMenu(HelpMenu):
     def _save_annotation_table(self, *args, filename=None):
         """Export annotation table."""
         # Read Table
-        row_count = self._AnnotateTable.rowCount()
-        sta_ind, end_ind, annot = [], [], []
-        for row in np.arange(row_count):
-            sta_ind.append(str(self._AnnotateTable.item(row, 0).text()))
-            end_ind.append(str(self._AnnotateTable.item(row, 1).text()))
-            annot.append(str(self._AnnotateTable.item(row, 2).text()))
+        sta_ind, end_ind, annot = [self._annotModel.get_text(k) for k in
+                                   range(3)]
         # Get file name :
         if filename is None:
             filename = dialog_save(self, 'Save annotations', 'annotations',
@@ -296,12 +325,11 @@ class UiMenu(HelpMenu):
                                    "All files (*.*)")
         if filename:
             # Load the hypnogram :
-            self._hypno, _ = read_hypno(filename)
-            self._hypno = oversample_hypno(self._hypno, self._N)[::self._dsf]
+            hypno, _ = read_hypno(filename, as_runs=True)
+            hypno = hypno.oversample(self._N).decimate(self._dsf)
+            self._hypno = hypno.to_array()
             self._hyp.set_data(self._sf, self._hypno, self._time)
-            # Update info table :
-            self._fcn_info_update()
-            # Update scoring table :
+            # Update scoring table (and info table) :
             self._fcn_hypno_to_score()
             self._fcn_score_to_hypno()
 
@@ -390,8 +418,19 @@ class UiMenu(HelpMenu):
         # Dialog window for detection file :
         if filename is None:
             filename = dialog_load(self, "Import detections", '',
-                                   "NumPy (*.npy);;All files (*.*)")
-        self._detect.dict = np.ndarray.tolist(np.load(filename))
+                                   "Event store (*.npz);;NumPy (*.npy);;"
+                                   "All files (*.*)")
+        if os.path.splitext(str(filename))[1] == '.npz':
+            store = EventStore.load(filename)
+            for k in self._detect:
+                if k in store:
+                    index = np.array(store.query(*k, columns=[])['index'])
+                    self._detect[k]['index'] = index
+                else:
+                    self._detect[k]['index'] = np.array([])
+        else:
+            self._detect.dict = np.ndarray.tolist(np.load(filename))
+        self._detect.set_dirty()
         # Made canvas visbles :
         for k in self._detect:
             if self._detect[k]['index'].size:
@@ -424,7 +463,7 @@ class UiMenu(HelpMenu):
             # Convert into index :
             index = np.round(index * self._sf).astype(int)
             # Set index :
-            self._detect[(chan, meth)]['index'] = index
+            self._detect.set_index((chan, meth), index)
             # Plot update :
             self._fcn_slider_move()
             self._loc_line_report()
@@ -437,28 +476,14 @@ class UiMenu(HelpMenu):
             filename = dialog_load(self, "Import annotations", '',
                                    "CSV file (*.csv);;Text file (*.txt);;"
                                    "All files (*.*)")
-        # Clean annotations :
-        self._AnnotateTable.setRowCount(0)
-        start, end, annot = annotations_to_array(filename)
-
-        # Fill table :
-        self._AnnotateTable.setRowCount(len(start))
-        # File the table :
-        for k, (s, e, a) in enumerate(zip(start, end, annot)):
-            # Starting index :
-            self._AnnotateTable.setItem(
-                k, 0, QtWidgets.QTableWidgetItem(str(s)))
-            # Ending index :
-            self._AnnotateTable.setItem(
-                k, 1, QtWidgets.QTableWidgetItem(str(e)))
-            # Text :
-            self._AnnotateTable.setItem(
-                k, 2, QtWidgets.QTableWidgetItem(str(a)))
-            # Set the current tab to the annotation tab :
+        self._annot = AnnotationStore.from_annotations(filename)
+
+        # Fill table (cells are only converted when displayed) :
+        self._annotModel.set_data(*self._annot.to_array())
+        # Set the current tab to the annotation tab :
+        if len(self._annot):
             self.QuickSettings.setCurrentIndex(5)
-        # Set markers :
-        middle = (start.astype(np.float32) + end.astype(np.float32)) / 2
-        self._annot_mark = middle
+        # Update markers :
         self._fcn_slider_move()
 
     ###########################################################
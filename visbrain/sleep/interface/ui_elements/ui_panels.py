@@ -99,6 +99,19 @@ class UiPanels(object):
         self._PanSpecCmapInv.clicked.connect(self._fcn_spec_compat)
         self._PanSpecNorm.currentIndexChanged.connect(self._fcn_spec_compat)
         self._PanSpecInterp.currentIndexChanged.connect(self._fcn_spec_interp)
+        # Precompute the spectrogram of every channel :
+        self._PanSpecPrecompute = QtWidgets.QCheckBox(self._spec_page)
+        self._PanSpecPrecompute.setText("Precompute all channels")
+        self._PanSpecPrecompute.setToolTip("Compute the spectrogram of every "
+                                           "channel in the background so "
+                                           "that switching channels is "
+                                           "instant.")
+        self.horizontalLayout_25.insertWidget(2, self._PanSpecPrecompute)
+        self._PanSpecPrecompute.clicked.connect(self._fcn_spec_precompute)
+        # Display tiles of the spectrogram as they are computed :
+        self._specTimer = QtCore.QTimer()
+        self._specTimer.setInterval(200)
+        self._specTimer.timeout.connect(self._fcn_spec_refresh)
         PROFILER("Spectrogram", level=2)
 
         # =====================================================================
@@ -201,11 +214,12 @@ class UiPanels(object):
     def _fcn_chan_check_and_create_w(self):
         """Create one checkbox and one widget/layout per channel."""
         # Empty list of checkbox and widgets/layouts :
+        n_canvas = 1 if self._stacked else len(self)
         self._chanChecks = [0] * len(self)
         self._yminSpin, self._ymaxSpin = [0] * len(self), [0] * len(self)
-        self._chanWidget = [0] * len(self)
-        self._chanLayout = [0] * len(self)
-        self._chanCanvas = [0] * len(self)
+        self._chanWidget = [0] * n_canvas
+        self._chanLayout = [0] * n_canvas
+        self._chanCanvas = [0] * n_canvas
         self._chanLabels = []
         self._amplitudeTxt = []
 
@@ -259,6 +273,10 @@ class UiPanels(object):
             self._yminSpin[i].valueChanged.connect(self._fcn_chan_amplitude)
             self._ymaxSpin[i].valueChanged.connect(self._fcn_chan_amplitude)
 
+            # Stacked channels share a unique canvas :
+            if self._stacked:
+                continue
+
             # ============ WIDGETS / LAYOUTS ============
             # Create a widget :
             (self._chanWidget[i],
@@ -280,6 +298,17 @@ class UiPanels(object):
             # Add the canvas to the layout :
             self._chanLayout[i].addWidget(self._chanCanvas[i].canvas.native)
 
+        # ============ STACKED CANVAS ============
+        if self._stacked:
+            (self._chanWidget[0],
+             self._chanLayout[0]) = self._create_compatible_w(
+                "_widgetChanStacked", "_LayoutChanStacked")
+            self._chanGrid.addWidget(self._chanWidget[0], 0, 0, 1, 2)
+            self._chanCanvas[0] = AxisCanvas(axis=self._ax, name='Stacked',
+                                             use_pad=True,
+                                             fcn=[self.on_mouse_wheel])
+            self._chanLayout[0].addWidget(self._chanCanvas[0].canvas.native)
+
         self._PanChanLay.addItem(vspacer, i + 1, 0, 1, 1)
         self._chanGrid.addItem(hspacer, i + 4, 1, 1, 1)
 
@@ -331,10 +360,7 @@ class UiPanels(object):
                 self._ylims[k, :] = np.array([-M.value(), M.value()])
             else:
                 self._ylims[k, :] = np.array([m.value(), M.value()])
-            rect = (self._chan.x[0], self._ylims[k, 0],
-                    self._chan.x[1] - self._chan.x[0],
-                    self._ylims[k, 1] - self._ylims[k, 0])
-            self._chanCam[k].rect = rect
+        self._chan.set_ylim(self._ylims)
 
     def _fcn_all_amp(self):
         """Set all channel amplitudes."""
@@ -359,9 +385,9 @@ class UiPanels(object):
     def _fcn_chan_antialias(self):
         """Set anti-aliasing lines."""
         aa = self._channels_alias.isChecked()
-        for k in range(len(self._channels)):
-            self._chan.mesh[k].antialias = aa
-            self._chan.mesh[k].update()
+        for k in self._chan.mesh:
+            k.antialias = aa
+            k.update()
         if aa:
             self._channels_lw.setMinimum(1.5)
         else:
@@ -375,11 +401,16 @@ class UiPanels(object):
         """Control visible panels of channels."""
         for i, k in enumerate(self._chanChecks):
             viz = k.isChecked()
+            self._chan.visible[i] = viz
+            if self._stacked:
+                continue
             self._chanWidget[i].setVisible(viz)
             self._chanLabels[i].setVisible(viz)
-            self._chan.visible[i] = viz
             if viz:
                 self._chanCanvas[i].set_camera(self._chanCam[i])
+        if self._stacked:
+            self._chanWidget[0].setVisible(any(self._chan.visible))
+            self._chanCanvas[0].set_camera(self._chanCam[0])
         self._chan.update()
 
     def _fcn_select_all_chan(self):
@@ -407,6 +438,8 @@ class UiPanels(object):
         visible : bool
             A boolean value indicating if the canvas is visible.
         """
+        if self._stacked:
+            return self._chanChecks[k].isChecked()
         return self._chanWidget[k].isVisible()
 
     def _canvas_set_visible(self, k, value):
@@ -420,6 +453,10 @@ class UiPanels(object):
             Boolean value if the canvas has to be visible.
         """
         self._chanChecks[k].setChecked(value)
+        if self._stacked:
+            self._chanWidget[0].setVisible(value or any(self._chan.visible))
+            self._chanCanvas[0].set_camera(self._chanCam[0])
+            return None
         self._chanWidget[k].setVisible(value)
         self._chanLabels[k].setVisible(value)
         self._chanCanvas[k].set_camera(self._chanCam[k])
@@ -429,6 +466,9 @@ class UiPanels(object):
     # =====================================================================
     def _fcn_spec_set_data(self):
         """Set data to the spectrogram."""
+        # The spectrogram is computed once the data are loaded :
+        if self._is_loading():
+            return None
         # Get nfft and overlap :
         nfft, over = self._PanSpecNfft.value(), self._PanSpecStep.value()
         # Get starting / ending frequency :
@@ -453,10 +493,33 @@ class UiPanels(object):
         self._spec.set_data(self._sf, self._data[chan, ...], self._time,
                             nfft=nfft, overlap=over, fstart=fstart, fend=fend,
                             cmap=cmap, contrast=contrast, interp=interp,
-                            norm=norm, method=method)
+                            norm=norm, method=method, channel=chan)
+        self._fcn_spec_precompute()
+        self._fcn_spec_refresh()
         # Set apply button disable :
         self._PanSpecApply.setEnabled(False)
 
+    def _fcn_spec_refresh(self):
+        """Display computed tiles of the spectrogram and the progress."""
+        progress = self._spec.refresh()
+        chan = self._channels[self._PanSpecChan.currentIndex()]
+        if progress < 1.:
+            self._specLabel.setText(self._addspace + chan + ' (%i%%)' % int(
+                100. * progress))
+            if not self._specTimer.isActive():
+                self._specTimer.start()
+        else:
+            self._specLabel.setText(self._addspace + chan)
+            self._specTimer.stop()
+
+    def _fcn_spec_precompute(self):
+        """Precompute the spectrogram of every channel."""
+        if self._PanSpecPrecompute.isChecked():
+            nfft, over = self._PanSpecNfft.value(), self._PanSpecStep.value()
+            method = str(self._PanSpecMethod.currentText())
+            self._spec.precompute(self._sf, self._data, self._time,
+                                  method=method, nfft=nfft, overlap=over)
+
     def _fcn_spec_compat(self):
         """Check compatibility between spectro parameters."""
         # Get nfft and overlap :
@@ -512,9 +575,7 @@ class UiPanels(object):
         if reply == QtWidgets.QMessageBox.Yes:
             self._hypno = np.zeros((len(self._hyp),), dtype=np.float32)
             self._hyp.clean(self._sf, self._time)
-            # Update info table :
-            self._fcn_info_update()
-            # Update scoring table :
+            # Update scoring table (and info table) :
             self._fcn_hypno_to_score()
             self._fcn_score_to_hypno()
         else:
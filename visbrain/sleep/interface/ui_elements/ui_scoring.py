@@ -1,8 +1,8 @@
 """Main class for settings managment."""
 import numpy as np
-from PyQt5 import QtWidgets
+from PyQt5 import QtCore
 
-from ....utils import transient
+from ....utils import StageRuns, ArrayTableModel
 
 
 class UiScoring(object):
@@ -14,8 +14,17 @@ class UiScoring(object):
         self._scoreAdd.clicked.connect(self._fcn_add_score_row)
         self._scoreRm.clicked.connect(self._fcn_rm_score_row)
 
+        # Table model (start, end, stage) :
+        self._scoreModel = ArrayTableModel(['From (minutes)', 'To (minutes)',
+                                            'Stage'], parent=self._scoreTable)
+        self._scoreModel.set_data(np.zeros((0,)), np.zeros((0,)),
+                                  np.array([], dtype=object))
+        self._scoreTable.setModel(self._scoreModel)
+        self._scoreTable.horizontalHeader().setSortIndicator(
+            -1, QtCore.Qt.AscendingOrder)
+
         # Table edited :
-        self._scoreTable.cellChanged.connect(self._fcn_score_to_hypno)
+        self._scoreModel.cellChanged.connect(self._fcn_score_to_hypno)
 
     ##########################################################################
     # UPDATE SCORE <=> HYPNO
@@ -23,46 +32,96 @@ class UiScoring(object):
     def _fcn_hypno_to_score(self):
         """Update hypno table from hypno data."""
         self._hypno = self._hyp.gui_to_hyp()
+        self._hypruns = StageRuns(self._hypno, self._sf)
+        # Remove every info in the table :
+        self._scoreModel.clear()
+        self._scoreRows = np.zeros((0, 3), dtype=float)
+        # Fill the table :
+        self._fcn_score_update_rows(0, 0, len(self._hypruns))
+
+    def _fcn_score_update_rows(self, row, n_removed, n_inserted):
+        """Only update modified rows of the hypno table.
+
+        Parameters
+        ----------
+        row : int
+            Index of the first modified run.
+        n_removed : int
+            Number of rows to remove (starting from row).
+        n_inserted : int
+            Number of runs to insert (starting from row).
+        """
         # Avoid updating data while setting cell :
         self._scoreSet = False
-        items = ['Wake', 'N1', 'N2', 'N3', 'REM', 'Art']
-        # Remove every info in the table :
-        self._scoreTable.setRowCount(0)
+        items = np.array(['Wake', 'N1', 'N2', 'N3', 'REM', 'Art'],
+                         dtype=object)
         # Find unit conversion :
         fact = self._get_fact_from_unit()
-        # Find transients :
-        _, idx, stages = transient(self._hypno, self._time / fact)
-        idx = np.round(10. * idx) / 10.
-        # Set length of the table :
-        self._scoreTable.setRowCount(len(stages))
-        # Fill the table :
-        for k in range(len(stages)):
-            # Add stage start / end :
-            self._scoreTable.setItem(k, 0, QtWidgets.QTableWidgetItem(
-                str(idx[k, 0])))
-            self._scoreTable.setItem(k, 1, QtWidgets.QTableWidgetItem(
-                str(idx[k, 1])))
-            # Add stage :
-            self._scoreTable.setItem(k, 2, QtWidgets.QTableWidgetItem(
-                items[stages[k]]))
+        # Get runs :
+        idx, stages = self._hypruns.transient(self._time / fact)
+        idx = np.round(10. * idx.astype(float)) / 10.
+        # Remove / insert rows :
+        sl = slice(row, row + n_inserted)
+        self._scoreModel.remove_rows(row, n_removed)
+        self._scoreModel.insert_rows(row, idx[sl, 0], idx[sl, 1],
+                                     items[stages[sl]])
+        # Stage start / end (in sample) :
+        markers = np.c_[(idx[sl, :] * fact * self._sf).astype(int),
+                        stages[sl]].astype(float)
+        # Keep (start, end, stage) of each row :
+        self._scoreRows = np.r_[self._scoreRows[:row, :], markers,
+                                self._scoreRows[row + n_removed:, :]]
         self._scoreSet = True
 
-    def _fcn_score_to_hypno(self):
-        """Update hypno data from hypno score."""
-        if self._scoreSet:
+    def _fcn_score_to_hypno(self, row=None, column=None):
+        """Update hypno data from hypno score.
+
+        If row is None, the hypnogram is rebuilt from the entire table.
+        Otherwise, only the interval covered by the edited row (before and
+        after the edition) is updated.
+        """
+        if not self._scoreSet:
+            return None
+        if row is None:
             # Reset hypnogram :
             self._hypno = np.zeros((len(self._time)), dtype=np.float32)
+            self._scoreRows = np.full((len(self._scoreModel), 3), np.nan)
             # Loop over table row :
-            for k in range(self._scoreTable.rowCount()):
+            for k in range(len(self._scoreModel)):
                 # Get tstart / tend / stage :
                 tstart, tend, stage = self._get_score_marker(k)
                 # Update pos if not None :
                 if tstart is not None:
+                    self._scoreRows[k, :] = (tstart, tend, stage)
                     self._hypno[tstart:tend] = stage
                     self._hyp.set_stage(tstart, tend, stage)
-            self._hyp.edit.update()
-            # Update sleep info :
-            self._fcn_info_update()
+            self._hypruns = StageRuns(self._hypno, self._sf)
+        else:
+            # Get the interval covered by the edited row :
+            old = self._scoreRows[row, :].copy()
+            self._scoreRows[row, :] = self._get_score_marker(row)
+            bounds = np.r_[old[0:2], self._scoreRows[row, 0:2]]
+            if np.isnan(bounds).all():
+                return None
+            start, stop = int(np.nanmin(bounds)), int(np.nanmax(bounds))
+            # Replay rows overlapping the interval :
+            self._set_hypno_stage(start, stop, 0.)
+            sc = self._scoreRows
+            with np.errstate(invalid='ignore'):
+                is_over = np.logical_and(sc[:, 0] < stop, sc[:, 1] > start)
+            for tstart, tend, stage in sc[is_over, :]:
+                self._set_hypno_stage(max(tstart, start), min(tend, stop),
+                                      stage)
+        self._hyp.edit.update()
+        # Update sleep info :
+        self._fcn_info_update()
+
+    def _set_hypno_stage(self, tstart, tend, stage):
+        """Set a stage to the hypnogram (data, runs and visual)."""
+        tstart, tend = int(tstart), int(tend)
+        self._hypno[tstart:tend] = stage
+        self._hyp.set_stage(tstart, tend, stage)
+        return self._hypruns.set_stage(tstart, tend, stage)
 
     def _get_score_marker(self, idx):
         """Get a specific row dat.
@@ -87,35 +146,23 @@ class UiScoring(object):
         it = {'art': -1., 'wake': 0., 'n1': 1., 'n2': 2., 'n3': 3., 'rem': 4.}
         # Get unit :
         fact = self._get_fact_from_unit()
-        # Get selected row :
-        # idx = self._scoreTable.currentRow()
         # ============= NON EMPTY ITEM =============
         # Define error message if bad editing :
         errmsg = "\nTable score error. Starting and ending time must be " + \
                  "float numbers (with time start < time end) and stage " + \
                  "must be Wake, N1, N2, N3, REM or Art"
         # Get row data and update if possible:
-        tstart_item = self._scoreTable.item(idx, 0)
-        tend_item = self._scoreTable.item(idx, 1)
-        stage_item = self._scoreTable.item(idx, 2)
-        if tstart_item and tend_item and stage_item:
-            # ============= PROPER FORMAT =============
-            if all([bool(str(tstart_item.text())), bool(str(tend_item.text())),
-                    str(stage_item.text()).lower() in it.keys()]):
-                try:
-                    # Get start / end / stage :
-                    tstart = int(float(str(tstart_item.text(
-                    ))) * fact * self._sf)
-                    tend = int(float(str(tend_item.text())) * fact * self._sf)
-                    stage = it[str(stage_item.text()).lower()]
-
-                    return tstart, tend, stage
-                except:
-                    raise ValueError(errmsg)
-            else:
-                raise ValueError(errmsg)
-        else:
+        tstart, tend, stage = [self._scoreModel.get_column(k)[idx] for k in
+                               range(3)]
+        if np.isnan(tstart) or np.isnan(tend) or not stage:
             return None, None, None
+        # ============= PROPER FORMAT =============
+        if str(stage).lower() not in it.keys():
+            raise ValueError(errmsg)
+        # Get start / end / stage :
+        tstart = int(tstart * fact * self._sf)
+        tend = int(tend * fact * self._sf)
+        return tstart, tend, it[str(stage).lower()]
 
     ##########################################################################
     # EDITING TABLE
@@ -123,11 +170,14 @@ class UiScoring(object):
     def _fcn_add_score_row(self):
         """Add a row to the table."""
         # Increase length :
-        self._scoreTable.setRowCount(self._scoreTable.rowCount() + 1)
+        self._scoreModel.insert_rows(len(self._scoreModel), [np.nan],
+                                     [np.nan], [''])
+        self._scoreRows = np.r_[self._scoreRows, np.full((1, 3), np.nan)]
 
     def _fcn_rm_score_row(self):
         """Remove selected row."""
         # Remove row :
-        self._scoreTable.removeRow(self._scoreTable.currentRow())
+        row = self._scoreTable.currentIndex().row()
+        self._scoreModel.remove_rows(self._scoreModel.source_row(row))
         # Update hypnogram from table :
         self._fcn_score_to_hypno()
@@ -43,6 +43,8 @@ class UiScreenshot(object):
                 # Force the spectrogram to be displayed :
                 self.menuDispSpec.setChecked(True)
                 self._disptog_spec()
+                # Finish to compute the spectrogram :
+                self._spec.wait()
                 # Get canvas
                 canvas = self._specCanvas.canvas
             elif name == 'hypnogram':
@@ -63,6 +65,6 @@ class UiScreenshot(object):
                 # Force the channel to be displayed :
                 self._chanChecks[kc].setChecked(True)
                 self._fcn_chan_viz()
-                canvas = self._chanCanvas[kc].canvas
+                canvas = self._chanCanvas[0 if self._stacked else kc].canvas
             # Finally, render the canvas :
             write_fig_canvas(filename, canvas=canvas, **kwargs)
@@ -69,7 +69,10 @@ class UiSettings(object):
         # Update display signal :
         sl = slice(t[0], t[1])
         self._chan.set_data(self._sf, self._data, self._time, sl=sl,
-                            ylim=self._ylims)
+                            ylim=self._ylims,
+                            step=int(round(step * self._sf)))
+        # Only send detections overlapping the window :
+        self._detect.build_line(self._data, sl)
 
         # ---------------------------------------
         is_indic_checked = self.menuDispIndic.isChecked()
@@ -86,9 +89,12 @@ class UiSettings(object):
         # ---------------------------------------
         # Update topoplot if visible :
         if self._topoW.isVisible():
-            # Prepare data before plotting :
-            data = self._topo._prepare_data(self._sf, self._data[:, sl],
-                                            self._time[sl]).mean(1)
+            # Get the mean of prepared data (epochs of the summary table
+            # are aligned with the window and the step) :
+            n_epoch = np.gcd(int(round(win * self._sf)),
+                             int(round(step * self._sf)))
+            data = self._topo.get_summary(self._sf, self._data, self._time,
+                                          sl, max(n_epoch, 1))
             # Set preprocessed sleep data :
             self._topo.set_sleep_topo(data)
             # Update title :
@@ -103,7 +109,7 @@ class UiSettings(object):
         # Update Time indicator :
         if is_indic_checked:
             self._TimeAxis.set_data(xlim[0], win, self._time, unit=unit,
-                                    markers=self._annot_mark)
+                                    markers=self._annot.markers())
 
         # ================= GUI =================
         # Update Go to :
@@ -117,9 +123,10 @@ class UiSettings(object):
             # Spectrogram :
             self._speccam.rect = (xlim[0], self._spec.freq[0], xlim_diff,
                                   self._spec.freq[-1] - self._spec.freq[0])
-            # Time axis :
+            # Time axis (only markers inside the window) :
             self._TimeAxis.set_data(xlim[0], win, np.array([xlim[0], xlim[1]]),
-                                    unit='seconds', markers=self._annot_mark)
+                                    unit='seconds',
+                                    markers=self._annot.markers(*xlim))
             self._timecam.rect = (xlim[0], 0., win, 1.)
 
         # ================= TEXT INFO =================
@@ -163,14 +170,11 @@ class UiSettings(object):
         sl = self._SlVal.value()
         slmax = self._SlVal.maximum()
         win = self._SigWin.value()
-        # Set minimum :
-        self._SlVal.setMinimum(self._time.min())
-        # Set maximum :
         step = self._SigSlStep.value()
-        self._SlVal.setMaximum(((self._time.max() - win) / step) + 1)
+        # Set minimum / maximum :
+        self._fcn_slider_range()
         self._SlVal.setTickInterval(step)
         self._SlVal.setSingleStep(step)
-        self._SlGoto.setMaximum((self._time.max() - win))
         # Re-set slider value :
         self._SlVal.setValue(sl * self._SlVal.maximum() / slmax)
 
@@ -184,6 +188,17 @@ class UiSettings(object):
         else:
             self._slOnStart = True
 
+    def _fcn_slider_range(self):
+        """Set the slider range (limited to loaded data)."""
+        win = self._SigWin.value()
+        step = self._SigSlStep.value()
+        t_max = self._time[self._n_loaded - 1]
+        # Set minimum :
+        self._SlVal.setMinimum(self._time.min())
+        # Set maximum :
+        self._SlVal.setMaximum(((t_max - win) / step) + 1)
+        self._SlGoto.setMaximum((t_max - win))
+
     def _fcn_slider_win_selection(self):
         """Move slider using window spin."""
         self._SlVal.setValue(self._SlGoto.value() / self._SigSlStep.value())
@@ -191,7 +206,7 @@ class UiSettings(object):
     def _fcn_slider_magnify(self):
         """Magnify signals."""
         # Set transformation to each node parent :
-        for k in self._chan.node:
+        for k in self._chan.root:
             # Use either Magnify / Null transformation :
             if self._slMagnify.isChecked():
                 transform = vist.nonlinear.Magnify1DTransform()
@@ -243,14 +258,12 @@ class UiSettings(object):
         t = [0, 0]
         t[0] = int(round(np.abs(self._time - xlim[0]).argmin()))
         t[1] = int(round(np.abs(self._time - xlim[1]).argmin()))
-        # Set the stage :
-        self._hypno[t[0]:t[1]] = stage
-        self._hyp.set_stage(t[0], t[1], stage)
-        # # Update info table :
+        # Set the stage (only modified runs are updated) :
+        row, n_removed, n_inserted = self._set_hypno_stage(t[0], t[1], stage)
+        # Update info table :
         self._fcn_info_update()
         # Update scoring table :
-        self._fcn_hypno_to_score()
-        # self._fcn_score_to_hypno()
+        self._fcn_score_update_rows(row, n_removed, n_inserted)
 
     # =====================================================================
     # Annotate
@@ -273,8 +286,7 @@ class UiSettings(object):
         self._infoTable.setRowCount(0)
 
         # Detection :
-        self._DetectLocations.clear()
-        self._DetectLocations.setRowCount(0)
+        self._locModel.clear()
 
         # -------------- LIST BOX --------------
         # Disconnect :
@@ -293,14 +305,17 @@ class UiSettings(object):
             # Delete elements :
             self._chanChecks[k].deleteLater()
             self._yminSpin[k].deleteLater(), self._ymaxSpin[k].deleteLater()
+            self._amplitudeTxt[k].deleteLater()
+        for k in range(len(self._chanCanvas)):
             self._chanWidget[k].deleteLater()
             self._chanLayout[k].deleteLater()
-            self._chanLabels[k].deleteLater()
-            self._amplitudeTxt[k].deleteLater()
             self._chanCanvas[k].parent = None
+        for k in self._chanLabels:
+            k.deleteLater()
         QObjectCleanupHandler().add(self._chanGrid)
         QObjectCleanupHandler().clear()
         # Spectrogram :
+        self._specTimer.stop()
         self._specCanvas.parent = None
         self._SpecW.deleteLater(), self._SpecLayout.deleteLater()
         self._specLabel.deleteLater()
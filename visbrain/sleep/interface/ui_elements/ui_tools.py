@@ -2,8 +2,7 @@
 
 import numpy as np
 from PyQt5 import QtWidgets
-from ....utils import (rereferencing, bipolarization, find_non_eeg,
-                       commonaverage)
+from ....utils import find_non_eeg, Montage
 
 
 class UiTools(object):
@@ -14,12 +13,16 @@ class UiTools(object):
         self._tool_pick.currentIndexChanged.connect(self._fcn_tool_pick)
         # Find non-eeg channels :
         self._noneeg = find_non_eeg(self._channels)
+        # Montages are applied on demand to the raw data (see
+        # _fcn_set_montage) :
+        self._raw_data = self._data
+        self._montage = Montage.identity(self._channels)
         # =====================================================================
         # RE-REFERENCING
         # =====================================================================
         # Add channels to scrolling area :
         self._ToolsRefIgnArea.setVisible(False)
-        self._reChecks = []
+        self._reChecks, self._reIndex = [], []
         for i, k in enumerate(self._channels):
             if not self._noneeg[i]:
                 # Add a checkbox to the scrolling panel :
@@ -28,6 +31,7 @@ class UiTools(object):
                 box.setText(k)
                 # Get it :
                 self._reChecks.append(box)
+                self._reIndex.append(i)
                 # Add checkbox to the grid :
                 self._ToolsRefIgnGrd.addWidget(box, i, 0, 1, 1)
         # Connections :
@@ -35,6 +39,13 @@ class UiTools(object):
         self._ToolsRefLst.addItems(np.array(self._channels)[~self._noneeg])
         self._ToolsRefMeth.currentIndexChanged.connect(self._fcn_ref_switch)
         self._ToolsRefApply.clicked.connect(self._fcn_ref_apply)
+        # Go back to raw data :
+        self._ToolsRefReset = QtWidgets.QPushButton(self._ToolsRefGrp)
+        self._ToolsRefReset.setText("Reset")
+        self._ToolsRefReset.setToolTip("Remove every applied montage and "
+                                       "display raw data.")
+        self.horizontalLayout_9.insertWidget(2, self._ToolsRefReset)
+        self._ToolsRefReset.clicked.connect(self._fcn_ref_reset)
         self._fcn_ref_switch()
 
         # =====================================================================
@@ -76,42 +87,66 @@ class UiTools(object):
         self._ToolsRefIgnArea.setVisible(self._ToolsRefIgn.isChecked())
 
     def _fcn_ref_apply(self):
-        """Apply re-referencing."""
+        """Apply re-referencing.
+
+        The montage is stacked on the current one (data are not modified).
+        """
         # By default, ingore non-eeg channel :
-        to_ignore = self._noneeg
+        to_ignore = self._noneeg.copy()
         if self._ToolsRefIgn.isChecked():
-            for num, k in enumerate(self._reChecks):
-                # Get the position of this channel :
-                idinlst = self._channels.index(str(k.text()))
+            for num, k in zip(self._reIndex, self._reChecks):
                 # Set to ignore :
-                to_ignore[idinlst] = k.isChecked()
+                to_ignore[num] = k.isChecked()
 
         # Get the current selected method :
         idx = int(self._ToolsRefMeth.currentIndex())
         # Single channel :
         if idx == 0:  # Single channel
             # Get selected channel :
-            idchan = idx = self._ToolsRefLst.currentIndex()
+            idchan = self._ToolsRefLst.currentIndex()
             # Re-referencing :
-            self._data, self._channels, consider = rereferencing(
-                self._data, self._channels, idchan,
-                to_ignore)
-            self._chanChecks[idx].setChecked(False)
+            montage = Montage.reference(self._channels, idchan, to_ignore)
         elif idx == 1:  # Common average
-            self._data, self._channels, consider = commonaverage(
-                self._data, self._channels, to_ignore)
+            montage = Montage.average(self._channels, to_ignore)
         elif idx == 2:  # Bipolarization
-            self._data, self._channels, consider = bipolarization(
-                self._data, self._channels,
-                to_ignore)
+            montage = Montage.bipolar(self._channels, to_ignore)
+        self._fcn_set_montage(self._montage.stack(montage))
+        if idx == 0:
+            self._chanChecks[idchan].setChecked(False)
+            self._fcn_chan_viz()
+
+    def _fcn_ref_reset(self):
+        """Remove montages (display raw data)."""
+        self._fcn_set_montage(Montage.identity(self._montage.channels))
+
+    def _fcn_set_montage(self, montage):
+        """Set the montage applied to raw data.
+
+        Switching montages is instantaneous because montages are applied on
+        demand to windows (or chunks) of data that are read.
+        """
+        assert len(montage) == len(self), ("The montage must contain %i "
+                                           "channels" % len(self))
+        self._montage = montage
+        if montage.is_identity:
+            self._data = self._raw_data
+        else:
+            self._data = montage.view(self._raw_data)
+        self._channels = list(montage.names)
+        consider = montage.consider
 
         # ____________________ Update ____________________
+        # Data have changed, remove prepared windows and spectra :
+        self._chan.prefetch.invalidate()
+        self._spec.cache.invalidate()
+        self._topo.invalidate()
+        self._features = self._artifacts = None
         a_max = np.argmax(consider)
         # Update data info :
         self._get_data_info()
 
         # Update and clear detections :
-        self._DetectLocations.setRowCount(0)
+        self._locModel.clear()
         self._DetectChanSw.clear()
         self._detect.update_keys(self._channels)
         self._detect.reset()
@@ -122,6 +157,10 @@ class UiTools(object):
         self._ToolDetectChan.clear()
         self._PanSpecChan.addItems(self._channels)
         self._ToolDetectChan.addItems(self._channels)
+        ref_idx = self._ToolsRefLst.currentIndex()
+        self._ToolsRefLst.clear()
+        self._ToolsRefLst.addItems(np.array(self._channels)[~self._noneeg])
+        self._ToolsRefLst.setCurrentIndex(ref_idx)
         # Reconnect :
         self._PanSpecChan.setCurrentIndex(a_max)
         self._ToolDetectChan.setCurrentIndex(a_max)
@@ -129,21 +168,27 @@ class UiTools(object):
         # Update channel names :
         for num, k in enumerate(self._channels):
             self._chanChecks[num].setText(k)
-            self._chanLabels[num].setText(k)
+            if not self._stacked:
+                self._chanLabels[num].setText(k)
+        if self._stacked:
+            self._chan.set_labels(self._channels)
 
         # Ignore non re-referenced channels :
-        if self._ToolsRefIgnore.isChecked():
-            for num, k in enumerate(consider):
-                # Remove from visible channels :
+        ignore = self._ToolsRefIgnore.isChecked()
+        for num, k in enumerate(consider):
+            k = bool(k) or not ignore
+            # Remove from visible channels :
+            if not k:
                 self._chanChecks[num].setChecked(False)
-                self._chanChecks[num].setVisible(k)
+            self._chanChecks[num].setVisible(k)
+            if not self._stacked:
                 self._chanLabels[num].setVisible(k)
-                self._yminSpin[num].setVisible(k)
-                self._ymaxSpin[num].setVisible(k)
-                self._amplitudeTxt[num].setVisible(k)
-                # Remove from chan list :
-                self._PanSpecChan.model().item(num).setEnabled(k)
-                self._ToolDetectChan.model().item(num).setEnabled(k)
+            self._yminSpin[num].setVisible(k)
+            self._ymaxSpin[num].setVisible(k)
+            self._amplitudeTxt[num].setVisible(k)
+            # Remove from chan list :
+            self._PanSpecChan.model().item(num).setEnabled(k)
+            self._ToolDetectChan.model().item(num).setEnabled(k)
         if not any([k.isChecked() for k in self._chanChecks]):
             self._chanChecks[a_max].setChecked(True)
         # Reconnect :
@@ -152,9 +197,6 @@ class UiTools(object):
         self._chan.update()
         self._fcn_chan_viz()
 
-        # Finally disable GroupBox :
-        self._ToolsRefGrp.setEnabled(False)
-
     # =====================================================================
     # DEMEAN / DETREND / FILTERING
     # =====================================================================
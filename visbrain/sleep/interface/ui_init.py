@@ -62,6 +62,7 @@ class TimeAxis(object):
         pos = np.full((1, 3), -10, dtype=np.float32)
         self.markers = Markers(pos=pos, parent=self.wc.scene)
         self.markers.set_gl_state('translucent')
+        self._markers = (None, None)
 
     def set_data(self, tox=None, width=None, time=None, unit='seconds',
                  markers=None):
@@ -79,8 +80,11 @@ class TimeAxis(object):
             self.mesh.transform.scale = width / fact
             # Update camera :
             self.wc.camera.rect = (0, 0, (time.max() - time.min()) / fact, 1)
-        # Set markers :
-        if markers is not None:
+        # Set markers (only if they have changed) :
+        is_same = (fact == self._markers[0]) and np.array_equal(
+            markers, self._markers[1])
+        if (markers is not None) and not is_same:
+            self._markers = (fact, markers)
             if markers.size:
                 pos = np.zeros((len(markers), 3), dtype=np.float32)
                 pos[:, 0] = markers / fact
@@ -2,11 +2,12 @@
 import numpy as np
 
 import vispy.scene.cameras as viscam
+from PyQt5 import QtCore
 
 from .interface import UiInit, UiElements
 from .visuals import Visuals
 from ..pyqt_module import PyQtModule
-from ..utils import (FixedCam, color2vb, MouseEventControl)
+from ..utils import (FixedCam, color2vb, MouseEventControl, Montage)
 from ..io import ReadSleepData
 from ..config import PROFILER
 
@@ -31,8 +32,9 @@ class Sleep(PyQtModule, ReadSleepData, UiInit, Visuals, UiElements,
         Polysomnographic data. Must either be a path to a supported file (see
         notes) or an array of raw data of shape (n_channels, n_pts). If None,
         a dialog window to load the file should appear.
-    hypno : array_like | None
-        Hypnogram data. Should be a raw vector of shape (n_pts,)
+    hypno : array_like | StageRuns | None
+        Hypnogram data. Should be a raw vector of shape (n_pts,) or a
+        compact StageRuns hypnogram (oversampled to the length of the data)
     config_file : string | None
         Path to the configuration file (.txt)
     annotations : string | None
@@ -58,6 +60,16 @@ class Sleep(PyQtModule, ReadSleepData, UiInit, Visuals, UiElements,
         Force to load the file using mne.io functions.
     kwargs_mne : dict | {}
         Dictionary to pass to the mne.io loading function.
+    stacked : bool | False
+        Display all of the channels stacked inside a single canvas. Data of
+        visible channels are drawn from a single vertex buffer which is much
+        faster for a large number of channels.
+    background : bool | False
+        Load the data in a background thread. The window is opened as soon as
+        the header and the first minutes of the recording are read, the
+        slider and the hypnogram are then extended as the data are loaded.
+        Only supported for files loaded using Sleep (.vhdr, .eeg, .trc, .edf
+        and .rec).
 
     Notes
     -----
@@ -77,7 +89,8 @@ class Sleep(PyQtModule, ReadSleepData, UiInit, Visuals, UiElements,
     def __init__(self, data=None, hypno=None, config_file=None,
                  annotations=None, channels=None, sf=None, downsample=100.,
                  axis=True, href=['art', 'wake', 'rem', 'n1', 'n2', 'n3'],
-                 preload=True, use_mne=False, kwargs_mne={}, verbose=None):
+                 preload=True, use_mne=False, kwargs_mne={}, stacked=False,
+                 background=False, verbose=None):
         """Init."""
         PyQtModule.__init__(self, verbose=verbose, icon='sleep_icon.svg')
         # ====================== APP CREATION ======================
@@ -93,14 +106,14 @@ class Sleep(PyQtModule, ReadSleepData, UiInit, Visuals, UiElements,
         PROFILER("Import file", as_type='title')
         ReadSleepData.__init__(self, data, channels, sf, hypno, href, preload,
                                use_mne, downsample, kwargs_mne,
-                               annotations)
+                               annotations, background)
 
         # ====================== VARIABLES ======================
         # Check all data :
         self._config_file = config_file
-        self._annot_mark = np.array([])
         self._hconvinv = {v: k for k, v in self._hconv.items()}
         self._ax = axis
+        self._stacked = stacked
         # ---------- Default line width ----------
         self._lw = 1.
         self._lwhyp = 2
@@ -167,9 +180,15 @@ class Sleep(PyQtModule, ReadSleepData, UiInit, Visuals, UiElements,
     ###########################################################################
     def _get_data_info(self):
         """Get some info about data (min, max, std, mean, dist)."""
-        self._datainfo = {'min': self._data.min(1), 'max': self._data.max(1),
-                          'std': self._data.std(1), 'mean': self._data.mean(1),
-                          'dist': self._data.max(1) - self._data.min(1)}
+        # Channels are read by chunks (data can be montaged on demand) :
+        info = []
+        for k in range(0, len(self), 8):
+            data = np.asarray(self._data[k:k + 8, :self._n_loaded])
+            info.append(np.c_[data.min(1), data.max(1), data.std(1),
+                              data.mean(1)])
+        d_min, d_max, d_std, d_mean = np.concatenate(info).T
+        self._datainfo = {'min': d_min, 'max': d_max, 'std': d_std,
+                          'mean': d_mean, 'dist': d_max - d_min}
 
     def _set_default_state(self):
         """Set the default window state."""
@@ -183,7 +202,7 @@ class Sleep(PyQtModule, ReadSleepData, UiInit, Visuals, UiElements,
         """Create a set of cameras."""
         # ------------------- Channels -------------------
         self._chanCam = []
-        for k in range(len(self)):
+        for k in range(1 if self._stacked else len(self)):
             self._chanCam.append(FixedCam())  # viscam.PanZoomCamera()
         # ------------------- Spectrogram -------------------
         self._speccam = FixedCam()  # viscam.PanZoomCamera()
@@ -206,12 +225,14 @@ class Sleep(PyQtModule, ReadSleepData, UiInit, Visuals, UiElements,
         """Applied on creation."""
         self._fcn_grid_toggle()
         self._fcn_slider_move()
+        self._fcn_spec_refresh()
         self._chanChecks[0].setChecked(True)
         self._hypLabel.setVisible(self.menuDispHypno.isChecked())
         self._fcn_chan_viz()
         self._fcn_chan_sym_amp()
-        self._fcn_info_update()
         self._fcn_hypno_to_score()
+        self._fcn_info_update()
+        self._fcn_load_refresh()
         # Set objects visible :
         self._SpecW.setVisible(True)
         self._HypW.setVisible(True)
@@ -221,3 +242,79 @@ class Sleep(PyQtModule, ReadSleepData, UiInit, Visuals, UiElements,
             self._load_config(filename=self._config_file)
         if self._annot_file is not None:   # Annotation file
             self._load_annotation_table(filename=self._annot_file)
+
+    def closeEvent(self, event):  # noqa
+        """Stop background threads before closing the GUI."""
+        self._fcn_load_cancel()
+        if self._detectJobs:
+            self._fcn_cancel_detection()
+        self._detectPool.shutdown(wait=False)
+        self.stop_stream()
+        PyQtModule.closeEvent(self, event)
+
+    ###########################################################################
+    # MONTAGE
+    ###########################################################################
+    def set_montage(self, montage=None):
+        """Set the montage applied to the data.
+
+        Montages are applied on demand to displayed windows, detected
+        channels and the topoplot. Hence, data are never modified and
+        switching montages is instantaneous.
+
+        Parameters
+        ----------
+        montage : Montage | None
+            The montage (see visbrain.utils.Montage) defined on the channels
+            of the loaded data. Use the stack method of a montage to combine
+            several montages. If None, raw data are displayed.
+        """
+        if montage is None:
+            montage = Montage.identity(self._montage.channels)
+        self._fcn_set_montage(montage)
+
+    ###########################################################################
+    # STREAMING
+    ###########################################################################
+    def stream(self, reader, fps=25.):
+        """Display streamed data in scrolling mode.
+
+        The latest samples of each channel are displayed using the duration
+        of the window defined in the settings panel.
+
+        Parameters
+        ----------
+        reader : StreamReader
+            The stream reader (see visbrain.io.StreamReader). The number of
+            channels of the reader must match the number of channels. The
+            reader is started if needed.
+        fps : float | 25.
+            Target frame rate of the display.
+        """
+        assert reader.n_channels == len(self), ("The reader must contain %i "
+                                                "channels" % len(self))
+        self._stream = reader
+        if not hasattr(self, '_streamTimer'):
+            self._streamTimer = QtCore.QTimer()
+            self._streamTimer.timeout.connect(self._fcn_stream_update)
+        self._streamTimer.setInterval(int(1000. / fps))
+        reader.start()
+        self._streamTimer.start()
+
+    def stop_stream(self):
+        """Stop displaying streamed data."""
+        if hasattr(self, '_streamTimer'):
+            self._streamTimer.stop()
+            self._stream.stop()
+
+    def _fcn_stream_update(self):
+        """Display the latest samples of the stream."""
+        reader = self._stream
+        if not reader.update():
+            return None
+        n = int(round(self._SigWin.value() * reader.sf))
+        data, time = reader.get_window(n)
+        if data.shape[1] < 2:
+            return None
+        self._chan.set_data(reader.sf, data, time)
+        reader.mark_displayed()
@@ -7,6 +7,7 @@ from vispy.util.keys import Key
 
 from visbrain import Sleep
 from visbrain.io import download_file, path_to_visbrain_data
+from visbrain.utils import Montage
 from visbrain.tests._tests_visbrain import _TestVisbrain
 
 
@@ -37,6 +38,17 @@ class TestSleep(_TestVisbrain):
             sp._fcn_ref_apply()
         sp._fcn_ref_chan_ignore()
 
+    def test_montage(self):
+        """Test stacking and switching montages."""
+        sp._ToolsRefMeth.setCurrentIndex(1)
+        sp._fcn_ref_apply()
+        sp._fcn_slider_move()
+        sp._fcn_ref_reset()
+        assert sp._data is sp._raw_data
+        sp.set_montage(Montage.average(sp._channels))
+        sp._fcn_slider_move()
+        sp.set_montage()
+
     def test_signal_processing(self):
         """Test function signal_processing."""
         sp._fcn_sig_processing()
@@ -53,6 +65,120 @@ class TestSleep(_TestVisbrain):
         for k in range(6):
             sp._ToolDetectType.setCurrentIndex(k)
             sp._fcn_apply_detection()
+            sp._fcn_wait_detection()
+        assert not sp._detectJobs
+        # Cancel a detection on all channels :
+        sp._ToolRdAll.setChecked(True)
+        sp._ToolDetectType.setCurrentIndex(1)
+        sp._fcn_detection_clicked()
+        assert sp._ToolDetectApply.text() == 'Cancel'
+        sp._fcn_detection_clicked()
+        assert not sp._detectJobs
+        assert sp._ToolDetectApply.text() == 'Apply'
+        sp._ToolRdSelected.setChecked(True)
+        # Only events overlapping the window are sent :
+        key = (sp._channels[0], 'Spindles')
+        index = np.array([[100, 200], [150, 400], [1000, 1100]])
+        sp._detect.set_index(key, index)
+        assert key in sp._detect._dirty
+        sp._detect.build_line(sp._data, slice(300, 1050))
+        assert not sp._detect._dirty
+        np.testing.assert_array_equal(sp._detect.get_window(key, 300, 1050),
+                                      index[1:, :])
+        assert sp._detect.line[key]._pos.shape[0] == 352
+
+    def test_ui_artifacts(self):
+        """Test artifact screening."""
+        sp._data[0, 0:int(30 * sp._sf)] *= 100.
+        sp._fcn_mark_artifacts()
+        assert sp._artifacts.shape[0] == len(sp)
+        sp._ToolDetectType.setCurrentIndex(1)
+        sp._fcn_apply_detection()
+        sp._fcn_wait_detection()
+        sp._data[0, 0:int(30 * sp._sf)] /= 100.
+
+    def test_ui_stream(self):
+        """Test displaying streamed data."""
+        from visbrain.io import FileSource, StreamReader
+        path = self.to_tmp_dir('sleep_stream.bin')
+        open(path, 'wb').close()
+        reader = StreamReader(FileSource(path, len(sp), sp._sf), dsf=2)
+        reader.put(np.random.rand(len(sp), 5000).astype(np.float32))
+        sp.stream(reader)
+        sp._fcn_stream_update()
+        assert reader.latency >= 0.
+        sp.stop_stream()
+        sp._fcn_slider_move()
+
+    def test_ui_stacked(self):
+        """Test stacked channels inside a single canvas."""
+        sp_st = Sleep(data=sleep_file, hypno=hypno_file, stacked=True)
+        sp_st._fcn_select_all_chan()
+        sp_st._SlVal.setValue(10)
+        sp_st._PanAmpAuto.setChecked(True)
+        sp_st._fcn_chan_auto_amp()
+        sp_st._PanAmpAuto.setChecked(False)
+        sp_st._fcn_chan_auto_amp()
+        canvas = sp_st._chanCanvas[0].canvas
+        self._mouse_event(canvas, etype='mouse_move', pos=(50, 100))
+        self._mouse_event(canvas, etype='mouse_double_click', pos=(50, 100))
+        sp_st._fcn_deselect_all_chan()
+
+    def test_ui_background_loading(self):
+        """Test background loading."""
+        sp_bg = Sleep(data=sleep_file, hypno=hypno_file, background=True)
+        sp_bg._loader.wait()
+        sp_bg._fcn_load_refresh()
+        assert not sp_bg._is_loading()
+        assert sp_bg._ToolDetectApply.isEnabled()
+        assert sp_bg._spec._spectrum is not None
+        assert sp_bg._data.shape == (len(sp_bg), len(sp_bg._time))
+
+    def test_ui_spectrogram(self):
+        """Test cached spectrogram."""
+        sp._PanSpecPrecompute.setChecked(True)
+        sp._fcn_spec_set_data()
+        for k in range(3):
+            sp._PanSpecChan.setCurrentIndex(k)
+            sp._fcn_spec_set_data()
+            sp._spec.wait()
+            assert sp._spec.refresh() == 1.
+        # Only re-color the spectrogram :
+        spectrum = sp._spec._spectrum
+        sp._PanSpecCon.setValue(.2)
+        sp._fcn_spec_set_data()
+        assert sp._spec._spectrum is spectrum
+        sp._PanSpecPrecompute.setChecked(False)
+
+    def test_ui_topo(self):
+        """Test topoplot summary table."""
+        sp.menuDispTopo.setChecked(True)
+        sp._disptog_topo()
+        sl = slice(3000, 6000)
+        summary = sp._topo.get_summary(sp._sf, sp._data, sp._time, sl, 3000)
+        assert len(sp._topo.features.names) == 1
+        assert summary.shape == (len(sp),)
+        # Aligned and unaligned windows over the same samples should agree :
+        settings = (sp._topo.filt, sp._topo.demean)
+        sp._topo.filt, sp._topo.demean = False, True
+        data = np.repeat(np.random.rand(len(sp), 10), 300, axis=1)
+        time = np.arange(data.shape[1]) / sp._sf
+        sl = slice(450, 1350)
+        aligned = sp._topo.get_summary(sp._sf, data, time, sl, 150)
+        unaligned = sp._topo.get_summary(sp._sf, data, time, sl, 300)
+        expected = (data - data.mean(1, keepdims=True))[:, sl].mean(1)
+        np.testing.assert_allclose(aligned, expected, rtol=1e-5)
+        np.testing.assert_allclose(unaligned, expected, rtol=1e-5)
+        assert np.abs(unaligned).max() > 1e-3
+        # New data of the same shape use a new table :
+        scaled = sp._topo.get_summary(sp._sf, 2. * data, time, sl, 300)
+        np.testing.assert_allclose(scaled, 2. * expected, rtol=1e-5)
+        sp._topo.filt, sp._topo.demean = settings
+        for k in range(3):
+            sp._SlVal.setValue(k)
+        sp._topo.invalidate()
+        sp.menuDispTopo.setChecked(False)
+        sp._disptog_topo()
 
     def test_ui_annotations(self):
         """Test method for annotations."""
@@ -92,12 +218,18 @@ class TestSleep(_TestVisbrain):
     def test_save_all_detections(self):
         """Test saving all detections."""
         sp._save_all_detect(filename=self.to_tmp_dir('all_detections.npy'))
+        sp._save_all_detect(filename=self.to_tmp_dir('all_detections.npz'))
 
     def test_save_selected_dection(self):
         """Test saving selected dection."""
         sp._save_select_detect(filename=self.to_tmp_dir('selected_detect.txt'))
         sp._save_select_detect(filename=self.to_tmp_dir('selected_detect.csv'))
 
+    def test_save_coincidences(self):
+        """Test saving coincidences of the selected detection type."""
+        sp._save_coinc_detect(filename=self.to_tmp_dir('coinc.txt'))
+        sp._save_coinc_detect(filename=self.to_tmp_dir('coinc.csv'))
+
     def test_save_config(self):
         """Test saving config."""
         sp._save_config(filename=self.to_tmp_dir('config.txt'))
@@ -118,6 +250,7 @@ class TestSleep(_TestVisbrain):
     def test_load_all_detections(self):
         """Test loading all detections."""
         sp._load_detect_all(filename=self.to_tmp_dir('all_detections.npy'))
+        sp._load_detect_all(filename=self.to_tmp_dir('all_detections.npz'))
 
     def test_load_selected_detection(self):
         """Test loading selected detection."""
@@ -4,7 +4,6 @@ This file contains and initialize visual objects (channel plot, spectrogram,
 hypnogram, indicator, shortcuts)
 """
 import numpy as np
-import scipy.signal as scpsig
 import itertools
 import logging
 
@@ -12,9 +11,12 @@ from vispy import scene
 import vispy.visuals.transforms as vist
 
 from .marker import Markers
-from ...utils import (array2colormap, color2vb, PrepareData)
+from ...utils import (array2colormap, color2vb, PrepareData, vispy_array)
 from ...utils.sleep.event import _index_to_events
-from ...visuals import TopoMesh, TFmapsMesh
+from ...utils.sleep.features import EpochFeatures
+from ...utils.sleep.prefetch import WindowPrefetcher
+from ...utils.sleep.spectro import SpectralCache
+from ...visuals import TopoMesh, TFmapsMesh, StackedSignal
 from ...config import PROFILER
 
 logger = logging.getLogger('visbrain')
@@ -28,13 +30,19 @@ __all__ = ("Visuals")
 ###############################################################################
 Classes below are used to create visual objects, display on sevral canvas :
 - ChannelPlot : plot data (one signal per channel)
+- StackedChannelPlot : plot data (all signals in a single canvas)
 - Spectrogram : on a specific channel
 - Hypnogram : sleep stages (can be optional)
 """
 
 
 class Detection(object):
-    """Create a detection object."""
+    """Create a detection object.
+
+    Only the (channel, type) keys marked as modified (see set_dirty) are
+    rebuilt and only the events overlapping the displayed window are sent to
+    the visuals.
+    """
 
     def __init__(self, channels, time, spincol=None, remcol=None,
                  kccol=None, swcol=None, peakcol=None, mtcol=None,
@@ -53,6 +61,10 @@ class Detection(object):
         sym = {'Spindles': spinsym, 'REM': remsym, 'K-complexes': kcsym,
                'Slow waves': swsym, 'Peaks': peaksym, 'Muscle twitches': mtsym}
         self.time = time
+        # Modified keys, displayed window and interval index of each key :
+        self._dirty = set()
+        self._window = (0, len(time))
+        self._intervals = {}
         self.hyp = Markers(parent=parent_hyp)
         self.hyp.set_gl_state('translucent')
         for num, k in enumerate(self):
@@ -83,36 +95,109 @@ class Detection(object):
     def __getitem__(self, key):
         return self.dict[key]
 
-    def build_line(self, data):
+    def set_index(self, key, index):
+        """Set the (start, end) index of a detection.
+
+        Parameters
+        ----------
+        key : tuple
+            The (channel, type) key.
+        index : array_like
+            Array of shape (n_events, 2).
+        """
+        self[key]['index'] = index
+        self.set_dirty(key)
+
+    def set_dirty(self, key=None):
+        """Mark a detection as modified.
+
+        Parameters
+        ----------
+        key : tuple | None
+            The (channel, type) key. If None, every detection is marked.
+        """
+        keys = list(self) if key is None else [key]
+        self._dirty.update(keys)
+        for k in keys:
+            self._intervals.pop(k, None)
+
+    def get_window(self, key, start, stop):
+        """Get events overlapping a window.
+
+        Parameters
+        ----------
+        key : tuple
+            The (channel, type) key.
+        start, stop : int
+            Window of samples [start, stop[.
+
+        Returns
+        -------
+        index : array_like
+            The (start, end) index of events overlapping the window, sorted
+            by starting index.
+        """
+        index = self[key]['index']
+        if not index.size:
+            return np.zeros((0, 2), dtype=int)
+        # Interval index (events sorted by start and cumulated maximum end) :
+        if key not in self._intervals:
+            index = index[np.argsort(index[:, 0], kind='mergesort'), :]
+            self._intervals[key] = (index, np.maximum.accumulate(index[:, 1]))
+        index, max_end = self._intervals[key]
+        # Events starting before the end of the window and after the first
+        # event that could overlap the window :
+        first = np.searchsorted(max_end, start, side='left')
+        last = np.searchsorted(index[:, 0], stop, side='left')
+        index = index[first:last, :]
+        return index[index[:, 1] >= start, :]
+
+    def build_line(self, data, sl=None):
         """Build detections reports.
 
+        Only modified detections are rebuilt, except if the window changed.
+
         Parameters
         ----------
         data : array_like
             Data vector for a spcefic channel.
+        sl : slice | None
+            The displayed window. If None, the latest window is used.
         """
-        for num, k in enumerate(self):
-            if self[k]['index'].size:
-                # Get the channel number :
-                nb = self.chans.index(k[0])
-                # Send data :
-                if k[1] is 'Peaks':
-                    # Get index and channel number :
-                    index = self[k]['index'][:, 0]
-                    z = np.full(len(index), 2., dtype=np.float32)
-                    pos = np.vstack((self.time[index], data[nb, index], z)).T
-                    self.peaks[k].set_data(pos=pos, edge_width=0.,
-                                           face_color=self[k]['color'])
-                else:
-                    # Get index and channel number :
-                    index = _index_to_events(self[k]['index'])
-                    z = np.full(index.shape, 2., dtype=np.float32)
-                    # Build position vector :
-                    pos = np.vstack((self.time[index], data[nb, index], z)).T
-                    # Build connections :
-                    connect = np.gradient(index) == 1.
-                    connect[0], connect[-1] = True, False
-                    self.line[k].set_data(pos=pos, width=4., connect=connect)
+        keys = set(self._dirty)
+        if sl is not None:
+            window = (sl.start, min(sl.stop, len(self.time)))
+            if window != self._window:
+                self._window = window
+                keys.update([k for k in self if self[k]['index'].size])
+        self._dirty.clear()
+        pos_empty = np.full((1, 3), -10., dtype=np.float32)
+        for k in keys:
+            # Get the channel number :
+            nb = self.chans.index(k[0])
+            index = self.get_window(k, *self._window)
+            # Send data :
+            if k[1] == 'Peaks':
+                if not index.size:
+                    self.peaks[k].set_data(pos=pos_empty)
+                    continue
+                # Get index and channel number :
+                index = index[:, 0]
+                z = np.full(len(index), 2., dtype=np.float32)
+                pos = np.vstack((self.time[index], data[nb, index], z)).T
+                self.peaks[k].set_data(pos=pos, edge_width=0.,
+                                       face_color=self[k]['color'])
+            else:
+                if not index.size:
+                    self.line[k].set_data(pos=pos_empty,
+                                          connect=np.array([False]))
+                    continue
+                # Get index of every sample inside events :
+                index, connect = _index_to_events(index, connect=True)
+                z = np.full(index.shape, 2., dtype=np.float32)
+                # Build position vector :
+                pos = np.vstack((self.time[index], data[nb, index], z)).T
+                self.line[k].set_data(pos=pos, width=4., connect=connect)
 
     def build_hyp(self, chan, types):
         """Build hypnogram report.
@@ -159,6 +244,7 @@ class Detection(object):
         """Delete data of a channel."""
         # Remove data from dict :
         self[(chan, types)]['index'] = np.array([])
+        self._intervals.pop((chan, types), None)
         # Remove data from plot :
         pos = np.full((1, 3), -10., dtype=np.float32)
         if types == 'Peaks':
@@ -207,11 +293,13 @@ class Detection(object):
                 # Remove old key :
                 del self.dict[k]
         self.chans = newkeys
+        self._intervals.clear()
 
     def reset(self):
         """Reset all detections."""
         for k in self:
             self[k]['index'] = np.array([])
+        self.set_dirty()
 
 
 class ChannelPlot(PrepareData):
@@ -232,6 +320,9 @@ class ChannelPlot(PrepareData):
         self._fcn = fcn
         self.visible = np.array([True] + [False] * (len(channels) - 1))
         self.consider = np.ones((len(channels),), dtype=bool)
+        # Previous and next windows are prepared in a background thread :
+        self._source, self._settings = None, None
+        self.prefetch = WindowPrefetcher(self._prepare_window)
 
         # Get color :
         self.color = color2vb(color)
@@ -278,6 +369,8 @@ class ChannelPlot(PrepareData):
                                            parent=parent[i].wc.scene)
             grid.set_gl_state('translucent')
             self.grid.append(grid)
+        # Nodes on which the magnify transformation is applied :
+        self.root = self.node
 
     def __iter__(self):
         """Iterate over visible mesh."""
@@ -287,9 +380,60 @@ class ChannelPlot(PrepareData):
 
     def __len__(self):
         """Return the number of channels."""
-        return len(self.mesh)
+        return len(self.visible)
+
+    def _get_window(self, sf, data, time_sl, sl):
+        """Get the prepared data of visible channels inside the window."""
+        data_sl = data[self.visible, sl]
+        # Prepare the data (only if needed) :
+        if self:
+            if self._preproc_channel == -1:  # prepare all channels
+                data_sl = self._prepare_data(sf, data_sl.copy(), time_sl)
+            else:  # filt only one channel
+                # Get on which visible channel to apply preprocessing :
+                chan_lst_viz = list(np.arange(len(self))[self.visible])
+                to_chan = chan_lst_viz.index(self._preproc_channel)
+                data_sl[[to_chan], :] = self._prepare_data(sf, data_sl[
+                    [to_chan], :].copy(), time_sl)
+        return data_sl
+
+    def _prepare_window(self, start, stop):
+        """Prepare the position of visible channels inside a window.
 
-    def set_data(self, sf, data, time, sl=None, ylim=None, autoamp=True):
+        Returns an array of shape (n_visible, n_points, 3) where the last
+        dimension is (time, data, z).
+        """
+        sf, data, time = self._source
+        sl = slice(start, stop)
+        time_sl = time[sl]
+        data_sl = self._get_window(sf, data, time_sl, sl)
+        pos = np.empty(data_sl.shape + (3,), dtype=np.float32)
+        pos[..., 0] = time_sl
+        pos[..., 1] = data_sl
+        pos[..., 2] = .5
+        return pos
+
+    def _fetch_window(self, sf, data, time, sl, step=None):
+        """Get a prepared window and prefetch surrounding windows.
+
+        Prepared windows are invalidated when the data or the preparation
+        settings (visible channels, de-meaning, filtering...) have changed.
+        """
+        settings = (self.visible.tobytes(), self._preproc_channel,
+                    self.settings)
+        if (self._source is None) or (data is not self._source[1]) or (
+                settings != self._settings):
+            self.prefetch.invalidate()
+        self._source, self._settings = (sf, data, time), settings
+        start, stop, _ = sl.indices(data.shape[1])
+        window = self.prefetch.get(start, stop, settings)
+        if step:
+            self.prefetch.prefetch(start, stop, int(step), data.shape[1],
+                                   settings)
+        return window
+
+    def set_data(self, sf, data, time, sl=None, ylim=None, autoamp=True,
+                 step=None):
         """Set data to channels.
 
         Parameters
@@ -302,6 +446,9 @@ class ChannelPlot(PrepareData):
             A slice object for the time selection of data.
         ylim : array_like | None
             Y-limits of each channel. Must be a (n_channels, 2) array.
+        step : int | None
+            Number of samples between two consecutive windows. If not None,
+            previous and next windows are prepared in a background thread.
         """
         if ylim is None:
             ylim = np.array([data.min(1), data.max(1)]).T
@@ -312,31 +459,16 @@ class ChannelPlot(PrepareData):
         # Slice selection (of time and data) :
         time_sl = time[sl]
         self.x = (time_sl.min(), time_sl.max())
-        data_sl = data[self.visible, sl]
-        z = np.full_like(time_sl, .5, dtype=np.float32)
-
-        # Prepare the data (only if needed) :
-        if self:
-            if self._preproc_channel == -1:  # prepare all channels
-                data_sl = self._prepare_data(sf, data_sl.copy(), time_sl)
-            else:  # filt only one channel
-                # Get on which visible channel to apply preprocessing :
-                chan_lst_viz = list(np.arange(len(self))[self.visible])
-                to_chan = chan_lst_viz.index(self._preproc_channel)
-                data_sl[[to_chan], :] = self._prepare_data(sf, data_sl[
-                    [to_chan], :].copy(), time_sl)
+        pos = self._fetch_window(sf, data, time, sl, step)
 
         # Set data to each plot :
         for l, (i, k) in enumerate(self):
             # ________ MAIN DATA ________
             # Select channel ;
-            datchan = data_sl[l, :]
-
-            # Concatenate time / data / z axis :
-            dat = np.vstack((time_sl, datchan, z)).T
+            datchan = pos[l, :, 1]
 
             # Set main ligne :
-            k.set_data(dat, width=self.width)
+            k.set_data(pos[l, ...], width=self.width)
 
             # ________ CAMERA ________
             # Use either auto / fixed adaptative camera :
@@ -349,6 +481,19 @@ class ChannelPlot(PrepareData):
             k.update()
             self.rect.append(rect)
 
+    def set_ylim(self, ylim):
+        """Set the amplitude of each channel.
+
+        Parameters
+        ----------
+        ylim : array_like
+            Y-limits of each channel. Must be a (n_channels, 2) array.
+        """
+        for k, cam in enumerate(self._camera):
+            rect = (self.x[0], ylim[k, 0], self.x[1] - self.x[0],
+                    ylim[k, 1] - ylim[k, 0])
+            cam.rect = rect
+
     def set_location(self, sf, data, channel, start, end, factor=100.):
         """Set vertical lines for detections."""
         # Get data limits :
@@ -408,11 +553,246 @@ class ChannelPlot(PrepareData):
         self._autoamp = value
 
 
+class StackedChannelPlot(ChannelPlot):
+    """Plot all of the channels stacked inside a single canvas.
+
+    The data of visible channels are sent to a unique vertex buffer and the
+    amplitude of each channel is set on the GPU. Moving the slider only
+    requires to upload a single contiguous block of data.
+    """
+
+    def __init__(self, channels, time, color=(.2, .2, .2), width=1.5,
+                 color_detection='red', method='gl', camera=None,
+                 parent=None, fcn=None):
+        # Initialize PrepareData :
+        PrepareData.__init__(self, axis=1)
+
+        # Variables :
+        self._camera = camera[0]
+        self._preproc_channel = -1
+        self.rect = []
+        self.width = width
+        self.autoamp = False
+        self._fcn = fcn
+        self.channels = list(channels)
+        self.visible = np.array([True] + [False] * (len(channels) - 1))
+        self.consider = np.ones((len(channels),), dtype=bool)
+        self._source, self._settings = None, None
+        self.prefetch = WindowPrefetcher(self._prepare_window)
+        self._ylim = None
+        self._labels_viz, self._nodes_viz = None, None
+
+        # Get color :
+        self.color = color2vb(color)
+        self.color_detection = color2vb(color_detection)
+
+        # ----------------------------------------------
+        # Create a node parent (for the magnify transformation) :
+        scene_parent = parent[0].wc.scene
+        root = scene.Node(name='stackedplot', parent=scene_parent)
+        self.root = [root]
+
+        # ----------------------------------------------
+        # Create a unique line for all of the channels :
+        mesh = StackedSignal(color=self.color, width=width, z=.5,
+                             antialias=method == 'agg', parent=root)
+        self.mesh = [mesh]
+
+        # ----------------------------------------------
+        # One node per channel. The transformation of each node is used to
+        # place detections and locations inside the channel band :
+        pos = np.zeros((1, 3), dtype=np.float32)
+        self.node, self.loc = [], []
+        for k in channels:
+            node = scene.Node(name=k + 'plot', parent=root)
+            node.transform = vist.STTransform()
+            self.node.append(node)
+            # Locations :
+            loc = scene.visuals.Line(pos, name=k + 'location', method=method,
+                                     color=(.1, .1, .1, .3), parent=node,
+                                     connect='segments')
+            loc.set_gl_state('translucent')
+            loc.visible = False
+            self.loc.append(loc)
+
+        # ----------------------------------------------
+        # Create a grid (one line per channel band) :
+        grid = scene.visuals.GridLines(color=(.1, .1, .1, .5),
+                                       scale=(1., 1.), parent=scene_parent)
+        grid.set_gl_state('translucent')
+        self.grid = [grid]
+
+        # ----------------------------------------------
+        # Channel names :
+        self.labels = scene.visuals.Text(text=' ', color='black',
+                                         font_size=8., anchor_x='left',
+                                         bold=True, parent=scene_parent)
+
+    def __iter__(self):
+        """Iterate over the stacked mesh."""
+        if any(self.visible):
+            yield 0, self.mesh[0]
+
+    def _prepare_window(self, start, stop):
+        """Prepare the data of visible channels inside a window.
+
+        Returns a contiguous float32 array of shape (n_visible, n_points).
+        """
+        sf, data, time = self._source
+        sl = slice(start, stop)
+        return vispy_array(self._get_window(sf, data, time[sl], sl))
+
+    def set_data(self, sf, data, time, sl=None, ylim=None, autoamp=True,
+                 step=None):
+        """Set data to channels.
+
+        Parameters
+        ----------
+        data: array_like
+            Array of data of shape (n_channels, n_points)
+        time: array_like
+            The time vector.
+        sl : slice | None
+            A slice object for the time selection of data.
+        ylim : array_like | None
+            Y-limits of each channel. Must be a (n_channels, 2) array.
+        step : int | None
+            Number of samples between two consecutive windows. If not None,
+            previous and next windows are prepared in a background thread.
+        """
+        if ylim is None:
+            ylim = np.array([data.min(1), data.max(1)]).T
+        self._ylim = ylim
+
+        # Manage slice :
+        sl = slice(0, data.shape[1]) if sl is None else sl
+
+        # Slice selection (of time and data) :
+        time_sl = time[sl]
+        self.x = (time_sl.min(), time_sl.max())
+        data_sl = self._fetch_window(sf, data, time, sl, step)
+        n_viz, n_pts = data_sl.shape
+        self.mesh[0].visible = bool(n_viz)
+        self.labels.visible = bool(n_viz)
+        if not n_viz:
+            return None
+
+        # ________ MAIN DATA ________
+        # Send all visible channels at once :
+        step = (time_sl[-1] - time_sl[0]) / (n_pts - 1) if n_pts > 1 else 1.
+        self.mesh[0].set_data(data_sl, start=time_sl[0], step=step)
+        self.mesh[0].width = self.width
+
+        # ________ AMPLITUDES ________
+        # Use either auto / fixed adaptative amplitudes :
+        if self.autoamp:
+            ycam = np.c_[data_sl.min(1), data_sl.max(1)]
+        else:
+            ycam = ylim[self.visible, :]
+        self._set_amplitudes(ycam)
+
+        # ________ CAMERA ________
+        rect = (self.x[0], 0., self.x[1] - self.x[0], float(n_viz))
+        self._camera.rect = rect
+        self.rect = [rect]
+
+        # ________ LABELS ________
+        if not np.array_equal(self._labels_viz, self.visible):
+            self._labels_viz = self.visible.copy()
+            self.labels.text = [self.channels[k] for k in np.where(
+                self.visible)[0]]
+        pos = np.zeros((n_viz, 3), dtype=np.float32)
+        pos[:, 0] = self.x[0] + .005 * (self.x[1] - self.x[0])
+        pos[:, 1] = n_viz - np.arange(n_viz) - .15
+        self.labels.pos = pos
+
+    def _set_amplitudes(self, ycam):
+        """Set the amplitude of visible channels.
+
+        Each visible channel is mapped to a band of height one. The first
+        visible channel is displayed on top.
+        """
+        ycam = np.asarray(ycam, dtype=np.float64)
+        n_viz = ycam.shape[0]
+        amp = ycam[:, 1] - ycam[:, 0]
+        amp[amp == 0.] = 1.
+        scale = 1. / amp
+        center = n_viz - np.arange(n_viz) - .5
+        offset = center - scale * ycam.mean(1)
+        # Nothing to update if the amplitudes have not changed :
+        updated = self.mesh[0].set_scaling(offset, scale)
+        if not updated and np.array_equal(self._nodes_viz, self.visible):
+            return None
+        self._nodes_viz = self.visible.copy()
+        # Update nodes transformations :
+        for i, o, s in zip(np.where(self.visible)[0], offset, scale):
+            self.node[i].transform.translate = (0., o, 0.)
+            self.node[i].transform.scale = (1., s, 1.)
+        for k, node in enumerate(self.node):
+            node.visible = bool(self.visible[k])
+
+    def set_ylim(self, ylim):
+        """Set the amplitude of each channel.
+
+        Parameters
+        ----------
+        ylim : array_like
+            Y-limits of each channel. Must be a (n_channels, 2) array.
+        """
+        self._ylim = ylim
+        if not self.autoamp and any(self.visible):
+            self._set_amplitudes(ylim[self.visible, :])
+
+    def set_labels(self, channels):
+        """Set channel names.
+
+        Parameters
+        ----------
+        channels : list
+            List of channel names.
+        """
+        self.channels = list(channels)
+        self._labels_viz = None
+
+    def pick(self, y):
+        """Get the channel displayed at a relative height of the canvas.
+
+        Parameters
+        ----------
+        y : float
+            Relative height starting from the top of the canvas (0 <= y <= 1).
+
+        Returns
+        -------
+        channel : str
+            Name of the channel.
+        """
+        viz = np.where(self.visible)[0]
+        row = int(np.clip(y * len(viz), 0, len(viz) - 1))
+        return self.channels[viz[row]]
+
+    def clean(self):
+        """Clean all the data."""
+        self.mesh[0].clean()
+        self.mesh[0].parent = None
+        self.grid[0].parent = None
+        self.labels.parent = None
+        for node in self.node:
+            node.parent = None
+        self.root[0].parent = None
+        self.mesh, self.grid, self.node, self.loc = [], [], [], []
+        self.root = []
+
+
 class Spectrogram(PrepareData):
     """Create and manage a Spectrogram object.
 
     After object creation, use the set_data() method to pass new data, new
     color, new frequency / time range, new settings...
+
+    Fourier and multitaper spectrograms are computed by tiles in a background
+    thread and cached (per channel and settings). Use the refresh() method to
+    display tiles as they are computed.
     """
 
     def __init__(self, camera, parent=None, fcn=None):
@@ -430,10 +810,14 @@ class Spectrogram(PrepareData):
         self.mesh = scene.visuals.Image(np.zeros((2, 2)), parent=parent,
                                         name='Fourier transform')
         self.mesh.transform = vist.STTransform()
+        # Cache of spectra (filled in a background thread) :
+        self.cache = SpectralCache()
+        self._spectrum, self._n_done = None, 0
+        self._time, self._color = None, {}
 
     def set_data(self, sf, data, time, method='Fourier transform',
                  cmap='rainbow', nfft=30., overlap=0., fstart=.5, fend=20.,
-                 contrast=.5, interp='nearest', norm=0):
+                 contrast=.5, interp='nearest', norm=0, channel=0):
         """Set data to the spectrogram.
 
         Use this method to change data, colormap, spectrogram settings, the
@@ -465,74 +849,174 @@ class Spectrogram(PrepareData):
             Interpolation method.
         norm : int | 0
             Normalization method for TF.
+        channel : int | 0
+            Index of the channel (used to identify cached spectra).
         """
-        # =================== PREPARE DATA ===================
-        # Prepare data (only if needed)
-        if self:
-            data = self._prepare_data(sf, data.copy(), time)
-
         nperseg = int(round(nfft * sf))
 
         # =================== TF // SPECTRO ===================
         if method == 'Wavelet':
+            # Prepare data (only if needed)
+            if self:
+                data = self._prepare_data(sf, data.copy(), time)
             self.tf.set_data(data, sf, f_min=fstart, f_max=fend, cmap=cmap,
                              contrast=contrast, n_window=nperseg,
                              overlap=overlap, window='hamming', norm=norm)
             self.tf._image.interpolation = interp
             self.rect = self.tf.rect
             self.freq = self.tf.freqs
+            self._spectrum = None
         else:
-            # =================== CONVERSION ===================
-            overlap = int(round(overlap * nperseg))
-
-            if method == 'Multitaper':
-                from lspopt import spectrogram_lspopt
-                freq, _, mesh = spectrogram_lspopt(data, fs=sf,
-                                                   nperseg=nperseg,
-                                                   c_parameter=20,
-                                                   noverlap=overlap)
-            elif method == 'Fourier transform':
-                freq, _, mesh = scpsig.spectrogram(data, fs=sf,
-                                                   nperseg=nperseg,
-                                                   noverlap=overlap,
-                                                   window='hamming')
-            mesh = 20 * np.log10(mesh)
-
-            # =================== FREQUENCY SELECTION ===================
-            # Find where freq is [fstart, fend] :
-            f = [0., 0.]
-            f[0] = np.abs(freq - fstart).argmin() if fstart else 0
-            f[1] = np.abs(freq - fend).argmin() if fend else len(freq)
-            # Build slicing and select frequency vector :
-            sls = slice(f[0], f[1] + 1)
-            freq = freq[sls]
-            self._fstart, self._fend = freq[0], freq[-1]
-
-            # =================== COLOR ===================
-            # Get clim :
-            clim = (contrast * mesh.min(), contrast * mesh.max())
-            # Turn mesh into color array for selected frequencies:
-            self.mesh.set_data(array2colormap(mesh[sls, :], cmap=cmap,
-                                              clim=clim))
-            self.mesh.interpolation = interp
-
-            # =================== TRANSFORM ===================
-            tm, tM = time.min(), time.max()
-            # Re-scale the mesh for fitting in time / frequency :
-            fact = (freq.max() - freq.min()) / len(freq)
-            sc = (tM / mesh.shape[1], fact, 1)
-            tr = [0., freq.min(), 0.]
-            self.mesh.transform.translate = tr
-            self.mesh.transform.scale = sc
-            # Update object :
-            self.mesh.update()
-            # Get camera rectangle :
-            self.rect = (tm, freq.min(), tM - tm, freq.max() - freq.min())
-            self.freq = freq
+            # =================== SPECTRAL STAGE ===================
+            # Get the cached spectrum or compute it in the background :
+            self._spectrum = self._request(sf, data, time, method, nfft,
+                                           overlap, channel)
+            self._time, self._n_done = time, 0
+            # =================== COLORING STAGE ===================
+            self.set_color(cmap=cmap, contrast=contrast, fstart=fstart,
+                           fend=fend, interp=interp)
         # Visibility :
         self.mesh.visible = 0 if method == 'Wavelet' else 1
         self.tf.visible = 1 if method == 'Wavelet' else 0
 
+    def set_color(self, cmap=None, contrast=None, fstart=None, fend=None,
+                  interp=None):
+        """Color the current spectrum.
+
+        Only the colors are updated (the spectrum is not recomputed). Tiles
+        that are not computed yet are transparent.
+
+        Parameters
+        ----------
+        cmap : string | None
+            The matplotlib colormap to use.
+        contrast : float | None
+            Contrast of the colormap.
+        fstart : float | None
+            Frequency from which the spectrogram have to start.
+        fend : float | None
+            Frequency from which the spectrogram have to finish.
+        interp : string | None
+            Interpolation method.
+        """
+        kw = dict(cmap=cmap, contrast=contrast, fstart=fstart, fend=fend,
+                  interp=interp)
+        self._color.update({k: i for k, i in kw.items() if i is not None})
+        if self._spectrum is None:
+            return None
+        spec, kw = self._spectrum, self._color
+        self._n_done = spec.done.sum()
+
+        # =================== FREQUENCY SELECTION ===================
+        # Find where freq is [fstart, fend] :
+        freq = spec.freq
+        fstart, fend = kw['fstart'], kw['fend']
+        f = [0., 0.]
+        f[0] = np.abs(freq - fstart).argmin() if fstart else 0
+        f[1] = np.abs(freq - fend).argmin() if fend else len(freq)
+        # Build slicing and select frequency vector :
+        sls = slice(f[0], f[1] + 1)
+        freq = freq[sls]
+        self._fstart, self._fend = freq[0], freq[-1]
+
+        # =================== COLOR ===================
+        mesh = spec.power[sls, :]
+        is_done = np.isfinite(mesh[0, :])
+        # Get clim :
+        if is_done.any():
+            clim = tuple(kw['contrast'] * np.array(spec.lim))
+        else:
+            clim = (0., 1.)
+        # Turn mesh into color array for selected frequencies :
+        color = array2colormap(np.nan_to_num(mesh), cmap=kw['cmap'],
+                               clim=clim)
+        color[..., -1] = is_done.reshape(1, -1)
+        self.mesh.set_data(color)
+        self.mesh.interpolation = kw['interp']
+
+        # =================== TRANSFORM ===================
+        time = self._time
+        tm, tM = time.min(), time.max()
+        # Re-scale the mesh for fitting in time / frequency :
+        fact = (freq.max() - freq.min()) / len(freq)
+        sc = (tM / mesh.shape[1], fact, 1)
+        tr = [0., freq.min(), 0.]
+        self.mesh.transform.translate = tr
+        self.mesh.transform.scale = sc
+        # Update object :
+        self.mesh.update()
+        # Get camera rectangle :
+        self.rect = (tm, freq.min(), tM - tm, freq.max() - freq.min())
+        self.freq = freq
+
+    def refresh(self):
+        """Display tiles computed since the last call.
+
+        Returns
+        -------
+        progress : float
+            Proportion of the current spectrum already computed.
+        """
+        if self._spectrum is None:
+            return 1.
+        if self._spectrum.done.sum() != self._n_done:
+            self.set_color()
+        return self._spectrum.progress
+
+    def wait(self):
+        """Finish to compute the current spectrum and display it."""
+        if (self._spectrum is not None) and not self._spectrum.complete:
+            self._spectrum.compute_all()
+            self.set_color()
+
+    def precompute(self, sf, data, time, method='Fourier transform',
+                   nfft=30., overlap=0.):
+        """Compute the spectrum of every channel in the background.
+
+        Parameters
+        ----------
+        sf: float
+            The sampling frequency.
+        data: array_like
+            Array of data of shape (n_channels, n_times).
+        time: array_like
+            The time vector.
+        method: string | 'Fourier transform'
+            Computation method.
+        nfft : float | 30.
+            Number of fft points for the spectrogram (in seconds).
+        overlap : float | .5
+            Ovelap proprotion (0 <= overlap <1).
+        """
+        if method == 'Wavelet':
+            return None
+        # Keep every channel in memory :
+        self.cache.max_size = max(self.cache.max_size, data.shape[0] + 1)
+        for k in range(data.shape[0]):
+            self._request(sf, data[k, ...], time, method, nfft, overlap, k,
+                          priority=False)
+
+    def _request(self, sf, data, time, method, nfft, overlap, channel,
+                 priority=True):
+        """Request a spectrum to the cache."""
+        nperseg = int(round(nfft * sf))
+        noverlap = int(round(overlap * nperseg))
+        settings = self.settings if self else None
+        key = (channel, method, nperseg, noverlap, settings)
+        if self:
+            # The background thread use a copy of the current settings :
+            prep = PrepareData(**{k: getattr(self, k) for k in [
+                'axis', 'demean', 'detrend', 'filt', 'fstart', 'fend',
+                'forder', 'way', 'filt_meth', 'btype', 'dispas',
+                'n_block']})
+
+            def prepare(x):
+                return prep._prepare_data(sf, x.copy(), time)
+        else:
+            prepare = None
+        return self.cache.request(key, data, sf, nperseg, noverlap, method,
+                                  prepare=prepare, priority=priority)
+
     def clean(self):
         """Clean indicators."""
         pos = np.zeros((3, 4), dtype=np.float32)
@@ -740,7 +1224,13 @@ filetring, de-meaning...
 
 
 class TopoSleep(TopoMesh, PrepareData):
-    """Topoplot for sleep data."""
+    """Topoplot for sleep data.
+
+    The mean of prepared data inside a window is obtained from a per-epoch,
+    per-channel feature table (see EpochFeatures). Each preparation setting
+    is stored as a feature of the table so that it is computed once for the
+    whole recording and each window only requires a lookup.
+    """
 
     def __init__(self, **kwargs):
         # Initialize TopoMesh and PrepareData :
@@ -751,6 +1241,78 @@ class TopoSleep(TopoMesh, PrepareData):
         self._clim = None
         self._cmap = None
         self._cblabel = None
+        # Feature table :
+        self.features, self._features_key = None, None
+
+    def get_summary(self, sf, data, time, sl, n_epoch):
+        """Get the mean of prepared data inside a window.
+
+        Parameters
+        ----------
+        sf : float
+            The sampling frequency.
+        data : array_like
+            Array of data of shape (n_channels, n_times).
+        time : array_like
+            The time vector.
+        sl : slice
+            Window of samples.
+        n_epoch : int
+            Number of samples per epoch of the feature table. Epochs that
+            are only partially inside the window are weighted by their number
+            of samples inside it.
+
+        Returns
+        -------
+        summary : array_like
+            Mean of each channel inside the window of shape (n_channels,).
+        """
+        start, stop = sl.start, min(sl.stop, data.shape[1])
+        if stop <= start:
+            return np.full((data.shape[0],), np.nan)
+        # New table for new data or epochs (ids of freed arrays can be
+        # reused, hence the data object itself is compared) :
+        key = self._features_key
+        if (key is None) or (data is not key[0]) or (
+                (data.shape, n_epoch) != key[1:]):
+            self.features = EpochFeatures(sf, n_epoch, data.shape[1])
+            self._features_key = (data, data.shape, n_epoch)
+        # Compute the feature (only if needed) :
+        name = 'topo_' + repr(self.settings)
+        if name not in self.features:
+            self.set_table(sf, data, time, name)
+        return self.features.mean(name, start, stop)
+
+    def set_table(self, sf, data, time, name, n_chunk=8):
+        """Add the per-epoch mean of prepared data to the feature table.
+
+        Parameters
+        ----------
+        sf : float
+            The sampling frequency.
+        data : array_like
+            Array of data of shape (n_channels, n_times).
+        time : array_like
+            The time vector.
+        name : string
+            Name of the feature.
+        n_chunk : int | 8
+            Number of channels prepared at once.
+        """
+        n_chan, n_times = data.shape
+        starts = self.features.starts
+        counts = np.diff(np.r_[starts, n_times])
+        table = np.zeros((n_chan, len(starts)), dtype=np.float64)
+        for k in range(0, n_chan, n_chunk):
+            sl = slice(k, k + n_chunk)
+            prep = self._prepare_data(sf, data[sl, :].copy(), time)
+            np.add.reduceat(prep, starts, axis=1, dtype=np.float64,
+                            out=table[sl, :])
+        self.features.add(name, table / counts)
+
+    def invalidate(self):
+        """Remove the feature table."""
+        self.features, self._features_key = None, None
 
     def set_sleep_topo(self, data=None, clim=None, cmap=None, cblabel=None):
         """Send data to TopoGraphic plot."""
@@ -963,7 +1525,12 @@ class CanvasShortcuts(object):
             """
             # Get canvas title :
             is_sp_hyp = canvas.title in ['Hypnogram', 'Spectrogram']
-            title = canvas.title if is_sp_hyp else canvas.title.split('_')[1]
+            if is_sp_hyp:
+                title = canvas.title
+            elif self._stacked:  # get the channel under the cursor
+                title = self._chan.pick(event.pos[1] / canvas.size[1])
+            else:
+                title = canvas.title.split('_')[1]
             # Annotate the timing :
             if is_sp_hyp:
                 cursor = self._time[-1] * event.pos[0] / canvas.size[0]
@@ -998,8 +1565,8 @@ class CanvasShortcuts(object):
                 cursor = tm + ((tM - tm) * event.pos[0] / canvas.size[0])
                 # Enable/Disable magnify :
                 if self._slMagnify.isChecked():
-                    for i, k in self._chan:
-                        self._chan.node[i].transform.center = (cursor, 0.)
+                    for k in self._chan.root:
+                        k.transform.center = (cursor, 0.)
                         k.update()
                     tm, tM = self._time.min(), self._time.max()
             # Set time position to the cursor text :
@@ -1048,11 +1615,12 @@ class Visuals(CanvasShortcuts):
         channels, hypno, cameras = self._channels, self._hypno, self._allCams
 
         # =================== CHANNELS ===================
-        self._chan = ChannelPlot(channels, time, camera=cameras[0],
-                                 color=self._chancolor, width=self._lw,
-                                 color_detection=self._indicol,
-                                 parent=self._chanCanvas,
-                                 fcn=self._fcn_slider_move)
+        chan_obj = StackedChannelPlot if self._stacked else ChannelPlot
+        self._chan = chan_obj(channels, time, camera=cameras[0],
+                              color=self._chancolor, width=self._lw,
+                              color_detection=self._indicol,
+                              parent=self._chanCanvas,
+                              fcn=self._fcn_slider_move)
         PROFILER('Channels', level=1)
 
         # =================== SPECTROGRAM ===================
@@ -1060,7 +1628,8 @@ class Visuals(CanvasShortcuts):
         self._spec = Spectrogram(camera=cameras[1],
                                  fcn=self._fcn_spec_set_data,
                                  parent=self._specCanvas.wc.scene)
-        self._spec.set_data(sf, data[0, ...], time, cmap=self._defcmap)
+        if self._loader is None:  # computed once the data are loaded
+            self._spec.set_data(sf, data[0, ...], time, cmap=self._defcmap)
         PROFILER('Spectrogram', level=1)
         # Create a visual indicator for spectrogram :
         self._specInd = Indicator(name='spectro_indic', visible=True, alpha=.3,
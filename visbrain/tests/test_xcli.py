@@ -4,8 +4,11 @@ import os
 
 from click.testing import CliRunner
 
-from visbrain.cli import cli_fig_hyp, cli_sleep_stats, cli_sleep
-from visbrain.io import download_file, path_to_visbrain_data
+import numpy as np
+
+from visbrain.cli import (cli_fig_hyp, cli_sleep_stats, cli_sleep,
+                          cli_sleep_stats_batch)
+from visbrain.io import download_file, path_to_visbrain_data, write_hypno_txt
 from visbrain.tests._tests_visbrain import _TestVisbrain
 # from visbrain.config import CONFIG
 
@@ -48,6 +51,21 @@ class TestCli(_TestVisbrain):
         r1 = runner.invoke(cli_sleep_stats, ['-h', hypno_file, '-o', out])
         print('Result : \n', r1.output)
 
+    def test_cli_sleep_stats_batch(self):
+        """Test function cli_sleep_stats_batch."""
+        path = self.to_tmp_dir('cli_batch')
+        os.makedirs(path, exist_ok=True)
+        for k in range(2):
+            hyp = np.random.randint(-1, 5, (100,))
+            write_hypno_txt(os.path.join(path, 'hyp_%i.txt' % k), hyp, 1.,
+                            1., 100)
+        runner = CliRunner()
+        out = self.to_tmp_dir('hypno_batch.csv')
+        r1 = runner.invoke(cli_sleep_stats_batch, ['-d', path, '-o', out,
+                                                   '-j', 2])
+        assert r1.exit_code == 0
+        assert len(open(out).readlines()) == 3
+
     @pytest.mark.skip('Segmentation fault')
     def test_cli_sleep(self):
         """Test function cli_sleep."""
@@ -6,6 +6,7 @@ from .guitools import *
 from .logging import *
 from .memory import *
 from .mesh import *
+from .moving import *
 from .others import *
 from .physio import *
 from .picture import *
@@ -1,18 +1,60 @@
 """Set of tools to filter data."""
 
 import numpy as np
-from scipy.signal import butter, filtfilt, lfilter, bessel, welch, detrend
+from scipy.signal import (butter, filtfilt, lfilter, lfilter_zi, bessel, welch,
+                          detrend, freqz)
+from scipy.fftpack import next_fast_len
 
-__all__ = ('filt', 'morlet', 'ndmorlet', 'morlet_power', 'welch_power',
-           'PrepareData')
+from .moving import _float_dtype
+
+__all__ = ('filt', 'filtfilt_blocks', 'lfilter_blocks', 'morlet', 'ndmorlet',
+           'morlet_power', 'welch_power', 'FilterBank', 'PrepareData')
 
 #############################################################################
 # FILTERING
 #############################################################################
 
 
+def _filter_coefficients(sf, f, btype='bandpass', order=3,
+                         method='butterworth'):
+    """Get the coefficients of an IIR filter.
+
+    Parameters
+    ----------
+    sf : float
+        The sampling frequency
+    f : array_like
+        Frequency vector (2,)
+    btype : {'bandpass', 'bandstop', 'highpass', 'lowpass'}
+        If highpass, the first value of f will be used. If lowpass
+        the second value of f will be used.
+    order : int | 3
+        The filter order.
+    method : {'butterworth', 'bessel'}
+        Filter type to use.
+
+    Returns
+    -------
+    b, a : array_like
+        Numerator and denominator of the filter.
+    """
+    # Normalize frequency vector according to btype :
+    if btype in ['bandpass', 'bandstop']:
+        fnorm = np.divide(f, .5 * sf)
+    elif btype == 'lowpass':
+        fnorm = np.array(f[-1] / (.5 * sf))
+    elif btype == 'highpass':
+        fnorm = np.array(f[0] / (.5 * sf))
+
+    # Get filter coefficients :
+    if method == 'butterworth':
+        return butter(order, fnorm, btype=btype)
+    elif method == 'bessel':
+        return bessel(order, fnorm, btype=btype)
+
+
 def filt(sf, f, x, btype='bandpass', order=3, method='butterworth',
-         way='filtfilt', axis=0):
+         way='filtfilt', axis=0, n_block=None, out=None):
     """Filt data.
 
     Parameters
@@ -35,31 +77,187 @@ def filt(sf, f, x, btype='bandpass', order=3, method='butterworth',
         ('filtfilt').
     axis : int | 0
         The axis along which the filter is applied.
+    n_block : int | None
+        If not None, the data are filtered by blocks of n_block time points
+        (see filtfilt_blocks and lfilter_blocks). The memory used by the
+        filtering is then bounded by the block size, which is recommended
+        for long recordings or memory-mapped data.
+    out : array_like | None
+        Preallocated output array (only used if n_block is not None).
 
     Returns
     -------
     xfilt : array_like
         Filtered data.
     """
-    # Normalize frequency vector according to btype :
-    if btype in ['bandpass', 'bandstop']:
-        fnorm = np.divide(f, .5 * sf)
-    elif btype == 'lowpass':
-        fnorm = np.array(f[-1] / (.5 * sf))
-    elif btype == 'highpass':
-        fnorm = np.array(f[0] / (.5 * sf))
-
     # Get filter coefficients :
-    if method == 'butterworth':
-        b, a = butter(order, fnorm, btype=btype)
-    elif method == 'bessel':
-        b, a = bessel(order, fnorm, btype=btype)
+    b, a = _filter_coefficients(sf, f, btype, order, method)
 
-    # Apply filter :
+    # Apply filter (the floating point type of x is preserved) :
+    x = np.asarray(x)
+    if n_block is not None:
+        fcn = filtfilt_blocks if way == 'filtfilt' else lfilter_blocks
+        return fcn(b, a, x, axis=axis, n_block=n_block, out=out)
     if way == 'filtfilt':
-        return filtfilt(b, a, x, axis=axis)
+        xfilt = filtfilt(b, a, x, axis=axis)
     elif way == 'lfilter':
-        return lfilter(b, a, x, axis=axis)
+        xfilt = lfilter(b, a, x, axis=axis)
+    return xfilt.astype(_float_dtype(x), copy=False)
+
+
+def _iir_length(a, tol=1e-10):
+    """Get the number of samples for the impulse response of a filter to decay.
+
+    Parameters
+    ----------
+    a : array_like
+        Denominator of the filter.
+    tol : float | 1e-10
+        Relative amplitude below which the impulse response is considered as
+        negligible.
+
+    Returns
+    -------
+    n : int
+        Number of samples.
+    """
+    rho = np.abs(np.roots(a)).max() if len(a) > 1 else 0.
+    if rho >= 1.:
+        raise ValueError("The filter is unstable.")
+    return int(np.ceil(np.log(tol) / np.log(rho))) if rho > 0. else 1
+
+
+def _block_output(x, out):
+    """Allocate (or check) the output of block filtering functions."""
+    if out is None:
+        out = np.empty(x.shape, dtype=_float_dtype(x))
+    assert out.shape == x.shape
+    return out
+
+
+def lfilter_blocks(b, a, x, axis=-1, n_block=2 ** 16, out=None):
+    """One way filtering by blocks with carried state.
+
+    The result is identical to scipy.signal.lfilter.
+
+    Parameters
+    ----------
+    b, a : array_like
+        Numerator and denominator of the filter.
+    x : array_like
+        The data to filt. Can be a memory-mapped array.
+    axis : int | -1
+        The axis along which the filter is applied.
+    n_block : int | 65536
+        Number of time points per block.
+    out : array_like | None
+        Preallocated output array (e.g a memory-mapped array).
+
+    Returns
+    -------
+    xfilt : array_like
+        Filtered data.
+    """
+    axis = axis % x.ndim
+    out = _block_output(x, out)
+    x_t, out_t = np.moveaxis(x, axis, -1), np.moveaxis(out, axis, -1)
+    zf = np.zeros(x_t.shape[:-1] + (max(len(a), len(b)) - 1,))
+    for start in range(0, x_t.shape[-1], int(n_block)):
+        sl = slice(start, start + int(n_block))
+        out_t[..., sl], zf = lfilter(b, a, x_t[..., sl], zi=zf)
+    return out
+
+
+def filtfilt_blocks(b, a, x, axis=-1, n_block=2 ** 16, n_overlap=None,
+                    out=None):
+    """Zero-phase (forward-backward) filtering by overlapping blocks.
+
+    The forward pass is computed by blocks with carried state. For each
+    output block, the backward pass starts n_overlap samples after the end of
+    the block so that the transient of the backward filter vanishes before
+    reaching the block. The temporary memory is bounded by the block size,
+    whatever the length of the data. The edges are handled as in
+    scipy.signal.filtfilt (odd extension of 3 * max(len(a), len(b)) samples
+    and steady state initial conditions) so that the result is the same as
+    scipy.signal.filtfilt up to the rounding errors of the recursion. The
+    absolute difference is about 1e-10 for well conditioned filters but can
+    reach 1e-4 for high order filters with poles close to the unit circle
+    (e.g a 5th order bandpass with cut-off frequencies of 0.5 and 4Hz at
+    100Hz). For such filters, scipy.signal.filtfilt is not more accurate.
+
+    Parameters
+    ----------
+    b, a : array_like
+        Numerator and denominator of the filter.
+    x : array_like
+        The data to filt. Can be a memory-mapped array.
+    axis : int | -1
+        The axis along which the filter is applied.
+    n_block : int | 65536
+        Number of time points per output block.
+    n_overlap : int | None
+        Number of samples after each block used to initialize the backward
+        pass. If None, the overlap is deduced from the decay of the impulse
+        response of the filter.
+    out : array_like | None
+        Preallocated output array (e.g a memory-mapped array).
+
+    Returns
+    -------
+    xfilt : array_like
+        Filtered data.
+    """
+    axis = axis % x.ndim
+    out = _block_output(x, out)
+    x_t, out_t = np.moveaxis(x, axis, -1), np.moveaxis(out, axis, -1)
+    n_times, n_block = x_t.shape[-1], int(n_block)
+    edge = 3 * max(len(a), len(b))
+    if n_times <= edge:
+        raise ValueError("The length of the input vector x must be greater "
+                         "than %i." % edge)
+    if n_overlap is None:
+        n_overlap = _iir_length(a)
+    zi = lfilter_zi(b, a)
+
+    # Odd extensions of the signal (same as scipy.signal.filtfilt) :
+    head = 2. * x_t[..., 0:1] - x_t[..., edge:0:-1]
+    tail = 2. * x_t[..., -1:] - x_t[..., -2:-edge - 2:-1]
+    n_ext = n_times + 2 * edge
+
+    def _get_ext(start, stop):
+        """Get the extended signal between start and stop."""
+        parts = []
+        if start < edge:
+            parts.append(head[..., start:min(stop, edge)])
+        if (stop > edge) and (start < edge + n_times):
+            parts.append(x_t[..., max(start, edge) - edge:min(
+                stop, edge + n_times) - edge])
+        if stop > edge + n_times:
+            parts.append(tail[..., max(start - edge - n_times, 0):stop -
+                              edge - n_times])
+        return np.concatenate(parts, axis=-1)
+
+    # Forward pass (carried state) and buffer of forward filtered data :
+    z_fwd = zi * head[..., 0:1]
+    fwd, fwd_start, fwd_stop = None, 0, 0
+    for start in range(edge, edge + n_times, n_block):
+        stop = min(start + n_block, edge + n_times)
+        stop_ov = min(stop + n_overlap, n_ext)
+        # Forward filtering up to the end of the overlap :
+        y, z_fwd = lfilter(b, a, _get_ext(fwd_stop, stop_ov), zi=z_fwd)
+        if fwd is None:
+            fwd = y
+        else:
+            fwd = np.concatenate((fwd[..., start - fwd_start:], y), axis=-1)
+            fwd_start = start
+        fwd_stop = stop_ov
+        # Backward filtering from the end of the overlap :
+        seg = fwd[..., start - fwd_start:][..., ::-1]
+        y, _ = lfilter(b, a, seg, zi=zi * seg[..., 0:1])
+        out_t[..., start - edge:stop - edge] = y[..., ::-1][..., :stop -
+                                                            start]
+    return out
+
 
 #############################################################################
 # WAVELET
@@ -114,8 +312,11 @@ def morlet(x, sf, f, width=7.0):
     xout: array_like
         The complex decomposition of the signal x.
     """
-    # Get the wavelet :
+    # Get the wavelet (single precision if x is single precision) :
+    x = np.asarray(x)
     m = _morlet_wlt(sf, f, width)
+    if _float_dtype(x) == np.float32:
+        m = m.astype(np.complex64)
 
     # Compute morlet :
     y = np.convolve(x, m)
@@ -124,9 +325,12 @@ def morlet(x, sf, f, width=7.0):
     return xout
 
 
-def ndmorlet(x, sf, f, axis=0, get=None, width=7.0):
+def ndmorlet(x, sf, f, axis=0, get=None, width=7.0, out=None):
     """Complex decomposition using Morlet's wlt for a multi-dimentional array.
 
+    The decomposition is performed in the frequency domain for all of the
+    signals at once (see FilterBank).
+
     Parameters
     ----------
     x : array_like
@@ -142,30 +346,19 @@ def ndmorlet(x, sf, f, axis=0, get=None, width=7.0):
         be returned or only the filtered signal.
     width : float | 7.0
         Width of the wavelet
+    out : array_like | None
+        Preallocated output array with the same shape as x. Must be complex if
+        get is None. Note that out should not share memory with x.
 
     Returns
     -------
         xout: array, same shape as x
             Complex decomposition of x.
     """
-    # Get the wavelet :
-    m = _morlet_wlt(sf, f, width)
-
-    # Define a morlet function :
-    def morlet_fcn(xt):
-        # Compute morlet :
-        y = np.convolve(xt, m)
-        return y[int(np.ceil(len(m) / 2)) - 1:int(len(y) - np.floor(
-            len(m) / 2))]
-
-    xf = np.apply_along_axis(morlet_fcn, axis, x)
-    # Get amplitude / power / phase :
-    if get == 'amplitude':
-        return np.abs(xf)
-    elif get == 'power':
-        return np.square(np.abs(xf))
-    elif get == 'phase':
-        return np.angle(xf)
+    fbank = FilterBank(sf, [np.mean(f)], method='morlet', width=width)
+    if out is not None:
+        out = out[np.newaxis, ...]
+    return fbank.apply(x, axis=axis, get=get, out=out)[0, ...]
 
 
 def morlet_power(x, freqs, sf, norm=True):
@@ -175,9 +368,10 @@ def morlet_power(x, freqs, sf, norm=True):
     ----------
     x : array_like
         Row vector signal.
-    freqs : array_like
+    freqs : array_like | FilterBank
         Frequency bands for power computation. The power will be computed
         using successive frequency band (e.g freqs=(1., 2, .3)).
+        Alternatively, a FilterBank instance can be used.
     sf : float
         Sampling frequency.
     norm : bool | True
@@ -190,14 +384,14 @@ def morlet_power(x, freqs, sf, norm=True):
         The power in the specified frequency bands of shape
         (len(freqs)-1, npts).
     """
-    # Build frequency vector :
-    f = np.c_[freqs[0:-1], freqs[1::]].mean(1)
-    # Get wavelet transform :
-    xpow = np.zeros((len(f), len(x)), dtype=np.float)
-    for num, k in enumerate(f):
-        xpow[num, :] = np.abs(morlet(x, sf, k))
-    # Compute inplace power :
-    np.power(xpow, 2, out=xpow)
+    if isinstance(freqs, FilterBank):
+        fbank = freqs
+    else:
+        # Build frequency vector :
+        f = np.c_[freqs[0:-1], freqs[1::]].mean(1)
+        fbank = FilterBank(sf, f, method='morlet')
+    # Get wavelet power of all bands using a single FFT of the signal :
+    xpow = fbank.apply(x, get='power')
     # Normalize by the band sum :
     if norm:
         sum_pow = xpow.sum(0).reshape(1, -1)
@@ -229,11 +423,12 @@ def welch_power(x, freqs, sf, window_s=10, norm=True):
         The power in the specified frequency bands of shape
         (len(freqs)-1, npts).
     """
+    x = np.asarray(x)
     sf = int(sf)
     freq_spacing = .1
     n_epoch = max(1, int(len(x) / (window_s * sf)))
 
-    xpow = np.zeros((len(freqs) - 1, n_epoch), dtype=np.float)
+    xpow = np.zeros((len(freqs) - 1, n_epoch), dtype=_float_dtype(x))
 
     for i in np.arange(0, len(x), window_s * sf):
         f, Pxx_spec = welch(x[int(i):int(i + window_s * sf)], sf,
@@ -256,6 +451,202 @@ def welch_power(x, freqs, sf, window_s=10, norm=True):
     return xpow
 
 
+#############################################################################
+# FILTER BANK
+#############################################################################
+
+
+def _bandpass_kernel(sf, f, order=3, method='butterworth', n_taps=None):
+    """Get an analytic zero-phase band-pass kernel.
+
+    The kernel has the magnitude response of the two-ways (filtfilt) IIR
+    filter with negative frequencies removed.
+
+    Parameters
+    ----------
+    sf : float
+        Sampling frequency.
+    f : array_like
+        Frequency vector of shape (2,).
+    order : int | 3
+        The filter order.
+    method : {'butterworth', 'bessel'}
+        Filter type to use.
+    n_taps : int | None
+        Length of the kernel. If None, the length is deduced from the lowest
+        frequency and the bandwidth.
+
+    Returns
+    -------
+    kernel : array_like
+        Complex kernel of shape (n_taps,).
+    """
+    b, a = _filter_coefficients(sf, f, 'bandpass', order, method)
+    if n_taps is None:
+        n_taps = int(np.ceil(8. * sf / min(f[0], f[1] - f[0])))
+    n_taps += 1 - n_taps % 2  # odd number of taps
+    freqs = np.fft.fftfreq(n_taps)
+    _, h = freqz(b, a, worN=2. * np.pi * np.abs(freqs))
+    resp = np.square(np.abs(h))
+    resp[freqs < 0.] = 0.
+    resp[freqs > 0.] *= 2.
+    return np.fft.fftshift(np.fft.ifft(resp))
+
+
+class FilterBank(object):
+    """Shared-FFT multi-band filter bank.
+
+    The filter bank computes complex analytic outputs for several frequency
+    bands at once. The spectrum of the signal is computed once (per block) and
+    multiplied by the frequency response of each band. Long signals are
+    processed by overlapping blocks (overlap-save) to bound the memory.
+
+    Parameters
+    ----------
+    sf : float
+        Sampling frequency.
+    freqs : array_like
+        Frequencies. If method is 'morlet', freqs can either be a vector of
+        central frequencies of shape (n_bands,) or band edges of shape
+        (n_bands, 2). If method is 'bandpass', freqs must be band edges of
+        shape (n_bands, 2).
+    method : {'morlet', 'bandpass'}
+        Use either Morlet's wavelets (same as the morlet function) or
+        zero-phase band-pass filters (magnitude of a two-ways IIR filter).
+    width : float | 7.0
+        Width of the wavelet (only if method is 'morlet').
+    order : int | 3
+        The filter order (only if method is 'bandpass').
+    filt_meth : {'butterworth', 'bessel'}
+        Filter type to use (only if method is 'bandpass').
+    n_taps : int | None
+        Length of band-pass kernels (only if method is 'bandpass').
+    """
+
+    def __init__(self, sf, freqs, method='morlet', width=7.0, order=3,
+                 filt_meth='butterworth', n_taps=None):
+        """Init."""
+        freqs = np.asarray(freqs, dtype=float)
+        assert method in ['morlet', 'bandpass']
+        if method == 'morlet':
+            if freqs.ndim == 2:
+                freqs = freqs.mean(1)
+            freqs = np.atleast_1d(freqs)
+            kernels = [_morlet_wlt(sf, k, width) for k in freqs]
+        elif method == 'bandpass':
+            freqs = np.atleast_2d(freqs)
+            assert freqs.shape[1] == 2
+            kernels = [_bandpass_kernel(sf, k, order, filt_meth,
+                                        n_taps) for k in freqs]
+        self.sf, self.freqs, self.method = float(sf), freqs, method
+        self._kernels = kernels
+        self._n_kernel = max([len(k) for k in kernels])
+        self._spectra = {}
+
+    def __len__(self):
+        """Get the number of bands."""
+        return len(self._kernels)
+
+    def _get_spectra(self, n_fft):
+        """Get the (cached) frequency responses of each band.
+
+        The delay of each kernel is compensated in the frequency domain so
+        that outputs are aligned with the input signal.
+        """
+        if n_fft not in self._spectra:
+            phase = 2j * np.pi * np.fft.fftfreq(n_fft)
+            spectra = np.zeros((len(self), n_fft), dtype=np.complex128)
+            for k, kernel in enumerate(self._kernels):
+                delay = int(np.ceil(len(kernel) / 2)) - 1
+                spectra[k, :] = np.fft.fft(kernel, n_fft) * np.exp(
+                    phase * delay)
+            self._spectra[n_fft] = spectra
+        return self._spectra[n_fft]
+
+    @staticmethod
+    def _get(xf, get):
+        """Get amplitude / power / phase of the complex output."""
+        if get is None:
+            return xf
+        elif get == 'real':
+            return xf.real
+        elif get == 'amplitude':
+            return np.abs(xf)
+        elif get == 'power':
+            return np.square(np.abs(xf))
+        elif get == 'phase':
+            return np.angle(xf)
+
+    def apply(self, x, axis=-1, get=None, n_block=None, out=None):
+        """Filter a signal in every band.
+
+        Parameters
+        ----------
+        x : array_like
+            Array of data.
+        axis : int | -1
+            Axis along which is located the time dimension.
+        get : {None, 'real', 'amplitude', 'power', 'phase'}
+            Specify if the complex analytic output, its real part, amplitude,
+            power or phase have to be returned.
+        n_block : int | None
+            Number of time points per block. If None, the block length is
+            adapted to the number of bands and to the size of the data.
+        out : array_like | None
+            Preallocated output array of shape (n_bands,) + x.shape.
+
+        Returns
+        -------
+        xf : array_like
+            Filtered data of shape (n_bands,) + x.shape.
+        """
+        assert get in [None, 'real', 'amplitude', 'power', 'phase']
+        x = np.asarray(x)
+        axis = axis % x.ndim
+        n_times, n_k = x.shape[axis], self._n_kernel
+        n_other = max(1, int(x.size / n_times))
+        half = n_k // 2
+
+        # Output type :
+        is_single = _float_dtype(x) == np.float32
+        if get is None:
+            dtype = np.complex64 if is_single else np.complex128
+        else:
+            dtype = np.float32 if is_single else np.float64
+        shape = (len(self),) + x.shape
+        if out is None:
+            out = np.empty(shape, dtype=dtype)
+        assert out.shape == shape
+
+        # Block length (overlap-save) :
+        if n_block is None:
+            n_block = max(4 * n_k, 2 ** 22 // (len(self) * n_other))
+        n_fft = next_fast_len(min(int(n_block), n_times) + n_k - 1)
+        n_step = n_fft - n_k + 1
+        sh = (len(self),) + (1,) * (x.ndim - 1) + (n_fft,)
+        spectra = self._get_spectra(n_fft).reshape(*sh)
+
+        # Work with time as the last dimension :
+        x_t = np.moveaxis(x, axis, -1)
+        out_t = np.moveaxis(out, axis + 1, -1)
+        seg = np.zeros(x_t.shape[:-1] + (n_fft,), dtype=x.dtype)
+        for start in range(0, n_times, n_step):
+            stop = min(start + n_step, n_times)
+            # Zero-padded segment [start - half, start - half + n_fft[ :
+            s_start, s_stop = max(start - half, 0), min(start - half + n_fft,
+                                                        n_times)
+            seg.fill(0.)
+            seg[..., s_start - start + half:s_stop - start + half] = x_t[
+                ..., s_start:s_stop]
+            # Single FFT shared by all of the bands :
+            xf = np.fft.fft(seg, axis=-1)
+            xf = np.fft.ifft(xf[np.newaxis, ...] * spectra, axis=-1)
+            out_t[..., start:stop] = self._get(xf[..., half:half + stop -
+                                                  start], get)
+
+        return out
+
+
 class PrepareData(object):
     """Prepare data before plotting.
 
@@ -268,10 +659,13 @@ class PrepareData(object):
 
     def __init__(self, axis=0, demean=False, detrend=False, filt=False,
                  fstart=12., fend=16., forder=3, way='lfilter',
-                 filt_meth='butterworth', btype='bandpass', dispas='filter'):
+                 filt_meth='butterworth', btype='bandpass', dispas='filter',
+                 n_block=None):
         """Init."""
         # Axis along which to perform preparation :
         self.axis = axis
+        # Filter by blocks (bounded memory, e.g for memory-mapped data) :
+        self.n_block = n_block
         # Demean and detrend :
         self.demean = demean
         self.detrend = detrend
@@ -286,12 +680,22 @@ class PrepareData(object):
         """Return if data have to be prepared."""
         return any([self.demean, self.detrend, self.filt])
 
+    @property
+    def settings(self):
+        """Get a hashable description of the preparation settings."""
+        return (self.axis, self.demean, self.detrend, self.filt, self.fstart,
+                self.fend, self.forder, self.filt_meth, self.way, self.btype,
+                self.dispas)
+
     def _prepare_data(self, sf, data, time):
         """Prepare data before plotting."""
         # ============= DEMEAN =============
         if self.demean:
             mean = np.mean(data, axis=self.axis, keepdims=True)
-            np.subtract(data, mean, out=data)
+            if data.flags.writeable:
+                np.subtract(data, mean, out=data)
+            else:  # e.g read-only memory-mapped data
+                data = data - mean
 
         # ============= DETREND =============
         if self.detrend:
@@ -302,7 +706,8 @@ class PrepareData(object):
             if self.dispas == 'filter':
                 data = filt(sf, np.array([self.fstart, self.fend]), data,
                             btype=self.btype, order=self.forder, way=self.way,
-                            method=self.filt_meth, axis=self.axis)
+                            method=self.filt_meth, axis=self.axis,
+                            n_block=self.n_block)
             else:
                 # Compute ndwavelet :
                 f = np.array([self.fstart, self.fend]).mean()
@@ -11,7 +11,7 @@ __all__ = ('slider2opacity', 'textline2color', 'color2json',
            'disconnect_all', 'extend_combo_list', 'get_combo_list_index',
            'safely_set_cbox', 'safely_set_spin', 'safely_set_slider',
            'toggle_enable_tab', 'get_screen_size', 'set_widget_size',
-           'fill_pyqt_table')
+           'fill_pyqt_table', 'ArrayTableModel')
 
 
 def slider2opacity(value, thmin=0.0, thmax=100.0, vmin=-5.0, vmax=105.0,
@@ -431,6 +431,10 @@ def fill_pyqt_table(table, col_names=None, col=None, df=None):
 
     Parameters
     ----------
+    table : QTableWidget or QTableView
+        The table to fill. If the table is a QTableView, the columns are
+        attached to the view using an ArrayTableModel (only displayed cells
+        are converted).
     col_names : list | None
         List of name of each columns.
     col : list | None
@@ -438,7 +442,7 @@ def fill_pyqt_table(table, col_names=None, col=None, df=None):
     df : pandas.DataFrame or dict | None
         Alternatively, a pandas DataFrame or a dictionary can also be used.
     """
-    from PyQt5.QtWidgets import QTableWidgetItem
+    from PyQt5.QtWidgets import QTableWidget, QTableWidgetItem
 
     # ________________________ Checking ________________________
     # Dictionary / pandas.DataFrame :
@@ -450,6 +454,16 @@ def fill_pyqt_table(table, col_names=None, col=None, df=None):
     assert len(col_names) == len(col)
     assert all([isinstance(k, str) for k in col_names])
 
+    # ________________________ Model / view ________________________
+    if not isinstance(table, QTableWidget):
+        model = table.model()
+        if not isinstance(model, ArrayTableModel) or (
+                model.col_names != col_names):
+            model = ArrayTableModel(col_names, parent=table)
+            table.setModel(model)
+        model.set_data(*col)
+        return None
+
     # ________________________ Define table ________________________
     table.clear()
     table.setColumnCount(len(col_names))
@@ -460,3 +474,276 @@ def fill_pyqt_table(table, col_names=None, col=None, df=None):
     for i in range(table.rowCount()):
         for k in range(table.columnCount()):
             table.setItem(i, k, QTableWidgetItem(str(col[k][i])))
+
+
+class ArrayTableModel(QtCore.QAbstractTableModel):
+    """Table model where each column is a NumPy array.
+
+    Cells are only converted into text when displayed by the view, which
+    avoids creating an item per cell. Sorting and filtering are performed
+    using NumPy on the order of displayed rows, the data themselves are never
+    re-ordered. Rows returned or expected by methods of this class are rows
+    of the data, except for source_row.
+
+    Parameters
+    ----------
+    col_names : list
+        List of name of each columns.
+    editable : list | None
+        Index of columns that can be edited. If None, every column can be
+        edited.
+    parent : QObject | None
+        Parent of the model.
+    """
+
+    cellChanged = QtCore.pyqtSignal(int, int)
+
+    def __init__(self, col_names, editable=None, parent=None):
+        """Init."""
+        QtCore.QAbstractTableModel.__init__(self, parent)
+        self.col_names = list(col_names)
+        n_cols = len(self.col_names)
+        self._editable = list(range(n_cols)) if editable is None else list(
+            editable)
+        self._cols = [np.array([], dtype=object) for k in range(n_cols)]
+        self._order = np.array([], dtype=int)
+        self._sort_col, self._sort_order = -1, QtCore.Qt.AscendingOrder
+        self._mask = None
+
+    def __len__(self):
+        """Return the number of rows (including filtered rows)."""
+        return len(self._cols[0])
+
+    # =========================== QT ===========================
+    def rowCount(self, parent=QtCore.QModelIndex()):  # noqa
+        """Return the number of displayed rows."""
+        return 0 if parent.isValid() else len(self._order)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):  # noqa
+        """Return the number of columns."""
+        return 0 if parent.isValid() else len(self._cols)
+
+    def headerData(self, section, orientation,  # noqa
+                   role=QtCore.Qt.DisplayRole):
+        """Get the header of a column or of a row."""
+        if role != QtCore.Qt.DisplayRole:
+            return None
+        if orientation == QtCore.Qt.Horizontal:
+            return self.col_names[section]
+        return str(section + 1)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        """Get the text of a displayed cell."""
+        if not index.isValid() or role not in [QtCore.Qt.DisplayRole,
+                                               QtCore.Qt.EditRole]:
+            return None
+        value = self._cols[index.column()][self._order[index.row()]]
+        return self._to_text(value)
+
+    def flags(self, index):
+        """Get flags of a cell."""
+        flags = QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+        if index.column() in self._editable:
+            flags |= QtCore.Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):  # noqa
+        """Set the value of an edited cell.
+
+        The value is converted to the type of the column. If the conversion
+        fails, the edition is refused.
+        """
+        if not index.isValid() or role != QtCore.Qt.EditRole or (
+                index.column() not in self._editable):
+            return False
+        row, col = int(self._order[index.row()]), index.column()
+        try:
+            self._cols[col][row] = value
+        except (ValueError, TypeError):
+            return False
+        self.dataChanged.emit(index, index)
+        self.cellChanged.emit(row, col)
+        return True
+
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        """Sort displayed rows according to a column (-1 for no sorting)."""
+        self._sort_col, self._sort_order = column, order
+        self._set_order(self._get_order())
+
+    # =========================== DATA ===========================
+    def set_data(self, *cols):
+        """Set the columns of the table.
+
+        Parameters
+        ----------
+        cols : array_like
+            Arrays of values of each column (all of the same length).
+        """
+        assert len(cols) == len(self._cols)
+        assert len(set([len(k) for k in cols])) <= 1
+        self.beginResetModel()
+        self._cols = [self._to_column(k) for k in cols]
+        self._mask = None
+        self._order = self._get_order()
+        self.endResetModel()
+
+    def clear(self):
+        """Remove every row (the type of each column is kept)."""
+        self.set_data(*[k[0:0] for k in self._cols])
+
+    def get_column(self, col):
+        """Get the values of a column (rows of the data)."""
+        return self._cols[col]
+
+    def get_text(self, col):
+        """Get the text of a column (displayed rows only)."""
+        return [self._to_text(k) for k in self._cols[col][self._order]]
+
+    def set_row(self, row, *values):
+        """Set the values of a row.
+
+        Parameters
+        ----------
+        row : int
+            Row of the data.
+        values : object
+            Value of each column.
+        """
+        for k, v in enumerate(values):
+            self._cols[k][row] = v
+        view_row = self.view_row(row)
+        if view_row >= 0:
+            self.dataChanged.emit(self.index(view_row, 0),
+                                  self.index(view_row, len(self._cols) - 1))
+
+    def insert_rows(self, row, *cols):
+        """Insert rows.
+
+        Parameters
+        ----------
+        row : int
+            Row of the data before which rows are inserted.
+        cols : array_like
+            Arrays of values of each column.
+        """
+        cols = [np.asarray(k) for k in cols]
+        n = len(cols[0])
+        if not n:
+            return None
+        is_ordered = self._is_ordered()
+        if is_ordered:
+            self.beginInsertRows(QtCore.QModelIndex(), row, row + n - 1)
+        else:
+            self.beginResetModel()
+        for k, c in enumerate(cols):
+            self._cols[k] = np.insert(self._cols[k], row, c.astype(
+                self._cols[k].dtype), axis=0)
+        if self._mask is not None:
+            self._mask = np.insert(self._mask, row, np.ones(n, dtype=bool))
+        self._order = self._get_order()
+        if is_ordered:
+            self.endInsertRows()
+        else:
+            self.endResetModel()
+
+    def remove_rows(self, row, count=1):
+        """Remove rows.
+
+        Parameters
+        ----------
+        row : int
+            Row of the data from which rows are removed.
+        count : int | 1
+            Number of rows to remove.
+        """
+        count = min(count, len(self) - row)
+        if (row < 0) or (count <= 0):
+            return None
+        is_ordered = self._is_ordered()
+        if is_ordered:
+            self.beginRemoveRows(QtCore.QModelIndex(), row, row + count - 1)
+        else:
+            self.beginResetModel()
+        sl = np.arange(row, row + count)
+        self._cols = [np.delete(k, sl, axis=0) for k in self._cols]
+        if self._mask is not None:
+            self._mask = np.delete(self._mask, sl)
+        self._order = self._get_order()
+        if is_ordered:
+            self.endRemoveRows()
+        else:
+            self.endResetModel()
+
+    def set_filter(self, mask=None):
+        """Only display some rows.
+
+        Parameters
+        ----------
+        mask : array_like | None
+            Boolean array of shape (n_rows,) where rows to display are True.
+            If None, every row is displayed.
+        """
+        if mask is not None:
+            mask = np.asarray(mask, dtype=bool)
+            assert len(mask) == len(self)
+        self._mask = mask
+        self._set_order(self._get_order())
+
+    def source_row(self, row):
+        """Convert a displayed row into a row of the data (-1 if invalid)."""
+        return int(self._order[row]) if 0 <= row < len(self._order) else -1
+
+    def view_row(self, row):
+        """Convert a row of the data into a displayed row (-1 if hidden)."""
+        if self._is_ordered():
+            return row if 0 <= row < len(self._order) else -1
+        idx = np.where(self._order == row)[0]
+        return int(idx[0]) if idx.size else -1
+
+    # =========================== ORDER ===========================
+    @staticmethod
+    def _to_text(value):
+        """Convert a value into text (missing values are empty)."""
+        if isinstance(value, (float, np.floating)) and np.isnan(value):
+            return ''
+        return str(value)
+
+    @staticmethod
+    def _to_column(col):
+        """Convert values into a column (text is stored as object)."""
+        col = np.asarray(col)
+        if col.dtype.kind in 'USa':
+            col = col.astype(object)
+        return col
+
+    def _is_ordered(self):
+        """Get if displayed rows are the rows of the data."""
+        return (self._mask is None) and (self._sort_col < 0)
+
+    def _get_order(self):
+        """Get the order of displayed rows."""
+        order = np.arange(len(self))
+        if self._mask is not None:
+            order = order[self._mask]
+        if (self._sort_col >= 0) and len(order):
+            col = self._cols[self._sort_col][order]
+            order = order[np.argsort(col, kind='mergesort')]
+            if self._sort_order == QtCore.Qt.DescendingOrder:
+                order = order[::-1]
+        return order
+
+    def _set_order(self, order):
+        """Change the order of displayed rows (the selection is kept)."""
+        self.layoutAboutToBeChanged.emit()
+        old = self.persistentIndexList()
+        rows = [self.source_row(k.row()) for k in old]
+        inv = np.full((len(self),), -1, dtype=int)
+        inv[order] = np.arange(len(order))
+        self._order = order
+        new = []
+        for idx, row in zip(old, rows):
+            valid = (row >= 0) and (inv[row] >= 0)
+            new.append(self.index(int(inv[row]), idx.column()) if valid else
+                       QtCore.QModelIndex())
+        self.changePersistentIndexList(old, new)
+        self.layoutChanged.emit()
@@ -0,0 +1,204 @@
+"""Moving-window engine.
+
+This module contains fast kernels to apply a window over consecutive samples
+of a signal :
+
+    * Flat windows (moving average) are computed using cumulative sums, which
+      cost O(N) whatever the window length.
+    * Shaped windows (hanning, hamming...) use a direct accumulation for short
+      windows and an FFT based convolution for long ones.
+    * Non-overlapping or overlapping windows can be extracted as a strided view
+      of the data (no copy).
+
+All of the functions accept an `axis` parameter so that multichannel arrays
+can be processed at once.
+"""
+import numpy as np
+from scipy.fftpack import next_fast_len
+
+
+__all__ = ('get_window', 'moving_window', 'moving_sum', 'moving_average')
+
+
+WINDOWS = {'flat': np.ones, 'hanning': np.hanning, 'hamming': np.hamming,
+           'bartlett': np.bartlett, 'blackman': np.blackman}
+
+
+def _float_dtype(x):
+    """Get the floating point type to use for an array."""
+    return np.float32 if x.dtype == np.float32 else np.float64
+
+
+def _direct_is_faster(n_window, n_times):
+    """Return if a direct convolution is faster than an FFT convolution."""
+    nfft = next_fast_len(n_times + n_window - 1)
+    return n_window * (n_times - n_window + 1) < 4. * nfft * np.log2(nfft)
+
+
+def get_window(window, n_window):
+    """Get window weights.
+
+    Parameters
+    ----------
+    window : string, array_like
+        Use either 'flat', 'hanning', 'hamming', 'bartlett', 'blackman' or pass
+        a numpy array of length n_window.
+    n_window : int
+        Window length.
+
+    Returns
+    -------
+    w : array_like
+        The window weights of shape (n_window,).
+    """
+    if isinstance(window, str):
+        if window not in WINDOWS.keys():
+            raise ValueError("window should either be %s" % ', '.join(
+                             WINDOWS.keys()))
+        return WINDOWS[window](int(n_window)).astype(np.float64)
+    elif isinstance(window, np.ndarray):
+        assert window.ndim == 1 and len(window) == n_window
+        return window.astype(np.float64)
+    else:
+        raise TypeError("window should either be a string or an array.")
+
+
+def moving_window(x, n_window, step=1, axis=-1):
+    """Get a strided view of consecutive windows of data.
+
+    Parameters
+    ----------
+    x : array_like
+        Array of data.
+    n_window : int
+        Number of samples per window.
+    step : int | 1
+        Number of samples between the beginning of two consecutive windows.
+    axis : int | -1
+        Axis along which to extract windows.
+
+    Returns
+    -------
+    xw : array_like
+        Read-only view of x where the axis dimension is replaced by the number
+        of windows and where the samples of each window are on a new last
+        dimension. For example, if x has a shape of (n_channels, n_times),
+        xw has a shape of (n_channels, n_windows, n_window).
+    """
+    x = np.asarray(x)
+    axis = axis % x.ndim
+    n_window, step = int(n_window), int(step)
+    assert 0 < n_window <= x.shape[axis] and step > 0
+    n_win = (x.shape[axis] - n_window) // step + 1
+    shape = list(x.shape) + [n_window]
+    shape[axis] = n_win
+    strides = list(x.strides) + [x.strides[axis]]
+    strides[axis] *= step
+    return np.lib.stride_tricks.as_strided(x, shape=shape, strides=strides,
+                                           writeable=False)
+
+
+def moving_sum(x, n_window, axis=-1, window='flat', method='auto'):
+    """Weighted sum over a moving window (valid convolution).
+
+    Parameters
+    ----------
+    x : array_like
+        Array of data.
+    n_window : int
+        Window length.
+    axis : int | -1
+        Axis along which to slide the window.
+    window : string, array_like | 'flat'
+        Use either 'flat', 'hanning', 'hamming', 'bartlett', 'blackman' or pass
+        a numpy array of length n_window.
+    method : {'auto', 'cumsum', 'direct', 'fft'}
+        Method to use. 'cumsum' is only available for flat windows. If 'auto',
+        cumulative sums are used for flat windows and the fastest method
+        between 'direct' and 'fft' is used for shaped windows.
+
+    Returns
+    -------
+    xs : array_like
+        The summed array. The length of the axis dimension is
+        x.shape[axis] - n_window + 1.
+    """
+    x = np.asarray(x)
+    axis = axis % x.ndim
+    n_window, n_times = int(n_window), x.shape[axis]
+    assert 0 < n_window <= n_times
+    assert method in ['auto', 'cumsum', 'direct', 'fft']
+    is_flat = isinstance(window, str) and window == 'flat'
+    w = get_window(window, n_window)
+    dtype = _float_dtype(x)
+    n_out = n_times - n_window + 1
+
+    if method == 'auto':
+        if is_flat:
+            method = 'cumsum'
+        elif _direct_is_faster(n_window, n_times):
+            method = 'direct'
+        else:
+            method = 'fft'
+    elif method == 'cumsum' and not is_flat:
+        raise ValueError("The cumsum method only works with flat windows.")
+
+    sl_out = [slice(None)] * x.ndim
+    if method == 'cumsum':
+        # The accumulation is performed in double precision to prevent drifts
+        # on long signals :
+        sh = list(x.shape)
+        sh[axis] = n_times + 1
+        csum = np.zeros(sh, dtype=np.float64)
+        sl_out[axis] = slice(1, None)
+        np.cumsum(x, axis=axis, dtype=np.float64, out=csum[tuple(sl_out)])
+        sl_stop, sl_start = list(sl_out), list(sl_out)
+        sl_stop[axis] = slice(n_window, None)
+        sl_start[axis] = slice(0, n_out)
+        xs = csum[tuple(sl_stop)] - csum[tuple(sl_start)]
+    elif method == 'direct':
+        sh = list(x.shape)
+        sh[axis] = n_out
+        xs = np.zeros(sh, dtype=np.float64)
+        for k in range(n_window):
+            sl_out[axis] = slice(k, k + n_out)
+            xs += w[n_window - 1 - k] * x[tuple(sl_out)]
+    elif method == 'fft':
+        nfft = next_fast_len(n_times + n_window - 1)
+        sh = [1] * x.ndim
+        sh[axis] = -1
+        xf = np.fft.rfft(x, nfft, axis=axis)
+        xf *= np.fft.rfft(w, nfft).reshape(*sh)
+        xs = np.fft.irfft(xf, nfft, axis=axis)
+        sl_out[axis] = slice(n_window - 1, n_times)
+        xs = xs[tuple(sl_out)]
+
+    return xs.astype(dtype, copy=False)
+
+
+def moving_average(x, n_window, axis=-1, window='flat', method='auto'):
+    """Weighted average over a moving window.
+
+    Parameters
+    ----------
+    x : array_like
+        Array of data.
+    n_window : int
+        Window length.
+    axis : int | -1
+        Axis along which to slide the window.
+    window : string, array_like | 'flat'
+        Use either 'flat', 'hanning', 'hamming', 'bartlett', 'blackman' or pass
+        a numpy array of length n_window.
+    method : {'auto', 'cumsum', 'direct', 'fft'}
+        Method to use (see moving_sum).
+
+    Returns
+    -------
+    xm : array_like
+        The averaged array. The length of the axis dimension is
+        x.shape[axis] - n_window + 1.
+    """
+    xm = moving_sum(x, n_window, axis=axis, window=window, method=method)
+    xm /= get_window(window, n_window).sum()
+    return xm
@@ -5,12 +5,14 @@ import logging
 import numpy as np
 from itertools import product
 from scipy.stats import zscore
+from scipy.sparse import csr_matrix, identity as sp_identity
 
 from .sigproc import smoothing
 from ..io.path import get_data_path, get_files_in_data
 
 __all__ = ('find_non_eeg', 'rereferencing', 'bipolarization', 'commonaverage',
-           'tal2mni', 'mni2tal', 'load_predefined_roi', 'generate_eeg')
+           'Montage', 'MontagedData', 'tal2mni', 'mni2tal',
+           'load_predefined_roi', 'generate_eeg')
 
 logger = logging.getLogger('visbrain')
 
@@ -206,6 +208,259 @@ def commonaverage(data, chans, to_ignore=None):
     return data, chans, consider
 
 
+###############################################################################
+###############################################################################
+#                                  MONTAGES
+###############################################################################
+###############################################################################
+
+class Montage(object):
+    """Linear montage represented as a sparse (n_out, n_in) matrix.
+
+    Montaged channels are linear combinations of input channels. The
+    montage is applied on demand to the window or chunk that is read (see
+    MontagedData) so that data are never modified in place. Montages can be
+    stacked (see the stack method).
+
+    Parameters
+    ----------
+    matrix : array_like | sparse matrix
+        Matrix of shape (n_out, n_in).
+    channels : list
+        List of input channel names of length n_in.
+    names : list | None
+        List of output channel names of length n_out. If None, input channel
+        names are used.
+    consider : array_like | None
+        Boolean vector of length n_out describing channels that have to be
+        considered during the ploting processus (e.g channels that are
+        actually re-referenced). If None, every channel is considered.
+    """
+
+    def __init__(self, matrix, channels, names=None, consider=None):
+        """Init."""
+        self.matrix = csr_matrix(matrix, dtype=np.float64)
+        self.channels = list(channels)
+        self.names = self.channels if names is None else list(names)
+        n_out, n_in = self.matrix.shape
+        assert (n_in == len(self.channels)) and (n_out == len(self.names))
+        if consider is None:
+            consider = np.ones((n_out,), dtype=bool)
+        self.consider = np.asarray(consider, dtype=bool)
+
+    def __len__(self):
+        """Return the number of output channels."""
+        return self.matrix.shape[0]
+
+    @property
+    def is_identity(self):
+        """Get if the montage leaves data unchanged."""
+        n_out, n_in = self.matrix.shape
+        return (n_out == n_in) and not (self.matrix != sp_identity(n_in)).nnz
+
+    @classmethod
+    def identity(cls, channels):
+        """Montage returning the input channels.
+
+        Parameters
+        ----------
+        channels : list
+            List of channel names.
+        """
+        return cls(sp_identity(len(channels)), channels)
+
+    @classmethod
+    def reference(cls, channels, reference, to_ignore=None):
+        """Re-referencing montage (see rereferencing).
+
+        Parameters
+        ----------
+        channels : list
+            List of channel names.
+        reference : int
+            The index of the channel to consider as a reference.
+        to_ignore : array_like | None
+            Boolean vector of channels to ignore in the re-referencing.
+        """
+        n_chan = len(channels)
+        consider = np.ones((n_chan,), dtype=bool)
+        consider[reference] = False
+        if to_ignore is not None:
+            consider[np.asarray(to_ignore)] = False
+        rows = np.arange(n_chan)
+        if to_ignore is not None:
+            rows = rows[~np.asarray(to_ignore)]
+        matrix = sp_identity(n_chan, format='lil')
+        matrix[rows, reference] = matrix[rows, reference].toarray() - 1.
+        name = channels[reference]
+        names = [k + '-' + name if consider[num] else k for num, k in
+                 enumerate(channels)]
+        return cls(matrix, channels, names, consider)
+
+    @classmethod
+    def average(cls, channels, to_ignore=None):
+        """Common average montage (see commonaverage).
+
+        Parameters
+        ----------
+        channels : list
+            List of channel names.
+        to_ignore : array_like | None
+            Boolean vector of channels to ignore in the re-referencing.
+        """
+        n_chan = len(channels)
+        consider = np.ones((n_chan,), dtype=bool)
+        if to_ignore is not None:
+            consider[to_ignore] = False
+        matrix = np.eye(n_chan)
+        matrix[np.ix_(consider, consider)] -= 1. / max(consider.sum(), 1)
+        names = [k + '-m' if consider[num] else k for num, k in
+                 enumerate(channels)]
+        return cls(matrix, channels, names, consider)
+
+    @classmethod
+    def bipolar(cls, channels, to_ignore=None, sep='.'):
+        """Bipolar montage (see bipolarization).
+
+        Parameters
+        ----------
+        channels : list
+            List of channel names.
+        to_ignore : array_like | None
+            Boolean vector of channels to ignore in the bipolarization.
+        sep : string | '.'
+            Separator to simplify electrode names by removing undesired name
+            after the sep.
+        """
+        n_chan = len(channels)
+        consider = np.zeros((n_chan,), dtype=bool)
+        names = [k.strip().replace(' ', '').split(sep)[0] for k in channels]
+        to_ignore = np.zeros((n_chan,), dtype=bool) if to_ignore is None \
+            else np.asarray(to_ignore)
+        matrix = sp_identity(n_chan, format='lil')
+        out = list(names)
+        for num, k in enumerate(channels):
+            number = findall(r'\d+', k)
+            if not number or to_ignore[num]:
+                continue
+            # Search the previous channel (e.g O1 for O2) :
+            chan_to_find = k.split(number[0])[0] + str(int(number[0]) - 1)
+            if chan_to_find in names:
+                matrix[num, names.index(chan_to_find)] = -1.
+                out[num] = names[num] + '-' + chan_to_find
+                consider[num] = True
+        return cls(matrix, channels, out, consider)
+
+    def stack(self, montage):
+        """Stack a montage applied to the output of this montage.
+
+        Parameters
+        ----------
+        montage : Montage
+            Montage defined on the output channels of this montage.
+
+        Returns
+        -------
+        stacked : Montage
+            The stacked montage (a single sparse matrix).
+        """
+        assert montage.matrix.shape[1] == len(self)
+        return Montage(montage.matrix @ self.matrix, self.channels,
+                       montage.names, montage.consider)
+
+    def apply(self, data, rows=None, cols=slice(None)):
+        """Apply the montage to data.
+
+        Only input channels that are needed to compute the requested output
+        channels are read.
+
+        Parameters
+        ----------
+        data : array_like
+            Array of shape (n_in, n_times) (e.g a memory-mapped array).
+        rows : array_like | None
+            Output channels to compute. If None, every channel is computed.
+        cols : slice | array_like
+            Time samples to read.
+
+        Returns
+        -------
+        x : array_like
+            Montaged data of shape (n_rows, n_samples).
+        """
+        matrix = self.matrix if rows is None else self.matrix[rows, :]
+        used = np.unique(matrix.indices)
+        if isinstance(cols, slice):
+            x = data[used, cols]
+        else:
+            x = data[np.ix_(used, np.asarray(cols).ravel())]
+        dtype = data.dtype if data.dtype.kind == 'f' else np.float64
+        return np.asarray(matrix[:, used] @ x, dtype=dtype)
+
+    def view(self, data):
+        """Get a lazy montaged view of data (see MontagedData)."""
+        return MontagedData(data, self)
+
+
+class MontagedData(object):
+    """Lazy montaged view of a (n_in, n_times) array.
+
+    The montage is applied to each indexed window or chunk. The view
+    supports indexing as data[rows, cols] where rows is an integer, a slice,
+    a list or a boolean vector of montaged channels and cols an integer, a
+    slice or a vector of time samples.
+
+    Parameters
+    ----------
+    data : array_like
+        Array of shape (n_in, n_times).
+    montage : Montage
+        The montage.
+    """
+
+    def __init__(self, data, montage):
+        """Init."""
+        assert data.shape[0] == montage.matrix.shape[1]
+        self.data, self.montage = data, montage
+
+    def __len__(self):
+        """Return the number of montaged channels."""
+        return len(self.montage)
+
+    def __array__(self, dtype=None):
+        """Montage the entire array (a full-size array is created)."""
+        x = self[:, :]
+        return x if dtype is None else x.astype(dtype)
+
+    def __getitem__(self, key):
+        """Montage a window."""
+        rows, cols = key if isinstance(key, tuple) else (key, slice(None))
+        cols = slice(None) if cols is Ellipsis else cols
+        is_row = isinstance(rows, (int, np.integer))
+        is_col = isinstance(cols, (int, np.integer))
+        rows = np.arange(len(self))[rows]
+        cols = [cols] if is_col else cols
+        x = self.montage.apply(self.data, np.atleast_1d(rows), cols)
+        x = x[:, 0] if is_col else x
+        return x[0] if is_row else x
+
+    @property
+    def shape(self):
+        """Get the shape of montaged data."""
+        return (len(self), self.data.shape[1])
+
+    @property
+    def ndim(self):
+        """Get the number of dimensions."""
+        return 2
+
+    @property
+    def dtype(self):
+        """Get the data type of montaged data."""
+        return self.data.dtype if self.data.dtype.kind == 'f' else \
+            np.dtype(np.float64)
+
+
 ###############################################################################
 ###############################################################################
 #                               XYZ CONVERSION
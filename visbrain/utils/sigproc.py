@@ -4,6 +4,8 @@ import logging
 import numpy as np
 from scipy.signal import fftconvolve
 
+from .moving import get_window, moving_window, moving_average
+
 
 __all__ = ('normalize', 'derivative', 'tkeo', 'zerocrossing', 'power_of_ten',
            'averaging', 'normalization', 'smoothing', 'smooth_3d')
@@ -200,35 +202,24 @@ def averaging(ts, n_window, axis=-1, overlap=0., window='flat'):
 
     # Get overlap step in samples :
     n_overlap = int(np.round(n_window * (1. - overlap)))
-
-    # Build the index vector :
-    ind = np.c_[np.arange(0, npts - n_window, n_overlap),
-                np.arange(n_window, npts, n_overlap)]
-    ind = np.vstack((ind, [npts - 1 - n_window, npts - 1]))  # add last window
-    n_ind = ind.shape[0]
+    n_reg = len(range(0, npts - n_window, n_overlap))
 
     # Get the window :
-    if window == 'flat':  # moving average
-        win = np.ones(n_window, 'd')
-    else:
-        win = eval('np.' + window + '(n_window)')
-
-    rsh = tuple(1 if i != axis else -1 for i in range(ts.ndim))
-    win = win.reshape(*rsh)
-
-    # Define the averaging array :
-    av_shape = tuple(k if i != axis else n_ind for i, k in enumerate(ts.shape))
-    average = np.zeros(av_shape, dtype=float)
+    win = get_window(window, n_window) / n_window
 
-    # Compute averaging :
-    sl_ts = [slice(None)] * ts.ndim
-    sl_av = sl_ts.copy()
-    for k in range(n_ind):
-        sl_ts[axis] = slice(ind[k, 0], ind[k, 1])
-        sl_av[axis] = slice(k, k + 1)
-        average[sl_av] += (ts[sl_ts] * win).mean(axis=axis, keepdims=True)
+    # Regular windows are extracted as a strided view of the data. The last
+    # window is always aligned on the end of the signal :
+    sl_last = [slice(None)] * ts.ndim
+    sl_last[axis] = slice(npts - 1 - n_window, npts - 1)
+    sl_reg = [slice(None)] * (ts.ndim + 1)
+    sl_reg[axis] = slice(0, n_reg)
+    view = moving_window(ts, n_window, n_overlap, axis)[tuple(sl_reg)]
+    last = np.moveaxis(ts[tuple(sl_last)], axis, -1)
+    average = np.concatenate((np.dot(view, win),
+                              np.expand_dims(np.dot(last, win), axis)),
+                             axis=axis)
 
-    return average
+    return average.astype(float, copy=False)
 
 
 def normalization(data, axis=-1, norm=None, baseline=None):
@@ -287,7 +278,7 @@ def normalization(data, axis=-1, norm=None, baseline=None):
             data /= d_std
 
 
-def smoothing(x, n_window=10, window='hanning'):
+def smoothing(x, n_window=10, window='hanning', axis=-1):
     """Smooth the data using a window with requested size.
 
     This method is based on the convolution of a scaled window with the signal.
@@ -295,23 +286,31 @@ def smoothing(x, n_window=10, window='hanning'):
     (with the window size) in both ends so that transient parts are minimized
     in the begining and end part of the output signal.
 
+    Flat windows are computed using cumulative sums and shaped windows using
+    either a direct or an FFT convolution depending on the window length (see
+    visbrain.utils.moving_average).
+
     Parameters
     ----------
     x : array_like
-        1-D array to smooth.
+        Array to smooth.
     n_window : int | 10
         Window length.
     window : string, array_like | 'hanning'
         Use either 'flat', 'hanning', 'hamming', 'bartlett', 'blackman' or pass
         a numpy array of length n_window.
+    axis : int | -1
+        Axis along which to smooth.
 
     Returns
     -------
         The smoothed signal
     """
     n_window = int(n_window)
-    assert isinstance(x, np.ndarray) and x.ndim == 1
-    assert len(x) > n_window
+    assert isinstance(x, np.ndarray)
+    axis = axis % x.ndim
+    npts = x.shape[axis]
+    assert npts > n_window
     assert isinstance(window, (str, np.ndarray))
     if isinstance(window, str):
         assert window in ['flat', 'hanning', 'hamming', 'bartlett', 'blackman']
@@ -321,14 +320,19 @@ def smoothing(x, n_window=10, window='hanning'):
     if n_window < 3:
         return x
 
-    s = np.r_[2 * x[0] - x[n_window:1:-1], x, 2 * x[-1] - x[-1:-n_window:-1]]
-    if window == 'flat':  # Moving average
-        w = np.ones((n_window,))
-    else:
-        w = eval('np.' + window + '(n_window)')
-
-    y = np.convolve(w / w.sum(), s, mode='same')
-    return y[n_window - 1:-n_window + 1]
+    # Reflected copies on both ends :
+    sl_first = [slice(None)] * x.ndim
+    sl_last = list(sl_first)
+    sl_first[axis], sl_last[axis] = slice(0, 1), slice(npts - 1, npts)
+    head = np.take(x, np.arange(n_window, 1, -1), axis=axis)
+    tail = np.take(x, np.arange(npts - 1, npts - n_window, -1), axis=axis)
+    s = np.concatenate((2 * x[tuple(sl_first)] - head, x,
+                        2 * x[tuple(sl_last)] - tail), axis=axis)
+
+    y = moving_average(s, n_window, axis=axis, window=window)
+    sl_y = [slice(None)] * x.ndim
+    sl_y[axis] = slice((n_window - 1) // 2, (n_window - 1) // 2 + npts)
+    return y[tuple(sl_y)]
 
 
 def smooth_3d(vol, smooth_factor=3):
@@ -1,2 +1,7 @@
 from .detection import *
+from .event import *
+from .features import *
 from .hypnoprocessing import *
+from .loader import *
+from .prefetch import *
+from .spectro import *
@@ -9,16 +9,22 @@ Perform:
 - Slow wave detection
 - KCs detection
 - Peak detection
+- Online (chunk-wise) spindles and slow waves detection
 """
 import numpy as np
-from scipy.signal import hilbert, detrend, welch
+from scipy.signal import (hilbert, detrend, welch, butter, lfilter, sosfilt,
+                          sosfilt_zi)
 
-from ..filtering import filt, morlet, morlet_power
+from ..filtering import filt, morlet, morlet_power, FilterBank
 from ..sigproc import derivative, tkeo, smoothing, normalization
 from .event import (_events_distance_fill, _index_to_events, _events_to_index)
 
 __all__ = ('kcdetect', 'spindlesdetect', 'remdetect', 'slowwavedetect',
-           'mtdetect', 'peakdetect')
+           'mtdetect', 'peakdetect', 'OnlineSpindles', 'OnlineSlowWaves')
+
+# Duration (in seconds) of the blocks used to filter the whole recording. The
+# memory used by the filtering is bounded by the block size (see filt) :
+FILT_BLOCK_S = 600.
 
 ###########################################################################
 # K-COMPLEX DETECTION
@@ -97,7 +103,8 @@ def kcdetect(data, sf, proba_thr, amp_thr, hypno, nrem_only, tmin, tmax,
 
     # MAIN DETECTION
     # Bandpass filtering
-    sig_filt = filt(sf, np.array([fmin, fmax]), data)
+    sig_filt = filt(sf, np.array([fmin, fmax]), data,
+                    n_block=int(FILT_BLOCK_S * sf))
     # Taiger-Keaser energy operator
     sig_tkeo = tkeo(sig_filt)
     # Define hard and soft thresholds
@@ -141,7 +148,7 @@ def kcdetect(data, sf, proba_thr, amp_thr, hypno, nrem_only, tmin, tmax,
         idx_kc_spin = _index_to_events(np.c_[idx_start, idx_stop][kc_spin])
 
         # Compute probability
-        proba = np.zeros(shape=data.shape)
+        proba = np.zeros(shape=data.shape, dtype=np.float32)
         proba[idx_kc] += 0.1
         proba[idx_no_delta] += 0.1
         proba[idx_loc_delta] += 0.1
@@ -256,9 +263,13 @@ def spindlesdetect(data, sf, threshold, hypno, nrem_only, fmin=12., fmax=14.,
         fmin = mfs - 1
         fmax = mfs + 1
 
-    # Compute relative sigma power
+    # Compute relative sigma power. The last band of the filter bank is also
+    # the wavelet decomposition of the sigma band :
     freqs = np.array([0.5, 4., 8., fmin, fmax])
-    sigma_npow = morlet_power(data, freqs, sf, norm=True)[-1]
+    fbank = FilterBank(sf, np.c_[freqs[0:-1], freqs[1::]], method='morlet')
+    xf = fbank.apply(data)
+    xpow = np.square(np.abs(xf))
+    sigma_npow = xpow[-1] / xpow.sum(0)
     sigma_nfpow = smoothing(sigma_npow, sf * (tmin / 1000))
     # Vector of sigma power supra-threshold values
     idx_sigma = np.where(sigma_nfpow > sigma_thr)[0]
@@ -266,13 +277,15 @@ def spindlesdetect(data, sf, threshold, hypno, nrem_only, fmin=12., fmax=14.,
     # Get complex decomposition of filtered data :
     if method == 'hilbert':
         # Bandpass filter
-        data_filt = filt(sf, [fmin, fmax], data, order=4)
+        data_filt = filt(sf, [fmin, fmax], data, order=4,
+                         n_block=int(FILT_BLOCK_S * sf))
         if data.size % 2:
             analytic = hilbert(data_filt)
         else:
             analytic = hilbert(data_filt[:-1], len(data_filt))
     elif method == 'wavelet':
-        analytic = morlet(data, sf, np.mean([fmin, fmax]))
+        analytic = xf[-1]
+    del xf, xpow
 
     # Get envelope
     amplitude = np.abs(analytic)
@@ -546,7 +559,8 @@ def slowwavedetect(data, sf, threshold, min_amp=70., max_amp=400., tmin=1000.,
         Duration (ms) of each slow wave period detected
     """
     filt_fmax = np.minimum(45, sf / 2.0 - 0.75)  # protect Nyquist
-    data_filt = filt(sf, [.1, filt_fmax], data)
+    data_filt = filt(sf, [.1, filt_fmax], data,
+                     n_block=int(FILT_BLOCK_S * sf))
 
     # Compute relative delta band-power
     delta_nfpow = morlet_power(data_filt, [fmin, fmax, 8, 12, 16, 30], sf,
@@ -867,3 +881,335 @@ def peakdetect(sf, y_axis, x_axis=None, lookahead=200, delta=1., get='max',
         return index, number, density
     else:
         return np.array([]), 0., 0.
+
+
+###########################################################################
+# ONLINE DETECTION
+###########################################################################
+
+
+class _OnlineDetector(object):
+    """Base class of online detectors.
+
+    Online detectors consume successive chunks of a single channel, without
+    the entire recording. Filters are causal and their state is kept between
+    chunks. Candidate events are tracked across chunks and emitted as soon
+    as they can't be extended anymore (i.e at most tmax + min_distance_ms
+    after their beginning, plus the duration of a chunk).
+
+    Sub-classes implement the _supra method that returns, for each sample of
+    a chunk, if the sample belongs to a candidate event and if it satisfies
+    the detection criterion (a candidate is kept if at least one of its
+    samples satisfies the criterion).
+    """
+
+    # Split candidates longer than tmax instead of rejecting them :
+    _split = False
+
+    def __init__(self, sf, tmin, tmax, min_distance_ms=0., warmup=0.):
+        """Init."""
+        self.sf = float(sf)
+        self._tmin = tmin * self.sf / 1000.
+        self._tmax = np.inf if tmax is None else tmax * self.sf / 1000.
+        self._min_dist = min_distance_ms * self.sf / 1000.
+        self._warmup = int(round(warmup * self.sf))
+        self._zi = {}
+        # Open and pending candidates as [start, stop, keep, min, max, valid]
+        # (stop excluded) :
+        self._run = self._pending = None
+        self.n_samples = self.n_events = 0
+
+    def _supra(self, x):
+        """Get candidate and criterion samples of a chunk."""
+        raise NotImplementedError
+
+    def _accept(self, event):
+        """Additional criterion applied to a candidate event."""
+        return True
+
+    def _filter(self, name, sos, x):
+        """Causal filtering (the state is kept between chunks)."""
+        if name not in self._zi:
+            self._zi[name] = sosfilt_zi(sos) * x[0]
+        y, self._zi[name] = sosfilt(sos, x, zi=self._zi[name])
+        return y
+
+    def _smooth(self, name, x, tau, unbiased=False):
+        """Exponential moving average (time constant tau in seconds)."""
+        alpha = 1. - np.exp(-1. / (tau * self.sf))
+        zi = self._zi.get(name, np.zeros((1,)))
+        y, self._zi[name] = lfilter([alpha], [1., alpha - 1.], x, zi=zi)
+        if unbiased:  # correct the initialization with zeros
+            n = self.n_samples + np.arange(1, len(x) + 1)
+            y /= -np.expm1(n * np.log1p(-alpha))
+        return y
+
+    def _running_stats(self, name, x, tau):
+        """Running mean and deviation with exponential forgetting."""
+        mean = self._smooth(name + '_mean', x, tau, True)
+        var = self._smooth(name + '_sq', x ** 2, tau, True) - mean ** 2
+        return mean, np.sqrt(np.maximum(var, 0.))
+
+    def _emit(self, event):
+        """Get the (start, stop) of an event if it is kept."""
+        dur = event[1] - 1 - event[0]
+        is_dur = (dur > self._tmin) and (self._split or dur < self._tmax)
+        if event[2] and event[5] and is_dur and self._accept(event):
+            self.n_events += 1
+            return [(event[0], event[1] - 1)]
+        return []
+
+    def _extend(self, run, x, keep, start, stop):
+        """Extend a candidate with the samples [start, stop[ of a chunk."""
+        if stop > start:
+            run[1:5] = [self.n_samples + stop,
+                        run[2] or bool(keep[start:stop].any()),
+                        min(run[3], x[start:stop].min()),
+                        max(run[4], x[start:stop].max())]
+
+    def _close(self, run):
+        """Close a candidate (merged with close candidates)."""
+        events, pending = [], self._pending
+        if (pending is not None) and (run[0] - pending[1] < self._min_dist):
+            run = [pending[0], run[1], pending[2] or run[2],
+                   min(pending[3], run[3]), max(pending[4], run[4]),
+                   pending[5] and run[5]]
+        elif pending is not None:
+            events += self._emit(pending)
+        self._pending = run
+        return events
+
+    def update(self, x):
+        """Process a chunk of data.
+
+        Parameters
+        ----------
+        x : array_like
+            Chunk of data of shape (n_samples,).
+
+        Returns
+        -------
+        index : array_like
+            Array of shape (n_events, 2) with the (start, end) index of
+            events that are finished. Indices are counted from the first
+            processed sample.
+        """
+        x = np.asarray(x, dtype=float).ravel()
+        if not x.size:
+            return np.zeros((0, 2), dtype=int)
+        above, keep = self._supra(x)
+        # No detection until running statistics are reliable :
+        if self.n_samples < self._warmup:
+            above[0:self._warmup - self.n_samples] = False
+        # Find where candidates start / end (an open candidate continues) :
+        n0, events = self.n_samples, []
+        is_open = self._run is not None
+        d = np.diff(np.r_[is_open, above].astype(np.int8))
+        starts = list(np.flatnonzero(d == 1))
+        stops = list(np.flatnonzero(d == -1))
+        if is_open:
+            starts.insert(0, 0)
+        split = self._split and np.isfinite(self._tmax)
+        n_max = int(np.ceil(self._tmax)) if split else 0
+        for k, s in enumerate(starts):
+            e = stops[k] if k < len(stops) else x.size
+            if (k == 0) and is_open:
+                run = self._run
+            else:
+                run = [n0 + s, n0 + s, False, np.inf, -np.inf, True]
+            # Split long candidates (at fixed durations) :
+            while split and (n0 + e - run[0] > n_max):
+                cut = run[0] + n_max - n0
+                self._extend(run, x, keep, s, cut)
+                events += self._close(run)
+                s, run = cut, [n0 + cut, n0 + cut, False, np.inf, -np.inf,
+                               True]
+            self._extend(run, x, keep, s, e)
+            self._run = None if k < len(stops) else run
+            if k < len(stops):
+                events += self._close(run)
+        self.n_samples += x.size
+        # Reject too long candidates (split candidates are already bounded) :
+        run = self._run
+        if (run is not None) and not self._split and (
+                run[1] - run[0] >= self._tmax):
+            run[5] = False
+        # Emit the pending candidate if it can't be merged anymore :
+        pending = self._pending
+        if (pending is not None) and (self.n_samples - pending[1] >=
+                                      self._min_dist) and (
+                (self._run is None) or (self._run[0] - pending[1] >=
+                                        self._min_dist)):
+            events += self._emit(pending)
+            self._pending = None
+        return np.array(events, dtype=int).reshape(-1, 2)
+
+    def flush(self):
+        """Emit remaining candidates (at the end of the stream).
+
+        Returns
+        -------
+        index : array_like
+            Array of shape (n_events, 2) with the (start, end) index of
+            events.
+        """
+        events = []
+        if self._run is not None:
+            events += self._close(self._run)
+            self._run = None
+        if self._pending is not None:
+            events += self._emit(self._pending)
+            self._pending = None
+        return np.array(events, dtype=int).reshape(-1, 2)
+
+    def run(self, data, n_chunk=None):
+        """Detect events of an entire signal, chunk by chunk.
+
+        The signal (e.g a memory-mapped array) is never entirely loaded.
+
+        Parameters
+        ----------
+        data : array_like
+            Signal of shape (n_pts,).
+        n_chunk : int | None
+            Number of samples per chunk. If None, 30 seconds chunks are used.
+
+        Returns
+        -------
+        index : array_like
+            Array of shape (n_events, 2) with the (start, end) index of
+            events.
+        """
+        n_chunk = int(round(30. * self.sf)) if n_chunk is None else n_chunk
+        events = [self.update(data[k:k + n_chunk]) for k in range(
+            0, len(data), n_chunk)]
+        return np.concatenate(events + [self.flush()])
+
+
+class OnlineSpindles(_OnlineDetector):
+    """Online sleep spindles detection.
+
+    Online variant of spindlesdetect. The envelope of the sigma band is
+    compared to a hard threshold (mean + threshold * std of the envelope)
+    and to a soft threshold (half of the hard threshold). The mean and
+    deviation are running statistics with exponential forgetting. Spindles
+    are periods above the soft threshold containing at least one sample
+    above the hard threshold with a relative sigma power above sigma_thr.
+
+    Parameters
+    ----------
+    sf : float
+        The sampling frequency.
+    threshold : float
+        Number of standard deviation to use as threshold.
+    fmin : float | 12
+        Lower bandpass frequency.
+    fmax : float | 14
+        Higher bandpass frequency.
+    tmin : float | 300
+        Minimum duration (ms) of spindles.
+    tmax : float | 3000
+        Maximum duration (ms) of spindles.
+    min_distance_ms : int | 300
+        Minimum distance (in ms) between two spindles to consider them as
+        two distinct spindles.
+    sigma_thr : float | 0.2
+        Sigma band-wise normalized power threshold (between 0 and 1).
+    memory : float | 300.
+        Time constant (in seconds) of the running statistics.
+    warmup : float | 30.
+        Duration (in seconds) at the beginning of the stream without
+        detection (statistics are not reliable yet).
+    """
+
+    def __init__(self, sf, threshold, fmin=12., fmax=14., tmin=300,
+                 tmax=3000, min_distance_ms=300, sigma_thr=.2, memory=300.,
+                 warmup=30.):
+        """Init."""
+        _OnlineDetector.__init__(self, sf, tmin, tmax, min_distance_ms,
+                                 warmup)
+        self.threshold, self.sigma_thr = threshold, sigma_thr
+        self.memory = memory
+        # Same bands as spindlesdetect (the last one is the sigma band) :
+        freqs = np.array([.5, 4., 8., fmin, fmax]) / (self.sf / 2.)
+        self._sos = [butter(2, [freqs[k], freqs[k + 1]], 'bandpass',
+                            output='sos') for k in range(len(freqs) - 1)]
+
+    def _supra(self, x):
+        """Get samples above the soft and hard thresholds."""
+        xf = [self._filter('band%i' % k, sos, x) for k, sos in enumerate(
+            self._sos)]
+        # Relative sigma power (smoothed over tmin) :
+        tau = self._tmin / self.sf
+        xpow = [self._smooth('pow%i' % k, np.square(b), tau) for k, b in
+                enumerate(xf)]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sigma_npow = xpow[-1] / np.sum(xpow, 0)
+        # Envelope of the sigma band and thresholds :
+        amplitude = np.sqrt(2. * self._smooth('env', np.square(xf[-1]), .1))
+        mean, std = self._running_stats('amp', amplitude, self.memory)
+        hard_thr = mean + self.threshold * std
+        keep = (amplitude > hard_thr) & (sigma_npow > self.sigma_thr)
+        return amplitude > .5 * hard_thr, keep
+
+
+class OnlineSlowWaves(_OnlineDetector):
+    """Online slow waves detection.
+
+    Online variant of slowwavedetect. The relative delta power is the ratio
+    between the power of the delta band and the power of every band, each
+    one being smoothed using an exponential moving average. Periods with a
+    relative delta power above the threshold, with a duration above tmin
+    and an amplitude between min_amp and max_amp are detected. To bound the
+    latency, periods longer than tmax are emitted as several events.
+
+    Parameters
+    ----------
+    sf : float
+        The sampling frequency.
+    threshold : float
+        Bandwise-normalized delta power threshold (between 0 and 1).
+    min_amp : float | 70.
+        Minimum amplitude (uV) of the raw signal.
+    max_amp : float | 400.
+        Maximum amplitude of slow wave.
+    tmin : float | 1000.
+        Minimum duration (ms) of slow waves.
+    tmax : float | 30000.
+        Maximum duration (ms) of an emitted slow waves period. If None,
+        periods are not split (the latency is not bounded).
+    fmin : float | .5
+        High-pass frequency.
+    fmax : float | 4.
+        Low-pass frequency.
+    smoothing_s : float | 20
+        Smoothing window in seconds (the time constant of the moving average
+        is smoothing_s / 2).
+    """
+
+    _split = True
+
+    def __init__(self, sf, threshold, min_amp=70., max_amp=400., tmin=1000.,
+                 tmax=30000., fmin=.5, fmax=4., smoothing_s=20):
+        """Init."""
+        _OnlineDetector.__init__(self, sf, tmin, tmax)
+        self.threshold, self.smoothing_s = threshold, smoothing_s
+        self.min_amp, self.max_amp = min_amp, max_amp
+        # Same bands as slowwavedetect (limited by the Nyquist frequency) :
+        freqs = np.array([fmin, fmax, 8., 12., 16., 30.]) / (self.sf / 2.)
+        freqs = freqs[freqs < .95]
+        self._sos = [butter(2, [freqs[k], freqs[k + 1]], 'bandpass',
+                            output='sos') for k in range(len(freqs) - 1)]
+
+    def _supra(self, x):
+        """Get samples with a relative delta power above the threshold."""
+        xpow = [self._smooth('pow%i' % k, np.square(self._filter(
+            'band%i' % k, sos, x)), self.smoothing_s / 2.) for k, sos in
+            enumerate(self._sos)]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            is_supra = xpow[0] / np.sum(xpow, 0) > self.threshold
+        return is_supra, is_supra
+
+    def _accept(self, event):
+        """Check the amplitude of the slow waves period."""
+        return self.min_amp < event[4] - event[3] < self.max_amp
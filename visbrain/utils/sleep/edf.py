@@ -198,7 +198,7 @@ class Edf:
 
         return dat
 
-    def return_dat(self, chan, begsam, endsam):
+    def return_dat(self, chan, begsam, endsam, dtype='float64'):
         """Read data from an EDF file.
 
         Reads channel by channel, and adjusts the values by calibration.
@@ -211,6 +211,10 @@ class Edf:
             index of the first sample
         endsam : int
             index of the last sample
+        dtype : str | 'float64'
+            floating point type of the returned data. The calibration is
+            performed inplace so that no temporary array of another type is
+            created.
 
         Returns
         -------
@@ -229,11 +233,13 @@ class Edf:
 
         gain = phys_range / dig_range
 
-        dat = empty(shape=(len(chan), endsam - begsam), dtype='float64')
+        dat = empty(shape=(len(chan), endsam - begsam), dtype=dtype)
 
         for i, i_chan in enumerate(chan):
-            d = self._read_dat(i, begsam, endsam).astype('float64')
-            dat[i, :] = (d - dig_min[i]) * gain[i] + phys_min[i]
+            dat[i, :] = self._read_dat(i, begsam, endsam)
+            dat[i, :] -= dig_min[i]
+            dat[i, :] *= gain[i]
+            dat[i, :] += phys_min[i]
 
         return dat
 
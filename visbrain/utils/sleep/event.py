@@ -2,7 +2,7 @@
 
 import numpy as np
 
-__all__ = ('_events_distance_fill', '_events_to_index', '_index_to_events')
+__all__ = ('event_coincidence',)
 
 
 def _events_distance_fill(index, min_distance_ms, sf):
@@ -60,20 +60,94 @@ def _events_to_index(x):
     return np.array([[k[0], k[-1]] for k in sp]).astype(int)
 
 
-def _index_to_events(x):
+def _index_to_events(x, connect=False):
     """Convert a 2D (start, end) array into a continuous one.
 
     Parameters
     ----------
     x : array_like
         2D array of indicies.
+    connect : bool | False
+        Return the connection vector of the events (False for the last
+        index of each event).
 
     Returns
     -------
     index : array_like
         Continuous array of indicies.
+    connect : array_like
+        Connection vector (only if connect is True).
     """
-    index = np.array([])
-    for k in range(x.shape[0]):
-        index = np.append(index, np.arange(x[k, 0], x[k, 1] + 1))
-    return index.astype(int)
+    x = np.asarray(x, dtype=int).reshape(-1, 2)
+    length = x[:, 1] - x[:, 0] + 1
+    # Shift of each index relatively to the start of its event :
+    offset = np.arange(length.sum()) - np.repeat(np.cumsum(length) - length,
+                                                 length)
+    index = np.repeat(x[:, 0], length) + offset
+    if connect:
+        con = np.ones(len(index), dtype=bool)
+        con[np.cumsum(length) - 1] = False
+        return index, con
+    return index
+
+
+def event_coincidence(index, sf=1., tolerance=0.):
+    """Find events co-occurring across channels.
+
+    Events of every channel are sorted by their starting point and swept in
+    order. An event joins the current cluster if it starts before the end of
+    the cluster (i.e the latest end of its events), otherwise it starts a new
+    cluster. Hence, a cluster is a group of (transitively) overlapping events
+    and the complexity is O(n_events * log(n_events)).
+
+    Parameters
+    ----------
+    index : dict
+        Events of each channel as {channel: array} where each array has a
+        shape of (n_events, 2) and contains the (start, end) sample of each
+        event (e.g detections of a single type).
+    sf : float | 1.
+        Sampling frequency used to convert samples into seconds.
+    tolerance : float | 0.
+        Maximum gap (in seconds) between an event and the end of the cluster
+        for the event to join the cluster.
+
+    Returns
+    -------
+    coinc : dict
+        Dictionary of arrays of shape (n_events,) sorted by cluster then by
+        starting point :
+
+            * 'cluster' : index of the cluster.
+            * 'channel' : channel of the event.
+            * 'event' : row of the event in the index of its channel.
+            * 'start', 'end' : start and end of the event (in seconds).
+            * 'lag' : delay between the start of the event and the start of
+              the cluster (in seconds).
+            * 'n_channels' : number of channels involved in the cluster
+              (i.e 1 for a local event).
+    """
+    chans = list(index.keys())
+    idx = [np.asarray(index[k]).reshape(-1, 2) for k in chans]
+    n_events = [len(k) for k in idx]
+    events = np.concatenate(idx + [np.zeros((0, 2))]).astype(float) / sf
+    chan = np.repeat(np.arange(len(chans)), n_events)
+    row = np.concatenate([np.arange(k) for k in n_events] + [[]]).astype(int)
+    # Sweep line (by starting point) :
+    order = np.lexsort((events[:, 1], events[:, 0]))
+    events, chan, row = events[order, :], chan[order], row[order]
+    reach = np.maximum.accumulate(events[:, 1]) + tolerance
+    is_new = np.ones((len(events),), dtype=bool)
+    is_new[1:] = events[1:, 0] > reach[:-1]
+    cluster = np.cumsum(is_new) - 1
+    # Number of distinct channels per cluster :
+    pairs = np.unique(cluster * len(chans) + chan)
+    n_chan = np.bincount(pairs // max(len(chans), 1),
+                         minlength=is_new.sum()).astype(int)
+    names = np.empty((len(chans),), dtype=object)
+    names[:] = chans
+    coinc = {'cluster': cluster, 'channel': names[chan], 'event': row}
+    coinc['start'], coinc['end'] = events[:, 0], events[:, 1]
+    coinc['lag'] = events[:, 0] - events[is_new, 0][cluster]
+    coinc['n_channels'] = n_chan[cluster]
+    return coinc
@@ -0,0 +1,431 @@
+"""Per-epoch and per-channel features of whole-night recordings.
+
+A recording of shape (n_channels, n_times) is split into consecutive epochs
+(e.g 30 seconds) and each epoch of each channel is summarized by a set of
+features (band powers, variance, line length...). Features are computed by
+chunks of epochs using vectorized operations and are stored as float32
+arrays of shape (n_channels, n_epochs) so that a whole night only takes a
+few kilobytes per feature. Panels that need a per-window summary of the
+data can then read the table instead of recomputing it. The artifact
+screening (see epoch_artifacts) reads the variance, line length and band
+powers from the same table.
+"""
+import logging
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+from scipy.signal import get_window
+try:  # scipy >= 1.4 keeps single precision
+    from scipy.fft import rfft
+except ImportError:
+    from numpy.fft import rfft
+
+logger = logging.getLogger('visbrain')
+
+__all__ = ('EPOCH_BANDS', 'epoch_features', 'epoch_artifacts',
+           'EpochFeatures')
+
+EPOCH_BANDS = {'delta': (.5, 4.), 'theta': (4., 8.), 'alpha': (8., 12.),
+               'sigma': (12., 16.), 'beta': (16., 30.), 'gamma': (30., 100.)}
+
+
+def _epoch_psd(x, sf, nperseg, noverlap=0):
+    """Welch power spectral density of each epoch.
+
+    Parameters
+    ----------
+    x : array_like
+        Array of shape (..., n_samples).
+    sf : float
+        The sampling frequency.
+    nperseg : int
+        Number of samples per segment.
+    noverlap : int | 0
+        Number of overlapping samples between two consecutive segments.
+
+    Returns
+    -------
+    freqs : array_like
+        The frequency vector of shape (n_freqs,).
+    psd : array_like
+        Power spectral density of shape (..., n_freqs).
+    """
+    x = np.asarray(x)
+    step = nperseg - noverlap
+    n_seg = (x.shape[-1] - noverlap) // step
+    # Segments are a strided view of epochs :
+    strides = x.strides[:-1] + (step * x.strides[-1], x.strides[-1])
+    seg = as_strided(x, x.shape[:-1] + (n_seg, nperseg), strides,
+                     writeable=False)
+    seg = seg - seg.mean(-1, keepdims=True)
+    win = get_window('hann', nperseg).astype(seg.dtype)
+    spec = rfft(seg * win, axis=-1)
+    psd = (spec.real ** 2 + spec.imag ** 2).mean(-2) / (sf * (win ** 2).sum())
+    psd[..., 1:-1 if not nperseg % 2 else None] *= 2.
+    return np.fft.rfftfreq(nperseg, 1. / sf), psd
+
+
+def _iter_epochs(data, n_epoch, n_chunk, partial=True):
+    """Iterate over chunks of epochs of a (n_channels, n_times) array.
+
+    Complete epochs are strided views of shape (n_channels, n_epochs,
+    n_epoch) (no copy). If partial is True, the last incomplete epoch (if it
+    contains more than one sample) is returned separately.
+
+    Yields
+    ------
+    sl : slice
+        Slice of the epochs.
+    x : array_like
+        Data of the epochs of shape (n_channels, n_epochs, n_samples).
+    """
+    n_chan, n_times = data.shape
+    n_full = n_times // n_epoch
+    if isinstance(data, np.ndarray):
+        view = as_strided(data, (n_chan, n_full, n_epoch), (
+            data.strides[0], n_epoch * data.strides[1], data.strides[1]),
+            writeable=False)
+    for k in range(0, n_full, n_chunk):
+        sl = slice(k, min(k + n_chunk, n_full))
+        if isinstance(data, np.ndarray):
+            yield sl, view[:, sl, :]
+        else:  # data read by chunks (e.g MontagedData)
+            x = data[:, sl.start * n_epoch:sl.stop * n_epoch]
+            yield sl, x.reshape(n_chan, -1, n_epoch)
+    if partial and (n_times - n_full * n_epoch > 1):
+        yield slice(n_full, None), data[:, n_full * n_epoch:][:, np.newaxis]
+
+
+def _robust_zscore(x):
+    """Robust z-score (median / MAD) of a (n_channels, n_epochs) array."""
+    med = np.nanmedian(x, axis=1, keepdims=True)
+    mad = 1.4826 * np.nanmedian(np.abs(x - med), axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (x - med) / mad
+    z[~np.isfinite(z)] = 0.
+    return z
+
+
+def _epoch_features(x, sf, bands, nperseg, edge):
+    """Compute features of epochs of shape (n_chan, n_epochs, n_samples)."""
+    feat = {}
+    nperseg = min(nperseg, x.shape[-1])
+    freqs, psd = _epoch_psd(x, sf, nperseg)
+    df = freqs[1] - freqs[0] if len(freqs) > 1 else 1.
+    # Absolute and relative band powers :
+    fmin = min([k[0] for k in bands.values()])
+    fmax = max([k[1] for k in bands.values()])
+    total = psd[..., (freqs >= fmin) & (freqs < fmax)].sum(-1) * df
+    for name, (f_start, f_end) in bands.items():
+        is_band = (freqs >= f_start) & (freqs < f_end)
+        feat['abs_' + name] = psd[..., is_band].sum(-1) * df
+    for name in bands.keys():
+        with np.errstate(divide='ignore', invalid='ignore'):
+            feat['rel_' + name] = feat['abs_' + name] / total
+    # Time-domain features :
+    feat['var'] = x.var(-1)
+    feat['line_length'] = np.abs(np.diff(x, axis=-1)).sum(-1)
+    xm = x - x.mean(-1, keepdims=True)
+    n_zc = (np.signbit(xm[..., 1:]) != np.signbit(xm[..., :-1])).sum(-1)
+    feat['zcr'] = n_zc * sf / x.shape[-1]
+    # Spectral edge frequency :
+    cum = np.cumsum(psd, axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cum /= cum[..., [-1]]
+    feat['sef'] = freqs[np.minimum((cum < edge).sum(-1), len(freqs) - 1)]
+    return feat
+
+
+def epoch_features(data, sf, n_epoch, bands=None, nperseg=None, edge=.95,
+                   n_chunk=64):
+    """Compute per-epoch features of a multichannel recording.
+
+    Features are :
+
+        * abs_<band> : absolute power in each band (Welch method).
+        * rel_<band> : relative power (absolute power divided by the power
+          between the lowest and highest band limits).
+        * var : variance.
+        * line_length : sum of absolute differences between samples.
+        * zcr : zero-crossing rate (Hz) of the de-meaned epoch.
+        * sef : spectral edge frequency (frequency below which the edge
+          proportion of the power is located).
+
+    Parameters
+    ----------
+    data : array_like
+        Array of data of shape (n_channels, n_times).
+    sf : float
+        The sampling frequency.
+    n_epoch : int
+        Number of samples per epoch. The last epoch can be shorter.
+    bands : dict | None
+        Frequency bands as {name: (f_start, f_end)}. If None, EPOCH_BANDS is
+        used.
+    nperseg : int | None
+        Number of samples per segment for the Welch method. If None, segments
+        of 4 seconds are used.
+    edge : float | .95
+        Proportion of the power used for the spectral edge frequency.
+    n_chunk : int | 64
+        Number of epochs computed at once.
+
+    Returns
+    -------
+    features : EpochFeatures
+        The feature table.
+    """
+    bands = EPOCH_BANDS if bands is None else bands
+    nperseg = int(4 * sf) if nperseg is None else int(nperseg)
+    n_epoch = int(n_epoch)
+    assert (data.ndim == 2) and (n_epoch > 1) and (nperseg > 1)
+    n_chan, n_times = data.shape
+    features = EpochFeatures(sf, n_epoch, n_times)
+    table = {}
+
+    for sl, x in _iter_epochs(data, n_epoch, n_chunk):
+        for name, val in _epoch_features(x, sf, bands, nperseg,
+                                         edge).items():
+            if name not in table:
+                table[name] = np.full((n_chan, len(features)), np.nan,
+                                      dtype=np.float32)
+            table[name][:, sl] = val
+    for name, val in table.items():
+        features.add(name, val)
+    logger.debug("%i features computed on %i epochs" % (
+        len(table), len(features)))
+    return features
+
+
+def epoch_artifacts(data, sf, n_epoch, flat=1e-3, clip=.01, z_thr=5.,
+                    hf=30., n_chunk=64, features=None, bands=None):
+    """Flag artifacted epochs of a multichannel recording.
+
+    Each channel is compared with its own distribution across epochs. Epochs
+    are flagged when :
+
+        * flat : the variance is lower than flat times the median variance
+          of the channel.
+        * clip : the proportion of samples at the minimum or maximum of the
+          channel (i.e amplitude clipping) exceeds clip.
+        * var / line_length : the robust z-score (median and median absolute
+          deviation of log values) of the variance or line length exceeds
+          z_thr.
+        * hf : the robust z-score of the ratio between the power of bands
+          starting above hf and the power of every band exceeds z_thr.
+
+    The variance, line length and band powers are read from the per-epoch
+    features of the recording (see epoch_features). Only the clipping
+    criterion requires a pass over the data.
+
+    Parameters
+    ----------
+    data : array_like
+        Array of data of shape (n_channels, n_times).
+    sf : float
+        The sampling frequency.
+    n_epoch : int
+        Number of samples per epoch. The last epoch is never flagged if it
+        is incomplete.
+    flat : float | 1e-3
+        Variance ratio below which an epoch is flat.
+    clip : float | .01
+        Proportion of clipped samples above which an epoch is flagged.
+    z_thr : float | 5.
+        Robust z-score threshold.
+    hf : float | 30.
+        Frequency (Hz) above which the power is considered as high
+        frequency. This criterion is ignored if hf is above sf / 2 or if no
+        band starts above hf.
+    n_chunk : int | 64
+        Number of epochs computed at once.
+    features : EpochFeatures | None
+        Features of data computed with the same n_epoch and bands (see
+        epoch_features). If None, features are computed.
+    bands : dict | None
+        Frequency bands of features. If None, EPOCH_BANDS is used.
+
+    Returns
+    -------
+    bad : array_like
+        Boolean array of shape (n_channels, n_epochs) where True refers to
+        an artifacted epoch.
+    reasons : dict
+        Boolean array of shape (n_channels, n_epochs) for each criterion.
+    """
+    n_epoch = int(n_epoch)
+    assert (data.ndim == 2) and (n_epoch > 1)
+    bands = EPOCH_BANDS if bands is None else bands
+    n_chan, n_times = data.shape
+    if features is None:
+        features = epoch_features(data, sf, n_epoch, bands, n_chunk=n_chunk)
+    assert (features.n_epoch == n_epoch) and (features.n_times == n_times)
+    n_ep, n_full = len(features), n_times // n_epoch
+    hf_bands = [k for k, (f_start, _) in bands.items() if f_start >= hf]
+    use_hf = (hf < sf / 2.) and bool(hf_bands)
+    names = ['var', 'line_length', 'clip'] + (['hf'] if use_hf else [])
+    metrics = {k: np.full((n_chan, n_ep), np.nan) for k in names}
+    # Features of complete epochs :
+    full = slice(0, n_full)
+    metrics['var'][:, full] = features['var'][:, full]
+    metrics['line_length'][:, full] = features['line_length'][:, full]
+    if use_hf:
+        power = {k: features['abs_' + k][:, full] for k in bands}
+        high = np.sum([power[k] for k in hf_bands], 0, dtype=float)
+        total = np.sum(list(power.values()), 0, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            metrics['hf'][:, full] = high / total
+    # Clipping (single pass over complete epochs) :
+    if isinstance(data, np.ndarray):
+        d_min, d_max = data.min(1), data.max(1)
+    else:  # data read by chunks (e.g MontagedData)
+        d_min, d_max = np.full((n_chan,), np.inf), np.full((n_chan,), -np.inf)
+        for sl, x in _iter_epochs(data, n_epoch, n_chunk):
+            d_min = np.minimum(d_min, x.min(axis=(1, 2)))
+            d_max = np.maximum(d_max, x.max(axis=(1, 2)))
+    for sl, x in _iter_epochs(data, n_epoch, n_chunk, partial=False):
+        is_clip = (x >= d_max[:, np.newaxis, np.newaxis]) | (
+            x <= d_min[:, np.newaxis, np.newaxis])
+        metrics['clip'][:, sl] = is_clip.mean(-1)
+    # Robust thresholds :
+    reasons = {}
+    var = metrics['var']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        reasons['flat'] = var <= flat * np.nanmedian(var, 1, keepdims=True)
+        reasons['clip'] = metrics['clip'] > clip
+        for name in [k for k in names if k != 'clip']:
+            val = np.log(metrics[name])
+            val[np.isinf(val)] = np.nan
+            reasons[name] = _robust_zscore(val) > z_thr
+    bad = np.any(list(reasons.values()), axis=0)
+    logger.debug("%i / %i epochs flagged as artifacts" % (bad.sum(),
+                                                          bad.size))
+    return bad, reasons
+
+
+class EpochFeatures(object):
+    """Table of per-epoch and per-channel features.
+
+    Parameters
+    ----------
+    sf : float
+        The sampling frequency.
+    n_epoch : int
+        Number of samples per epoch.
+    n_times : int
+        Number of time points of the recording.
+    """
+
+    def __init__(self, sf, n_epoch, n_times):
+        """Init."""
+        assert n_epoch > 0 and n_times > 0
+        self.sf, self.n_epoch, self.n_times = sf, int(n_epoch), int(n_times)
+        self._features = {}
+
+    def __len__(self):
+        """Return the number of epochs."""
+        return -(-self.n_times // self.n_epoch)
+
+    def __contains__(self, name):
+        """Return if a feature exists."""
+        return name in self._features
+
+    def __getitem__(self, name):
+        """Get a feature of shape (n_channels, n_epochs)."""
+        return self._features[name]
+
+    @property
+    def names(self):
+        """Get the name of each feature."""
+        return list(self._features.keys())
+
+    @property
+    def nbytes(self):
+        """Get the number of bytes used by features."""
+        return sum([k.nbytes for k in self._features.values()])
+
+    @property
+    def starts(self):
+        """Get the index where each epoch starts."""
+        return np.arange(len(self)) * self.n_epoch
+
+    def add(self, name, values):
+        """Add a feature.
+
+        Parameters
+        ----------
+        name : string
+            Name of the feature.
+        values : array_like
+            Feature of shape (n_channels, n_epochs).
+        """
+        values = np.asarray(values, dtype=np.float32)
+        assert values.ndim == 2 and values.shape[1] == len(self)
+        self._features[name] = values
+
+    def remove(self, name=None):
+        """Remove a feature (or every feature if name is None)."""
+        if name is None:
+            self._features.clear()
+        else:
+            self._features.pop(name, None)
+
+    def mean(self, name, start, stop):
+        """Mean of a feature inside a window of samples.
+
+        Each epoch is weighted by its number of samples inside the window.
+        Hence, the result is exact for windows aligned with epochs.
+
+        Parameters
+        ----------
+        name : string
+            Name of the feature.
+        start, stop : int
+            Window of samples [start, stop[.
+
+        Returns
+        -------
+        mean : array_like
+            Mean of each channel of shape (n_channels,).
+        """
+        stop = min(stop, self.n_times)
+        assert 0 <= start < stop
+        e_start, e_stop = start // self.n_epoch, -(-stop // self.n_epoch)
+        starts = self.starts[e_start:e_stop]
+        weights = np.minimum(starts + self.n_epoch, stop) - np.maximum(
+            starts, start)
+        values = self._features[name][:, e_start:e_stop].astype(np.float64)
+        return (values * weights).sum(1) / weights.sum()
+
+    def save(self, path):
+        """Save features.
+
+        Parameters
+        ----------
+        path : string
+            Path to the .npz file.
+        """
+        info = np.array([self.sf, self.n_epoch, self.n_times])
+        np.savez(path, *self._features.values(), _info=info,
+                 _names=np.array(self.names))
+
+    @classmethod
+    def load(cls, path):
+        """Load features saved using the save method.
+
+        Parameters
+        ----------
+        path : string
+            Path to the .npz file.
+
+        Returns
+        -------
+        features : EpochFeatures
+            The feature table.
+        """
+        arch = np.load(path)
+        sf, n_epoch, n_times = arch['_info']
+        features = cls(sf, n_epoch, n_times)
+        for k, name in enumerate(arch['_names']):
+            features.add(str(name), arch['arr_%i' % k])
+        return features
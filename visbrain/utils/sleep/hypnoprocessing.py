@@ -1,8 +1,11 @@
 """Hypnogram related functions."""
 
 import numpy as np
+from numpy.lib.stride_tricks import as_strided
 
-__all__ = ('transient', 'sleepstats')
+from .features import _epoch_psd
+
+__all__ = ('transient', 'sleepstats', 'stage_psd', 'StageRuns')
 
 
 def transient(data, xvec=None):
@@ -10,7 +13,7 @@ def transient(data, xvec=None):
 
     Parameters
     ----------
-    data : array_like
+    data : array_like | StageRuns
         The hypnogram data.
     xvec : array_like | None
         The time vector to use. If None, np.arange(len(data)) will be used
@@ -26,6 +29,9 @@ def transient(data, xvec=None):
     stages : array_like
         The stages for each segment.
     """
+    if isinstance(data, StageRuns):
+        st, stages = data.transient(xvec)
+        return data.starts[1:] - 1, st, stages
     # Transient detection :
     t = list(np.nonzero(np.abs(data[:-1] - data[1:]))[0])
     # Add first and last points :
@@ -43,7 +49,7 @@ def transient(data, xvec=None):
     return np.array(t), st, stages.astype(int)
 
 
-def sleepstats(hypno, sf_hyp):
+def sleepstats(hypno, sf_hyp, extended=False):
     """Compute sleep stats from an hypnogram vector.
 
     Sleep statistics specifications:
@@ -70,60 +76,587 @@ def sleepstats(hypno, sf_hyp):
 
     - Latencies: latencies of sleep stages from the beginning of the record.
 
+    Extended statistics (if extended is True):
+
+    - Trans_X_Y: number of transitions from stage X to stage Y.
+
+    - Bouts_X, BoutMean_X, BoutMedian_X, BoutMax_X: number of bouts of
+      stage X and distribution of their duration.
+
+    - Shifts: number of stage shifts. SSI (stage shift index): number of
+      stage shifts per hour of TST.
+
+    - Awakenings: number of transitions from sleep to wake. AI (awakening
+      index): number of awakenings per hour of TST.
+
+    - SFI (sleep fragmentation index): number of transitions from sleep to
+      wake or from N2, N3, REM to N1 per hour of TST.
+
     ======================================================================
 
+    Statistics are computed from runs of consecutive stages (see
+    StageRuns).
+
     Parameters
     ----------
-    hypno : array_like
+    hypno : array_like | StageRuns
         Hypnogram vector
     sf_hyp : float
-        The sampling frequency of the hypnogram
+        The sampling frequency of the hypnogram (ignored if hypno is a
+        StageRuns instance)
+    extended : bool | False
+        Add transitions, bouts and fragmentation statistics.
 
     Returns
     -------
     stats: dict
         Sleep statistics (expressed in minutes)
     """
-    stats = {}
-    tov = np.nan
-
-    # Downsample to 1 value per second
-    hypno = hypno[::int(sf_hyp)]
-
-    stats['TIB'] = len(hypno)
-    stats['TDT'] = np.where(hypno != 0)[0].max() if np.nonzero(
-        hypno)[0].size else tov
-
-    # Duration of each sleep stages
-    stats['Art'] = hypno[hypno == -1].size
-    stats['W'] = hypno[hypno == 0].size
-    stats['N1'] = hypno[hypno == 1].size
-    stats['N2'] = hypno[hypno == 2].size
-    stats['N3'] = hypno[hypno == 3].size
-    stats['REM'] = hypno[hypno == 4].size
-
-    # Sleep stage latencies
-    stats['LatN1'] = np.where(hypno == 1)[0].min() if 1 in hypno else tov
-    stats['LatN2'] = np.where(hypno == 2)[0].min() if 2 in hypno else tov
-    stats['LatN3'] = np.where(hypno == 3)[0].min() if 3 in hypno else tov
-    stats['LatREM'] = np.where(hypno == 4)[0].min() if 4 in hypno else tov
-
-    if not np.isnan(stats['LatN1']) and not np.isnan(stats['TDT']):
-        hypno_s = hypno[stats['LatN1']:stats['TDT']]
-
-        stats['SPT'] = hypno_s.size
-        stats['WASO'] = hypno_s[hypno_s == 0].size
-        stats['TST'] = stats['SPT'] - stats['WASO']
-    else:
-        stats['SPT'] = tov
-        stats['WASO'] = tov
-        stats['TST'] = tov
+    if not isinstance(hypno, StageRuns):
+        hypno = StageRuns(hypno, sf_hyp)
+    return hypno.sleepstats(extended)
+
+
+def stage_psd(data, sf, hypno, epoch=30., stages=(0, 1, 2, 3, 4),
+              nperseg=None, noverlap=None, n_times=None, n_chunk=32):
+    """Compute the power spectral density of each sleep stage.
 
-    # Convert to minutes
-    for key, value in stats.items():
-        stats[key] = value / 60
+    The recording is split into consecutive epochs and only epochs entirely
+    scored as a single stage are kept. Hence, artifacts (-1) are excluded
+    unless they are included in stages. Epochs are selected using a strided
+    view of the data (no copy) and the Welch power spectral density of every
+    channel is computed by batches of epochs. Only one batch is loaded in
+    memory at once.
 
-    stats['SE'] = np.round(stats['TST'] / stats['TDT'] * 100., 2)
-    stats['Units'] = 'minutes'
+    Parameters
+    ----------
+    data : array_like | callable
+        Array of data of shape (n_channels, n_times) (memory-mapped arrays
+        are only read by batches of epochs). Alternatively, a function
+        called as data(start, stop) that returns the data of shape
+        (n_channels, stop - start) can be used (see n_times).
+    sf : float
+        The sampling frequency of the data.
+    hypno : array_like | StageRuns
+        Hypnogram vector of shape (n_times,) or StageRuns hypnogram at any
+        sampling frequency (epochs are located using their time).
+    epoch : float | 30.
+        Duration of epochs (in seconds).
+    stages : tuple | (0, 1, 2, 3, 4)
+        Stages for which the power spectral density is computed.
+    nperseg : int | None
+        Number of samples per Welch segment. If None, segments of 4 seconds
+        are used.
+    noverlap : int | None
+        Number of overlapping samples between two consecutive segments. If
+        None, nperseg // 2 is used.
+    n_times : int | None
+        Number of time points (only needed if data is a function).
+    n_chunk : int | 32
+        Number of epochs per batch.
+
+    Returns
+    -------
+    freqs : array_like
+        The frequency vector of shape (n_freqs,).
+    psd : array_like
+        Mean power spectral density of each stage of shape
+        (n_stages, n_channels, n_freqs). Stages without epochs are filled
+        with NaN.
+    counts : array_like
+        Number of epochs of each stage of shape (n_stages,).
+    """
+    is_fcn = callable(data)
+    n_times = n_times if is_fcn else data.shape[1]
+    n_epoch = int(round(epoch * sf))
+    nperseg = min(int(4 * sf) if nperseg is None else int(nperseg), n_epoch)
+    noverlap = nperseg // 2 if noverlap is None else int(noverlap)
+    n_ep = n_times // n_epoch
+    assert n_ep > 0, "The recording should contain at least one epoch"
+    if not isinstance(hypno, StageRuns):
+        hypno = StageRuns(hypno, sf)
+    # Stage of epochs entirely covered by a single run :
+    bounds = np.c_[np.arange(n_ep), np.arange(1, n_ep + 1)] * n_epoch
+    bounds[:, 1] -= 1
+    index = np.floor(bounds / sf * hypno.sf).astype(int)
+    run = np.searchsorted(hypno.starts, np.clip(index, 0, hypno.n - 1),
+                          'right') - 1
+    stage = np.where(run[:, 0] == run[:, 1], hypno.stages[run[:, 0]], -2)
+    is_stage = np.isin(stage, stages)
+    # Epochs of the data as a view of shape (n_channels, n_ep, n_epoch) :
+    if not is_fcn:
+        view = as_strided(data, (data.shape[0], n_ep, n_epoch), (
+            data.strides[0], n_epoch * data.strides[1], data.strides[1]),
+            writeable=False)
+    # Sum of power spectral densities by batch of epochs :
+    psd, counts = None, np.zeros((len(stages),), dtype=int)
+    for k in range(0, n_ep, n_chunk):
+        idx = k + np.where(is_stage[k:k + n_chunk])[0]
+        if not len(idx):
+            continue
+        if is_fcn:
+            x = data(k * n_epoch, (idx[-1] + 1) * n_epoch)
+            x = x.reshape(x.shape[0], -1, n_epoch)[:, idx - k, :]
+        else:
+            x = view[:, idx, :]
+        freqs, pxx = _epoch_psd(x, sf, nperseg, noverlap)
+        if psd is None:
+            psd = np.zeros((len(stages), x.shape[0], len(freqs)))
+        for i, s in enumerate(stages):
+            is_s = stage[idx] == s
+            psd[i] += pxx[:, is_s, :].sum(1)
+            counts[i] += is_s.sum()
+    if psd is None:
+        freqs = np.fft.rfftfreq(nperseg, 1. / sf)
+        n_chan = data(0, n_epoch).shape[0] if is_fcn else data.shape[0]
+        psd = np.zeros((len(stages), n_chan, len(freqs)))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        psd /= counts[:, np.newaxis, np.newaxis]
+    return freqs, psd, counts
+
+
+class StageRuns(object):
+    """Run-length model of a hypnogram.
+
+    The hypnogram is described as a list of runs (consecutive samples sharing
+    the same stage). Editing a stage only modifies the runs overlapping the
+    edited interval and per-stage totals are updated incrementally so that
+    the cost of an edit doesn't depend on the hypnogram length.
+
+    The memory footprint only depends on the number of runs. Hence, this
+    object can also be used as a compact hypnogram (e.g a 24h hypnogram at
+    the sampling rate of the data only takes a few kilobytes). Per-sample
+    vectors are only computed when requested (see the to_array, stage_at and
+    to_epochs methods).
+
+    Parameters
+    ----------
+    hypno : array_like
+        The hypnogram vector.
+    sf_hyp : float | 1.
+        The sampling frequency of the hypnogram (e.g 1. / 30 for one stage
+        every 30 seconds).
+    """
 
-    return stats
+    _stages = {-1: 'Art', 0: 'W', 1: 'N1', 2: 'N2', 3: 'N3', 4: 'REM'}
+
+    def __init__(self, hypno, sf_hyp=1.):
+        """Init."""
+        hypno = np.asarray(hypno).ravel()
+        assert len(hypno), "The hypnogram should not be empty"
+        t = np.nonzero(hypno[:-1] != hypno[1:])[0] + 1
+        starts = np.r_[0, t].astype(int)
+        self._set_runs(starts, hypno[starts], len(hypno), sf_hyp)
+
+    def __len__(self):
+        """Return the number of runs."""
+        return len(self.starts)
+
+    def _set_runs(self, starts, stages, n, sf_hyp):
+        """Set runs and compute per-stage totals."""
+        self.n, self.sf = int(n), float(sf_hyp)
+        self._step = max(int(sf_hyp), 1)
+        self.starts, self.stages = starts.astype(int), stages.astype(int)
+        # Per-stage totals (number of seconds) :
+        count = self._count(self.starts, self.stops)
+        self.totals = {k: 0 for k in self._stages.keys()}
+        for k, c in zip(self.stages, count):
+            self.totals[k] = self.totals.get(k, 0) + c
+
+    ###########################################################################
+    #                              CONSTRUCTORS
+    ###########################################################################
+    @classmethod
+    def from_runs(cls, starts, stages, n, sf_hyp=1.):
+        """Build the hypnogram from runs.
+
+        Empty runs are dropped and consecutive runs of the same stage are
+        merged.
+
+        Parameters
+        ----------
+        starts : array_like
+            Sorted index where each run starts (the first one should be 0).
+        stages : array_like
+            The stage of each run.
+        n : int
+            Number of samples of the hypnogram.
+        sf_hyp : float | 1.
+            The sampling frequency of the hypnogram.
+
+        Returns
+        -------
+        runs : StageRuns
+            The hypnogram.
+        """
+        starts = np.asarray(starts).ravel().astype(int)
+        stages = np.asarray(stages).ravel().astype(int)
+        assert len(starts) == len(stages) and (n > 0)
+        assert starts[0] == 0, "The first run should start at 0"
+        # Keep the last run starting at a given index :
+        keep = np.r_[starts[1:] != starts[:-1], True] & (starts < n)
+        starts, stages = starts[keep], stages[keep]
+        # Merge consecutive runs of the same stage :
+        keep = np.r_[True, stages[1:] != stages[:-1]]
+        runs = cls.__new__(cls)
+        runs._set_runs(starts[keep], stages[keep], n, sf_hyp)
+        return runs
+
+    @classmethod
+    def from_epochs(cls, stages, epoch, n=None, sf_hyp=1.):
+        """Build the hypnogram from one stage per epoch.
+
+        Parameters
+        ----------
+        stages : array_like
+            The stage of each epoch.
+        epoch : int
+            Number of samples per epoch.
+        n : int | None
+            Number of samples of the hypnogram. If n is greater than the
+            number of epochs times epoch, the last stage is repeated.
+        sf_hyp : float | 1.
+            The sampling frequency of the hypnogram.
+
+        Returns
+        -------
+        runs : StageRuns
+            The hypnogram.
+        """
+        stages = np.asarray(stages).ravel()
+        epoch = int(epoch)
+        assert len(stages) and (epoch > 0)
+        n = len(stages) * epoch if n is None else n
+        t = np.r_[0, np.nonzero(stages[:-1] != stages[1:])[0] + 1]
+        return cls.from_runs(t * epoch, stages[t], n, sf_hyp)
+
+    def oversample(self, n):
+        """Oversample the hypnogram (see the oversample_hypno function).
+
+        Parameters
+        ----------
+        n : int
+            The destination number of samples.
+
+        Returns
+        -------
+        runs : StageRuns
+            The oversampled hypnogram.
+        """
+        rep = int(np.floor(n / self.n))
+        if not rep:
+            raise ValueError("The hypnogram can't be oversampled from %i to "
+                             "%i samples" % (self.n, n))
+        return self.from_runs(self.starts * rep, self.stages, n,
+                              self.sf * rep)
+
+    def decimate(self, dsf):
+        """Keep one sample every dsf (same as hypno[::dsf]).
+
+        Parameters
+        ----------
+        dsf : int
+            The down-sampling factor.
+
+        Returns
+        -------
+        runs : StageRuns
+            The down-sampled hypnogram.
+        """
+        dsf = int(dsf)
+        return self.from_runs(-(self.starts // -dsf), self.stages,
+                              -(-self.n // dsf), self.sf / dsf)
+
+    ###########################################################################
+    #                              CONVERSIONS
+    ###########################################################################
+    @property
+    def stops(self):
+        """Get the index (excluded) where each run ends."""
+        return np.r_[self.starts[1:], self.n]
+
+    @property
+    def nbytes(self):
+        """Get the number of bytes used by runs."""
+        return self.starts.nbytes + self.stages.nbytes
+
+    def _to_sec(self, index):
+        """Convert sample indices into seconds (one point per second)."""
+        if self.sf < 1.:
+            return np.asarray(index) / self.sf
+        return -(np.asarray(index) // -self._step)
+
+    def _count(self, start, stop):
+        """Number of down-sampled points (one per second) in [start, stop[."""
+        return self._to_sec(stop) - self._to_sec(start)
+
+    def stage_at(self, index):
+        """Get the stage of samples.
+
+        Parameters
+        ----------
+        index : array_like
+            Sample indices.
+
+        Returns
+        -------
+        stages : array_like
+            The stage of each sample.
+        """
+        index = np.asarray(index)
+        assert np.all((index >= 0) & (index < self.n))
+        return self.stages[np.searchsorted(self.starts, index, 'right') - 1]
+
+    def stage_at_time(self, time):
+        """Get the stage at time points.
+
+        Parameters
+        ----------
+        time : array_like
+            Time points (in seconds).
+
+        Returns
+        -------
+        stages : array_like
+            The stage at each time point.
+        """
+        index = np.floor(np.asarray(time) * self.sf).astype(int)
+        return self.stage_at(np.clip(index, 0, self.n - 1))
+
+    def to_epochs(self, epoch=30.):
+        """Get one stage per epoch (stage at the beginning of each epoch).
+
+        Parameters
+        ----------
+        epoch : float | 30.
+            Duration of an epoch (in seconds).
+
+        Returns
+        -------
+        stages : array_like
+            The stage of each epoch.
+        """
+        step = epoch * self.sf
+        index = np.floor(np.arange(0, self.n, step)).astype(int)
+        return self.stage_at(index)
+
+    def to_array(self, dtype=np.float32):
+        """Get the hypnogram vector.
+
+        Returns
+        -------
+        hypno : array_like
+            The hypnogram vector.
+        """
+        return np.repeat(self.stages, np.diff(np.r_[self.starts, self.n])
+                         ).astype(dtype)
+
+    def __array__(self, dtype=None):
+        """Get the hypnogram vector (e.g np.asarray(runs))."""
+        return self.to_array(np.float32 if dtype is None else dtype)
+
+    def transient(self, xvec=None):
+        """Get runs boundaries (same output as the transient function).
+
+        Parameters
+        ----------
+        xvec : array_like | None
+            The time vector to use.
+
+        Returns
+        -------
+        st : array_like
+            Index (or time if xvec is not None) of the first and last sample
+            of each run of shape (n_runs, 2).
+        stages : array_like
+            The stage of each run.
+        """
+        idx = np.c_[self.starts, self.stops - 1]
+        if (xvec is not None) and (len(xvec) == self.n):
+            idx = xvec[idx]
+        return idx, self.stages.copy()
+
+    def set_stage(self, start, stop, stage):
+        """Set a stage in the interval [start, stop[.
+
+        Parameters
+        ----------
+        start : int
+            Index where the stage starts.
+        stop : int
+            Index where the stage ends (excluded).
+        stage : int
+            The stage.
+
+        Returns
+        -------
+        row : int
+            Index of the first modified run.
+        n_removed : int
+            Number of runs removed starting from row.
+        n_inserted : int
+            Number of runs inserted starting from row.
+        """
+        start, stop, stage = max(int(start), 0), min(int(stop), self.n), int(
+            stage)
+        if start >= stop:
+            return 0, 0, 0
+        starts, stages, stops = self.starts, self.stages, self.stops
+        # First and last overlapped runs :
+        r0 = np.searchsorted(starts, start, side='right') - 1
+        r1 = np.searchsorted(starts, stop - 1, side='right') - 1
+        # Update totals :
+        for k in range(r0, r1 + 1):
+            c = self._count(max(starts[k], start), min(stops[k], stop))
+            self.totals[stages[k]] -= c
+        self.totals[stage] = self.totals.get(stage, 0) + self._count(start,
+                                                                     stop)
+        # Extend the new run with neighbouring runs of the same stage :
+        new_start, new_stop = start, stop
+        if stages[r0] == stage:
+            new_start = starts[r0]
+        elif (starts[r0] == start) and (r0 > 0) and (stages[r0 - 1] == stage):
+            r0 -= 1
+            new_start = starts[r0]
+        if stages[r1] == stage:
+            new_stop = stops[r1]
+        elif (stops[r1] == stop) and (r1 + 1 < len(starts)) and (
+                stages[r1 + 1] == stage):
+            r1 += 1
+            new_stop = stops[r1]
+        # New runs :
+        new_starts, new_stages = [new_start], [stage]
+        if starts[r0] < new_start:
+            new_starts.insert(0, starts[r0])
+            new_stages.insert(0, stages[r0])
+        if new_stop < stops[r1]:
+            new_starts.append(new_stop)
+            new_stages.append(stages[r1])
+        self.starts = np.r_[starts[:r0], new_starts, starts[r1 + 1:]].astype(
+            int)
+        self.stages = np.r_[stages[:r0], new_stages, stages[r1 + 1:]].astype(
+            int)
+        return int(r0), int(r1 - r0 + 1), len(new_starts)
+
+    def transitions(self):
+        """Count transitions between stages.
+
+        Returns
+        -------
+        trans : array_like
+            Number of transitions of shape (n_stages, n_stages) where rows
+            are the stage before the transition and columns the stage after
+            (ordered as Art, W, N1, N2, N3, REM).
+        """
+        order = np.array(sorted(self._stages.keys()))
+        is_valid = np.isin(self.stages, order)
+        idx = np.searchsorted(order, self.stages)
+        is_pair = np.logical_and(is_valid[:-1], is_valid[1:])
+        trans = np.zeros((len(order), len(order)), dtype=int)
+        np.add.at(trans, (idx[:-1][is_pair], idx[1:][is_pair]), 1)
+        return trans
+
+    def sleepstats(self, extended=False):
+        """Compute sleep statistics (see the sleepstats function).
+
+        Parameters
+        ----------
+        extended : bool | False
+            Add transitions, bouts and fragmentation statistics.
+
+        Returns
+        -------
+        stats: dict
+            Sleep statistics (expressed in minutes)
+        """
+        stats = {}
+        tov = np.nan
+        # Down-sampled index of each run :
+        first, last = self._to_sec(self.starts), self._to_sec(self.stops)
+        is_valid = last > first
+
+        def _latency(is_stage):
+            is_stage = np.logical_and(is_stage, is_valid)
+            return first[is_stage].min() if is_stage.any() else tov
+
+        stats['TIB'] = int(self._count(0, self.n))
+        is_sleep = np.logical_and(self.stages != 0, is_valid)
+        stats['TDT'] = last[is_sleep].max() - 1 if is_sleep.any() else tov
+
+        # Duration of each sleep stages
+        for k, name in self._stages.items():
+            stats[name] = self.totals.get(k, 0)
+
+        # Sleep stage latencies
+        for k in [1, 2, 3, 4]:
+            stats['Lat' + self._stages[k]] = _latency(self.stages == k)
+
+        if not np.isnan(stats['LatN1']) and not np.isnan(stats['TDT']):
+            lat, tdt = stats['LatN1'], stats['TDT']
+            stats['SPT'] = max(tdt - lat, 0)
+            # Wake inside [LatN1, TDT[ :
+            is_wake = self.stages == 0
+            overlap = np.minimum(last[is_wake], tdt) - np.maximum(
+                first[is_wake], lat)
+            stats['WASO'] = overlap[overlap > 0].sum()
+            stats['TST'] = stats['SPT'] - stats['WASO']
+        else:
+            stats['SPT'] = tov
+            stats['WASO'] = tov
+            stats['TST'] = tov
+
+        # Convert to minutes
+        for key, value in stats.items():
+            stats[key] = value / 60
+
+        stats['SE'] = np.round(stats['TST'] / stats['TDT'] * 100., 2)
+        stats['Units'] = 'minutes'
+
+        if extended:
+            stats.update(self._extended_stats(stats['TST'] / 60.))
+
+        return stats
+
+    def _extended_stats(self, tst):
+        """Transitions, bouts and fragmentation statistics.
+
+        Parameters
+        ----------
+        tst : float
+            Total sleep time (in hours).
+        """
+        stats = {}
+        tov = np.nan
+        order = sorted(self._stages.keys())
+
+        def _per_hour(count):
+            return count / tst if tst > 0 else tov
+
+        # Transitions :
+        trans = self.transitions()
+        for i, k in enumerate(order):
+            for j, l in enumerate(order):
+                key = 'Trans_%s_%s' % (self._stages[k], self._stages[l])
+                stats[key] = trans[i, j]
+
+        # Bouts duration (in minutes) :
+        duration = self._count(self.starts, self.stops) / 60
+        for k in order:
+            name, bouts = self._stages[k], duration[self.stages == k]
+            is_bout = bool(len(bouts))
+            stats['Bouts_' + name] = len(bouts)
+            stats['BoutMean_' + name] = bouts.mean() if is_bout else tov
+            stats['BoutMedian_' + name] = np.median(bouts) if is_bout else tov
+            stats['BoutMax_' + name] = bouts.max() if is_bout else tov
+
+        # Fragmentation :
+        before, after = self.stages[:-1], self.stages[1:]
+        is_sleep = np.isin(before, [1, 2, 3, 4])
+        awakenings = np.logical_and(is_sleep, after == 0).sum()
+        lighter = np.logical_and(np.isin(before, [2, 3, 4]), after == 1)
+        stats['Shifts'] = len(before)
+        stats['SSI'] = _per_hour(len(before))
+        stats['Awakenings'] = awakenings
+        stats['AI'] = _per_hour(awakenings)
+        stats['SFI'] = _per_hour(awakenings + lighter.sum())
+        return stats
@@ -0,0 +1,137 @@
+"""Load data chunk by chunk in a background thread.
+
+The data array is allocated as soon as the header of the file is read. Chunks
+of consecutive samples are then decoded in a background thread and copied
+inside this array so that the beginning of the recording can be inspected
+while the end is still being loaded. Chunks are loaded in order so that the
+loaded part of the array is always contiguous (see the n_loaded attribute).
+"""
+import logging
+import threading
+
+import numpy as np
+
+logger = logging.getLogger('visbrain')
+
+__all__ = ('ChunkLoader',)
+
+
+class ChunkLoader(object):
+    """Fill an array chunk by chunk in a background thread.
+
+    Parameters
+    ----------
+    fcn : callable
+        Function used to read a chunk. The function is called as
+        fcn(start, stop) where start and stop are sample indices of the file
+        (before down-sampling) and should return the down-sampled data of
+        shape (n_channels, n_samples).
+    data : array_like
+        Array to fill of shape (n_channels, n_times) where n_times is the
+        number of time points after down-sampling.
+    n : int
+        Number of time points in the file (before down-sampling).
+    dsf : int | 1
+        Down-sampling factor.
+    n_chunk : int | 100000
+        Number of time points per chunk (before down-sampling). This number
+        is rounded to a multiple of the down-sampling factor.
+    """
+
+    def __init__(self, fcn, data, n, dsf=1, n_chunk=100000):
+        """Init."""
+        assert callable(fcn) and isinstance(data, np.ndarray)
+        assert data.shape[1] == len(range(0, n, dsf))
+        self._fcn, self._data = fcn, data
+        self.n, self.dsf = n, dsf
+        self.n_chunk = max(int(n_chunk) // dsf, 1) * dsf
+        self.scale = 1.
+        self.error = None
+        self.done = np.zeros((int(np.ceil(n / self.n_chunk)),), dtype=bool)
+        self._stop = False
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def __len__(self):
+        """Return the number of chunks."""
+        return len(self.done)
+
+    @property
+    def n_loaded(self):
+        """Get the number of loaded time points (after down-sampling)."""
+        n_done = len(self) if self.complete else self.done.argmin()
+        return min(n_done * self.n_chunk // self.dsf, self._data.shape[1])
+
+    @property
+    def progress(self):
+        """Get the proportion of loaded chunks."""
+        return self.done.mean()
+
+    @property
+    def complete(self):
+        """Get if every chunk has been loaded."""
+        return self.done.all()
+
+    def read(self, chunk):
+        """Read a chunk in the calling thread.
+
+        Parameters
+        ----------
+        chunk : int
+            Index of the chunk.
+        """
+        with self._lock:
+            if self.done[chunk]:
+                return None
+            start = chunk * self.n_chunk
+            stop = min(start + self.n_chunk, self.n)
+            data = self._fcn(start, stop)
+            if self.scale != 1.:
+                data *= self.scale
+            sl = slice(start // self.dsf, start // self.dsf + data.shape[1])
+            self._data[:, sl] = data
+            self.done[chunk] = True
+
+    def start(self):
+        """Read remaining chunks in a background thread."""
+        if self.complete or (self._thread is not None):
+            return None
+        self._thread = threading.Thread(target=self._run, name='ChunkLoader',
+                                        daemon=True)
+        self._thread.start()
+
+    def wait(self):
+        """Wait until every chunk is loaded.
+
+        Chunks are read in the calling thread if the background thread has
+        not been started.
+        """
+        if self._thread is None:
+            for k in np.where(~self.done)[0]:
+                self.read(k)
+        else:
+            self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def cancel(self):
+        """Stop loading remaining chunks.
+
+        The chunk being read by the background thread is finished before
+        returning. Hence, the array is not modified afterwards.
+        """
+        self._stop = True
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        """Background thread reading remaining chunks."""
+        for k in np.where(~self.done)[0]:
+            if self._stop:
+                break
+            try:
+                self.read(k)
+            except Exception as e:
+                logger.error("Chunk %i could not be loaded (%s)" % (k, str(e)))
+                self.error = e
+                break
@@ -0,0 +1,146 @@
+"""Prepare windows of data in a background thread.
+
+When scrolling through a recording, the previous and next windows are
+prepared in advance (slicing, de-meaning, filtering...) and stored inside a
+ring buffer. Each window is identified by a key (start, stop, settings) so
+that moving back and forth only requires a lookup.
+"""
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger('visbrain')
+
+__all__ = ('WindowPrefetcher',)
+
+
+class WindowPrefetcher(object):
+    """Ring buffer of prepared windows filled by a background thread.
+
+    Parameters
+    ----------
+    fcn : callable
+        Function used to prepare a window. The function is called as
+        fcn(start, stop) where start and stop are sample indices and should
+        return the prepared window.
+    n_windows : int | 2
+        Number of windows to prepare before and after the current one.
+    """
+
+    def __init__(self, fcn, n_windows=2):
+        """Init."""
+        assert callable(fcn) and isinstance(n_windows, int)
+        self._fcn = fcn
+        self.n_windows = n_windows
+        self._buffer = OrderedDict()
+        self._pending = []
+        self._generation = 0
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def __len__(self):
+        """Return the number of prepared windows."""
+        return len(self._buffer)
+
+    def __contains__(self, key):
+        """Return if a window (start, stop, settings) is already prepared."""
+        with self._cond:
+            return key in self._buffer
+
+    def get(self, start, stop, settings=None):
+        """Get a prepared window.
+
+        If the window is not in the buffer, it's prepared in the calling
+        thread.
+
+        Parameters
+        ----------
+        start : int
+            Index of the first sample.
+        stop : int
+            Index of the last sample (excluded).
+        settings : hashable | None
+            Preparation settings.
+
+        Returns
+        -------
+        window : object
+            The prepared window.
+        """
+        key = (start, stop, settings)
+        with self._cond:
+            if key in self._buffer:
+                self._buffer.move_to_end(key)
+                return self._buffer[key]
+            generation = self._generation
+        window = self._fcn(start, stop)
+        self._store(key, window, generation)
+        return window
+
+    def prefetch(self, start, stop, step, n_times, settings=None):
+        """Prepare windows around the current one in a background thread.
+
+        Parameters
+        ----------
+        start : int
+            Index of the first sample of the current window.
+        stop : int
+            Index of the last sample (excluded) of the current window.
+        step : int
+            Number of samples between two consecutive windows.
+        n_times : int
+            Number of time points (windows outside [0, n_times] are ignored).
+        settings : hashable | None
+            Preparation settings.
+        """
+        keys = []
+        for k in range(1, self.n_windows + 1):
+            for shift in [k * step, -k * step]:
+                if (start + shift >= 0) and (stop + shift <= n_times):
+                    keys.append((start + shift, stop + shift, settings))
+        with self._cond:
+            # Most recent requests replace the pending ones :
+            self._pending = [k for k in keys if k not in self._buffer]
+            if self._pending:
+                if (self._thread is None) or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run,
+                                                    name='WindowPrefetcher',
+                                                    daemon=True)
+                    self._thread.start()
+                self._cond.notify()
+
+    def invalidate(self):
+        """Remove all prepared windows.
+
+        Windows being prepared when this method is called are dropped.
+        """
+        with self._cond:
+            self._generation += 1
+            self._buffer.clear()
+            self._pending = []
+
+    def _store(self, key, window, generation):
+        """Store a prepared window (oldest windows are removed)."""
+        with self._cond:
+            if generation != self._generation:  # outdated window
+                return None
+            self._buffer[key] = window
+            self._buffer.move_to_end(key)
+            while len(self._buffer) > 2 * self.n_windows + 1:
+                self._buffer.popitem(last=False)
+
+    def _run(self):
+        """Background thread preparing pending windows."""
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                key = self._pending.pop(0)
+                generation = self._generation
+            try:
+                window = self._fcn(key[0], key[1])
+            except Exception as e:
+                logger.debug("Window %s could not be prepared (%s)" % (
+                    str(key[0:2]), str(e)))
+                continue
+            self._store(key, window, generation)
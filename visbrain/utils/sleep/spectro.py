@@ -0,0 +1,382 @@
+"""Compute whole-night spectrograms by tiles in a background thread.
+
+A spectrogram is split into tiles of consecutive segments. Because each
+segment only depends on its own samples, tiles can be computed independently
+and give the same result as a single call to the spectrogram function. Tiles
+are computed in a background thread and stored inside a cache so that :
+
+    * Changing the colormap or the contrast only requires to re-color the
+      cached power.
+    * Coming back to an already computed channel only requires a lookup.
+    * Every channel can be precomputed in advance.
+
+Completed spectra can also be saved on disk (see the cache_dir parameter of
+SpectralCache).
+"""
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import scipy.signal as scpsig
+
+logger = logging.getLogger('visbrain')
+
+__all__ = ('spectrogram_tile', 'Spectrum', 'SpectralCache')
+
+
+def spectrogram_tile(data, sf, nperseg, noverlap, method='Fourier transform'):
+    """Compute the power (in dB) of consecutive segments of data.
+
+    Parameters
+    ----------
+    data : array_like
+        Data vector of shape (n_times,).
+    sf : float
+        The sampling frequency.
+    nperseg : int
+        Number of samples per segment.
+    noverlap : int
+        Number of overlapping samples between two consecutive segments.
+    method : {'Fourier transform', 'Multitaper'}
+        Computation method.
+
+    Returns
+    -------
+    freq : array_like
+        The frequency vector of shape (n_freqs,).
+    power : array_like
+        Power in dB of shape (n_freqs, n_segments).
+    """
+    if method == 'Multitaper':
+        from lspopt import spectrogram_lspopt
+        freq, _, mesh = spectrogram_lspopt(data, fs=sf, nperseg=nperseg,
+                                           c_parameter=20, noverlap=noverlap)
+    elif method == 'Fourier transform':
+        freq, _, mesh = scpsig.spectrogram(data, fs=sf, nperseg=nperseg,
+                                           noverlap=noverlap, window='hamming')
+    else:
+        raise ValueError("method should either be 'Fourier transform' or "
+                         "'Multitaper'")
+    return freq, (20 * np.log10(mesh)).astype(np.float32)
+
+
+class Spectrum(object):
+    """Whole-night spectrogram filled tile by tile.
+
+    Parameters
+    ----------
+    data : array_like
+        Data vector of shape (n_times,).
+    sf : float
+        The sampling frequency.
+    nperseg : int
+        Number of samples per segment.
+    noverlap : int
+        Number of overlapping samples between two consecutive segments.
+    method : string | 'Fourier transform'
+        Computation method.
+    n_tile : int | 64
+        Number of segments per tile.
+    prepare : callable | None
+        Function applied to the data before computing the first tile (e.g
+        de-meaning, filtering...).
+    """
+
+    def __init__(self, data, sf, nperseg, noverlap, method='Fourier transform',
+                 n_tile=64, prepare=None):
+        """Init."""
+        assert 0 <= noverlap < nperseg <= len(data)
+        self._data, self._prepare = data, prepare
+        self.sf, self.method = sf, method
+        self.nperseg, self.noverlap = nperseg, noverlap
+        self.n_tile = int(n_tile)
+        step = nperseg - noverlap
+        self.n_seg = (len(data) - noverlap) // step
+        self.freq = np.fft.rfftfreq(nperseg, 1. / sf)
+        self.power = np.full((len(self.freq), self.n_seg), np.nan,
+                             dtype=np.float32)
+        self.done = np.zeros((int(np.ceil(self.n_seg / self.n_tile)),),
+                             dtype=bool)
+        self._lim = [np.inf, -np.inf]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Return the number of tiles."""
+        return len(self.done)
+
+    @property
+    def progress(self):
+        """Get the proportion of computed tiles."""
+        return self.done.mean()
+
+    @property
+    def complete(self):
+        """Get if every tile has been computed."""
+        return self.done.all()
+
+    @property
+    def lim(self):
+        """Get the (min, max) of computed power."""
+        return tuple(self._lim)
+
+    def compute(self, tile):
+        """Compute a tile.
+
+        Parameters
+        ----------
+        tile : int
+            Index of the tile.
+        """
+        with self._lock:
+            self._compute(tile)
+
+    def _compute(self, tile):
+        """Compute a tile (without locking)."""
+        if self.done[tile]:
+            return None
+        if self._prepare is not None:
+            self._data, self._prepare = self._prepare(self._data), None
+        step = self.nperseg - self.noverlap
+        s_start = tile * self.n_tile
+        s_stop = min(s_start + self.n_tile, self.n_seg)
+        sl = slice(s_start * step, (s_stop - 1) * step + self.nperseg)
+        _, power = spectrogram_tile(self._data[sl], self.sf, self.nperseg,
+                                    self.noverlap, self.method)
+        self.power[:, s_start:s_stop] = power
+        self._lim = [min(self._lim[0], power.min()),
+                     max(self._lim[1], power.max())]
+        self.done[tile] = True
+        # Data are not needed anymore :
+        if self.complete:
+            self._data = None
+
+    def compute_all(self):
+        """Compute every remaining tile."""
+        with self._lock:
+            for k in np.where(~self.done)[0]:
+                self._compute(k)
+
+    def save(self, path):
+        """Save a complete spectrum.
+
+        Parameters
+        ----------
+        path : string
+            Path to the .npz file.
+        """
+        assert self.complete
+        np.savez(path, freq=self.freq, power=self.power)
+
+    @classmethod
+    def load(cls, path, sf, nperseg, noverlap, method='Fourier transform'):
+        """Load a spectrum saved using the save method.
+
+        Parameters
+        ----------
+        path : string
+            Path to the .npz file.
+        sf : float
+            The sampling frequency.
+        nperseg : int
+            Number of samples per segment.
+        noverlap : int
+            Number of overlapping samples between two consecutive segments.
+        method : string | 'Fourier transform'
+            Computation method.
+
+        Returns
+        -------
+        spec : Spectrum
+            The complete spectrum.
+        """
+        arch = np.load(path)
+        spec = cls.__new__(cls)
+        spec._data, spec._prepare = None, None
+        spec._lock = threading.Lock()
+        spec.sf, spec.method = sf, method
+        spec.nperseg, spec.noverlap = nperseg, noverlap
+        spec.freq, spec.power = arch['freq'], arch['power']
+        spec.n_seg = spec.power.shape[1]
+        spec.n_tile = spec.n_seg
+        spec.done = np.ones((1,), dtype=bool)
+        spec._lim = [spec.power.min(), spec.power.max()]
+        return spec
+
+
+class SpectralCache(object):
+    """Cache of spectra computed tile by tile in a background thread.
+
+    Parameters
+    ----------
+    max_size : int | 8
+        Maximum number of spectra kept in memory (the least recently used
+        spectra are removed first).
+    n_tile : int | 64
+        Number of segments per tile.
+    cache_dir : string | None
+        Directory where complete spectra are saved. If None, spectra are only
+        kept in memory. Keys should identify the data across sessions (e.g
+        include the file name).
+    """
+
+    def __init__(self, max_size=8, n_tile=64, cache_dir=None):
+        """Init."""
+        assert isinstance(max_size, int) and max_size > 0
+        self.max_size, self.n_tile = max_size, n_tile
+        self.cache_dir = cache_dir
+        self._spectra = OrderedDict()
+        self._pending = []
+        self._cond = threading.Condition()
+        self._save_lock = threading.Lock()
+        self._thread = None
+
+    def __len__(self):
+        """Return the number of cached spectra."""
+        return len(self._spectra)
+
+    def __contains__(self, key):
+        """Return if a spectrum is cached (complete or not)."""
+        with self._cond:
+            return key in self._spectra
+
+    def __getitem__(self, key):
+        """Get a cached spectrum."""
+        with self._cond:
+            return self._spectra[key]
+
+    def _get_path(self, key):
+        """Get the file name associated to a key."""
+        name = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.cache_dir, name + '.npz')
+
+    def request(self, key, data, sf, nperseg, noverlap,
+                method='Fourier transform', prepare=None, priority=True):
+        """Request a spectrum.
+
+        Parameters
+        ----------
+        key : hashable
+            Identifier of the spectrum (channel, parameters...).
+        data : array_like
+            Data vector of shape (n_times,).
+        sf : float
+            The sampling frequency.
+        nperseg : int
+            Number of samples per segment.
+        noverlap : int
+            Number of overlapping samples between two consecutive segments.
+        method : string | 'Fourier transform'
+            Computation method.
+        prepare : callable | None
+            Function applied to the data before computing (in the background
+            thread).
+        priority : bool | True
+            If True, tiles of this spectrum are computed before the pending
+            ones. Otherwise, they are computed after.
+
+        Returns
+        -------
+        spec : Spectrum
+            The spectrum. Use the progress and complete attributes to follow
+            the computation.
+        """
+        with self._cond:
+            if key in self._spectra:
+                self._spectra.move_to_end(key)
+                spec = self._spectra[key]
+            else:
+                path = self._get_path(key) if self.cache_dir else None
+                if path and os.path.isfile(path):
+                    spec = Spectrum.load(path, sf, nperseg, noverlap, method)
+                else:
+                    spec = Spectrum(data, sf, nperseg, noverlap, method,
+                                    self.n_tile, prepare)
+                self._spectra[key] = spec
+                self._trim()
+            if not spec.complete:
+                jobs = [(key, k) for k in np.where(~spec.done)[0]]
+                others = [k for k in self._pending if k[0] != key]
+                if priority:
+                    self._pending = jobs + others
+                else:
+                    self._pending = others + jobs
+                self._start()
+        return spec
+
+    def wait(self, key):
+        """Compute the remaining tiles of a spectrum in the calling thread.
+
+        Parameters
+        ----------
+        key : hashable
+            Identifier of the spectrum.
+
+        Returns
+        -------
+        spec : Spectrum
+            The complete spectrum.
+        """
+        with self._cond:
+            spec = self._spectra[key]
+            self._pending = [k for k in self._pending if k[0] != key]
+        spec.compute_all()
+        self._save(key, spec)
+        return spec
+
+    def invalidate(self):
+        """Remove all cached spectra (from memory only).
+
+        Tiles being computed when this method is called are dropped.
+        """
+        with self._cond:
+            self._spectra.clear()
+            self._pending = []
+
+    def _trim(self):
+        """Remove least recently used spectra."""
+        while len(self._spectra) > self.max_size:
+            key, _ = self._spectra.popitem(last=False)
+            self._pending = [k for k in self._pending if k[0] != key]
+
+    def _start(self):
+        """Start the background thread (if needed)."""
+        if self._pending:
+            if (self._thread is None) or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run,
+                                                name='SpectralCache',
+                                                daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _save(self, key, spec):
+        """Save a complete spectrum on disk."""
+        if not (self.cache_dir and spec.complete):
+            return None
+        with self._save_lock:
+            path = self._get_path(key)
+            if not os.path.isfile(path):
+                try:
+                    spec.save(path)
+                except Exception as e:
+                    logger.debug("Spectrum could not be saved (%s)" % str(e))
+
+    def _run(self):
+        """Background thread computing pending tiles."""
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                key, tile = self._pending.pop(0)
+                if key not in self._spectra:
+                    continue
+                spec = self._spectra[key]
+            try:
+                spec.compute(tile)
+            except Exception as e:
+                logger.debug("Tile %i could not be computed (%s)" % (
+                    tile, str(e)))
+                continue
+            self._save(key, spec)
@@ -3,7 +3,8 @@ import numpy as np
 
 from visbrain.utils.sleep.detection import (kcdetect, spindlesdetect,
                                             remdetect, slowwavedetect,
-                                            mtdetect, peakdetect)
+                                            mtdetect, peakdetect,
+                                            OnlineSpindles, OnlineSlowWaves)
 from visbrain.utils import generate_eeg
 
 """If tests continue to failed, one idea could be to save in a npz file the
@@ -52,3 +53,50 @@ class TestDetections(object):
         peakdetect(sf, data, get='min')
         peakdetect(sf, data, get='max')
         peakdetect(sf, data, get='minmax', threshold=.6)
+
+    def test_online_spindles(self):
+        """Test class OnlineSpindles."""
+        rng = np.random.RandomState(0)
+        x = 10. * rng.randn(60000)
+        onsets = np.arange(6000, 59000, 2000)
+        burst = 40. * np.sin(2 * np.pi * 13. * np.arange(100) / sf)
+        for k in onsets:
+            x[k:k + 100] += burst * np.hanning(100)
+        index = OnlineSpindles(sf, 3.).run(x, n_chunk=137)
+        assert len(index) == len(onsets)
+        assert np.all(np.abs(index[:, 0] - onsets) < 50)
+        # Results don't depend on the size of chunks :
+        np.testing.assert_array_equal(OnlineSpindles(sf, 3.).run(x), index)
+        # Latency is bounded :
+        det = OnlineSpindles(sf, 3.)
+        for k in range(0, 10000, 100):
+            for start, _ in det.update(x[k:k + 100]):
+                assert k + 100 - start < (3000 + 300) * sf / 1000. + 100
+
+    def test_online_slowwaves(self):
+        """Test class OnlineSlowWaves."""
+        rng = np.random.RandomState(0)
+        x = 10. * rng.randn(60000)
+        x[10000:16000] += 80. * np.sin(2 * np.pi * np.arange(6000) / sf)
+        index = OnlineSlowWaves(sf, .8).run(x, n_chunk=250)
+        # Long periods are split :
+        assert len(index) == 2 and np.all(np.diff(index, axis=1) < 3000)
+        assert 10000 <= index[0, 0] < 10500
+        np.testing.assert_array_equal(OnlineSlowWaves(sf, .8).run(x), index)
+        assert len(OnlineSlowWaves(sf, .8, tmax=None).run(x)) == 1
+
+    def test_online_split_chunk_boundary(self):
+        """Test splitting when a split point lands on a chunk boundary."""
+        class _Mask(OnlineSlowWaves):
+            def _supra(self, x):
+                idx = self.n_samples + np.arange(len(x))
+                above = (idx >= 3000) & (idx < 9500)
+                return above, above
+
+        x = 100. * np.sin(2 * np.pi * np.arange(12000) / sf)
+        expected = [[3000, 5999], [6000, 8999], [9000, 9499]]
+        for n_chunk in [137, 250, 1000, 3000]:
+            index = _Mask(sf, .8).run(x, n_chunk=n_chunk)
+            np.testing.assert_array_equal(index, expected)
+        # Amplitude criterion :
+        assert not len(OnlineSlowWaves(sf, .8, max_amp=100.).run(x))
@@ -2,7 +2,8 @@
 import numpy as np
 
 from visbrain.utils.sleep.event import (_events_distance_fill,
-                                        _events_to_index, _index_to_events)
+                                        _events_to_index, _index_to_events,
+                                        event_coincidence)
 
 
 class TestEvent(object):
@@ -31,4 +32,30 @@ class TestEvent(object):
     def test_index_to_event(self):
         """Test function index_to_event."""
         idx = _events_to_index(self._get_index())
-        _index_to_events(idx)
+        index = _index_to_events(idx)
+        np.testing.assert_array_equal(index, self._get_index())
+        index, connect = _index_to_events(idx, connect=True)
+        assert not connect[[4, 8, 14]].any() and connect.sum() == 12
+        assert not _index_to_events(np.zeros((0, 2))).size
+
+    def test_event_coincidence(self):
+        """Test function event_coincidence."""
+        index = {'Cz': np.array([[100, 200], [500, 600], [1000, 1100]]),
+                 'Fz': np.array([[150, 250], [240, 300], [700, 800]]),
+                 'Pz': np.array([[290, 400], [1200, 1300]])}
+        coinc = event_coincidence(index, sf=100.)
+        np.testing.assert_array_equal(coinc['cluster'],
+                                      [0, 0, 0, 0, 1, 2, 3, 4])
+        np.testing.assert_array_equal(coinc['channel'][0:4],
+                                      ['Cz', 'Fz', 'Fz', 'Pz'])
+        np.testing.assert_array_equal(coinc['event'][0:4], [0, 0, 1, 0])
+        np.testing.assert_array_equal(coinc['n_channels'],
+                                      [3, 3, 3, 3, 1, 1, 1, 1])
+        np.testing.assert_allclose(coinc['lag'][0:4], [0., .5, 1.4, 1.9])
+        np.testing.assert_allclose(coinc['start'][-1], 12.)
+        # Tolerance between events :
+        coinc = event_coincidence(index, sf=100., tolerance=1.)
+        assert coinc['cluster'].max() == 1
+        # Empty events :
+        coinc = event_coincidence({'Cz': np.zeros((0, 2), dtype=int)})
+        assert not coinc['cluster'].size and not coinc['channel'].size
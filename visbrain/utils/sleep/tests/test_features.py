@@ -0,0 +1,97 @@
+"""Test functions in features.py."""
+import os
+
+import numpy as np
+from scipy.signal import welch, butter, lfilter
+
+from visbrain.utils.sleep.features import (epoch_features, epoch_artifacts,
+                                           EpochFeatures)
+from visbrain.utils.physio import Montage
+
+
+class TestFeatures(object):
+    """Test functions in features.py."""
+
+    def test_epoch_features(self):
+        """Test function epoch_features."""
+        sf, n_epoch = 100., 3000
+        data = np.random.rand(3, 10 * n_epoch + 500)
+        feat = epoch_features(data, sf, n_epoch, n_chunk=4)
+        assert len(feat) == 11 and len(feat.names) == 16
+        assert feat['var'].shape == (3, 11)
+        assert feat['var'].dtype == np.float32
+        # Compare with scipy :
+        x = data[1, 2 * n_epoch:3 * n_epoch]
+        freqs, psd = welch(x, sf, nperseg=400, noverlap=0, window='hann')
+        is_band = (freqs >= 4.) & (freqs < 8.)
+        np.testing.assert_allclose(feat['abs_theta'][1, 2],
+                                   psd[is_band].sum() * .25, rtol=1e-4)
+        np.testing.assert_allclose(feat['var'][1, 2], x.var(), rtol=1e-5)
+        np.testing.assert_allclose(feat['line_length'][1, 2],
+                                   np.abs(np.diff(x)).sum(), rtol=1e-5)
+        rel = np.sum([feat[k] for k in feat.names if k.startswith('rel_')],
+                     axis=0)
+        np.testing.assert_allclose(rel, 1., rtol=1e-4)
+        assert np.all((feat['sef'] > 0.) & (feat['sef'] <= sf / 2.))
+        # Sine wave :
+        sine = np.sin(2 * np.pi * 10. * np.arange(n_epoch) / sf)[np.newaxis]
+        feat_sine = epoch_features(sine, sf, n_epoch)
+        np.testing.assert_allclose(feat_sine['zcr'], 20., rtol=.01)
+        assert feat_sine['rel_alpha'][0, 0] > .99
+        # Montaged data (read by chunks) :
+        montage = Montage.average(['Cz', 'Pz', 'Fz'])
+        feat_m = epoch_features(montage.view(data), sf, n_epoch, n_chunk=4)
+        feat_a = epoch_features(montage.apply(data), sf, n_epoch)
+        for k in ['var', 'abs_theta', 'sef']:
+            np.testing.assert_allclose(feat_m[k], feat_a[k], rtol=1e-5)
+
+    def test_epoch_artifacts(self):
+        """Test function epoch_artifacts."""
+        sf, n_epoch = 100., 3000
+        rng = np.random.RandomState(0)
+        b, a = butter(4, 20. / 50.)
+        data = lfilter(b, a, rng.randn(4, 20 * n_epoch + 50), axis=1)
+        data[0, 3 * n_epoch:4 * n_epoch] = 0.
+        data[1, 5 * n_epoch:6 * n_epoch] *= 10.
+        data[1] = np.clip(data[1], -3., 3.)
+        data[2, 7 * n_epoch:8 * n_epoch] *= 20.
+        data[3, 9 * n_epoch:10 * n_epoch] += .3 * rng.randn(n_epoch)
+        bad, reasons = epoch_artifacts(data, sf, n_epoch)
+        assert bad.shape == (4, 21)
+        np.testing.assert_array_equal(np.argwhere(bad),
+                                      [[0, 3], [1, 5], [2, 7], [3, 9]])
+        assert reasons['flat'][0, 3] and reasons['clip'][1, 5]
+        assert reasons['var'][2, 7] and reasons['hf'][3, 9]
+        # High frequency criterion above the Nyquist frequency :
+        assert 'hf' not in epoch_artifacts(data, sf, n_epoch, hf=60.)[1]
+        # Features computed once and shared :
+        feat = epoch_features(data, sf, n_epoch)
+        bad_f, reasons_f = epoch_artifacts(data, sf, n_epoch, features=feat)
+        np.testing.assert_array_equal(bad_f, bad)
+        feat.add('var', np.zeros_like(feat['var']))
+        assert epoch_artifacts(data, sf, n_epoch, features=feat)[1][
+            'flat'][:, :20].all()
+        view = Montage.identity(['a', 'b', 'c', 'd']).view(data)
+        np.testing.assert_array_equal(epoch_artifacts(view, sf, n_epoch)[0],
+                                      bad)
+
+    def test_epoch_features_table(self, tmpdir):
+        """Test class EpochFeatures."""
+        data = np.random.rand(2, 1050)
+        feat = EpochFeatures(100., 100, data.shape[1])
+        means = np.add.reduceat(data, feat.starts, axis=1) / np.diff(
+            np.r_[feat.starts, data.shape[1]])
+        feat.add('mean', means)
+        assert 'mean' in feat and feat.nbytes == means.size * 4
+        np.testing.assert_allclose(feat.mean('mean', 200, 500),
+                                   data[:, 200:500].mean(1), rtol=1e-5)
+        np.testing.assert_allclose(feat.mean('mean', 900, 1050),
+                                   data[:, 900:].mean(1), rtol=1e-5)
+        # Save / load :
+        path = os.path.join(str(tmpdir), 'features.npz')
+        feat.save(path)
+        feat_load = EpochFeatures.load(path)
+        assert feat_load.names == ['mean'] and len(feat_load) == len(feat)
+        np.testing.assert_array_equal(feat_load['mean'], feat['mean'])
+        feat.remove()
+        assert not feat.names
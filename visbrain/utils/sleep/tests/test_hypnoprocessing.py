@@ -1,7 +1,71 @@
 """Test functions in hypnoprocessing.py."""
+import os
+
 import numpy as np
+from scipy.signal import welch
+
+from visbrain.utils.sleep.hypnoprocessing import (transient, sleepstats,
+                                                  stage_psd, StageRuns)
+
+
+def _sleepstats_reference(hypno, sf_hyp):
+    """Per-sample sleep statistics used as a reference for StageRuns."""
+    stats, tov = {}, np.nan
+    names = {-1: 'Art', 0: 'W', 1: 'N1', 2: 'N2', 3: 'N3', 4: 'REM'}
+    hyp = hypno[::int(sf_hyp)]
+    stats['TIB'] = len(hyp)
+    stats['TDT'] = np.where(hyp != 0)[0].max() if np.nonzero(
+        hyp)[0].size else tov
+    for k, name in names.items():
+        stats[name] = hyp[hyp == k].size
+    for k in [1, 2, 3, 4]:
+        stats['Lat' + names[k]] = np.where(hyp == k)[0].min() if (
+            k in hyp) else tov
+    if not np.isnan(stats['LatN1']) and not np.isnan(stats['TDT']):
+        hyp_s = hyp[stats['LatN1']:stats['TDT']]
+        stats['SPT'] = hyp_s.size
+        stats['WASO'] = hyp_s[hyp_s == 0].size
+        stats['TST'] = stats['SPT'] - stats['WASO']
+    else:
+        stats['SPT'] = stats['WASO'] = stats['TST'] = tov
+    for key, value in stats.items():
+        stats[key] = value / 60
+    stats['SE'] = np.round(stats['TST'] / stats['TDT'] * 100., 2)
+    # Transitions (sample by sample) :
+    change = np.nonzero(hypno[:-1] != hypno[1:])[0]
+    before, after = hypno[change], hypno[change + 1]
+    for i, name_i in names.items():
+        for j, name_j in names.items():
+            stats['Trans_%s_%s' % (name_i, name_j)] = np.sum(
+                (before == i) & (after == j))
+    # Bouts (duration in minutes, one point per second) :
+    starts = np.r_[0, change + 1]
+    is_sec = (np.arange(len(hypno)) % int(sf_hyp) == 0).astype(int)
+    duration, stages = np.add.reduceat(is_sec, starts) / 60, hypno[starts]
+    for k, name in names.items():
+        bouts = duration[stages == k]
+        stats['Bouts_' + name] = len(bouts)
+        stats['BoutMean_' + name] = bouts.mean() if len(bouts) else tov
+        stats['BoutMedian_' + name] = np.median(bouts) if len(
+            bouts) else tov
+        stats['BoutMax_' + name] = bouts.max() if len(bouts) else tov
+    # Fragmentation :
+    tst = stats['TST'] / 60.
+    awakenings = np.sum(np.isin(before, [1, 2, 3, 4]) & (after == 0))
+    lighter = np.sum(np.isin(before, [2, 3, 4]) & (after == 1))
+    stats['Shifts'] = len(change)
+    stats['SSI'] = len(change) / tst if tst > 0 else tov
+    stats['Awakenings'] = awakenings
+    stats['AI'] = awakenings / tst if tst > 0 else tov
+    stats['SFI'] = (awakenings + lighter) / tst if tst > 0 else tov
+    return stats
 
-from visbrain.utils.sleep.hypnoprocessing import (transient, sleepstats)
+
+def _assert_sleepstats(stats, reference):
+    """Compare sleep statistics with the per-sample reference."""
+    assert set(stats.keys()) - {'Units'} == set(reference.keys())
+    for key, val in reference.items():
+        np.testing.assert_allclose(stats[key], val, err_msg=key)
 
 
 class TestHypnoprocessing(object):
@@ -23,3 +87,94 @@ class TestHypnoprocessing(object):
         """Test function sleepstats."""
         hypno = np.random.randint(-1, 3, (2000,))
         sleepstats(hypno, 100.)
+        # Extended statistics (one value per second) :
+        hypno = np.array([0, 0, 1, 1, 2, 2, 2, 0, 2, 3, 3, 4, 1, 0, 0])
+        hypno = np.repeat(hypno, 60)
+        stats = sleepstats(hypno, 1., extended=True)
+        assert stats['Shifts'] == 8
+        assert stats['Trans_N2_W'] == stats['Trans_W_N1'] == 1
+        assert stats['Awakenings'] == 2
+        assert stats['Bouts_N2'] == 2
+        assert stats['BoutMax_N2'] == 3.
+        np.testing.assert_allclose(stats['BoutMean_W'], 5. / 3.)
+        np.testing.assert_allclose(stats['SSI'], 8 / (stats['TST'] / 60.))
+        np.testing.assert_allclose(stats['SFI'], 3 / (stats['TST'] / 60.))
+
+    def test_stage_runs(self):
+        """Test class StageRuns."""
+        hypno = np.repeat(np.random.randint(-1, 5, (50,)), 40).astype(float)
+        runs = StageRuns(hypno, 4.)
+        for k in range(50):
+            start = np.random.randint(0, len(hypno))
+            stop = np.random.randint(start, len(hypno) + 10)
+            stage = np.random.randint(-1, 5)
+            n_runs = len(runs)
+            _, n_removed, n_inserted = runs.set_stage(start, stop, stage)
+            hypno[start:stop] = stage
+            assert len(runs) == n_runs - n_removed + n_inserted
+            assert np.array_equal(runs.to_array(), hypno)
+            # Runs :
+            _, idx, stages = transient(hypno)
+            r_idx, r_stages = runs.transient()
+            assert np.array_equal(idx, r_idx)
+            assert np.array_equal(stages, r_stages)
+            # Statistics (incremental runs vs. per-sample reference) :
+            reference = _sleepstats_reference(hypno, 4.)
+            _assert_sleepstats(runs.sleepstats(extended=True), reference)
+            _assert_sleepstats(sleepstats(hypno, 4., extended=True),
+                               reference)
+
+    def test_stage_runs_conversions(self):
+        """Test StageRuns used as a compact hypnogram."""
+        epochs = np.random.randint(-1, 5, (100,))
+        # One stage every 30 seconds :
+        runs = StageRuns(epochs, 1. / 30)
+        hypno = np.repeat(epochs, 30)
+        np.testing.assert_array_equal(runs.to_epochs(30.), epochs)
+        np.testing.assert_array_equal(runs.stage_at_time(np.arange(3000)),
+                                      hypno)
+        _assert_sleepstats(sleepstats(runs, 1., extended=True),
+                           _sleepstats_reference(hypno, 1.))
+        # Oversample then down-sample :
+        over = StageRuns.from_epochs(epochs, 3).oversample(1000).decimate(7)
+        assert over.nbytes < hypno.nbytes
+        hypno = np.r_[np.repeat(epochs, 9), [epochs[-1]] * 100][::7]
+        np.testing.assert_array_equal(np.asarray(over), hypno)
+        np.testing.assert_array_equal(over.stage_at(np.arange(len(hypno))),
+                                      hypno)
+        _, idx, stages = transient(hypno)
+        _, r_idx, r_stages = transient(over)
+        assert np.array_equal(idx, r_idx)
+        assert np.array_equal(stages, r_stages)
+
+    def test_stage_psd(self, tmpdir):
+        """Test function stage_psd."""
+        sf, n_epoch = 100., 3000
+        data = np.random.rand(3, 20 * n_epoch + 100)
+        epochs = np.array([0, 0, 2, 2, -1, 2, 3, 3, 4, 1] * 2)
+        hypno = StageRuns.from_epochs(epochs, 30, n=600)
+        # Stage change inside the 4th epoch (excluded) :
+        hypno.set_stage(100, 110, 1)
+        freqs, psd, counts = stage_psd(data, sf, hypno, n_chunk=3)
+        assert psd.shape == (5, 3, len(freqs))
+        np.testing.assert_array_equal(counts, [4, 2, 5, 4, 2])
+        # Compare with scipy :
+        x = data[:, :20 * n_epoch].reshape(3, 20, n_epoch)
+        x = x[:, [2, 5, 12, 13, 15], :]
+        f, pxx = welch(x, sf, nperseg=400, noverlap=200, window='hann')
+        np.testing.assert_allclose(freqs, f)
+        np.testing.assert_allclose(psd[2], pxx.mean(1), rtol=1e-6)
+        # Array hypnogram, function and memory-mapped data :
+        hyp_full = np.repeat(epochs, n_epoch)
+        out = stage_psd(data[:, :len(hyp_full)], sf, hyp_full)[1]
+        np.testing.assert_allclose(out[[0, 1, 3, 4]], psd[[0, 1, 3, 4]])
+        fcn = stage_psd(lambda a, b: data[:, a:b], sf, hypno,
+                        n_times=data.shape[1])[1]
+        np.testing.assert_allclose(fcn, psd)
+        path = os.path.join(str(tmpdir), 'data.npy')
+        np.save(path, data)
+        mmap = stage_psd(np.load(path, mmap_mode='r'), sf, hypno)[1]
+        np.testing.assert_allclose(mmap, psd)
+        # Missing stage :
+        psd_missing, counts = stage_psd(data, sf, hypno, stages=(5,))[1:]
+        assert counts[0] == 0 and np.isnan(psd_missing).all()
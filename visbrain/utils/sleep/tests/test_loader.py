@@ -0,0 +1,75 @@
+"""Test functions in loader.py."""
+import time
+
+import numpy as np
+import pytest
+
+from visbrain.utils.sleep.loader import ChunkLoader
+
+
+class TestLoader(object):
+    """Test functions in loader.py."""
+
+    @staticmethod
+    def _loader(n_chunk, dsf=1):
+        """Get a loader and the data to load."""
+        raw = np.random.rand(3, 1000).astype(np.float32)
+        data = np.zeros((3, len(range(0, 1000, dsf))), dtype=np.float32)
+
+        def fcn(start, stop):
+            return raw[:, start:stop:dsf].copy()
+
+        return ChunkLoader(fcn, data, 1000, dsf, n_chunk=n_chunk), raw, data
+
+    def test_chunk_loader(self):
+        """Test class ChunkLoader."""
+        loader, raw, data = self._loader(300, dsf=4)
+        assert loader.n_chunk == 300 and len(loader) == 4
+        # First chunk in the calling thread :
+        loader.read(0)
+        assert loader.n_loaded == 75 and not loader.complete
+        np.testing.assert_array_equal(data[:, 0:75], raw[:, 0:300:4])
+        assert not data[:, 75:].any()
+        # Remaining chunks in the background (with scaling) :
+        loader.scale = 2.
+        loader.start()
+        loader.wait()
+        assert loader.complete and (loader.progress == 1.)
+        assert loader.n_loaded == data.shape[1]
+        np.testing.assert_array_equal(data[:, 75:], 2. * raw[:, 300::4])
+        # Chunks are rounded to the down-sampling factor :
+        loader, raw, data = self._loader(250, dsf=3)
+        assert loader.n_chunk == 249
+        loader.wait()
+        np.testing.assert_array_equal(data, raw[:, ::3])
+
+    def test_chunk_loader_error(self):
+        """Test errors during background loading."""
+        data = np.zeros((2, 100), dtype=np.float32)
+
+        def fcn(start, stop):
+            if start >= 50:
+                raise IOError("Corrupted file")
+            return np.ones((2, stop - start), dtype=np.float32)
+
+        loader = ChunkLoader(fcn, data, 100, n_chunk=25)
+        loader.start()
+        with pytest.raises(IOError):
+            loader.wait()
+        assert loader.n_loaded == 50 and not loader.complete
+
+    def test_chunk_loader_cancel(self):
+        """Test cancelling background loading."""
+        data = np.zeros((2, 100), dtype=np.float32)
+
+        def fcn(start, stop):
+            time.sleep(.05)
+            return np.ones((2, stop - start), dtype=np.float32)
+
+        loader = ChunkLoader(fcn, data, 100, n_chunk=10)
+        loader.start()
+        loader.cancel()
+        n_loaded = loader.n_loaded
+        assert not loader.complete and data[:, n_loaded:].sum() == 0.
+        time.sleep(.1)
+        assert not data[:, n_loaded:].any()
@@ -0,0 +1,49 @@
+"""Test functions in prefetch.py."""
+import time
+
+import numpy as np
+
+from visbrain.utils.sleep.prefetch import WindowPrefetcher
+
+
+class TestPrefetch(object):
+    """Test functions in prefetch.py."""
+
+    @staticmethod
+    def _wait(prefetch, keys, timeout=5.):
+        """Wait until keys are prepared by the background thread."""
+        t_start = time.time()
+        while not all([k in prefetch for k in keys]):
+            assert time.time() - t_start < timeout
+            time.sleep(.01)
+
+    def test_window_prefetcher(self):
+        """Test class WindowPrefetcher."""
+        data = np.random.rand(3, 1000)
+        calls = []
+
+        def fcn(start, stop):
+            calls.append((start, stop))
+            return data[:, start:stop] * 2.
+
+        prefetch = WindowPrefetcher(fcn, n_windows=2)
+        win = prefetch.get(300, 400, 'set')
+        np.testing.assert_array_equal(win, data[:, 300:400] * 2.)
+        # Previous and next windows :
+        prefetch.prefetch(300, 400, 100, 1000, 'set')
+        keys = [(k, k + 100, 'set') for k in [100, 200, 400, 500]]
+        self._wait(prefetch, keys)
+        n_calls = len(calls)
+        np.testing.assert_array_equal(prefetch.get(400, 500, 'set'),
+                                      data[:, 400:500] * 2.)
+        assert len(calls) == n_calls
+        # Windows outside the data are ignored :
+        prefetch.prefetch(800, 900, 100, 1000, 'set')
+        keys = [(k, k + 100, 'set') for k in [600, 700, 900]]
+        self._wait(prefetch, keys)
+        assert len(prefetch) <= 5
+        # Settings change :
+        prefetch.get(300, 400, 'new_set')
+        assert len(calls) == n_calls + 4
+        prefetch.invalidate()
+        assert not len(prefetch)
@@ -0,0 +1,77 @@
+"""Test functions in spectro.py."""
+import os
+import time
+
+import numpy as np
+import scipy.signal as scpsig
+
+from visbrain.utils.sleep.spectro import (spectrogram_tile, Spectrum,
+                                          SpectralCache)
+
+
+sf = 100.
+data = np.random.rand(20000)
+
+
+class TestSpectro(object):
+    """Test functions in spectro.py."""
+
+    @staticmethod
+    def _wait(spec, timeout=10.):
+        """Wait until a spectrum is computed by the background thread."""
+        t_start = time.time()
+        while not spec.complete:
+            assert time.time() - t_start < timeout
+            time.sleep(.01)
+
+    def test_spectrogram_tile(self):
+        """Test function spectrogram_tile."""
+        freq, power = spectrogram_tile(data, sf, 300, 100)
+        _freq, _, mesh = scpsig.spectrogram(data, fs=sf, nperseg=300,
+                                            noverlap=100, window='hamming')
+        np.testing.assert_array_equal(freq, _freq)
+        np.testing.assert_allclose(power, 20 * np.log10(mesh), rtol=1e-5)
+
+    def test_spectrum(self):
+        """Test class Spectrum."""
+        _, ref = spectrogram_tile(data, sf, 300, 100)
+        for n_tile in [1, 7, 64, 1000]:
+            spec = Spectrum(data, sf, 300, 100, n_tile=n_tile)
+            assert spec.power.shape == ref.shape
+            spec.compute(0)
+            assert np.isfinite(spec.power[:, 0:n_tile]).all()
+            spec.compute_all()
+            assert spec.complete and spec.progress == 1.
+            np.testing.assert_allclose(spec.power, ref, rtol=1e-4, atol=1e-4)
+            np.testing.assert_allclose(spec.lim, (ref.min(), ref.max()),
+                                       rtol=1e-4)
+        # Preparation :
+        spec = Spectrum(data, sf, 300, 0, prepare=lambda x: 2. * x)
+        spec.compute_all()
+        _, ref = spectrogram_tile(2. * data, sf, 300, 0)
+        np.testing.assert_allclose(spec.power, ref, rtol=1e-4, atol=1e-4)
+
+    def test_spectral_cache(self, tmpdir):
+        """Test class SpectralCache."""
+        cache = SpectralCache(max_size=2, n_tile=8)
+        spec = cache.request('a', data, sf, 200, 0)
+        self._wait(spec)
+        assert cache.request('a', data, sf, 200, 0) is spec
+        # Least recently used spectra are removed :
+        for k in ['b', 'c']:
+            cache.request(k, data, sf, 200, 0, priority=False)
+        assert 'a' not in cache and len(cache) == 2
+        # Compute in the calling thread :
+        spec = cache.wait('c')
+        assert spec.complete
+        cache.invalidate()
+        assert not len(cache)
+        # Disk cache :
+        cache = SpectralCache(cache_dir=str(tmpdir))
+        cache.request('d', data, sf, 200, 0)
+        spec = cache.wait('d')
+        assert len(os.listdir(str(tmpdir))) == 1
+        cache.invalidate()
+        spec_disk = cache.request('d', None, sf, 200, 0)
+        assert spec_disk.complete
+        np.testing.assert_array_equal(spec.power, spec_disk.power)
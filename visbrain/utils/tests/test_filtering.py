@@ -3,8 +3,11 @@ import numpy as np
 import math
 from itertools import product
 
-from visbrain.utils.filtering import (filt, morlet, ndmorlet, morlet_power,
-                                      welch_power, PrepareData)
+from scipy.signal import butter, filtfilt, lfilter
+
+from visbrain.utils.filtering import (filt, filtfilt_blocks, lfilter_blocks,
+                                      morlet, ndmorlet, morlet_power,
+                                      welch_power, FilterBank, PrepareData)
 
 
 class TestFiltering(object):
@@ -32,6 +35,26 @@ class TestFiltering(object):
         for k in self:
             filt(sf, f, x, *k)
 
+    def test_filt_blocks(self):
+        """Test functions filtfilt_blocks and lfilter_blocks."""
+        x = np.random.rand(3, 5000)
+        b, a = butter(3, [.02, .3], btype='bandpass')
+        x_ff, x_lf = filtfilt(b, a, x, axis=1), lfilter(b, a, x, axis=1)
+        for n_block in [200, 1000, 10000]:
+            x_ffb = filtfilt_blocks(b, a, x, axis=1, n_block=n_block)
+            np.testing.assert_allclose(x_ffb, x_ff, rtol=0., atol=1e-9)
+            x_lfb = lfilter_blocks(b, a, x.T, axis=0, n_block=n_block)
+            assert np.allclose(x_lfb.T, x_lf)
+        # Rounding errors are amplified by poles close to the unit circle :
+        b, a = butter(5, [.01, .08], btype='bandpass')
+        x_ffb = filtfilt_blocks(b, a, x, axis=1, n_block=1000)
+        np.testing.assert_allclose(x_ffb, filtfilt(b, a, x, axis=1), rtol=0.,
+                                   atol=1e-4)
+        # Using filt with a preallocated output :
+        out = np.zeros((5000, 3), dtype=np.float32)
+        filt(512., [2., 4.], x.T.astype(np.float32), n_block=500, out=out)
+        assert np.allclose(out, filt(512., [2., 4.], x.T), atol=1e-5)
+
     def test_morlet(self):
         """Test morlet function."""
         x, f, sf = self._get_data(True)
@@ -42,6 +65,17 @@ class TestFiltering(object):
         x, f, sf = self._get_data(True)
         for k in [None, 'amplitude', 'phase', 'power']:
             ndmorlet(x, sf, f, get=k)
+        # Multi-channel decomposition :
+        x_nd = np.random.rand(4, 2000).astype(np.float32)
+        x_amp = ndmorlet(x_nd, sf, f, axis=1, get='amplitude')
+        assert x_amp.shape == x_nd.shape and x_amp.dtype == np.float32
+        assert np.allclose(x_amp[2, :], np.abs(morlet(x_nd[2, :], sf, f)),
+                           atol=1e-5)
+        # Preallocated output :
+        out = np.zeros((2000, 4), dtype=np.complex128)
+        x_c = ndmorlet(x_nd.T.astype(float), sf, f, axis=0, out=out)
+        assert np.shares_memory(out, x_c)
+        assert np.allclose(out[:, 1], morlet(x_nd[1, :].astype(float), sf, f))
 
     def test_morlet_power(self):
         """Test morlet_power function."""
@@ -57,6 +91,47 @@ class TestFiltering(object):
         sf = 100.
         assert math.isclose(welch_power(x, f, sf, norm=True).sum(0).max(), 1.)
 
+    def test_filter_bank(self):
+        """Test class FilterBank."""
+        x, _, sf = self._get_data(True)
+        f = [2., 6., 10., 14.]
+        # Morlet bank is equivalent to the morlet function :
+        fb = FilterBank(sf, f, method='morlet')
+        xf = fb.apply(x)
+        assert xf.shape == (4, len(x)) and len(fb) == 4
+        for k, i in enumerate(f):
+            assert np.allclose(xf[k, :], morlet(x, sf, i))
+        # Blocks and multi-dimensional arrays :
+        assert np.allclose(fb.apply(x, n_block=300), xf)
+        x_2d = np.c_[x, x]
+        xf_2d = fb.apply(x_2d, axis=0, get='amplitude')
+        assert xf_2d.shape == (4, len(x), 2)
+        assert np.allclose(xf_2d[..., 1], np.abs(xf))
+        # Band-pass bank :
+        fb = FilterBank(sf, [[12., 14.], [2., 4.]], method='bandpass')
+        for k in [None, 'real', 'amplitude', 'phase', 'power']:
+            fb.apply(x, get=k)
+        # Morlet power using a filter bank :
+        fb = FilterBank(sf, [1.5, 2.5, 3.5])
+        assert np.allclose(morlet_power(x, fb, sf),
+                           morlet_power(x, [1., 2., 3., 4.], sf))
+
+    def test_single_precision(self):
+        """Test that float32 inputs are kept in float32."""
+        x, f, sf = self._get_data()
+        x_32 = x.astype(np.float32)
+        xf_32, xf_64 = filt(sf, f, x_32), filt(sf, f, x)
+        assert xf_32.dtype == np.float32
+        assert np.allclose(xf_32, xf_64, atol=1e-4)
+        xm_32, xm_64 = morlet(x_32, sf, 3.), morlet(x, sf, 3.)
+        assert xm_32.dtype == np.complex64
+        assert np.allclose(xm_32, xm_64, atol=1e-4)
+        f = [1., 2., 3., 4.]
+        xp_32, xp_64 = morlet_power(x_32, f, sf), morlet_power(x, f, sf)
+        assert xp_32.dtype == np.float32
+        assert np.allclose(xp_32, xp_64, atol=1e-4)
+        assert welch_power(x_32, [5, 10., 15], 100.).dtype == np.float32
+
     def test_prepare_data(self):
         """Test class PrepareData."""
         p = PrepareData(demean=True, detrend=True)
@@ -1,4 +1,5 @@
 """Test functions in guitools.py."""
+import numpy as np
 import pytest
 from PyQt5 import QtWidgets, QtCore
 
@@ -9,7 +10,7 @@ from visbrain.utils.guitools import (slider2opacity, textline2color,
                                      get_combo_list_index, safely_set_cbox,
                                      safely_set_spin, safely_set_slider,
                                      toggle_enable_tab, get_screen_size,
-                                     set_widget_size)
+                                     set_widget_size, ArrayTableModel)
 
 
 class TestGuitools(object):
@@ -161,3 +162,33 @@ class TestGuitools(object):
         app = QtWidgets.QApplication([])
         w = QtWidgets.QWidget()
         set_widget_size(app, w)
+
+    def test_array_table_model(self):
+        """Test class ArrayTableModel."""
+        model = ArrayTableModel(['start', 'end', 'text'], editable=[0, 2])
+        model.set_data(np.array([3., 1., 2.]), np.array([4., 2., 3.]),
+                       np.array(['c', 'a', 'b']))
+        edited = []
+        model.cellChanged.connect(lambda row, col: edited.append((row, col)))
+        assert model.rowCount() == len(model) == 3
+        assert model.data(model.index(0, 2)) == 'c'
+        # Edition :
+        assert model.setData(model.index(1, 0), '5.')
+        assert not model.setData(model.index(1, 0), 'bad')
+        assert not model.setData(model.index(1, 1), '5.')
+        assert (model.get_column(0)[1] == 5.) and (edited == [(1, 0)])
+        # Sorting / filtering :
+        model.sort(0, QtCore.Qt.AscendingOrder)
+        assert model.get_text(2) == ['b', 'c', 'a']
+        assert (model.source_row(0) == 2) and (model.view_row(2) == 0)
+        model.set_filter(model.get_column(0) > 2.)
+        assert model.get_text(2) == ['c', 'a']
+        model.sort(-1)
+        model.set_filter()
+        # Insert / remove rows :
+        model.insert_rows(3, [np.nan], [np.nan], [''])
+        assert model.get_text(0) == ['3.0', '5.0', '2.0', '']
+        model.remove_rows(0, 2)
+        assert model.get_text(2) == ['b', '']
+        model.clear()
+        assert not len(model) and model.get_column(0).dtype == float
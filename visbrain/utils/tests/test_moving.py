@@ -0,0 +1,49 @@
+"""Test functions in moving.py."""
+import numpy as np
+import pytest
+
+from visbrain.utils.moving import (get_window, moving_window, moving_sum,
+                                   moving_average)
+
+
+class TestMoving(object):
+    """Test functions in moving.py."""
+
+    def test_get_window(self):
+        """Test function get_window."""
+        for k in ['flat', 'hanning', 'hamming', 'bartlett', 'blackman']:
+            assert get_window(k, 20).shape == (20,)
+        assert np.array_equal(get_window(np.ones(5), 5), np.ones(5))
+        with pytest.raises(ValueError):
+            get_window('np.ones', 5)
+
+    def test_moving_window(self):
+        """Test function moving_window."""
+        x = np.random.rand(3, 100)
+        xw = moving_window(x, 10, step=5, axis=-1)
+        assert xw.shape == (3, 19, 10)
+        assert np.array_equal(xw[1, 3, :], x[1, 15:25])
+        xw = moving_window(x.T, 10, step=5, axis=0)
+        assert xw.shape == (19, 3, 10)
+        assert np.array_equal(xw[3, 1, :], x[1, 15:25])
+
+    def test_moving_sum(self):
+        """Test function moving_sum."""
+        x = np.random.rand(4, 500)
+        ref = np.array([np.convolve(k, np.hanning(31), 'valid') for k in x])
+        for meth in ['auto', 'direct', 'fft']:
+            xs = moving_sum(x, 31, window='hanning', method=meth)
+            assert np.allclose(xs, ref)
+            xs = moving_sum(x.T, 31, axis=0, window='hanning', method=meth)
+            assert np.allclose(xs, ref.T)
+        ref = np.array([np.convolve(k, np.ones(31), 'valid') for k in x])
+        assert np.allclose(moving_sum(x, 31, method='cumsum'), ref)
+        with pytest.raises(ValueError):
+            moving_sum(x, 31, window='hanning', method='cumsum')
+
+    def test_moving_average(self):
+        """Test function moving_average."""
+        x = np.random.rand(1000).astype(np.float32)
+        xm = moving_average(x, 10)
+        assert xm.dtype == np.float32 and len(xm) == 991
+        assert np.allclose(xm[0], x[0:10].mean())
@@ -3,7 +3,7 @@ import numpy as np
 
 from visbrain.utils.physio import (find_non_eeg, rereferencing, bipolarization,
                                    commonaverage, tal2mni, mni2tal,
-                                   generate_eeg)
+                                   generate_eeg, Montage, MontagedData)
 
 
 class TestPhysio(object):
@@ -48,6 +48,40 @@ class TestPhysio(object):
         data_r, chan_r, consider = commonaverage(data, channels, ignore)
         assert chan_r == ['Cz-m', 'Pz-m', 'Fz-m', 'EOG']
 
+    def test_montage(self):
+        """Test class Montage."""
+        fcns = {'eeg': [(lambda d, c, i: rereferencing(d, c, 1, i),
+                         lambda c, i: Montage.reference(c, 1, i)),
+                        (commonaverage, Montage.average)],
+                'intra': [(bipolarization, Montage.bipolar)]}
+        for kind, couples in fcns.items():
+            for fcn, montage_fcn in couples:
+                data, channels, ignore = self._generate_eeg_dataset(kind)
+                montage = montage_fcn(list(channels), ignore)
+                view = montage.view(data)
+                data_r, chan_r, consider = fcn(data.copy(), list(channels),
+                                               ignore)
+                # Same results as in-place functions :
+                assert montage.names == chan_r
+                np.testing.assert_array_equal(montage.consider, consider)
+                np.testing.assert_allclose(np.asarray(view), data_r)
+                np.testing.assert_allclose(view[1, 10:20], data_r[1, 10:20])
+                np.testing.assert_allclose(view[[0, 2], 5], data_r[[0, 2], 5])
+                np.testing.assert_allclose(view[consider, ...],
+                                           data_r[consider, :])
+        # Stack montages :
+        data, channels, ignore = self._generate_eeg_dataset('intra')
+        bip = Montage.bipolar(channels, ignore)
+        stacked = bip.stack(Montage.average(bip.names, ignore))
+        assert stacked.names == ['m1-m', 'm2-m1-m', 'm3-m2-m', 'i1']
+        x = bipolarization(data.copy(), list(channels), ignore)[0]
+        x = commonaverage(x, list(bip.names), ignore)[0]
+        np.testing.assert_allclose(stacked.apply(data), x)
+        # Identity :
+        assert Montage.identity(channels).is_identity
+        assert not stacked.is_identity
+        assert isinstance(stacked.view(data), MontagedData)
+
     def test_tal2mni(self):
         """Test function tal2mni."""
         xyz = self._generate_coordinates()
@@ -67,6 +67,12 @@ class TestSigproc(object):
         for w in window:
             x_ns = smoothing(x_n, window=w)
             assert len(x_ns) == len(x_n)
+        # Test multichannel smoothing :
+        x_m = np.random.rand(3, 1000)
+        x_ms = smoothing(x_m, n_window=100, window='flat', axis=1)
+        assert np.allclose(x_ms[1], smoothing(x_m[1], 100, 'flat'))
+        x_ms = smoothing(x_m.T, n_window=100, window='hanning', axis=0)
+        assert np.allclose(x_ms[:, 1], smoothing(x_m[1], 100, 'hanning'))
 
     def test_smooth_3d(self):
         """Test function smooth_3d."""
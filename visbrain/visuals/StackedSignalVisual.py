@@ -0,0 +1,214 @@
+"""Display signals stacked on top of each other using a single vertex buffer.
+
+All of the signals are drawn using a single draw call. The samples are sent
+to a unique and contiguous vertex buffer while the time vector and the
+per-signal offset and scaling are computed on the GPU.
+"""
+import numpy as np
+
+from vispy import gloo, visuals
+from vispy.scene.visuals import create_visual_node
+
+from visbrain.utils import color2vb, vispy_array
+
+
+__all__ = ('StackedSignal')
+
+
+vertex_shader = """
+#version 120
+varying vec2 v_index;
+void main() {
+    // Compute the x coordinate from the time index :
+    float x = $u_time.x + $a_index.y * $u_time.y;
+    // Apply the per-signal offset and scaling :
+    float y = $a_scaling.x + $a_scaling.y * $a_position;
+    gl_Position = $transform(vec4(x, y, $u_z, 1.));
+    v_index = $a_index;
+}
+"""
+
+fragment_shader = """
+#version 120
+varying vec2 v_index;
+void main() {
+    gl_FragColor = $u_color;
+
+    // Discard the fragments between the signals (emulate glMultiDrawArrays).
+    if (fract(v_index.x) > 0.)
+        discard;
+}
+"""
+
+
+class StackedSignalVisual(visuals.Visual):
+    """Visual class for stacked signals.
+
+    Parameters
+    ----------
+    color : array_like/string/tuple | 'black'
+        Color of the signals.
+    width : float | 1.
+        Line width.
+    antialias : bool | False
+        Use smooth lines.
+    z : float | 0.
+        Depth of the signals.
+    """
+
+    def __len__(self):
+        """Return the number of time points."""
+        return self._n
+
+    def __init__(self, color='black', width=1., antialias=False, z=0.):
+        """Init."""
+        # =========================== VISUALS ===========================
+        visuals.Visual.__init__(self, vertex_shader, fragment_shader)
+        self.set_gl_state('translucent', depth_test=True, cull_face=False,
+                          blend=True, blend_func=('src_alpha',
+                                                  'one_minus_src_alpha'))
+        self._draw_mode = 'line_strip'
+
+        # =========================== BUFFERS ===========================
+        self._n, self._n_rows = 1, 1
+        self._scaling = np.zeros((1, 2), dtype=np.float32)
+        self._dbuffer = gloo.VertexBuffer(np.zeros((1,), dtype=np.float32))
+        self._ibuffer = gloo.VertexBuffer(np.zeros((1, 2), dtype=np.float32))
+        self._sbuffer = gloo.VertexBuffer(self._scaling)
+        # Send to the program :
+        self.shared_program.vert['a_position'] = self._dbuffer
+        self.shared_program.vert['a_index'] = self._ibuffer
+        self.shared_program.vert['a_scaling'] = self._sbuffer
+        self.shared_program.vert['u_time'] = (0., 1.)
+        self.shared_program.vert['u_z'] = float(z)
+
+        # =========================== PROPERTIES ===========================
+        self.color = color
+        self.width = width
+        self.antialias = antialias
+        self.freeze()
+
+    def set_data(self, data, start=0., step=1.):
+        """Set data to the stacked signals.
+
+        Parameters
+        ----------
+        data : array_like
+            Array of data of shape (n_rows, n_times). The first row is
+            displayed on top.
+        start : float | 0.
+            Time of the first sample.
+        step : float | 1.
+            Time between two consecutive samples.
+        """
+        assert isinstance(data, np.ndarray) and data.ndim == 2
+        n_rows, n = data.shape
+        # Index and scaling buffers only depends on the data shape :
+        if (n_rows, n) != (self._n_rows, self._n):
+            self._n_rows, self._n = n_rows, n
+            index = np.c_[np.repeat(np.arange(n_rows), n),
+                          np.tile(np.arange(n), n_rows)]
+            self._ibuffer.set_data(vispy_array(index))
+            self._scaling = np.zeros((n_rows, 2), dtype=np.float32)
+            self._scaling[:, 1] = 1.
+            self._sbuffer.set_data(np.repeat(self._scaling, n, axis=0))
+        # Send data as a single contiguous block :
+        self._dbuffer.set_data(vispy_array(data.ravel()))
+        self.shared_program.vert['u_time'] = (float(start), float(step))
+        self.update()
+
+    def set_scaling(self, offset, scale):
+        """Set the offset and the scaling of each signal.
+
+        The displayed y coordinate of a sample is offset + scale * data.
+
+        Parameters
+        ----------
+        offset : array_like
+            Offset of each signal of shape (n_rows,).
+        scale : array_like
+            Scaling factor of each signal of shape (n_rows,).
+
+        Returns
+        -------
+        updated : bool
+            Boolean value indicating if the scaling has changed.
+        """
+        scaling = np.c_[offset, scale].astype(np.float32)
+        assert scaling.shape == (self._n_rows, 2)
+        # Only upload the buffer if the scaling has changed :
+        if np.array_equal(scaling, self._scaling):
+            return False
+        self._scaling = scaling
+        self._sbuffer.set_data(np.repeat(scaling, len(self), axis=0))
+        self.update()
+        return True
+
+    def clean(self):
+        """Clean buffers."""
+        self._dbuffer.delete()
+        self._ibuffer.delete()
+        self._sbuffer.delete()
+
+    def _prepare_transforms(self, view):
+        """Call for the first rendering."""
+        tr = view.transforms
+        view_vert = view.view_program.vert
+        view_vert['transform'] = tr.get_transform()
+
+    def _prepare_draw(self, view=None):
+        """Function called everytime there's a camera update."""
+        try:
+            import OpenGL.GL as GL
+            GL.glLineWidth(self._width)
+            if self._antialias:
+                GL.glEnable(GL.GL_LINE_SMOOTH)
+            else:
+                GL.glDisable(GL.GL_LINE_SMOOTH)
+        except Exception:  # can be other than ImportError sometimes
+            pass
+
+    # ========================================================================
+    # ========================================================================
+    # PROPERTIES
+    # ========================================================================
+    # ========================================================================
+    # ----------- COLOR -----------
+    @property
+    def color(self):
+        """Get the color value."""
+        return self._color
+
+    @color.setter
+    def color(self, value):
+        """Set color value."""
+        self._color = color2vb(value).ravel()
+        self.shared_program.frag['u_color'] = self._color
+        self.update()
+
+    # ----------- WIDTH -----------
+    @property
+    def width(self):
+        """Get the width value."""
+        return self._width
+
+    @width.setter
+    def width(self, value):
+        """Set width value."""
+        self._width = value
+        self.update()
+
+    # ----------- ANTIALIAS -----------
+    @property
+    def antialias(self):
+        """Get the antialias value."""
+        return self._antialias
+
+    @antialias.setter
+    def antialias(self, value):
+        """Set antialias value."""
+        self._antialias = value
+        self.update()
+
+
+StackedSignal = create_visual_node(StackedSignalVisual)
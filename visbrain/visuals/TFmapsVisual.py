@@ -10,7 +10,7 @@ import vispy.visuals.transforms as vist
 from vispy.scene.visuals import Image
 
 from ..visuals import CbarBase
-from ..utils import (morlet, array2colormap, vispy_array, averaging,
+from ..utils import (FilterBank, array2colormap, vispy_array, averaging,
                      normalization)
 
 
@@ -89,11 +89,9 @@ class TFmapsMesh(CbarBase):
         self._n = len(data)
         freqs = np.arange(f_min, f_max, f_step)  # frequency vector
         time = np.arange(len(self)) / sf
-        tf = np.zeros((len(freqs), len(self)), dtype=data.dtype)
 
         # ======================= COMPUTE TF =======================
-        for i, k in enumerate(freqs):
-            tf[i, :] = np.square(np.abs(morlet(data, sf, k)))
+        tf = FilterBank(sf, freqs).apply(data, get='power')
 
         # ======================= NORMALIZATION =======================
         normalization(tf, norm=norm, baseline=baseline, axis=1)
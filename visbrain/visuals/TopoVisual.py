@@ -15,7 +15,6 @@ import os
 import logging
 
 import numpy as np
-from scipy.interpolate import interp2d
 
 from vispy import scene
 from vispy.scene import visuals
@@ -222,15 +221,12 @@ class TopoMesh(object):
         self.chanText.transform = vist.STTransform(translate=tr)
 
         # ================== GRID INTERPOLATION ==================
-        # Interpolation vectors :
-        x = y = np.arange(0, self._pix, 1)
-        xnew = ynew = np.arange(0, self._pix, self._interp)
-
-        # Grid interpolation function :
-        def _grid_interpolation(grid):
-            f = interp2d(x, y, grid, kind='linear')
-            return f(xnew, ynew)
-        self._grid_interpolation = _grid_interpolation
+        # Linear interpolation matrix (the grid is interpolated along the
+        # x and y-axis using grid_new = interp @ grid @ interp.T) :
+        xnew = np.arange(0, self._pix, self._interp)
+        self._interp_mat = self._linear_interp_matrix(self._pix, xnew)
+        # Channels -> grid matrix (computed on first call to set_data) :
+        self._grid_mat = None
 
     def __len__(self):
         """Return the number of channels."""
@@ -296,14 +292,18 @@ class TopoMesh(object):
         pos_x, pos_y = xyz[:, 0], xyz[:, 1]
         xmin, xmax = pos_x.min(), pos_x.max()
         ymin, ymax = pos_y.min(), pos_y.max()
-        xi = np.linspace(xmin, xmax, self._pix)
-        yi = np.linspace(ymin, ymax, self._pix)
-        Xi, Yi = np.meshgrid(xi, yi)
-        grid = self._griddata(pos_x, pos_y, data, Xi, Yi)
+        # The grid is a linear combination of the data so the matrix is only
+        # computed once :
+        if self._grid_mat is None:
+            xi = np.linspace(xmin, xmax, self._pix)
+            yi = np.linspace(ymin, ymax, self._pix)
+            Xi, Yi = np.meshgrid(xi, yi)
+            self._grid_mat = self._griddata_matrix(pos_x, pos_y, Xi, Yi)
+        grid = self._grid_mat.dot(data).reshape(self._pix, self._pix)
 
         # =================== INTERPOLATION ===================
         if self._interp is not None:
-            grid = self._grid_interpolation(grid)
+            grid = self._interp_mat.dot(grid).dot(self._interp_mat.T)
         csize = max(self._pix, grid.shape[0])
         # Variables :
         l = csize / 2  # noqa
@@ -481,36 +481,63 @@ class TopoMesh(object):
         return xyz
 
     @staticmethod
-    def _griddata(x, y, v, xi, yi):
-        """Make griddata."""
+    def _griddata_matrix(x, y, xi, yi):
+        """Get the matrix of the biharmonic spline interpolation.
+
+        The interpolated grid is obtained using matrix.dot(v) where v is the
+        vector of values at (x, y).
+
+        Parameters
+        ----------
+        x, y : array_like
+            Coordinates of the data of shape (n,).
+        xi, yi : array_like
+            Coordinates of the grid of shape (m, p).
+
+        Returns
+        -------
+        matrix : array_like
+            The interpolation matrix of shape (m * p, n).
+        """
+        def _green(d):
+            """Green function of the biharmonic operator."""
+            is_null = d == 0.
+            d[is_null] = 1.
+            g = (d * d) * (np.log(d) - 1.)
+            g[is_null] = 0.
+            return g
+
         xy = x.ravel() + y.ravel() * -1j
-        d = xy[None, :] * np.ones((len(xy), 1))
-        d = np.abs(d - d.T)
-        n = d.shape[0]
-        d.flat[::n + 1] = 1.
-
-        g = (d * d) * (np.log(d) - 1.)
-        g.flat[::n + 1] = 0.
-        weights = np.linalg.solve(g, v.ravel())
-
-        m, n = xi.shape
-        zi = np.zeros_like(xi)
-        xy = xy.T
-
-        g = np.empty(xy.shape)
-        for i in range(m):
-            for j in range(n):
-                d = np.abs(xi[i, j] + -1j * yi[i, j] - xy)
-                mask = np.where(d == 0)[0]
-                if len(mask):
-                    d[mask] = 1.
-                np.log(d, out=g)
-                g -= 1.
-                g *= d * d
-                if len(mask):
-                    g[mask] = 0.
-                zi[i, j] = g.dot(weights)
-        return zi
+        xyi = xi.ravel() + yi.ravel() * -1j
+        g = _green(np.abs(xy[:, np.newaxis] - xy[np.newaxis, :]))
+        gi = _green(np.abs(xyi[:, np.newaxis] - xy[np.newaxis, :]))
+        # matrix = gi.dot(inv(g)) :
+        return np.linalg.solve(g.T, gi.T).T
+
+    @staticmethod
+    def _linear_interp_matrix(n, xnew):
+        """Get the matrix of a 1-D linear interpolation.
+
+        Parameters
+        ----------
+        n : int
+            Number of points of the regular grid (0, 1, ..., n - 1).
+        xnew : array_like
+            Coordinates where to interpolate (clipped to [0, n - 1]).
+
+        Returns
+        -------
+        matrix : array_like
+            Matrix of shape (len(xnew), n).
+        """
+        xnew = np.clip(xnew, 0, n - 1)
+        left = np.minimum(np.floor(xnew).astype(int), n - 2)
+        w = xnew - left
+        matrix = np.zeros((len(xnew), n), dtype=float)
+        idx = np.arange(len(xnew))
+        matrix[idx, left] = 1. - w
+        matrix[idx, left + 1] = w
+        return matrix
 
     @staticmethod
     def array_project_radial_to3d(points_2d):
@@ -4,6 +4,7 @@ from .cbar import *  # noqa
 from .GridSignalVisual import GridSignal  # noqa
 from .hypno_visual import Hypnogram  # noqa
 from .PicVisual import PicMesh  # noqa
+from .StackedSignalVisual import StackedSignal  # noqa
 from .TFmapsVisual import TFmapsMesh  # noqa
 from .TopoVisual import TopoMesh  # noqa
 
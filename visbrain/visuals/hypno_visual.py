@@ -10,7 +10,8 @@ from vispy import gloo, visuals
 from vispy.visuals.shaders import Function
 from vispy.scene.visuals import create_visual_node
 
-from visbrain.utils import vispy_array, wrap_properties, color2vb, transient
+from visbrain.utils import (vispy_array, wrap_properties, color2vb, transient,
+                            StageRuns)
 # from visbrain.io import is_opengl_installed
 
 
@@ -164,11 +165,17 @@ class HypogramVisual(visuals.Visual):
 
         Parameters
         ----------
-        data : array_like
-            Array of data of shape (n_pts,).
+        data : array_like | StageRuns
+            Array of data of shape (n_pts,). If data is a StageRuns object,
+            only the boundaries of each run are drawn.
         time : array_like | None
             Array of time points of shape (n_pts,)
         """
+        is_runs = isinstance(data, StageRuns)
+        self._runs = data if is_runs else None
+        self._runs_time = time if is_runs else None
+        if is_runs:
+            return self._set_runs()
         data = np.asarray(data)
         assert data.ndim == 1
         self._n = len(data)
@@ -182,6 +189,29 @@ class HypogramVisual(visuals.Visual):
         self._pos = vispy_array(np.c_[time, data])
         self._position_vbo.set_data(self._pos)
 
+    def _set_runs(self):
+        """Draw each run using four vertices.
+
+        Vertices at runs boundaries are duplicated so that only the vertical
+        lines between two runs are drawn as transients.
+        """
+        runs, time = self._runs, self._runs_time
+        self._n = 4 * len(runs)
+        idx = np.c_[runs.starts, np.minimum(runs.stops, runs.n - 1)]
+        if (time is not None) and (len(time) == runs.n):
+            bounds = np.asarray(time)[idx]
+        else:
+            bounds = idx / runs.sf
+        time = np.repeat(bounds, 2, axis=1).ravel()
+        data = np.repeat(runs.stages, 4).astype(np.float32)
+        # Transients (first and last vertices excluded) :
+        self._transient = data.copy()
+        self._transient[1::4] = self._transient[2::4] = 10.
+        self._transient[[0, -1]] = 10.
+        self._transient_vbo.set_data(self._transient)
+        self._pos = vispy_array(np.c_[time, data])
+        self._position_vbo.set_data(self._pos)
+
     def set_stage(self, stage, idx_start, idx_end):
         """Set stage.
 
@@ -198,6 +228,9 @@ class HypogramVisual(visuals.Visual):
         if isinstance(stage, str):
             assert stage in STAGES
             stage = eval('self.%s' % stage)
+        if self._runs is not None:
+            self._runs.set_stage(idx_start, idx_end, stage)
+            return self._set_runs()
         self._pos[idx_start:idx_end, 1] = stage
         self.transient = self._pos[:, 1]
 